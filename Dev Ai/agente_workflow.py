@@ -1,286 +1,1953 @@
-from google.adk.agents import LlmAgent
-import textwrap
-import os
-import google.generativeai as genai 
-from google.api_core import exceptions
-import streamlit as st # Necessário para acessar st.session_state
-
-# ---------------------------------------------------------
-# CONFIGURAÇÃO E CHAVE API
-# ---------------------------------------------------------
-
-# Use a chave hardcoded fornecida (MUITO CUIDADO com isso em código público!)
-# Prioriza a variável de ambiente, depois o valor padrão
-CHAVE_API = os.getenv("GOOGLE_API_KEY", "key")
-os.environ["GOOGLE_API_KEY"] = CHAVE_API
-
-try:
-    # A configuração global é feita aqui na importação
-    genai.configure(api_key=CHAVE_API)
-except Exception as e:
-    print(f"Erro ao configurar o cliente Gemini: {e}")
-
-# ---------------------------------------------------------
-# INSTRUÇÕES DOS AGENTES
-# ---------------------------------------------------------
-
-instrucao_eng_software = textwrap.dedent("""\
-    Você é um engenheiro de software renomado. Sua tarefa é receber o 'PEDIDO DO CLIENTE' (que pode conter um código existente
-    e/ou uma nova funcionalidade) e transformá-lo em uma especificação técnica detalhada e clara para o desenvolvedor.
-
-    1. **Fidelidade:** Mantenha total fidelidade ao que foi solicitado. Não altere nem adicione funcionalidades não pedidas.
-    2. **Nova Funcionalidade/Criação:** Se houver código existente, a especificação deve focar em como a nova funcionalidade 
-    será integrada ao código fornecido. Se não houver código, gere a especificação para criação do zero.
-    
-    Sua resposta deve ser dividida em duas seções CLARAS, para garantir que o contexto não se perca:
-
-    --- ESPECIFICACAO TECNICA ---
-    [Defina funções, entradas, saídas e requisitos da nova aplicação OU da nova funcionalidade. NÃO escreva código.]
-
-    --- CONTEXTO ORIGINAL DO CLIENTE ---
-    [Cole o 'PEDIDO DO CLIENTE' exatamente como foi recebido, incluindo qualquer código existente e o prompt original.]
-    """)
-
-instrucao_dev = textwrap.dedent("""\
-    Você é um DEV Senior. Você receberá uma 'ESPECIFICACAO TECNICA' e o 'CONTEXTO ORIGINAL DO CLIENTE'.
-
-    1. **Prioridade Máxima:** Codifique a solução conforme a especificação.
-    2. **Código Base (Memória):** O código original (se aplicável) **NÃO ESTÁ NO PROMPT**. Ele está na sua memória.
-       - Se o 'CONTEXTO ORIGINAL' indicar que o código base é **APLICÁVEL**, você **DEVE** modificar o código que está na sua memória (use-o como ponto de partida).
-       - Se o 'CONTEXTO ORIGINAL' indicar **NÃO APLICÁVEL**, crie o código do zero (Ex: o Streamlit).
-    3. **Caso o contexto do cliente inclua a criação de uma nova classe com base no código passado, sua especificação deve detalhar:
-       - Quais funções/métodos da classe existente a nova classe deve importar?
-       - Quais variáveis da classe existente a nova classe deve importar?
-       - Como a nova classe irá implementar a classe passada pelo usuário?
-    4. **Em caso de Feedback (Correção):** Se a entrada for apenas uma lista de tarefas/feedback de erros, reescreva o código 
-    corrigindo TODOS os pontos apontados, mas **use o CONTEXTO ORIGINAL** para saber qual código corrigir e qual a funcionalidade
-     pedida.
-
-    Sua resposta deve ser estruturada exatamente assim:
-
-    --- CODIGO PYTHON ---
-    [Cole o bloco de código Python final, pronto para ser usado.]
-
-    --- CONTEXTO ORIGINAL DO CLIENTE ---
-    [Cole o 'CONTEXTO ORIGINAL DO CLIENTE' sem o código, caso algum tenha sido recebido. O restante, 
-    repasse exatamente como recebido do Engenheiro/Gerente.]
-    """)
-
-instrucao_revisor = textwrap.dedent("""\
-    Você é um revisor de código. Analise erros de sintaxe e PEP8. Se atenha ao que o usuário pediu, 
-    verificando se o código atende o CONTEXTO ORIGINAL.
-    - Se encontrar erros: Liste-os.
-    - Se o código estiver perfeito sintaticamente E atender ao contexto original: Responda APENAS com a frase 'STATUS: APROVADO'.""")
-
-instrucao_beta_tester = textwrap.dedent("""\
-    Você é um Beta Tester. Tente quebrar a lógica do código, focando na funcionalidade pedida no CONTEXTO ORIGINAL.
-    - Se encontrar falhas ou bugs lógicos: Descreva-os. 
-    - Se a lógica estiver sólida E atender ao contexto original: Responda APENAS com a frase 'STATUS: APROVADO'.""")
-
-instrucao_controle_qualidade = textwrap.dedent("""\
-    Você é o QA (Controle de Qualidade). Avalie a experiência e requisitos, garantindo que o código final atenda ao CONTEXTO ORIGINAL 
-    do cliente.
-    - Se houver problemas de usabilidade ou requisitos não atendidos: Liste-os.
-    - Se estiver tudo excelente E atender ao contexto original: Responda APENAS com a frase 'STATUS: APROVADO'.""")
-
-instrucao_gerente_lancamento = textwrap.dedent("""\
-    Você é o Release Manager. Leia os relatórios do Revisor, Beta Tester e QA.
-    Regras Rígidas:
-    1. Se E SOMENTE SE os três relatórios contiverem a frase 'STATUS: APROVADO':
-        Sua resposta deve ser EXATAMENTE: 'TERMINATE'.
-    2. Caso contrário (se houver qualquer erro):
-        Consolide todos os feedbacks negativos em uma lista de tarefas CLARAS para o Dev. 
-        **Você DEVE incluir o 'CONTEXTO ORIGINAL DO CLIENTE' (que está na sua entrada de trabalho) na sua resposta**, 
-        para que o Dev saiba qual código corrigir e qual funcionalidade implementar/corrigir.
-        NÃO gere código. Apenas as instruções de correção e o contexto original formatados como 
-        '--- CONTEXTO ORIGINAL DO CLIENTE --- [Conteúdo]'.
-    """)
-
-# ---------------------------------------------------------
-# DEFINIÇÃO DOS AGENTES
-# ---------------------------------------------------------
-
-eng_software = LlmAgent(
-    name="eng_software", 
-    model="gemini-2.5-flash", 
-    description="Decidir qual a melhor forma de desenvolver uma aplicação", 
-    instruction=instrucao_eng_software)
-
-dev = LlmAgent(
-    name="dev", 
-    model="gemini-2.5-flash", 
-    description="Codificar a aplicação conforme instrução do engenheiro de software", 
-    instruction=instrucao_dev)
-
-revisor = LlmAgent(
-    name="Revisor", 
-    model="gemini-2.5-flash", 
-    description="Revisar erros no código do desenvolvedor que impedem a compilação do mesmo", 
-    instruction=instrucao_revisor)
-
-beta_tester = LlmAgent(
-    name="beta_tester", 
-    model="gemini-2.5-flash", 
-    description="Testar o código do desenvolvedor para procurar possíveis bugs e mal funcionamento", 
-    instruction=instrucao_beta_tester)
-
-controle_qualidade = LlmAgent(
-    name="controle_qualidade", 
-    model="gemini-2.5-flash", 
-    description="Garantir que o usuário da aplicação recebida tenha uma boa experiência com o seu produto", 
-    instruction=instrucao_controle_qualidade)
-
-gerente_lancamento = LlmAgent(
-    name="gerente_lancamento", 
-    model="gemini-2.5-flash", 
-    description="Gerente que decide se o software vai para produção.", 
-    instruction=instrucao_gerente_lancamento) 
-
-# Lista de agentes para uso no workflow
-AGENTES_VERIFICADORES = [revisor, beta_tester, controle_qualidade]
-AGENTE_GERENTE = gerente_lancamento
-
-# ---------------------------------------------------------
-# FUNÇÃO DE EXECUÇÃO SÍNCRONA
-# ---------------------------------------------------------
-
-def executar_agente_sincronamente(agente, entrada, codigo_base_na_memoria=None):
-    """
-    Função wrapper para executar um agente Gemini, com injeção de código base
-    para o DEV quando necessário.
-    """
-    prompt_injetado = ""
-    # Injeção de memória ocorre apenas para o DEV e se o código base for aplicável
-    if agente.name == "dev" and codigo_base_na_memoria and 'APLICÁVEL' in entrada:
-        prompt_injetado = (
-            f"\n\n🚨 CÓDIGO BASE NA MEMÓRIA (INÍCIO DO TRABALHO) 🚨\n"
-            f"{codigo_base_na_memoria}"
-            f"\n🚨 CÓDIGO BASE NA MEMÓRIA (FIM DO TRABALHO) 🚨\n"
-        )
-            
-    prompt_completo = (
-        f"Instrução do Agente '{agente.name}' ({agente.description}): {agente.instruction}\n\n"
-        f"{prompt_injetado}" 
-        f"ENTRADA DE TRABALHO: {entrada}"
-    )
-    
-    # O cliente pega a chave do os.environ, que foi configurada no topo do arquivo.
-    client = genai.GenerativeModel(model_name=agente.model)
-    
-    try:
-        response = client.generate_content(
-            contents=prompt_completo,
-            generation_config={'temperature': 0.0} 
-        )
-        return response.text
-    except exceptions.ResourceExhausted:
-         return f"ERRO DE EXECUÇÃO DO LLM PARA {agente.name}: Limite de quota excedido."
-    except Exception as e:
-        return f"ERRO DE EXECUÇÃO DO LLM PARA {agente.name}: {e}"
-
-# ---------------------------------------------------------
-# FUNÇÃO PRINCIPAL DO WORKFLOW (GERADOR COM CHECK DE ABORT)
-# ---------------------------------------------------------
-
-def executar_workflow_de_desenvolvimento(pedido_do_cliente: str, codigo_base: str = "", max_iteracoes: int = 10):
-    """
-    Executa o ciclo completo de agentes, checando se há um pedido de interrupção 
-    na st.session_state em cada iteração e retornando o status (yield).
-    """
-    
-    # 1. Engenheiro Gera a Spec
-    yield {"status": "iniciado", "mensagem": "1. Engenheiro gerando especificação técnica..."}
-    entrada_engenheiro = f"PEDIDO TEXTUAL: {pedido_do_cliente}\n\nStatus do Código Base: {'Presente' if codigo_base else 'Ausente'}"
-    especificacao_e_contexto = executar_agente_sincronamente(eng_software, entrada_engenheiro)
-
-    entrada_atual = especificacao_e_contexto
-    ultimo_codigo_valido = "Nenhuma tentativa de código ainda."
-    contexto_original_dev = ""
-    loop_terminado = False
-    
-    # Inferência de linguagem para o destaque de sintaxe na UI
-    linguagem_pedida = "python"
-    if "javascript" in pedido_do_cliente.lower() or "js" in pedido_do_cliente.lower():
-        linguagem_pedida = "javascript"
-    elif "java" in pedido_do_cliente.lower():
-        linguagem_pedida = "java"
-    elif "html" in pedido_do_cliente.lower() or "css" in pedido_do_cliente.lower():
-        linguagem_pedida = "html"
-    
-    yield {"status": "engenheiro_completo", "mensagem": "✅ Especificação gerada. Iniciando loop de desenvolvimento."}
-
-    for iteracao_atual in range(1, max_iteracoes + 1):
-        
-        # 💥 CHECAGEM DE INTERRUPÇÃO 💥
-        if st.session_state.get('abort_workflow', False):
-            yield {"status": "terminado", "sucesso": False, "codigo": ultimo_codigo_valido, "linguagem": linguagem_pedida, "mensagem": "🚫 Operação abortada pelo usuário."}
-            st.session_state['abort_workflow'] = False # Reseta o flag
-            return
-
-        yield {"status": "iteracao_inicio", "iteracao": iteracao_atual, "mensagem": f"🔄 Iteração {iteracao_atual}/{max_iteracoes}: Desenvolvedor trabalhando..."}
-        
-        # A. Desenvolvedor trabalha
-        codigo_e_contexto = executar_agente_sincronamente(dev, entrada_atual, codigo_base_na_memoria=codigo_base)
-
-        # 💥 Lógica de Parsing
-        if "--- CONTEXTO ORIGINAL DO CLIENTE ---" in codigo_e_contexto:
-             parts = codigo_e_contexto.split("--- CONTEXTO ORIGINAL DO CLIENTE ---", 1)
-             codigo_gerado = parts[0].replace("--- CODIGO PYTHON ---", "").strip()
-             contexto_original_dev = "--- CONTEXTO ORIGINAL DO CLIENTE ---" + parts[1].strip()
-        else:
-             codigo_gerado = codigo_e_contexto 
-             contexto_original_dev = entrada_atual
-        
-        ultimo_codigo_valido = codigo_gerado
-        yield {"status": "dev_completo", "iteracao": iteracao_atual, "mensagem": f"🛠️ Código gerado. Rodando verificadores..."}
-
-        # B. Verificadores analisam
-        relatorios = []
-        aprovados = 0
-        for agente in AGENTES_VERIFICADORES:
-            analise_input = f"Pedido do Cliente: {pedido_do_cliente}\n\nAnalise o seguinte código:\n{codigo_gerado}"
-            relatorio = executar_agente_sincronamente(agente, analise_input)
-            relatorios.append(relatorio)
-            if 'STATUS: APROVADO' in relatorio:
-                 aprovados += 1
-            yield {"status": "analise", "agente": agente.name, "mensagem": f"   -> {agente.name}: {relatorio.split(':')[0]}..."}
-        
-        yield {"status": "verificadores_completos", "iteracao": iteracao_atual, "mensagem": f"🔎 Análise concluída ({aprovados}/{len(AGENTES_VERIFICADORES)} aprovados). Gerente decidindo..."}
-
-        # C. Gerente Decide
-        relatorio_completo = "\n".join(relatorios)
-        gerente_input = f"RELATÓRIOS DOS REVISORES:\n{relatorio_completo}\n\nCONTEXTO NECESSÁRIO PARA O FEEDBACK:\n{contexto_original_dev}"
-        decisao = executar_agente_sincronamente(AGENTE_GERENTE, gerente_input) 
-
-# agente_workflow.py
-
-# ... (após a linha decisao = executar_agente_sincronamente(...))
-
-        # D. Lógica de Parada (Com Segurança de Parsing)
-        decisao_limpa = decisao.strip()
-        
-        # 1. Checagem de Término
-        if "TERMINATE" in decisao_limpa: 
-            loop_terminado = True
-            yield {"status": "terminado", "sucesso": True, "codigo": ultimo_codigo_valido, "linguagem": linguagem_pedida}
-            return
-            
-        # 2. Processamento do Feedback (Quando Reprovado)
-        else:
-            entrada_atual = decisao
-            
-            # --- BLOCO DE SEGURANÇA CRÍTICO ---
-            try:
-                # Tenta extrair apenas o feedback antes do marcador de contexto
-                feedback_mensagem = decisao_limpa.split('--- CONTEXTO ORIGINAL DO CLIENTE ---', 1)[0].strip()
-            except Exception as e:
-                # Se falhar no split ou parsing, usa a decisão completa.
-                # Isso impede o crash do gerador.
-                feedback_mensagem = f"ERRO DE PARSING DE FEEDBACK: {e}\n\nDECISÃO COMPLETA:\n{decisao_limpa}"
-            # -----------------------------------
-
-            # 3. YIELD DE FEEDBACK (Agora seguro contra crashes de string)
-            yield {"status": "feedback", "iteracao": iteracao_atual, 
-                  "mensagem": f"❌ Reprovado. Feedback enviado ao Dev:\n{feedback_mensagem}"}
-            
-            # O loop continua para a próxima iteração
\ No newline at end of file
+import ast
+import functools
+import contextvars
+import itertools
+import re
+import textwrap
+import os
+import threading
+import time
+from dataclasses import asdict, replace
+from typing import Callable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from backends_llm import obter_armazem_gravacoes
+from clientes_llm import obter_cliente, obter_cliente_assincrono
+from cache_contexto import CacheContexto
+from cache_respostas import CacheRespostas
+from checkpoints_workflow import ArmazemCheckpoints, CheckpointsExecucao
+from cancelamento import OperacaoCancelada, dormir, executar_cancelavel, token_atual, verificar_cancelamento
+from especificacao_agentes import EspecAgente
+from deteccao_convergencia import DetectorConvergencia
+from diff_incremental import (ErroAplicacaoDiff, MARCADOR_DIFF, aplicar_diff, extrair_diff, gerar_diff,
+                              remover_cercas_markdown, resumir_regioes_inalteradas)
+from limitador_taxa import LIMITADOR, ErroLimiteLLM
+from precheck_estatico import (executar_precheck, executar_precheck_projeto, formatar_erros_sintaxe,
+                               formatar_relatorio_estilo)
+from opcoes_workflow import OpcoesWorkflow
+from projeto_arquivos import MARCADOR_ARQUIVO, Projeto
+from roteamento_modelos import HistoricoRoteamento, PoliticaRoteamento, RoteadorExecucao
+from saida_estruturada import (ESQUEMA_DEV, ESQUEMA_ENGENHEIRO, ESQUEMA_GERENTE, ESQUEMA_VERIFICADOR,
+                               LeitorJsonIncremental, config_json, interpretar_json, relatorio_do_verificador)
+from indice_pedidos import IndicePedidos
+from indice_simbolos import ErroRecorte, indexar_codigo, restaurar_trechos
+from memo_veredictos import MemoVeredictos, impressao_texto, simbolos_alterados, simbolos_do_codigo
+from telemetria import TelemetriaExecucao, estimar_custo
+from triagem_candidatos import ranquear_candidatos
+from sandbox_execucao import (MARCADOR_CASOS_DE_TESTE, SandboxIndisponivel, executar_lote, extrair_casos_de_teste,
+                              formatar_resultados)
+
+# ---------------------------------------------------------
+# CONFIGURAÇÃO E CHAVE API
+# ---------------------------------------------------------
+
+# Use a chave hardcoded fornecida (MUITO CUIDADO com isso em código público!)
+# Prioriza a variável de ambiente, depois o valor padrão
+CHAVE_API = os.getenv("GOOGLE_API_KEY", "key")
+os.environ["GOOGLE_API_KEY"] = CHAVE_API
+
+# O SDK do Gemini é importado e configurado (genai.configure) só ao criar o primeiro cliente real. O backend
+# das chamadas (gemini, gravar ou replay offline, por BACKEND_LLM) é aplicado na primeira chamada a um agente.
+
+# ---------------------------------------------------------
+# INSTRUÇÕES DOS AGENTES
+# ---------------------------------------------------------
+
+instrucao_eng_software = textwrap.dedent("""\
+    Você é um engenheiro de software renomado. Sua tarefa é receber o 'PEDIDO DO CLIENTE' (que pode conter um código existente
+    e/ou uma nova funcionalidade) e transformá-lo em uma especificação técnica detalhada e clara para o desenvolvedor.
+
+    1. **Fidelidade:** Mantenha total fidelidade ao que foi solicitado. Não altere nem adicione funcionalidades não pedidas.
+    2. **Nova Funcionalidade/Criação:** Se houver código existente, a especificação deve focar em como a nova funcionalidade 
+    será integrada ao código fornecido. Se não houver código, gere a especificação para criação do zero.
+    
+    Sua resposta deve ser dividida em duas seções CLARAS, para garantir que o contexto não se perca:
+
+    --- ESPECIFICACAO TECNICA ---
+    [Defina funções, entradas, saídas e requisitos da nova aplicação OU da nova funcionalidade. NÃO escreva código.]
+
+    --- CONTEXTO ORIGINAL DO CLIENTE ---
+    [Cole o 'PEDIDO DO CLIENTE' exatamente como foi recebido, incluindo qualquer código existente e o prompt original.]
+    """)
+
+instrucao_dev = textwrap.dedent("""\
+    Você é um DEV Senior. Você receberá uma 'ESPECIFICACAO TECNICA' e o 'CONTEXTO ORIGINAL DO CLIENTE'.
+
+    1. **Prioridade Máxima:** Codifique a solução conforme a especificação.
+    2. **Código Base (Memória):** O código original (se aplicável) **NÃO ESTÁ NO PROMPT**. Ele está na sua memória.
+       - Se o 'CONTEXTO ORIGINAL' indicar que o código base é **APLICÁVEL**, você **DEVE** modificar o código que está na sua memória (use-o como ponto de partida).
+       - Se o 'CONTEXTO ORIGINAL' indicar **NÃO APLICÁVEL**, crie o código do zero (Ex: o Streamlit).
+    3. **Caso o contexto do cliente inclua a criação de uma nova classe com base no código passado, sua especificação deve detalhar:
+       - Quais funções/métodos da classe existente a nova classe deve importar?
+       - Quais variáveis da classe existente a nova classe deve importar?
+       - Como a nova classe irá implementar a classe passada pelo usuário?
+    4. **Em caso de Feedback (Correção):** Se a entrada for apenas uma lista de tarefas/feedback de erros, reescreva o código 
+    corrigindo TODOS os pontos apontados, mas **use o CONTEXTO ORIGINAL** para saber qual código corrigir e qual a funcionalidade
+     pedida.
+
+    Sua resposta deve ser estruturada exatamente assim:
+
+    --- CODIGO PYTHON ---
+    [Cole o bloco de código Python final, pronto para ser usado.]
+
+    --- CONTEXTO ORIGINAL DO CLIENTE ---
+    [Cole o 'CONTEXTO ORIGINAL DO CLIENTE' sem o código, caso algum tenha sido recebido. O restante, 
+    repasse exatamente como recebido do Engenheiro/Gerente.]
+    """)
+
+instrucao_revisor = textwrap.dedent("""\
+    Você é um revisor de código. Analise erros de sintaxe e PEP8. Se atenha ao que o usuário pediu, 
+    verificando se o código atende o CONTEXTO ORIGINAL.
+    - Se encontrar erros: Liste-os.
+    - Se o código estiver perfeito sintaticamente E atender ao contexto original: Responda APENAS com a frase 'STATUS: APROVADO'.""")
+
+instrucao_beta_tester = textwrap.dedent("""\
+    Você é um Beta Tester. Tente quebrar a lógica do código, focando na funcionalidade pedida no CONTEXTO ORIGINAL.
+    - Se encontrar falhas ou bugs lógicos: Descreva-os. 
+    - Se a lógica estiver sólida E atender ao contexto original: Responda APENAS com a frase 'STATUS: APROVADO'.""")
+
+instrucao_controle_qualidade = textwrap.dedent("""\
+    Você é o QA (Controle de Qualidade). Avalie a experiência e requisitos, garantindo que o código final atenda ao CONTEXTO ORIGINAL 
+    do cliente.
+    - Se houver problemas de usabilidade ou requisitos não atendidos: Liste-os.
+    - Se estiver tudo excelente E atender ao contexto original: Responda APENAS com a frase 'STATUS: APROVADO'.""")
+
+instrucao_gerente_lancamento = textwrap.dedent("""\
+    Você é o Release Manager. Leia os relatórios do Revisor, Beta Tester e QA.
+    Regras Rígidas:
+    1. Se E SOMENTE SE os três relatórios contiverem a frase 'STATUS: APROVADO':
+        Sua resposta deve ser EXATAMENTE: 'TERMINATE'.
+    2. Caso contrário (se houver qualquer erro):
+        Consolide todos os feedbacks negativos em uma lista de tarefas CLARAS para o Dev. 
+        **Você DEVE incluir o 'CONTEXTO ORIGINAL DO CLIENTE' (que está na sua entrada de trabalho) na sua resposta**, 
+        para que o Dev saiba qual código corrigir e qual funcionalidade implementar/corrigir.
+        NÃO gere código. Apenas as instruções de correção e o contexto original formatados como 
+        '--- CONTEXTO ORIGINAL DO CLIENTE --- [Conteúdo]'.
+    """)
+
+# Complemento da entrada do Dev no modo incremental (a partir da 2ª iteração)
+instrucao_dev_incremental = textwrap.dedent(f"""\
+    🔁 MODO INCREMENTAL: a 'VERSÃO ATUAL DO CÓDIGO' abaixo já incorpora o código base e as iterações anteriores.
+    NÃO reescreva o arquivo inteiro e NÃO repita o CONTEXTO ORIGINAL. Responda APENAS com a linha '{MARCADOR_DIFF}'
+    seguida de um diff unificado (formato 'diff -u', com cabeçalhos '@@ -a,b +c,d @@' e 3 linhas de contexto)
+    contra a VERSÃO ATUAL, corrigindo TODOS os pontos das tarefas.
+    """)
+
+# Complemento da entrada do Dev quando o resultado é um projeto com vários arquivos
+instrucao_dev_projeto = textwrap.dedent(f"""\
+    📁 PROJETO COM VÁRIOS ARQUIVOS: comece cada arquivo com a linha '{MARCADOR_ARQUIVO.format("caminho/arquivo.py")}'
+    seguida do conteúdo COMPLETO do arquivo. Envie APENAS os arquivos criados ou alterados: os arquivos do projeto
+    que você não enviar são mantidos como estão (inclusive os do código base).
+    """)
+
+# Complemento da entrada do Beta Tester quando o código é executado no sandbox
+instrucao_beta_tester_sandbox = textwrap.dedent(f"""\
+    Use os RESULTADOS DA EXECUÇÃO REAL acima como evidência (tracebacks, saídas, tempos).
+    Se quiser que cenários específicos sejam executados na próxima versão do código, proponha-os após a linha
+    '{MARCADOR_CASOS_DE_TESTE}', cada um em um bloco ```python``` com asserts que usem as funções do código
+    (o caso roda no mesmo namespace do código importado).
+    """)
+
+# Saída estruturada (JSON com esquema): substitui os formatos textuais acima. O contexto do cliente fica
+# com o workflow, que o repassa ao Dev: nenhum agente o ecoa de volta na resposta.
+formato_json_eng_software = textwrap.dedent("""\
+    Responda em JSON: o campo 'especificacao' define funções, entradas, saídas e requisitos da nova aplicação OU da
+    nova funcionalidade (NÃO escreva código). NÃO repita o pedido do cliente: o sistema o repassa ao desenvolvedor.""")
+
+formato_json_dev = textwrap.dedent("""\
+    Responda em JSON: o campo 'codigo' traz o código Python final, pronto para ser usado (sem cercas markdown).
+    NÃO repita o CONTEXTO ORIGINAL DO CLIENTE: o sistema o mantém.""")
+
+formato_json_verificador = textwrap.dedent("""\
+    Responda em JSON: 'status' é 'APROVADO' ou 'REPROVADO' e 'tarefas' lista cada problema encontrado (vazia se
+    aprovado).""")
+
+instrucao_gerente_lancamento_json = textwrap.dedent("""\
+    Você é o Release Manager. Leia os relatórios do Revisor, Beta Tester e QA e responda em JSON.
+    Regras Rígidas:
+    1. Se E SOMENTE SE os três relatórios contiverem a frase 'STATUS: APROVADO': 'decisao' = 'TERMINATE' e 'tarefas' vazia.
+    2. Caso contrário: 'decisao' = 'CORRIGIR' e 'tarefas' com todos os feedbacks negativos consolidados em tarefas
+       CLARAS para o Dev. NÃO gere código e NÃO inclua o CONTEXTO ORIGINAL DO CLIENTE: o sistema o repassa ao Dev.
+    """)
+
+instrucao_beta_tester_sandbox_json = textwrap.dedent("""\
+    Use os RESULTADOS DA EXECUÇÃO REAL acima como evidência (tracebacks, saídas, tempos).
+    Se quiser que cenários específicos sejam executados na próxima versão do código, proponha-os no campo 'testes',
+    cada um como um trecho Python com asserts que usem as funções do código (o caso roda no mesmo namespace do
+    código importado).
+    """)
+
+# ---------------------------------------------------------
+# DEFINIÇÃO DOS AGENTES
+# ---------------------------------------------------------
+
+eng_software = EspecAgente(
+    name="eng_software", 
+    model="gemini-2.5-flash", 
+    description="Decidir qual a melhor forma de desenvolver uma aplicação", 
+    instruction=instrucao_eng_software)
+
+dev = EspecAgente(
+    name="dev", 
+    model="gemini-2.5-flash", 
+    description="Codificar a aplicação conforme instrução do engenheiro de software", 
+    instruction=instrucao_dev)
+
+revisor = EspecAgente(
+    name="Revisor", 
+    model="gemini-2.5-flash", 
+    description="Revisar erros no código do desenvolvedor que impedem a compilação do mesmo", 
+    instruction=instrucao_revisor)
+
+beta_tester = EspecAgente(
+    name="beta_tester", 
+    model="gemini-2.5-flash", 
+    description="Testar o código do desenvolvedor para procurar possíveis bugs e mal funcionamento", 
+    instruction=instrucao_beta_tester)
+
+controle_qualidade = EspecAgente(
+    name="controle_qualidade", 
+    model="gemini-2.5-flash", 
+    description="Garantir que o usuário da aplicação recebida tenha uma boa experiência com o seu produto", 
+    instruction=instrucao_controle_qualidade)
+
+gerente_lancamento = EspecAgente(
+    name="gerente_lancamento", 
+    model="gemini-2.5-flash", 
+    description="Gerente que decide se o software vai para produção.", 
+    instruction=instrucao_gerente_lancamento) 
+
+# Lista de agentes para uso no workflow
+AGENTES_VERIFICADORES = [revisor, beta_tester, controle_qualidade]
+AGENTE_GERENTE = gerente_lancamento
+
+def _sem_formato_textual(instrucao):
+    """Instrução sem a seção final que descreve o formato textual da resposta."""
+    return instrucao.split("Sua resposta deve ser", 1)[0].rstrip()
+
+# Versões com saída estruturada (por nome do agente), usadas com saida_estruturada=True
+AGENTES_JSON = {
+    eng_software.name: replace(eng_software, esquema=ESQUEMA_ENGENHEIRO,
+                               instruction=f"{_sem_formato_textual(instrucao_eng_software)}\n\n{formato_json_eng_software}"),
+    dev.name: replace(dev, esquema=ESQUEMA_DEV, instruction=f"{_sem_formato_textual(instrucao_dev)}\n\n{formato_json_dev}"),
+    **{agente.name: replace(agente, esquema=ESQUEMA_VERIFICADOR, instruction=(
+        agente.instruction.replace("Responda APENAS com a frase 'STATUS: APROVADO'", "use o status 'APROVADO'")
+        + f"\n{formato_json_verificador}")) for agente in AGENTES_VERIFICADORES},
+    AGENTE_GERENTE.name: replace(AGENTE_GERENTE, esquema=ESQUEMA_GERENTE, instruction=instrucao_gerente_lancamento_json),
+}
+
+# Contador global de chamadas efetivas ao LLM (respostas do cache não contam)
+_chamadas_llm = {"total": 0}
+_trava_chamadas_llm = threading.Lock()
+
+def _contar_chamada_llm():
+    with _trava_chamadas_llm:
+        _chamadas_llm["total"] += 1
+
+def total_chamadas_llm():
+    """Total de chamadas ao LLM feitas por este processo (usado para medir vazão)."""
+    return _chamadas_llm["total"]
+
+# Erros do Gemini tratados pelo LIMITADOR com backoff (os demais viram 'ERRO DE EXECUÇÃO DO LLM ...')
+@functools.lru_cache(maxsize=None)
+def _erros_do_sdk():
+    """(erros de quota, erros transitórios) do google.api_core, importado só na primeira chamada."""
+    try:
+        from google.api_core import exceptions
+    except ImportError:  # backends offline (replay/stand-in) sem o SDK instalado
+        return (), ()
+    return ((exceptions.ResourceExhausted, exceptions.TooManyRequests),
+            (exceptions.ServiceUnavailable, exceptions.DeadlineExceeded, exceptions.InternalServerError))
+# Pausas do workflow (evento "pausado") antes de desistir quando o limite persiste após o backoff
+MAX_PAUSAS_QUOTA = int(os.getenv("MAX_PAUSAS_QUOTA", 3))
+
+def _estimar_tokens(texto):
+    return max(1, len(texto) // 4)
+
+def _ajustar_tokens_limitador(agente, tokens_estimados, response):
+    """Corrige no balde de tokens/min a diferença entre o estimado e o uso real informado pela API."""
+    uso = getattr(response, "usage_metadata", None)
+    total = getattr(uso, "total_token_count", None) if uso is not None else None
+    if total:
+        LIMITADOR.ajustar_tokens(agente.model, total - tokens_estimados)
+
+# Configuração de geração compartilhada por todos os agentes (também faz parte da chave do registro de clientes)
+GENERATION_CONFIG = {'temperature': 0.0}
+
+# Armazéns persistentes: abertos no primeiro uso (o import do módulo não faz I/O). Se um deles não abre,
+# o workflow segue sem o recurso correspondente.
+
+# Cache persistente: só faz sentido com temperatura 0 (respostas determinísticas)
+USAR_CACHE_RESPOSTAS = GENERATION_CONFIG.get('temperature') == 0.0
+
+
+@functools.lru_cache(maxsize=None)
+def _abrir_cache_respostas():
+    try:
+        return CacheRespostas()
+    except Exception as e:
+        print(f"Erro ao abrir o cache de respostas (seguindo sem cache): {e}")
+        return None
+
+
+def obter_cache_respostas():
+    """CacheRespostas do processo (None com USAR_CACHE_RESPOSTAS desligado, ex: no benchmark)."""
+    return _abrir_cache_respostas() if USAR_CACHE_RESPOSTAS else None
+
+
+# Checkpoints das execuções: permitem retomar um workflow interrompido pelo execucao_id
+@functools.lru_cache(maxsize=None)
+def obter_checkpoints():
+    try:
+        return ArmazemCheckpoints()
+    except Exception as e:
+        print(f"Erro ao abrir o armazém de checkpoints (seguindo sem retomada): {e}")
+        return None
+
+
+# Índice de execuções aprovadas para reaproveitar pedidos quase idênticos
+LIMIAR_SIMILARIDADE = float(os.getenv("LIMIAR_SIMILARIDADE", 0.8))
+
+
+@functools.lru_cache(maxsize=None)
+def obter_indice_pedidos():
+    try:
+        return IndicePedidos()
+    except Exception as e:
+        print(f"Erro ao abrir o índice de pedidos (seguindo sem reaproveitamento): {e}")
+        return None
+
+
+# Histórico de desempenho por papel/modelo usado pelo roteamento adaptativo
+@functools.lru_cache(maxsize=None)
+def obter_politica_roteamento():
+    try:
+        return PoliticaRoteamento(HistoricoRoteamento())
+    except Exception as e:
+        print(f"Erro ao abrir o histórico de roteamento (seguindo com os modelos fixos): {e}")
+        return None
+
+# Detecção de convergência: modelo do Dev na ação 'escalar' e instrução acrescentada na ação 'reformular'
+MODELO_DEV_ESCALADO = os.getenv("MODELO_DEV_ESCALADO", "gemini-2.5-pro")
+INSTRUCAO_ANTICICLO = (
+    "⚠️ ATENÇÃO: AS ÚLTIMAS TENTATIVAS ENTRARAM EM CICLO ({detalhe}). NÃO repita versões anteriores do código: "
+    "releia a especificação, adote uma abordagem diferente e trate explicitamente cada ponto do feedback."
+)
+
+# ---------------------------------------------------------
+# MONTAGEM DO PROMPT
+# ---------------------------------------------------------
+
+def montar_prompt_em_partes(agente, entrada, codigo_base_na_memoria=None) -> Tuple[str, str]:
+    """
+    Monta o prompt do agente como (prefixo, sufixo): o prefixo (instrução e,
+    para o DEV, o código base injetado) é idêntico em todas as iterações da
+    execução e pode ficar no cache de contexto; o sufixo é a entrada de trabalho.
+    """
+    prompt_injetado = ""
+    # Injeção de memória ocorre apenas para o DEV e se o código base for aplicável
+    if agente.name == "dev" and codigo_base_na_memoria and 'APLICÁVEL' in entrada:
+        prompt_injetado = (
+            f"\n\n🚨 CÓDIGO BASE NA MEMÓRIA (INÍCIO DO TRABALHO) 🚨\n"
+            f"{codigo_base_na_memoria}"
+            f"\n🚨 CÓDIGO BASE NA MEMÓRIA (FIM DO TRABALHO) 🚨\n"
+        )
+            
+    prefixo = (
+        f"Instrução do Agente '{agente.name}' ({agente.description}): {agente.instruction}\n\n"
+        f"{prompt_injetado}"
+    )
+    return prefixo, f"ENTRADA DE TRABALHO: {entrada}"
+
+def montar_prompt(agente, entrada, codigo_base_na_memoria=None):
+    """
+    Monta o prompt completo do agente, com injeção de código base
+    para o DEV quando necessário.
+    """
+    return "".join(montar_prompt_em_partes(agente, entrada, codigo_base_na_memoria))
+
+def _config_geracao(agente, generation_config=None):
+    """generation_config da chamada: o informado (ou GENERATION_CONFIG) mais o esquema JSON do agente, se houver."""
+    generation_config = generation_config or GENERATION_CONFIG
+    return config_json(generation_config, agente.esquema) if agente.esquema else generation_config
+
+def _preparar_envio(agente, client, prefixo, sufixo, contexto, generation_config=None):
+    """(cliente, conteúdo enviado, tokens do prefixo previstos como cacheados) conforme o cache de contexto."""
+    if contexto is None:
+        return client, prefixo + sufixo, 0
+    return contexto.preparar(agente.model, generation_config or GENERATION_CONFIG, prefixo, sufixo, client)
+
+# ---------------------------------------------------------
+# MÉTRICAS DE LATÊNCIA POR CHAMADA
+# ---------------------------------------------------------
+
+def _contar_tokens_saida(texto, response=None):
+    """Usa o usage_metadata da resposta quando disponível; senão estima ~4 caracteres por token."""
+    uso = getattr(response, "usage_metadata", None)
+    tokens = getattr(uso, "candidates_token_count", None) if uso is not None else None
+    return tokens if tokens else max(1, len(texto) // 4) if texto else 0
+
+def _contar_tokens_prompt(metricas, response=None):
+    """prompt_token_count do usage_metadata quando disponível; senão estima pelos bytes do prompt."""
+    uso = getattr(response, "usage_metadata", None)
+    tokens = getattr(uso, "prompt_token_count", None) if uso is not None else None
+    return tokens if tokens else metricas.get("bytes_prompt", 0) // 4
+
+def _contar_tokens_cacheados(response, previstos):
+    """cached_content_token_count do usage_metadata (cache do provedor) ou os tokens previstos pelo CacheContexto."""
+    uso = getattr(response, "usage_metadata", None)
+    tokens = getattr(uso, "cached_content_token_count", None) if uso is not None else None
+    return tokens if tokens else previstos
+
+def _registrar_metricas(metricas, agente, inicio, primeiro_token, texto, response=None, cache=False,
+                        tokens_cacheados_previstos=0):
+    """
+    Preenche o dict 'metricas' (quando fornecido pelo chamador) com a latência
+    percebida (tempo até o primeiro token) e a real (duração total e tokens/s),
+    os tokens de entrada/saída (os de entrada divididos em servidos pelo cache
+    de contexto ou não) e o custo estimado (zero quando veio do cache de respostas).
+    """
+    if metricas is None:
+        return
+    fim = time.perf_counter()
+    primeiro_token = primeiro_token if primeiro_token is not None else fim
+    tokens_saida = _contar_tokens_saida(texto, response)
+    tempo_geracao = fim - primeiro_token
+    metricas.update({
+        "agente": agente.name,
+        "modelo": agente.model,
+        "cache": cache,
+        "duracao": fim - inicio,
+        "ttft": primeiro_token - inicio,
+        "tokens_saida": tokens_saida,
+        "tokens_prompt": 0 if cache else _contar_tokens_prompt(metricas, response),
+        # Sem streaming o texto chega todo de uma vez: a taxa considera a chamada inteira
+        "tokens_por_segundo": tokens_saida / (tempo_geracao if tempo_geracao > 0 else max(fim - inicio, 1e-9)),
+    })
+    tokens_cacheados = 0 if cache else min(metricas["tokens_prompt"],
+                                           _contar_tokens_cacheados(response, tokens_cacheados_previstos))
+    metricas["tokens_prompt_cache"] = tokens_cacheados
+    metricas["tokens_prompt_sem_cache"] = metricas["tokens_prompt"] - tokens_cacheados
+    metricas["custo"] = 0.0 if cache else estimar_custo(agente.model, metricas["tokens_prompt"], tokens_saida,
+                                                        tokens_cacheados)
+
+# ---------------------------------------------------------
+# FUNÇÃO DE EXECUÇÃO SÍNCRONA
+# ---------------------------------------------------------
+
+def executar_agente_sincronamente(agente, entrada, codigo_base_na_memoria=None, metricas=None, contexto=None,
+                                  generation_config=None):
+    """
+    Função wrapper para executar um agente Gemini, com injeção de código base
+    para o DEV quando necessário. Respostas já vistas são servidas pelo
+    cache de respostas (mensagens de erro nunca são cacheadas).
+
+    'contexto' (CacheContexto da execução) permite enviar só o sufixo do
+    prompt quando o prefixo estável já está cacheado no provedor.
+    'generation_config' substitui o GENERATION_CONFIG (ex: temperatura dos
+    candidatos do Dev); com temperatura > 0 o cache de respostas não é usado.
+    Agentes com 'esquema' respondem em JSON restrito a ele.
+
+    Se 'metricas' (dict) for passado, ele recebe a latência da chamada, incluindo
+    a espera no LIMITADOR como componente separado ("espera_limitador").
+
+    Quota excedida ou erros transitórios passam por backoff com jitter; se
+    persistirem, levanta ErroLimiteLLM em vez de devolver texto de erro.
+    """
+    inicio = time.perf_counter()
+    generation_config = _config_geracao(agente, generation_config)
+    prefixo, sufixo = montar_prompt_em_partes(agente, entrada, codigo_base_na_memoria)
+    prompt_completo = prefixo + sufixo
+    if metricas is not None:
+        metricas["bytes_prompt"] = len(prompt_completo.encode("utf-8"))
+    
+    chave_cache = None
+    cache_respostas = obter_cache_respostas()
+    if cache_respostas is not None and generation_config.get('temperature') == 0.0:
+        chave_cache = cache_respostas.gerar_chave(agente.model, prompt_completo, generation_config)
+        resposta_cacheada = cache_respostas.obter(chave_cache)
+        if resposta_cacheada is not None:
+            _registrar_metricas(metricas, agente, inicio, None, resposta_cacheada, cache=True)
+            return resposta_cacheada
+
+    # O cliente é reaproveitado entre chamadas (um por modelo + generation_config).
+    # Ele pega a chave do os.environ, que foi configurada no topo do arquivo.
+    obter_armazem_gravacoes()  # aplica BACKEND_LLM no primeiro uso
+    client = obter_cliente(agente.model, generation_config)
+    _contar_chamada_llm()
+    tokens_estimados = _estimar_tokens(prompt_completo)
+    erros_quota, erros_transitorios = _erros_do_sdk()
+    
+    try:
+        client, conteudo, tokens_cacheados = _preparar_envio(agente, client, prefixo, sufixo, contexto,
+                                                             generation_config)
+        response = LIMITADOR.executar(
+            agente.model, tokens_estimados,
+            lambda: executar_cancelavel(lambda: client.generate_content(contents=conteudo)),
+            erros_quota=erros_quota, erros_transitorios=erros_transitorios, metricas=metricas)
+        _ajustar_tokens_limitador(agente, tokens_estimados, response)
+        if chave_cache:
+            cache_respostas.guardar(chave_cache, response.text)
+        _registrar_metricas(metricas, agente, inicio, None, response.text, response,
+                            tokens_cacheados_previstos=tokens_cacheados)
+        return response.text
+    except ErroLimiteLLM:
+        raise
+    except Exception as e:
+        if metricas is not None:
+            metricas["falha"] = "erro_llm"
+        return f"ERRO DE EXECUÇÃO DO LLM PARA {agente.name}: {e}"
+
+# ---------------------------------------------------------
+# FUNÇÃO DE EXECUÇÃO EM STREAMING
+# ---------------------------------------------------------
+
+def executar_agente_em_stream(agente, entrada, codigo_base_na_memoria=None, metricas=None, contexto=None,
+                              generation_config=None):
+    """
+    Versão em streaming de executar_agente_sincronamente (stream=True): gera os
+    trechos de texto à medida que o modelo os produz. Em caso de erro, o último
+    trecho é a mensagem 'ERRO DE EXECUÇÃO DO LLM PARA ...'. O LIMITADOR cobre o
+    início do stream (até o primeiro trecho); ErroLimiteLLM é levantado antes de
+    qualquer trecho ser gerado. Se o consumidor parar de ler (ex: o veredito já
+    chegou), as métricas registram o parcial e a resposta não vai ao cache.
+    """
+    inicio = time.perf_counter()
+    generation_config = _config_geracao(agente, generation_config)
+    prefixo, sufixo = montar_prompt_em_partes(agente, entrada, codigo_base_na_memoria)
+    prompt_completo = prefixo + sufixo
+    if metricas is not None:
+        metricas["bytes_prompt"] = len(prompt_completo.encode("utf-8"))
+
+    chave_cache = None
+    cache_respostas = obter_cache_respostas()
+    if cache_respostas is not None and generation_config.get('temperature') == 0.0:
+        chave_cache = cache_respostas.gerar_chave(agente.model, prompt_completo, generation_config)
+        resposta_cacheada = cache_respostas.obter(chave_cache)
+        if resposta_cacheada is not None:
+            _registrar_metricas(metricas, agente, inicio, None, resposta_cacheada, cache=True)
+            yield resposta_cacheada
+            return
+
+    obter_armazem_gravacoes()  # aplica BACKEND_LLM no primeiro uso
+    client = obter_cliente(agente.model, generation_config)
+    _contar_chamada_llm()
+    tokens_estimados = _estimar_tokens(prompt_completo)
+    erros_quota, erros_transitorios = _erros_do_sdk()
+
+    def iniciar_stream():
+        iterador = iter(cliente_envio.generate_content(contents=conteudo, stream=True))
+        return iterador, next(iterador, None)
+
+    def fechar_stream(iterador):
+        fechar = getattr(iterador, "close", None)
+        if fechar is not None:
+            fechar()
+
+    partes = []
+    primeiro_token = None
+    ultimo_chunk = None
+    try:
+        cliente_envio, conteudo, tokens_cacheados = _preparar_envio(agente, client, prefixo, sufixo, contexto,
+                                                                    generation_config)
+        iterador, primeiro_chunk = LIMITADOR.executar(
+            agente.model, tokens_estimados,
+            lambda: executar_cancelavel(iniciar_stream, descartar=lambda aberto: fechar_stream(aberto[0])),
+            erros_quota=erros_quota, erros_transitorios=erros_transitorios, metricas=metricas)
+    except ErroLimiteLLM:
+        raise
+    except Exception as e:
+        if metricas is not None:
+            metricas["falha"] = "erro_llm"
+        yield f"ERRO DE EXECUÇÃO DO LLM PARA {agente.name}: {e}"
+        return
+
+    try:
+        for chunk in itertools.chain([primeiro_chunk] if primeiro_chunk is not None else [], iterador):
+            verificar_cancelamento()
+            trecho = chunk.text
+            if not trecho:
+                continue
+            if primeiro_token is None:
+                primeiro_token = time.perf_counter()
+            partes.append(trecho)
+            ultimo_chunk = chunk
+            yield trecho
+    except (GeneratorExit, OperacaoCancelada):
+        # Fecha o stream do cliente já (e não na coleta de lixo): o gravador registra o parcial lido
+        fechar_stream(iterador)
+        _registrar_metricas(metricas, agente, inicio, primeiro_token, "".join(partes), ultimo_chunk,
+                            tokens_cacheados_previstos=tokens_cacheados)
+        raise
+    except Exception as e:
+        if metricas is not None:
+            metricas["falha"] = "erro_llm"
+        yield f"ERRO DE EXECUÇÃO DO LLM PARA {agente.name}: {e}"
+        return
+
+    texto = "".join(partes)
+    _ajustar_tokens_limitador(agente, tokens_estimados, ultimo_chunk)
+    if chave_cache:
+        cache_respostas.guardar(chave_cache, texto)
+    # O usage_metadata do último chunk traz o total acumulado da resposta
+    _registrar_metricas(metricas, agente, inicio, primeiro_token, texto, ultimo_chunk,
+                        tokens_cacheados_previstos=tokens_cacheados)
+
+# ---------------------------------------------------------
+# FUNÇÃO DE EXECUÇÃO ASSÍNCRONA
+# ---------------------------------------------------------
+
+async def executar_agente_assincronamente(agente, entrada, codigo_base_na_memoria=None, metricas=None):
+    """
+    Contraparte assíncrona de executar_agente_sincronamente, construída sobre
+    generate_content_async. Permite sobrepor a espera de várias chamadas no
+    mesmo event loop (ex: asyncio.gather sobre os verificadores).
+    """
+    inicio = time.perf_counter()
+    generation_config = _config_geracao(agente)
+    prompt_completo = montar_prompt(agente, entrada, codigo_base_na_memoria)
+    if metricas is not None:
+        metricas["bytes_prompt"] = len(prompt_completo.encode("utf-8"))
+    chave_cache = None
+    cache_respostas = obter_cache_respostas()
+    if cache_respostas is not None:
+        chave_cache = cache_respostas.gerar_chave(agente.model, prompt_completo, generation_config)
+        resposta_cacheada = cache_respostas.obter(chave_cache)
+        if resposta_cacheada is not None:
+            _registrar_metricas(metricas, agente, inicio, None, resposta_cacheada, cache=True)
+            return resposta_cacheada
+
+    obter_armazem_gravacoes()  # aplica BACKEND_LLM no primeiro uso
+    client = obter_cliente_assincrono(agente.model, generation_config)
+    _contar_chamada_llm()
+    tokens_estimados = _estimar_tokens(prompt_completo)
+    erros_quota, erros_transitorios = _erros_do_sdk()
+
+    try:
+        response = await LIMITADOR.executar_async(
+            agente.model, tokens_estimados, lambda: client.generate_content_async(contents=prompt_completo),
+            erros_quota=erros_quota, erros_transitorios=erros_transitorios, metricas=metricas)
+        _ajustar_tokens_limitador(agente, tokens_estimados, response)
+        if chave_cache:
+            cache_respostas.guardar(chave_cache, response.text)
+        _registrar_metricas(metricas, agente, inicio, None, response.text, response)
+        return response.text
+    except ErroLimiteLLM:
+        raise
+    except Exception as e:
+        if metricas is not None:
+            metricas["falha"] = "erro_llm"
+        return f"ERRO DE EXECUÇÃO DO LLM PARA {agente.name}: {e}"
+
+# ---------------------------------------------------------
+# EXECUÇÃO DOS VERIFICADORES (SEQUENCIAL OU CONCORRENTE)
+# ---------------------------------------------------------
+
+def _verificar_em_json(agente, analise_input, metricas, contexto, modelo=None):
+    """
+    Verificador com saída estruturada, em streaming: o 'status' é lido assim
+    que chega (métrica "tempo_veredito"); uma aprovação encerra a leitura sem
+    esperar o resto. Devolve o relatório no formato textual do workflow.
+    """
+    inicio = time.perf_counter()
+    leitor = LeitorJsonIncremental()
+    partes = []
+    agente_json = AGENTES_JSON[agente.name]
+    if modelo:
+        agente_json = replace(agente_json, model=modelo)
+    stream = executar_agente_em_stream(agente_json, analise_input, metricas=metricas, contexto=contexto)
+    try:
+        for trecho in stream:
+            if trecho.startswith("ERRO DE EXECUÇÃO DO LLM"):
+                return trecho
+            partes.append(trecho)
+            for tipo, chave, valor in leitor.alimentar(trecho):
+                if tipo == "campo" and chave == "status":
+                    metricas["tempo_veredito"] = time.perf_counter() - inicio
+                    if valor == "APROVADO" and not leitor.completo:
+                        metricas["veredito_antecipado"] = True
+                        return relatorio_do_verificador({"status": valor})
+    finally:
+        stream.close()
+    dados = interpretar_json("".join(partes))
+    if dados is None or "status" not in dados:
+        metricas["falha_json"] = True
+        return "".join(partes)
+    return relatorio_do_verificador(dados)
+
+def _executar_verificador(agente, analise_input, contexto=None, estruturada=False, modelo=None):
+    metricas = {}
+    try:
+        if estruturada:
+            relatorio = _verificar_em_json(agente, analise_input, metricas, contexto, modelo)
+        else:
+            chamado = replace(agente, model=modelo) if modelo else agente
+            relatorio = executar_agente_sincronamente(chamado, analise_input, metricas=metricas, contexto=contexto)
+    except ErroLimiteLLM as e:
+        # Devolvido como relatório para não derrubar os demais verificadores do pool
+        relatorio = e
+    return relatorio, metricas
+
+def executar_verificadores(analise_input, concorrente=True, complementos=None, agentes=None, contexto=None,
+                           estruturada=False, modelos=None):
+    """
+    Executa os AGENTES_VERIFICADORES (ou apenas o subconjunto 'agentes') sobre a
+    mesma entrada e gera tuplas (indice, agente, relatorio, metricas) à medida
+    que cada um termina; o índice é sempre a posição em AGENTES_VERIFICADORES.
+    Se o limite do LLM persistir para um verificador, seu "relatorio" é a
+    própria exceção ErroLimiteLLM (o chamador decide pausar e refazê-lo).
+    'complementos' (nome do agente -> texto) acrescenta informação específica
+    à entrada de um verificador (ex: o relatório PEP8 local para o Revisor).
+    'contexto' é o CacheContexto da execução, repassado a cada chamada.
+    Com 'estruturada' os verificadores respondem em JSON (AGENTES_JSON),
+    convertido para o mesmo formato de relatório. 'modelos' (nome do agente ->
+    modelo) troca o modelo de um verificador só na chamada (roteamento).
+
+    No modo concorrente as chamadas são disparadas ao mesmo tempo em um pool de
+    threads, de modo que a iteração paga apenas a latência do verificador mais
+    lento. O índice permite ao chamador manter a ordem original dos relatórios.
+    """
+    complementos = complementos or {}
+    modelos = modelos or {}
+    selecionados = [
+        (indice, agente) for indice, agente in enumerate(AGENTES_VERIFICADORES)
+        if agentes is None or agente in agentes
+    ]
+    if not selecionados:
+        return
+    entradas = {
+        agente.name: f"{analise_input}\n\n{complementos[agente.name]}" if agente.name in complementos else analise_input
+        for _, agente in selecionados
+    }
+
+    if not concorrente:
+        for indice, agente in selecionados:
+            yield (indice, agente, *_executar_verificador(agente, entradas[agente.name], contexto, estruturada,
+                                                          modelos.get(agente.name)))
+        return
+
+    with ThreadPoolExecutor(max_workers=len(selecionados)) as pool:
+        # Cada thread herda o contexto (token de cancelamento do job) de quem chamou
+        futuros = {
+            pool.submit(contextvars.copy_context().run, _executar_verificador, agente, entradas[agente.name], contexto,
+                        estruturada, modelos.get(agente.name)): (indice, agente)
+            for indice, agente in selecionados
+        }
+        for futuro in as_completed(futuros):
+            indice, agente = futuros[futuro]
+            yield (indice, agente, *futuro.result())
+
+# ---------------------------------------------------------
+# DECISÃO DE LANÇAMENTO POR REGRAS (SEM CHAMADA AO LLM)
+# ---------------------------------------------------------
+
+def _extrair_tarefas(relatorio):
+    """Transforma um relatório reprovado em itens de tarefa (listas do relatório ou o texto inteiro)."""
+    relatorio = relatorio.split(MARCADOR_CASOS_DE_TESTE, 1)[0]
+    linhas = [linha.strip() for linha in relatorio.splitlines() if linha.strip()]
+    itens = [
+        re.sub(r"^(?:[-*•]|\d+[.)])\s*", "", linha) for linha in linhas
+        if re.match(r"^(?:[-*•]|\d+[.)])\s+", linha)
+    ]
+    return itens or [" ".join(linhas)]
+
+def decidir_lancamento(relatorios, contexto_original_dev=""):
+    """
+    Aplica localmente a regra 1 do gerente_lancamento: 'TERMINATE' se e somente
+    se todos os relatórios contêm 'STATUS: APROVADO'. Caso contrário, consolida
+    os feedbacks negativos em uma lista de tarefas para o Dev, seguida do
+    contexto original (regra 2), sem gastar uma chamada ao LLM.
+    """
+    if all('STATUS: APROVADO' in relatorio for relatorio in relatorios):
+        return "TERMINATE"
+
+    secoes = ["LISTA DE TAREFAS PARA O DEV (corrija TODOS os pontos):"]
+    numero = 1
+    for agente, relatorio in zip(AGENTES_VERIFICADORES, relatorios):
+        if 'STATUS: APROVADO' in relatorio:
+            continue
+        secoes.append(f"\n[{agente.name}]")
+        for tarefa in _extrair_tarefas(relatorio):
+            secoes.append(f"{numero}. {tarefa}")
+            numero += 1
+    tarefas = "\n".join(secoes)
+    return f"{tarefas}\n\n{contexto_original_dev}" if contexto_original_dev else tarefas
+
+# ---------------------------------------------------------
+# EXTRAÇÃO DO CÓDIGO BASE E AUXILIARES DO WORKFLOW
+# ---------------------------------------------------------
+
+def extrair_codigo_base(texto_cliente: str) -> Tuple[str, str]:
+    """
+    Extrai o código base do pedido do cliente usando um marcador.
+    """
+    match = re.search(r"(?:CÓDIGO DADO:|CÓDIGO BASE:)\s*(.*)", texto_cliente, re.DOTALL | re.IGNORECASE)
+    
+    if match:
+        codigo = match.group(1).strip()
+        codigo = re.sub(r"```python\s*|```", "", codigo).strip()
+        pedido_textual = texto_cliente.replace(match.group(0), "").strip()
+        return pedido_textual, codigo
+    
+    return texto_cliente, "" 
+
+def _pausar_por_quota(erro, pausas):
+    """
+    Gerador: pausa o workflow (evento "pausado") pelo tempo sugerido no erro de
+    limite. Após MAX_PAUSAS_QUOTA pausas o erro é propagado e o workflow encerra.
+    """
+    if pausas["pausas"] >= MAX_PAUSAS_QUOTA:
+        raise erro
+    pausas["pausas"] += 1
+    pausas["espera_total"] += erro.espera_sugerida
+    yield {"status": "pausado", "espera": erro.espera_sugerida, "modelo": erro.modelo,
+           "mensagem": f"⏸️ Limite do LLM atingido ({erro}). Pausando {erro.espera_sugerida:.0f}s antes de retomar..."}
+    dormir(erro.espera_sugerida)
+
+def _chamar_com_pausa(chamada, pausas):
+    """Gerador: executa 'chamada()' e, enquanto o limite do LLM persistir, pausa e tenta de novo (retorna o resultado)."""
+    while True:
+        try:
+            return chamada()
+        except ErroLimiteLLM as e:
+            yield from _pausar_por_quota(e, pausas)
+
+def _relatorio_invalido(relatorio, metricas):
+    """Relatório de verificador que não serve ao workflow: vazio, erro do LLM ou fora do esquema (saída estruturada)."""
+    return not relatorio.strip() or relatorio.startswith("ERRO DE EXECUÇÃO DO LLM") or bool(metricas.get("falha_json"))
+
+def _verificar_com_pausa(analise_input, agentes, pausas, **opcoes):
+    """
+    executar_verificadores com pausa por quota: gera as mesmas tuplas e, entre
+    elas, os eventos "pausado" (dict); após a pausa refaz apenas os
+    verificadores que ficaram sem relatório.
+    """
+    pendentes = list(agentes)
+    while pendentes:
+        limitados = []
+        for indice, agente, relatorio, metricas in executar_verificadores(analise_input, agentes=pendentes, **opcoes):
+            if isinstance(relatorio, ErroLimiteLLM):
+                limitados.append((agente, relatorio))
+            else:
+                yield indice, agente, relatorio, metricas
+        pendentes = [agente for agente, _ in limitados]
+        if limitados:
+            yield from _pausar_por_quota(limitados[0][1], pausas)
+
+def _verificar_com_checkpoints(checkpoints, iteracao, etapa, analise_input, agentes, pausas, **opcoes):
+    """
+    _verificar_com_pausa que primeiro devolve os relatórios salvos em checkpoint
+    (com métricas None: não houve chamada) e grava os relatórios dos demais.
+    """
+    pendentes = []
+    for indice, agente in enumerate(AGENTES_VERIFICADORES):
+        if agente not in agentes:
+            continue
+        relatorio = checkpoints.obter(iteracao, f"{etapa}:{agente.name}")
+        if relatorio is None:
+            pendentes.append(agente)
+        else:
+            yield indice, agente, relatorio, None
+    for item in _verificar_com_pausa(analise_input, pendentes, pausas, **opcoes):
+        if not isinstance(item, dict):
+            checkpoints.gravar(iteracao, f"{etapa}:{item[1].name}", item[2])
+        yield item
+
+def _dev_em_stream(agente, entrada_dev, codigo_base_dev, metricas_dev, iteracao, pausas, contexto):
+    """
+    Gerador: Dev em streaming (eventos "dev_parcial"), refeito do início após
+    uma pausa por quota; retorna o texto. Com saída estruturada, os trechos
+    exibidos são o código já decodificado do campo 'codigo' do JSON. Se o
+    stream falha no meio, o parcial é descartado e só a mensagem de erro é
+    retornada, como em executar_agente_sincronamente.
+    """
+    while True:
+        partes_dev = []
+        leitor = LeitorJsonIncremental() if agente.esquema else None
+        try:
+            for trecho in executar_agente_em_stream(agente, entrada_dev, codigo_base_na_memoria=codigo_base_dev,
+                                                    metricas=metricas_dev, contexto=contexto):
+                if trecho.startswith("ERRO DE EXECUÇÃO DO LLM"):
+                    return trecho
+                partes_dev.append(trecho)
+                if leitor is not None:
+                    trecho = "".join(texto for tipo, chave, texto in leitor.alimentar(trecho)
+                                     if tipo == "trecho" and chave == "codigo")
+                    if not trecho:
+                        continue
+                yield {"status": "dev_parcial", "iteracao": iteracao, "trecho": trecho}
+            return "".join(partes_dev)
+        except ErroLimiteLLM as e:
+            yield from _pausar_por_quota(e, pausas)
+
+# Variantes do Dev no modo especulativo (temperatura, ênfase acrescentada à entrada). O candidato 0 é o Dev
+# de sempre (GENERATION_CONFIG); os demais ciclam pelas variantes.
+VARIANTES_CANDIDATOS = [
+    (None, ""),
+    (0.7, "ÊNFASE DESTA VERSÃO: a solução mais simples e direta que atenda à especificação."),
+    (0.7, "ÊNFASE DESTA VERSÃO: robustez — valide as entradas e trate casos de borda e erros."),
+    (1.0, "ÊNFASE DESTA VERSÃO: cobertura completa de cada item da especificação."),
+]
+
+def _gerar_candidatos_dev(agente, entrada_dev, codigo_base_dev, indices, contexto):
+    """
+    Chama o Dev para os candidatos 'indices' ao mesmo tempo (uma variante de
+    VARIANTES_CANDIDATOS cada) e devolve {indice: (resposta, metricas)}, em
+    que 'resposta' é o ErroLimiteLLM dos candidatos que esbarraram no limite
+    do LLM (métricas com "falha": "limite_llm").
+    """
+    def gerar(indice):
+        temperatura, enfase = VARIANTES_CANDIDATOS[indice % len(VARIANTES_CANDIDATOS)]
+        config = GENERATION_CONFIG if temperatura is None else {**GENERATION_CONFIG, "temperature": temperatura}
+        metricas = {}
+        try:
+            resposta = executar_agente_sincronamente(
+                agente, f"{entrada_dev}\n\n{enfase}" if enfase else entrada_dev,
+                codigo_base_na_memoria=codigo_base_dev, metricas=metricas, contexto=contexto, generation_config=config)
+        except ErroLimiteLLM as e:
+            metricas.update({"agente": agente.name, "modelo": agente.model, "falha": "limite_llm"})
+            return e, metricas
+        return resposta, metricas
+
+    with ThreadPoolExecutor(max_workers=len(indices)) as pool:
+        futuros = {pool.submit(contextvars.copy_context().run, gerar, indice): indice for indice in indices}
+        return {futuros[futuro]: futuro.result() for futuro in as_completed(futuros)}
+
+def _candidatos_com_checkpoints(checkpoints, iteracao, quantidade, agente, entrada_dev, codigo_base_dev, pausas,
+                                contexto):
+    """
+    Gerador: os 'quantidade' candidatos do Dev, salvos em checkpoint (métricas
+    None) ou gerados em paralelo; retorna {indice: (resposta, metricas)}. Os
+    que esbarram no limite do LLM são refeitos após uma pausa por quota. Sem
+    pausas restantes, o workflow segue com os que vingaram (evento
+    "candidato_limitado", com as métricas de cada um para a telemetria); se
+    nenhum vingou, o ErroLimiteLLM encerra o workflow.
+    """
+    candidatos = {}
+    for indice in range(quantidade):
+        salvo = checkpoints.obter(iteracao, f"dev_candidato:{indice}")
+        if salvo is not None:
+            candidatos[indice] = (salvo, None)
+    pendentes = [indice for indice in range(quantidade) if indice not in candidatos]
+    while pendentes:
+        limitados = {}
+        for indice, (resposta, metricas) in _gerar_candidatos_dev(agente, entrada_dev, codigo_base_dev, pendentes,
+                                                                    contexto).items():
+            if isinstance(resposta, ErroLimiteLLM):
+                limitados[indice] = (resposta, metricas)
+            else:
+                checkpoints.gravar(iteracao, f"dev_candidato:{indice}", resposta)
+                candidatos[indice] = (resposta, metricas)
+        if not limitados:
+            break
+        erro = next(iter(limitados.values()))[0]
+        if pausas["pausas"] >= MAX_PAUSAS_QUOTA and candidatos:
+            for indice, (_, metricas) in sorted(limitados.items()):
+                yield {"status": "candidato_limitado", "iteracao": iteracao, "indice": indice, "metricas": metricas,
+                       "mensagem": f"⚠️ Candidato {indice + 1}/{quantidade} do Dev sem resposta ({erro}): "
+                                   f"seguindo com os demais."}
+            break
+        yield from _pausar_por_quota(erro, pausas)
+        pendentes = sorted(limitados)
+    return candidatos
+
+def _eh_python_valido(codigo):
+    try:
+        ast.parse(codigo)
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+# ---------------------------------------------------------
+# FUNÇÃO PRINCIPAL DO WORKFLOW (GERADOR COM CHECK DE ABORT)
+# ---------------------------------------------------------
+
+def executar_workflow_de_desenvolvimento(pedido_do_cliente: str, codigo_base: str = "", max_iteracoes: int = 10,
+                                         opcoes: Optional[OpcoesWorkflow] = None,
+                                         deve_abortar: Optional[Callable[[], bool]] = None,
+                                         execucao_id: Optional[str] = None, **ajustes):
+    """
+    Executa o ciclo completo de agentes, checando se há um pedido de interrupção 
+    em cada iteração e retornando o status (yield). A interrupção vem do callable
+    'deve_abortar' ou, na falta dele, do TokenCancelamento atual (usar_token),
+    que também interrompe chamadas ao LLM em andamento e esperas do limitador:
+    nesse caso o workflow encerra com um "terminado" de operação abortada.
+
+    As funcionalidades opcionais vêm de 'opcoes' (OpcoesWorkflow, que documenta
+    cada uma e os eventos que ela acrescenta); 'ajustes' aceita os mesmos campos
+    como argumentos nomeados (ex: stream_dev=False) e sobrepõe 'opcoes'. As
+    etapas de cada iteração ficam em ExecucaoWorkflow; aqui a execução é
+    montada e os eventos ganham a telemetria.
+
+    Todas as chamadas passam pelo LIMITADOR compartilhado (limites por minuto
+    configurados, backoff com jitter). Se a quota continuar excedida, o workflow emite um
+    evento "pausado" e retoma do mesmo ponto (no caso dos verificadores, só os
+    que ficaram sem relatório); após MAX_PAUSAS_QUOTA pausas, encerra com um
+    "terminado" sem sucesso em vez de seguir com relatórios de erro. Os eventos
+    "terminado" trazem "quota" com as pausas.
+
+    Toda execução aprovada entra no índice de pedidos (MinHash do pedido e da AST
+    do código base), consultado com a opção 'reaproveitar_similares'.
+
+    Cada chamada de agente é registrada em uma TelemetriaExecucao (duração,
+    tokens de entrada/saída, retentativas e custo estimado): os eventos
+    "feedback" e "terminado" trazem "telemetria_iteracao" (agregado da
+    iteração) e o "terminado" traz "telemetria", com os agregados por agente,
+    por iteração e da execução e a exportação em JSON lines/Prometheus.
+
+    A saída de cada etapa (especificação, código do Dev, relatório de cada
+    verificador, resumo e decisão do gerente) é gravada em segundo plano no
+    armazém de checkpoints sob o 'execucao_id' (gerado se ausente; vem no evento
+    "iniciado"). Chamar de novo com o mesmo 'execucao_id' (ou usar
+    retomar_workflow) retoma a execução: as etapas salvas são reaproveitadas
+    sem chamar o LLM e o trabalho continua da primeira etapa sem checkpoint.
+    Os eventos "terminado" trazem "checkpoints" com as etapas reaproveitadas.
+    """
+    opcoes = replace(opcoes or OpcoesWorkflow(), **ajustes)
+    parametros = {"pedido_do_cliente": pedido_do_cliente, "codigo_base": codigo_base, "max_iteracoes": max_iteracoes,
+                  **asdict(opcoes)}
+    checkpoints = CheckpointsExecucao(obter_checkpoints(), execucao_id, parametros)
+    contexto = CacheContexto() if opcoes.cache_contexto else None
+    telemetria = TelemetriaExecucao(execucao_id=checkpoints.execucao_id)
+    roteador = None
+    politica_roteamento = obter_politica_roteamento() if opcoes.roteamento_adaptativo else None
+    if politica_roteamento is not None:
+        roteador = RoteadorExecucao(politica_roteamento, {
+            agente.name: agente.model for agente in [eng_software, dev, AGENTE_GERENTE, *AGENTES_VERIFICADORES]})
+    execucao = ExecucaoWorkflow(opcoes, checkpoints, contexto, roteador, pedido_do_cliente, codigo_base, max_iteracoes,
+                                deve_abortar)
+    # Resultado para o histórico de roteamento: None (abortada) não conta contra os geradores
+    sucesso_execucao = None
+    iteracao = 0  # 0 = engenheiro (antes do loop)
+    try:
+        for evento in execucao.executar():
+            iteracao = evento.get("iteracao", iteracao)
+            if evento.get("metricas"):
+                telemetria.registrar(iteracao, evento["metricas"])
+                if roteador is not None:
+                    roteador.registrar_chamada(evento["metricas"].get("agente"), evento["metricas"])
+            if evento["status"] in ("feedback", "erro_dev", "terminado"):
+                evento["telemetria_iteracao"] = telemetria.da_iteracao(iteracao)
+            if evento["status"] == "terminado":
+                evento["telemetria"] = telemetria
+                abortada = not evento["sucesso"] and execucao.deve_abortar()
+                sucesso_execucao = None if abortada else evento["sucesso"]
+            yield evento
+    except ErroLimiteLLM as e:
+        yield {"status": "terminado", "sucesso": False, "codigo": execucao.ultimo_codigo_valido,
+               "linguagem": execucao.linguagem,
+               "mensagem": f"⛔ Workflow encerrado: limite do LLM persistiu após {MAX_PAUSAS_QUOTA} pausa(s) ({e}).",
+               "telemetria_iteracao": telemetria.da_iteracao(iteracao), "telemetria": telemetria,
+               **execucao.estatisticas()}
+    except OperacaoCancelada:
+        # Cancelado durante uma chamada ao LLM ou uma espera (não só entre iterações)
+        yield {"status": "terminado", "sucesso": False, "codigo": execucao.ultimo_codigo_valido,
+               "linguagem": execucao.linguagem,
+               "mensagem": "🚫 Operação abortada pelo usuário.",
+               "telemetria_iteracao": telemetria.da_iteracao(iteracao), "telemetria": telemetria,
+               **execucao.estatisticas()}
+    finally:
+        if contexto is not None:
+            contexto.liberar()
+        if roteador is not None:
+            roteador.encerrar(sucesso_execucao)
+
+def retomar_workflow(execucao_id: str, deve_abortar: Optional[Callable[[], bool]] = None, **sobrescritas):
+    """
+    Retoma uma execução a partir do último checkpoint, com os parâmetros
+    gravados (ou 'sobrescritas', ex: um max_iteracoes maior).
+    """
+    armazem_checkpoints = obter_checkpoints()
+    if armazem_checkpoints is None:
+        raise ValueError("Armazém de checkpoints indisponível: não é possível retomar execuções.")
+    parametros, _ = armazem_checkpoints.carregar(execucao_id)
+    if parametros is None:
+        raise ValueError(f"Execução '{execucao_id}' não encontrada nos checkpoints.")
+    return executar_workflow_de_desenvolvimento(**{**parametros, **sobrescritas}, deve_abortar=deve_abortar,
+                                                execucao_id=execucao_id)
+
+def _inferir_linguagem(pedido_do_cliente):
+    """Linguagem pedida, para o destaque de sintaxe na UI."""
+    pedido = pedido_do_cliente.lower()
+    if "javascript" in pedido or "js" in pedido:
+        return "javascript"
+    if "java" in pedido:
+        return "java"
+    if "html" in pedido or "css" in pedido:
+        return "html"
+    return "python"
+
+# ---------------------------------------------------------
+# ETAPAS DE UMA EXECUÇÃO DO WORKFLOW
+# ---------------------------------------------------------
+
+class ExecucaoWorkflow:
+    """
+    Estado de uma execução do workflow (entrada atual do Dev, última versão do
+    código, agentes com o modelo da vez e estatísticas) e as etapas de cada
+    iteração: Dev, pré-verificação local, sandbox, verificadores, gerente,
+    passe final, feedback e reação à convergência. As etapas são geradores:
+    os eventos seguem para o chamador por 'yield from' e o resultado da etapa
+    volta no 'return'. Cada etapa lê as funcionalidades ligadas em 'opcoes'.
+    """
+
+    def __init__(self, opcoes, checkpoints, contexto, roteador, pedido_do_cliente, codigo_base, max_iteracoes,
+                 deve_abortar=None):
+        self.opcoes = opcoes
+        self.checkpoints = checkpoints
+        self.contexto = contexto
+        self.roteador = roteador
+        self.pedido_do_cliente = pedido_do_cliente
+        self.codigo_base = codigo_base
+        self.max_iteracoes = max_iteracoes
+        self.deve_abortar = deve_abortar or token_atual() or (lambda: False)
+        self.pausas_quota = {"pausas": 0, "espera_total": 0.0}
+        self.inicio = time.perf_counter()
+        self.linguagem = _inferir_linguagem(pedido_do_cliente)
+        # Desligada no meio da execução se o sandbox não tiver isolamento
+        self.execucao_sandbox = opcoes.execucao_sandbox
+        # Passa a True quando uma etapa emite o "terminado" (ex: parada por convergência)
+        self.encerrada = False
+
+        self.similar = None
+        self.especificacao_e_contexto = ""
+        self.entrada_atual = ""
+        self.ultimo_codigo_valido = "Nenhuma tentativa de código ainda."
+        self.contexto_original_dev = ""
+        self.bytes_prompt_iteracao = 0
+        # Modo incremental: última versão (sem cercas markdown) e o diff da iteração
+        self.codigo_anterior = None
+        self.diff_iteracao = ""
+        self.casos_de_teste = []
+        self.memo_veredictos = MemoVeredictos()
+        self.codigo_memo_anterior = ""
+        # Recorte do código base: o índice de símbolos é montado uma vez por execução
+        self.indice_base = indexar_codigo(codigo_base) if opcoes.recorte_codigo_base and codigo_base else None
+        # Detecção de convergência: o Dev pode ser escalado ou ter a entrada reformulada no meio da execução
+        self.detector = DetectorConvergencia() if opcoes.acao_convergencia else None
+        self.instrucao_anticiclo = ""
+        # Projeto multiarquivo: os arquivos do código base entram no projeto; o Dev regenera só os arquivos alvo
+        self.projeto = Projeto.de_texto(codigo_base) if opcoes.projeto_multiarquivo else None
+        self.arquivos_alvo = []
+        self.arquivos_alterados = []
+
+        self.agente_dev = AGENTES_JSON[dev.name] if opcoes.saida_estruturada else dev
+        self.agente_gerente = AGENTES_JSON[AGENTE_GERENTE.name] if opcoes.saida_estruturada else AGENTE_GERENTE
+        if roteador is not None:
+            # Verificadores: o modelo de cada um é trocado na chamada (modelos_verificadores, atualizado nas subidas)
+            self.agente_dev = replace(self.agente_dev, model=roteador.modelo(dev.name))
+            self.agente_gerente = replace(self.agente_gerente, model=roteador.modelo(AGENTE_GERENTE.name))
+        self.modelos_verificadores = roteador.modelos if roteador is not None else None
+
+        self.estatisticas_similar = {}
+        self.estatisticas_precheck = {"execucoes": 0, "reprovacoes_locais": 0, "chamadas_llm_economizadas": 0}
+        self.estatisticas_gerente = {"decisoes": 0, "chamadas_llm": 0, "chamadas_evitadas": 0}
+        self.estatisticas_memo = {"vereditos_memo": 0, "chamadas_ao_vivo": 0, "passes_finais": 0}
+        self.estatisticas_recorte = {"chamadas": 0, "bytes_enviados": 0, "bytes_base": 0, "falhas": 0}
+        self.estatisticas_candidatos = {"iteracoes": 0, "gerados": 0, "descartados": 0, "limitados": 0,
+                                        "com_erro": 0, "escolhidos_por_variante": {}}
+        self.estatisticas_convergencia = {"acao": opcoes.acao_convergencia,
+                                          "deteccoes": self.detector.deteccoes if self.detector else [],
+                                          "acoes_aplicadas": [], "iteracoes_economizadas": 0, "melhor_iteracao": None}
+        self.estatisticas_estruturada = {"tokens_saida_economizados": 0, "por_iteracao": {},
+                                         "vereditos_antecipados": 0, "falhas_json": 0}
+        self.estatisticas_projeto = {"arquivos": {}, "bytes_regenerados": 0, "por_iteracao": {}}
+
+    def estatisticas(self):
+        """Estatísticas acumuladas da execução, anexadas aos eventos "terminado"."""
+        opcoes = self.opcoes
+        return {"precheck": self.estatisticas_precheck, "gerente": self.estatisticas_gerente,
+                "memo": self.estatisticas_memo, "quota": self.pausas_quota,
+                "checkpoints": self.checkpoints.estatisticas(), "similar": self.estatisticas_similar,
+                "cache_contexto": self.contexto.estatisticas() if self.contexto is not None else {},
+                "recorte": self.estatisticas_recorte if self.indice_base is not None else {},
+                "candidatos": self.estatisticas_candidatos if opcoes.candidatos_dev > 1 else {},
+                "convergencia": self.estatisticas_convergencia if self.detector is not None else {},
+                "saida_estruturada": self.estatisticas_estruturada if opcoes.saida_estruturada else {},
+                "projeto": ({**self.estatisticas_projeto, "arquivos": dict(self.projeto.hashes)}
+                            if self.projeto is not None else {}),
+                "roteamento": self.roteador.resumo() if self.roteador is not None else {}}
+
+    def executar(self):
+        """Gerador com os eventos da execução, do "iniciado" ao "terminado"."""
+        yield from self.etapa_engenheiro()
+
+        for iteracao in range(1, self.max_iteracoes + 1):
+
+            # 💥 CHECAGEM DE INTERRUPÇÃO 💥
+            if self.deve_abortar():
+                yield {"status": "terminado", "sucesso": False, "codigo": self.ultimo_codigo_valido,
+                       "linguagem": self.linguagem, "mensagem": "🚫 Operação abortada pelo usuário.",
+                       **self.estatisticas()}
+                return
+
+            yield {"status": "iteracao_inicio", "iteracao": iteracao,
+                   "mensagem": f"🔄 Iteração {iteracao}/{self.max_iteracoes}: Desenvolvedor trabalhando..."}
+            self.bytes_prompt_iteracao = 0
+
+            # A. Desenvolvedor trabalha
+            codigo_gerado = yield from self.etapa_dev(iteracao)
+            if codigo_gerado is None:
+                continue  # o Dev não respondeu: é chamado de novo com a mesma entrada
+
+            # A.0 Convergência: o Dev repetiu a versão anterior ou voltou a uma já reprovada
+            codigo_memo = remover_cercas_markdown(codigo_gerado)
+            # Hash do texto (do projeto inteiro, no modo projeto): uma versão que só muda a formatação ou os
+            # comentários é nova, tanto para a detecção de convergência quanto para o memo de vereditos
+            chave_memo = impressao_texto(codigo_memo)
+            simbolos_atuais = simbolos_do_codigo(codigo_memo)
+            if self.detector is not None:
+                deteccao = self.detector.registrar_codigo(iteracao, chave_memo)
+                if deteccao:
+                    if (yield from self.reagir_a_convergencia(deteccao, iteracao)):
+                        return
+                    # Versão repetida não vai aos verificadores: o Dev escalado/reformulado refaz com o mesmo feedback
+                    continue
+
+            # A.1 Pré-verificação local (sintaxe + PEP8), sem custo de LLM
+            complementos_verificadores = {}
+            if (yield from self.etapa_precheck(iteracao, codigo_gerado, complementos_verificadores)):
+                if self.encerrada:
+                    return
+                continue
+
+            # A.2 Execução real no sandbox (importação + casos de teste em paralelo)
+            yield from self.etapa_sandbox(iteracao, codigo_gerado, complementos_verificadores)
+
+            # B. Verificadores analisam
+            relatorios, aprovacoes_herdadas = yield from self.etapa_verificadores(
+                iteracao, codigo_gerado, codigo_memo, chave_memo, simbolos_atuais, complementos_verificadores)
+
+            # C. Gerente Decide
+            decisao, metricas_gerente = yield from self.etapa_gerente(iteracao, relatorios)
+            if self.opcoes.modo_incremental:
+                self.codigo_anterior = codigo_gerado
+
+            # D. Lógica de Parada
+            # 0. Passe final: aprovações herdadas precisam ser confirmadas ao vivo antes do TERMINATE
+            if "TERMINATE" in decisao and aprovacoes_herdadas:
+                decisao = yield from self.etapa_passe_final(iteracao, codigo_gerado, chave_memo, simbolos_atuais,
+                                                            relatorios, aprovacoes_herdadas,
+                                                            complementos_verificadores, decisao)
+            self.checkpoints.gravar(iteracao, "decisao", decisao)
+
+            # 1. Checagem de Término
+            if "TERMINATE" in decisao:
+                yield from self.concluir(iteracao, metricas_gerente)
+                return
+
+            # 2. Processamento do Feedback (Quando Reprovado)
+            yield from self.etapa_feedback(iteracao, decisao, relatorios, codigo_gerado, metricas_gerente)
+            if self.encerrada:
+                return
+
+        # Limite de iterações atingido sem aprovação do gerente
+        self.checkpoints.gravar(self.max_iteracoes, "terminado", "limite")
+        yield {"status": "terminado", "sucesso": False, "codigo": self.ultimo_codigo_valido, "linguagem": self.linguagem,
+               "mensagem": f"⌛ Limite de {self.max_iteracoes} iterações atingido sem aprovação.\n\n"
+                           f"Última versão do código:\n{self.ultimo_codigo_valido}",
+               **self.estatisticas()}
+
+    # -----------------------------------------------------
+    # AUXILIARES DAS ETAPAS
+    # -----------------------------------------------------
+
+    def _chamar_agente(self, iteracao, etapa, agente, entrada, metricas, codigo_base=None):
+        """Gerador: chamada síncrona do agente, com pausa por quota e checkpoint da etapa; retorna a resposta."""
+        return (yield from self.checkpoints.etapa(iteracao, etapa, lambda: _chamar_com_pausa(
+            lambda: executar_agente_sincronamente(agente, entrada, codigo_base_na_memoria=codigo_base,
+                                                  metricas=metricas, contexto=self.contexto),
+            self.pausas_quota)))
+
+    def registrar_roteamento(self, papel, falhou, motivo, iteracao):
+        """
+        Gerador: conta o sucesso/falha do papel no roteador e, se ele subir de
+        nível, atualiza o agente correspondente e emite o evento "roteamento".
+        """
+        if self.roteador is None:
+            return
+        if not falhou:
+            self.roteador.registrar_sucesso(papel)
+            return
+        escalonamento = self.roteador.registrar_falha(papel, motivo, iteracao)
+        if escalonamento is None:
+            return
+        self.agente_dev = replace(self.agente_dev, model=self.roteador.modelo(dev.name))
+        self.agente_gerente = replace(self.agente_gerente, model=self.roteador.modelo(AGENTE_GERENTE.name))
+        yield {"status": "roteamento", **escalonamento,
+               "mensagem": f"⬆️ {papel} passa de {escalonamento['de']} para {escalonamento['para']} ({motivo})."}
+
+    def ler_json(self, resposta, iteracao, metricas, campo):
+        """
+        Valor de 'campo' na resposta JSON (saída estruturada) ou None se ela
+        estiver fora do esquema; contabiliza o contexto que deixou de ser ecoado.
+        """
+        if resposta.startswith("ERRO DE EXECUÇÃO DO LLM"):
+            return None
+        dados = interpretar_json(resposta)
+        if dados is None or campo not in dados:
+            self.estatisticas_estruturada["falhas_json"] += 1
+            if metricas is not None:
+                metricas["falha_json"] = True
+            return None
+        if metricas and not metricas.get("cache"):
+            economia = _estimar_tokens(self.contexto_original_dev) if self.contexto_original_dev else 0
+            self.estatisticas_estruturada["tokens_saida_economizados"] += economia
+            por_iteracao = self.estatisticas_estruturada["por_iteracao"]
+            por_iteracao[iteracao] = por_iteracao.get(iteracao, 0) + economia
+        return dados[campo]
+
+    def codigo_do_dev(self, resposta, iteracao, metricas):
+        """Código da resposta do Dev: o campo 'codigo' do JSON ou, fora do esquema, a resposta como veio."""
+        if not self.opcoes.saida_estruturada:
+            return resposta
+        codigo = self.ler_json(resposta, iteracao, metricas, "codigo")
+        return codigo if isinstance(codigo, str) else resposta
+
+    def decisao_do_gerente(self, resposta, iteracao, metricas):
+        """Decisão do gerente LLM no formato do workflow ('TERMINATE' ou tarefas + contexto original)."""
+        if not self.opcoes.saida_estruturada:
+            return resposta
+        decisao = self.ler_json(resposta, iteracao, metricas, "decisao")
+        if decisao == "TERMINATE":
+            return "TERMINATE"
+        if decisao != "CORRIGIR":
+            return resposta
+        tarefas = interpretar_json(resposta).get("tarefas") or []
+        texto = "LISTA DE TAREFAS PARA O DEV (corrija TODOS os pontos):\n" + "\n".join(
+            f"{numero}. {tarefa}" for numero, tarefa in enumerate(tarefas, start=1))
+        contexto_feedback = "" if self.opcoes.modo_incremental else self.contexto_original_dev
+        return f"{texto}\n\n{contexto_feedback}" if contexto_feedback else texto
+
+    # -----------------------------------------------------
+    # 0/1. PEDIDO SIMILAR E ENGENHEIRO
+    # -----------------------------------------------------
+
+    def etapa_engenheiro(self):
+        """Gerador: retomada, pedido similar e especificação do engenheiro (define a primeira entrada do Dev)."""
+        opcoes = self.opcoes
+        checkpoints = self.checkpoints
+        if checkpoints.retomada:
+            yield {"status": "retomado", "execucao_id": checkpoints.execucao_id,
+                   "mensagem": f"♻️ Retomando a execução {checkpoints.execucao_id}: {len(checkpoints.salvas)} etapa(s) "
+                               f"salva(s) serão reaproveitadas sem chamar o LLM."}
+
+        # 0. Pedido quase idêntico já aprovado: reaproveita a spec e o código dele
+        indice_pedidos = obter_indice_pedidos() if opcoes.reaproveitar_similares else None
+        if indice_pedidos is not None:
+            self.similar = indice_pedidos.buscar(self.pedido_do_cliente, self.codigo_base, LIMIAR_SIMILARIDADE)
+        similar = self.similar
+        if similar:
+            self.estatisticas_similar = {
+                "execucao_similar": similar["execucao_id"], "similaridade": similar["similaridade"],
+                "tempo_busca_ms": similar["tempo_busca"] * 1000, "iteracoes_referencia": similar["iteracoes"],
+                "duracao_referencia": similar["duracao"]}
+            yield {"status": "similar_encontrado", **self.estatisticas_similar,
+                   "mensagem": f"🔁 Pedido {similar['similaridade']:.0%} similar a uma execução aprovada "
+                               f"({similar['iteracoes']} iteração(ões), {similar['duracao']:.0f}s; busca em "
+                               f"{similar['tempo_busca'] * 1000:.1f} ms): reaproveitando a especificação e o código aprovado."}
+
+        # 1. Engenheiro Gera a Spec
+        yield {"status": "iniciado", "execucao_id": checkpoints.execucao_id,
+               "mensagem": "1. Reaproveitando a especificação do pedido similar..." if similar
+                           else "1. Engenheiro gerando especificação técnica..."}
+        entrada_engenheiro = (f"PEDIDO TEXTUAL: {self.pedido_do_cliente}\n\n"
+                              f"Status do Código Base: {'Presente' if self.codigo_base else 'Ausente'}")
+        metricas_engenheiro = {}
+        agente_engenheiro = AGENTES_JSON[eng_software.name] if opcoes.saida_estruturada else eng_software
+        if self.roteador is not None:
+            agente_engenheiro = replace(agente_engenheiro, model=self.roteador.modelo(eng_software.name))
+        if similar:
+            especificacao_e_contexto = yield from checkpoints.etapa(0, "engenheiro", lambda: _chamar_com_pausa(
+                lambda: similar["especificacao"], self.pausas_quota))
+        else:
+            especificacao_e_contexto = yield from self._chamar_agente(0, "engenheiro", agente_engenheiro,
+                                                                      entrada_engenheiro, metricas_engenheiro)
+        if opcoes.saida_estruturada and not similar:
+            # O contexto original é montado aqui, não ecoado pelo engenheiro
+            dados = interpretar_json(especificacao_e_contexto)
+            if dados is not None and isinstance(dados.get("especificacao"), str):
+                especificacao_e_contexto = (
+                    f"--- ESPECIFICACAO TECNICA ---\n{dados['especificacao']}\n\n"
+                    f"--- CONTEXTO ORIGINAL DO CLIENTE ---\nPEDIDO DO CLIENTE: {self.pedido_do_cliente}\n"
+                    f"Código base: {'APLICÁVEL (está na memória do Dev)' if self.codigo_base else 'nenhum (criar do zero)'}"
+                )
+                if metricas_engenheiro and not metricas_engenheiro.get("cache"):
+                    self.estatisticas_estruturada["tokens_saida_economizados"] += _estimar_tokens(entrada_engenheiro)
+                    self.estatisticas_estruturada["por_iteracao"][0] = _estimar_tokens(entrada_engenheiro)
+            elif not especificacao_e_contexto.startswith("ERRO DE EXECUÇÃO DO LLM"):
+                self.estatisticas_estruturada["falhas_json"] += 1
+        self.especificacao_e_contexto = especificacao_e_contexto
+
+        self.entrada_atual = especificacao_e_contexto
+        if similar:
+            # Antes da spec: o contexto original (no fim da spec) continua sendo o último bloco da entrada do Dev
+            self.entrada_atual = (
+                f"--- CÓDIGO APROVADO PARA UM PEDIDO QUASE IDÊNTICO (similaridade {similar['similaridade']:.0%}) ---\n"
+                f"{similar['codigo_aprovado']}\n"
+                f"Parta deste código e altere apenas o que o pedido atual exige de diferente.\n\n{especificacao_e_contexto}"
+            )
+        if opcoes.saida_estruturada and "--- CONTEXTO ORIGINAL DO CLIENTE ---" in especificacao_e_contexto:
+            # Sem eco do Dev, o contexto original vem da spec e é mantido pelo workflow
+            self.contexto_original_dev = (
+                "--- CONTEXTO ORIGINAL DO CLIENTE ---"
+                + especificacao_e_contexto.split("--- CONTEXTO ORIGINAL DO CLIENTE ---", 1)[1].strip())
+
+        yield {"status": "engenheiro_completo",
+               "mensagem": f"✅ Especificação {'reaproveitada' if similar else 'gerada'}. Iniciando loop de desenvolvimento.",
+               "metricas": metricas_engenheiro}
+
+    # -----------------------------------------------------
+    # A. DESENVOLVEDOR
+    # -----------------------------------------------------
+
+    def _entrada_dev(self, usar_diff):
+        """(entrada_dev, codigo_base_dev, recorte) da chamada ao Dev nesta iteração."""
+        recorte = None
+        if usar_diff:
+            # O Dev recebe a versão anterior (não o código base) e devolve só o diff
+            entrada_dev = (
+                f"{instrucao_dev_incremental}\nTAREFAS DE CORREÇÃO:\n{self.entrada_atual}\n\n{self.contexto_original_dev}\n\n"
+                f"--- VERSÃO ATUAL DO CÓDIGO ---\n{self.codigo_anterior}"
+            )
+            codigo_base_dev = None
+        else:
+            entrada_dev = self.entrada_atual
+            codigo_base_dev = self.codigo_base
+            if self.indice_base is not None and 'APLICÁVEL' in entrada_dev:
+                recorte = self.indice_base.recortar(f"{self.pedido_do_cliente}\n{entrada_dev}")
+            if recorte is not None:
+                codigo_base_dev = recorte["codigo"]
+                self.estatisticas_recorte["chamadas"] += 1
+                self.estatisticas_recorte["bytes_enviados"] += recorte["bytes_enviados"]
+                self.estatisticas_recorte["bytes_base"] += recorte["bytes_base"]
+        projeto = self.projeto
+        if projeto is not None and not usar_diff:
+            # Antes do feedback: o contexto original continua sendo o último bloco da entrada
+            partes_projeto = [instrucao_dev_projeto]
+            if self.arquivos_alvo:
+                partes_projeto.append(
+                    f"ARQUIVOS A REGENERAR (reenvie só estes, completos): {', '.join(self.arquivos_alvo)}\n"
+                    f"--- VERSÃO ATUAL DOS ARQUIVOS A REGENERAR ---\n{projeto.texto(self.arquivos_alvo)}")
+                demais = projeto.resumos(excluir=self.arquivos_alvo)
+                if demais:
+                    partes_projeto.append(f"--- INTERFACES DOS DEMAIS ARQUIVOS (mantidos como estão) ---\n{demais}")
+            elif projeto.arquivos:
+                partes_projeto.append(f"Arquivos já existentes no projeto: {', '.join(projeto.arquivos)}.")
+            entrada_dev = "\n\n".join(partes_projeto + [entrada_dev])
+        if self.instrucao_anticiclo:
+            entrada_dev = f"{self.instrucao_anticiclo}\n\n{entrada_dev}"
+        return entrada_dev, codigo_base_dev, recorte
+
+    def _candidatos_dev(self, iteracao, entrada_dev, codigo_base_dev, recorte):
+        """
+        Gerador (modo especulativo): N candidatos em paralelo e a triagem local
+        que escolhe o que vai aos verificadores. Retorna (resposta escolhida,
+        se os trechos omitidos já foram restaurados, resumo dos candidatos).
+        """
+        quantidade = self.opcoes.candidatos_dev
+        candidatos = yield from _candidatos_com_checkpoints(
+            self.checkpoints, iteracao, quantidade, self.agente_dev, entrada_dev, codigo_base_dev, self.pausas_quota,
+            self.contexto)
+        respostas = {}
+        for indice, (resposta, metricas_candidato) in sorted(candidatos.items()):
+            self.bytes_prompt_iteracao += (metricas_candidato or {}).get("bytes_prompt", 0)
+            resposta = self.codigo_do_dev(resposta, iteracao, metricas_candidato)
+            respostas[indice] = resposta
+            if recorte is not None and not resposta.startswith("ERRO DE EXECUÇÃO DO LLM"):
+                try:
+                    respostas[indice] = restaurar_trechos(resposta, self.indice_base, recorte["omitidos"])
+                except ErroRecorte:
+                    respostas[indice] = ""  # inválido na triagem
+            yield {"status": "candidato_dev", "iteracao": iteracao, "indice": indice,
+                   "origem": "checkpoint" if metricas_candidato is None else "ao_vivo",
+                   "metricas": metricas_candidato,
+                   "mensagem": f"   -> Candidato {indice + 1}/{quantidade} do Dev gerado."}
+        ranking = ranquear_candidatos(respostas, entrada_dev, self.linguagem)
+        escolhido = ranking[0]
+        restaurado = False
+        if escolhido["valido"]:
+            codigo_e_contexto = respostas[escolhido["indice"]]
+            restaurado = recorte is not None
+        else:
+            # Nenhum candidato utilizável: segue com a resposta crua (erro ou recorte a refazer)
+            codigo_e_contexto = self.codigo_do_dev(candidatos[escolhido["indice"]][0], iteracao, None)
+        estatisticas = self.estatisticas_candidatos
+        estatisticas["iteracoes"] += 1
+        estatisticas["gerados"] += len(candidatos)
+        # Sem resposta pelo limite do LLM (eventos "candidato_limitado") ou com erro do LLM como resposta
+        estatisticas["limitados"] += quantidade - len(candidatos)
+        estatisticas["com_erro"] += sum(1 for resposta, _ in candidatos.values()
+                                        if resposta.startswith("ERRO DE EXECUÇÃO DO LLM"))
+        estatisticas["descartados"] += sum(1 for c in ranking if not c["valido"] or not c["compila"])
+        variantes = estatisticas["escolhidos_por_variante"]
+        variantes[escolhido["indice"]] = variantes.get(escolhido["indice"], 0) + 1
+        resumo_candidatos = {
+            "total": len(candidatos), "escolhido": escolhido["indice"], "rank": escolhido["rank"],
+            "ranking": [{chave: c[chave] for chave in ("indice", "rank", "pontuacao", "compila", "cobertura_spec",
+                                                        "tamanho", "motivo")} for c in ranking],
+        }
+        return codigo_e_contexto, restaurado, resumo_candidatos
+
+    def _dev_versao_completa(self, iteracao, entrada_dev):
+        """Gerador: pede ao Dev a versão completa, com o código base inteiro (fallback do diff e do recorte)."""
+        metricas_fallback = {}
+        codigo_e_contexto = yield from self._chamar_agente(iteracao, "dev_versao_completa", self.agente_dev,
+                                                           entrada_dev, metricas_fallback, self.codigo_base)
+        self.bytes_prompt_iteracao += metricas_fallback.get("bytes_prompt", 0)
+        return self.codigo_do_dev(codigo_e_contexto, iteracao, metricas_fallback)
+
+    def etapa_dev(self, iteracao):
+        """
+        Gerador: o Dev gera a versão da iteração e o workflow a reconstrói
+        localmente (diff, trechos omitidos, arquivos do projeto). Retorna o
+        código gerado ou None quando a chamada ao Dev falhou.
+        """
+        opcoes = self.opcoes
+        usar_diff = opcoes.modo_incremental and self.codigo_anterior is not None
+        entrada_dev, codigo_base_dev, recorte = self._entrada_dev(usar_diff)
+
+        metricas_dev = {}
+        resumo_candidatos = None
+        restaurado = False
+        if opcoes.candidatos_dev > 1 and not usar_diff:
+            codigo_e_contexto, restaurado, resumo_candidatos = yield from self._candidatos_dev(
+                iteracao, entrada_dev, codigo_base_dev, recorte)
+        else:
+            if opcoes.stream_dev:
+                codigo_e_contexto = yield from self.checkpoints.etapa(iteracao, "dev", lambda: _dev_em_stream(
+                    self.agente_dev, entrada_dev, codigo_base_dev, metricas_dev, iteracao, self.pausas_quota,
+                    self.contexto))
+            else:
+                codigo_e_contexto = yield from self._chamar_agente(iteracao, "dev", self.agente_dev, entrada_dev,
+                                                                   metricas_dev, codigo_base_dev)
+            codigo_e_contexto = self.codigo_do_dev(codigo_e_contexto, iteracao, metricas_dev)
+            self.bytes_prompt_iteracao += metricas_dev.get("bytes_prompt", 0)
+
+        diff_aplicado = False
+        erro_dev = codigo_e_contexto.startswith("ERRO DE EXECUÇÃO DO LLM")
+        if usar_diff and not erro_dev:
+            # Reconstrução local: aplica o diff e valida o resultado
+            try:
+                codigo_gerado = aplicar_diff(self.codigo_anterior, extrair_diff(codigo_e_contexto))
+                if (self.linguagem == "python" and _eh_python_valido(self.codigo_anterior)
+                        and not _eh_python_valido(codigo_gerado)):
+                    raise ErroAplicacaoDiff("O diff aplicado produziu código Python inválido.")
+                diff_aplicado = True
+            except ErroAplicacaoDiff as e:
+                # Fallback: pede a versão completa, como no modo tradicional
+                yield {"status": "diff_invalido", "iteracao": iteracao,
+                       "mensagem": f"⚠️ Diff do Dev não pôde ser aplicado ({e}). Pedindo a versão completa..."}
+                codigo_e_contexto = yield from self._dev_versao_completa(
+                    iteracao, f"{self.entrada_atual}\n\n{self.contexto_original_dev}")
+        elif recorte is not None and not restaurado and not erro_dev:
+            # Reconstrução local: os stubs voltam a ser o código original da base
+            try:
+                codigo_e_contexto = restaurar_trechos(codigo_e_contexto, self.indice_base, recorte["omitidos"])
+            except ErroRecorte as e:
+                self.estatisticas_recorte["falhas"] += 1
+                yield {"status": "recorte_invalido", "iteracao": iteracao,
+                       "mensagem": f"⚠️ Trechos omitidos não puderam ser restaurados ({e}). "
+                                   f"Pedindo a versão com o código base inteiro..."}
+                codigo_e_contexto = yield from self._dev_versao_completa(iteracao, entrada_dev)
+
+        if codigo_e_contexto.startswith("ERRO DE EXECUÇÃO DO LLM"):
+            # Falha da chamada, não código reprovado: sem pré-verificação, verificadores nem detector de
+            # convergência. A última versão válida continua valendo e o Dev é chamado de novo com a mesma entrada.
+            yield {"status": "erro_dev", "iteracao": iteracao, "metricas": metricas_dev,
+                   "mensagem": f"⚠️ O Dev não respondeu nesta iteração ({codigo_e_contexto}). "
+                               f"Tentando de novo na próxima.",
+                   "bytes_prompt_iteracao": self.bytes_prompt_iteracao}
+            yield from self.registrar_roteamento(dev.name, True, "erro do LLM", iteracao)
+            return None
+
+        # 💥 Lógica de Parsing
+        if diff_aplicado:
+            pass
+        elif "--- CONTEXTO ORIGINAL DO CLIENTE ---" in codigo_e_contexto:
+            parts = codigo_e_contexto.split("--- CONTEXTO ORIGINAL DO CLIENTE ---", 1)
+            codigo_gerado = parts[0].replace("--- CODIGO PYTHON ---", "").strip()
+            self.contexto_original_dev = "--- CONTEXTO ORIGINAL DO CLIENTE ---" + parts[1].strip()
+        elif opcoes.saida_estruturada:
+            # O contexto original não volta na resposta: continua o mantido pelo workflow
+            codigo_gerado = codigo_e_contexto
+        else:
+            codigo_gerado = codigo_e_contexto
+            self.contexto_original_dev = self.entrada_atual
+
+        resumo_projeto = None
+        if self.projeto is not None:
+            # Só os arquivos enviados (e com hash novo) mudam; o texto do projeto inteiro segue pelo workflow
+            aplicacao = self.projeto.aplicar(codigo_gerado, self.arquivos_alvo)
+            self.arquivos_alterados = aplicacao["alterados"]
+            codigo_gerado = self.projeto.texto()
+            resumo_projeto = {"alterados": self.arquivos_alterados, "bytes_regenerados": aplicacao["bytes_regenerados"],
+                              "bytes_projeto": self.projeto.bytes_total()}
+            self.estatisticas_projeto["por_iteracao"][iteracao] = resumo_projeto
+            self.estatisticas_projeto["bytes_regenerados"] += aplicacao["bytes_regenerados"]
+
+        if opcoes.modo_incremental:
+            # Normaliza (sem cercas markdown) para que o próximo diff seja aplicável
+            codigo_gerado = remover_cercas_markdown(codigo_gerado)
+            self.diff_iteracao = gerar_diff(self.codigo_anterior, codigo_gerado) if self.codigo_anterior is not None else ""
+
+        self.ultimo_codigo_valido = codigo_gerado
+        yield {"status": "dev_completo", "iteracao": iteracao, "mensagem": f"🛠️ Código gerado. Rodando verificadores...",
+               "metricas": metricas_dev, "incremental": diff_aplicado,
+               "recorte": None if recorte is None else {
+                   "bytes_enviados": recorte["bytes_enviados"], "bytes_base": recorte["bytes_base"],
+                   "omitidos": len(recorte["omitidos"]), "selecionados": len(recorte["selecionados"])},
+               "candidatos": resumo_candidatos,
+               "tokens_saida_economizados": self.estatisticas_estruturada["por_iteracao"].get(iteracao, 0),
+               "projeto": resumo_projeto}
+        return codigo_gerado
+
+    # -----------------------------------------------------
+    # A.1/A.2 PRÉ-VERIFICAÇÃO LOCAL E SANDBOX
+    # -----------------------------------------------------
+
+    def etapa_precheck(self, iteracao, codigo_gerado, complementos_verificadores):
+        """
+        Gerador: sintaxe e PEP8 verificados localmente. Com erro de sintaxe, o
+        feedback volta direto ao Dev (verificadores e gerente são pulados) e
+        retorna True; senão, os avisos de estilo vão para o Revisor.
+        """
+        opcoes = self.opcoes
+        projeto = self.projeto
+        if not opcoes.precheck_local or (self.linguagem != "python" and projeto is None):
+            return False
+        if projeto is not None:
+            resultado_precheck = executar_precheck_projeto(projeto.arquivos)
+        else:
+            resultado_precheck = executar_precheck(remover_cercas_markdown(codigo_gerado))
+        estatisticas = self.estatisticas_precheck
+        estatisticas["execucoes"] += 1
+        if not resultado_precheck["erros_sintaxe"]:
+            complementos_verificadores[revisor.name] = (
+                "VERIFICAÇÃO LOCAL (não repita estes pontos, foque na aderência ao CONTEXTO ORIGINAL):\n"
+                + formatar_relatorio_estilo(resultado_precheck["avisos_estilo"])
+            )
+            return False
+
+        estatisticas["reprovacoes_locais"] += 1
+        gerente_chamaria_llm = not opcoes.gerente_por_regras or opcoes.resumo_gerente_llm
+        estatisticas["chamadas_llm_economizadas"] += len(AGENTES_VERIFICADORES) + int(gerente_chamaria_llm)
+        erros_texto = formatar_erros_sintaxe(resultado_precheck["erros_sintaxe"])
+        self.entrada_atual = erros_texto if opcoes.modo_incremental else f"{erros_texto}\n\n{self.contexto_original_dev}"
+        if projeto is not None:
+            self.arquivos_alvo = list(dict.fromkeys(erro["arquivo"] for erro in resultado_precheck["erros_sintaxe"]))
+        if opcoes.modo_incremental:
+            self.codigo_anterior = codigo_gerado
+        yield {"status": "feedback", "iteracao": iteracao, "precheck": True,
+               "erros_sintaxe": resultado_precheck["erros_sintaxe"],
+               "mensagem": f"❌ Reprovado na verificação local. Feedback enviado ao Dev:\n{erros_texto}",
+               "bytes_prompt_iteracao": self.bytes_prompt_iteracao}
+        yield from self.registrar_roteamento(dev.name, True, "código não compila", iteracao)
+        if self.detector is not None:
+            deteccao = self.detector.registrar_resultado(iteracao, codigo_gerado, 0, erros_texto, compila=False)
+            if deteccao:
+                yield from self.reagir_a_convergencia(deteccao, iteracao)
+        return True
+
+    def etapa_sandbox(self, iteracao, codigo_gerado, complementos_verificadores):
+        """Gerador: executa o código de verdade e passa os resultados ao Beta Tester."""
+        if not self.execucao_sandbox or self.linguagem != "python":
+            return
+        projeto = self.projeto
+        try:
+            if projeto is not None:
+                # Executa o arquivo em trabalho com os demais ao lado (para os imports entre eles)
+                modulos = [c for c in self.arquivos_alterados + list(projeto.arquivos) if c.endswith(".py")]
+                principal = modulos[0] if modulos else None
+                resultados_execucao = executar_lote(
+                    projeto.arquivos[principal], self.casos_de_teste,
+                    arquivos={c: t for c, t in projeto.arquivos.items() if c != principal}) if principal else []
+            else:
+                resultados_execucao = executar_lote(remover_cercas_markdown(codigo_gerado), self.casos_de_teste)
+        except SandboxIndisponivel as e:
+            # Sem isolamento o código não roda: a execução segue sem o sandbox
+            self.execucao_sandbox = False
+            yield {"status": "sandbox", "iteracao": iteracao, "resultados": [], "indisponivel": True,
+                   "mensagem": f"⚠️ Sandbox indisponível, o código não será executado: {e}"}
+            return
+        falhas = sum(1 for resultado in resultados_execucao if not resultado["ok"])
+        yield {"status": "sandbox", "iteracao": iteracao, "resultados": resultados_execucao,
+               "mensagem": f"🧪 Execução real: {len(resultados_execucao) - falhas}/{len(resultados_execucao)} execuções sem erro."}
+        complementos_verificadores[beta_tester.name] = (
+            f"{formatar_resultados(resultados_execucao)}\n\n"
+            f"{instrucao_beta_tester_sandbox_json if self.opcoes.saida_estruturada else instrucao_beta_tester_sandbox}"
+        )
+
+    # -----------------------------------------------------
+    # B. VERIFICADORES
+    # -----------------------------------------------------
+
+    def _vereditos_memorizados(self, codigo_memo, chave_memo, simbolos_atuais, relatorios):
+        """
+        Gerador (B.1, reverificação seletiva): preenche 'relatorios' com os
+        vereditos memorizados ou herdados. Retorna (agentes a chamar ao vivo,
+        aprovações herdadas).
+        """
+        agentes_ao_vivo = list(AGENTES_VERIFICADORES)
+        aprovacoes_herdadas = []
+        # None: código não Python/inválido, sem como saber o que mudou (nenhuma aprovação é herdada)
+        alterados = simbolos_alterados(self.codigo_memo_anterior, codigo_memo) if simbolos_atuais is not None else None
+        for indice, agente in enumerate(AGENTES_VERIFICADORES):
+            relatorio = self.memo_veredictos.obter(agente.name, chave_memo)
+            if relatorio is None and self.memo_veredictos.aprovou_ultima_versao(agente.name, alterados):
+                relatorio = "STATUS: APROVADO (aprovação herdada da versão anterior; confirmada no passe final)"
+                aprovacoes_herdadas.append(agente)
+            if relatorio is None:
+                continue
+            agentes_ao_vivo.remove(agente)
+            relatorios[indice] = relatorio
+            self.estatisticas_memo["vereditos_memo"] += 1
+            yield {"status": "analise", "agente": agente.name, "origem": "memo", "simbolos_alterados": alterados,
+                   "mensagem": f"   -> {agente.name}: {relatorio.split(':')[0]} (memo)..."}
+        self.codigo_memo_anterior = codigo_memo
+        return agentes_ao_vivo, aprovacoes_herdadas
+
+    def _entrada_verificadores(self, codigo_gerado, codigo_memo, simbolos_atuais):
+        """(texto analisado pelos verificadores, símbolos que eles veem nesta iteração)."""
+        pedido = self.pedido_do_cliente
+        projeto = self.projeto
+        if self.opcoes.modo_incremental and self.codigo_anterior is not None:
+            # Só os símbolos do diff
+            simbolos_revisados = simbolos_atuais
+            if simbolos_atuais is not None:
+                simbolos_revisados = set(simbolos_alterados(self.codigo_anterior, codigo_memo))
+            return (
+                f"Pedido do Cliente: {pedido}\n\n"
+                f"Analise as ALTERAÇÕES feitas no código desde a versão anterior (diff unificado):\n{self.diff_iteracao}\n\n"
+                f"RESUMO DAS REGIÕES INALTERADAS:\n{resumir_regioes_inalteradas(self.codigo_anterior, codigo_gerado)}"
+            ), simbolos_revisados
+        if projeto is not None:
+            exibidos = self.arquivos_alterados or list(projeto.arquivos)
+            return (
+                f"Pedido do Cliente: {pedido}\n\n"
+                f"Analise os arquivos do projeto alterados nesta iteração:\n{projeto.texto(exibidos)}\n\n"
+                f"INTERFACES DOS DEMAIS ARQUIVOS DO PROJETO (inalterados):\n{projeto.resumos(excluir=exibidos) or 'nenhum'}"
+            ), simbolos_atuais
+        return f"Pedido do Cliente: {pedido}\n\nAnalise o seguinte código:\n{codigo_gerado}", simbolos_atuais
+
+    def etapa_verificadores(self, iteracao, codigo_gerado, codigo_memo, chave_memo, simbolos_atuais,
+                            complementos_verificadores):
+        """Gerador: relatórios dos verificadores (memo, checkpoint ou ao vivo); retorna (relatorios, aprovações herdadas)."""
+        opcoes = self.opcoes
+        relatorios = [""] * len(AGENTES_VERIFICADORES)
+        agentes_ao_vivo = list(AGENTES_VERIFICADORES)
+        aprovacoes_herdadas = []
+        if opcoes.reverificacao_seletiva:
+            agentes_ao_vivo, aprovacoes_herdadas = yield from self._vereditos_memorizados(
+                codigo_memo, chave_memo, simbolos_atuais, relatorios)
+
+        analise_input, simbolos_revisados = self._entrada_verificadores(codigo_gerado, codigo_memo, simbolos_atuais)
+        for item in _verificar_com_checkpoints(
+                self.checkpoints, iteracao, "verificador", analise_input, agentes_ao_vivo, self.pausas_quota,
+                concorrente=opcoes.verificacao_concorrente, complementos=complementos_verificadores,
+                contexto=self.contexto, estruturada=opcoes.saida_estruturada, modelos=self.modelos_verificadores):
+            if isinstance(item, dict):  # evento "pausado"
+                yield item
+                continue
+            indice, agente, relatorio, metricas_verificador = item
+            origem = "ao_vivo" if metricas_verificador is not None else "checkpoint"
+            metricas_verificador = metricas_verificador or {}
+            relatorios[indice] = relatorio
+            self.memo_veredictos.registrar(agente.name, chave_memo, relatorio, simbolos_revisados)
+            self.estatisticas_estruturada["vereditos_antecipados"] += bool(metricas_verificador.get("veredito_antecipado"))
+            self.estatisticas_estruturada["falhas_json"] += bool(metricas_verificador.get("falha_json"))
+            if origem == "ao_vivo":
+                self.estatisticas_memo["chamadas_ao_vivo"] += 1
+            if self.execucao_sandbox and agente is beta_tester:
+                # Casos propostos agora serão executados contra a próxima versão do código
+                self.casos_de_teste = extrair_casos_de_teste(relatorio) or self.casos_de_teste
+            self.bytes_prompt_iteracao += metricas_verificador.get("bytes_prompt", 0)
+            yield {"status": "analise", "agente": agente.name, "origem": origem,
+                   "mensagem": f"   -> {agente.name}: {relatorio.split(':')[0]}...",
+                   "metricas": metricas_verificador}
+            if origem == "ao_vivo":
+                yield from self.registrar_roteamento(agente.name, _relatorio_invalido(relatorio, metricas_verificador),
+                                                     "resposta inválida", iteracao)
+
+        aprovados = sum(1 for relatorio in relatorios if 'STATUS: APROVADO' in relatorio)
+        yield {"status": "verificadores_completos", "iteracao": iteracao,
+               "mensagem": f"🔎 Análise concluída ({aprovados}/{len(AGENTES_VERIFICADORES)} aprovados). Gerente decidindo..."}
+        return relatorios, aprovacoes_herdadas
+
+    # -----------------------------------------------------
+    # C/D. GERENTE, PASSE FINAL, CONCLUSÃO E FEEDBACK
+    # -----------------------------------------------------
+
+    def etapa_gerente(self, iteracao, relatorios):
+        """Gerador: decisão de lançamento (por regras e/ou pelo LLM); retorna (decisao, metricas_gerente)."""
+        opcoes = self.opcoes
+        relatorio_completo = "\n".join(relatorios)
+        if opcoes.modo_incremental and iteracao > 1:
+            # O contexto original fica com o workflow, que o repassa ao Dev
+            gerente_input = (
+                f"RELATÓRIOS DOS REVISORES:\n{relatorio_completo}\n\n"
+                f"(O CONTEXTO ORIGINAL DO CLIENTE é mantido pelo sistema: NÃO o inclua na resposta.)"
+            )
+        else:
+            gerente_input = (f"RELATÓRIOS DOS REVISORES:\n{relatorio_completo}\n\n"
+                             f"CONTEXTO NECESSÁRIO PARA O FEEDBACK:\n{self.contexto_original_dev}")
+        metricas_gerente = {}
+        estatisticas = self.estatisticas_gerente
+        estatisticas["decisoes"] += 1
+        if opcoes.gerente_por_regras:
+            # No modo incremental o workflow já repassa o contexto ao Dev
+            decisao = decidir_lancamento(relatorios, "" if opcoes.modo_incremental else self.contexto_original_dev)
+            if decisao != "TERMINATE" and opcoes.resumo_gerente_llm:
+                resumo = yield from self._chamar_agente(iteracao, "gerente", self.agente_gerente, gerente_input,
+                                                        metricas_gerente)
+                resumo = self.decisao_do_gerente(resumo, iteracao, metricas_gerente)
+                estatisticas["chamadas_llm"] += 1
+                yield from self.registrar_roteamento(
+                    AGENTE_GERENTE.name,
+                    resumo.startswith("ERRO DE EXECUÇÃO DO LLM") or bool(metricas_gerente.get("falha_json")),
+                    "resposta inválida", iteracao)
+                # O LLM só resume: um 'TERMINATE' ou erro dele não muda a decisão local
+                if "TERMINATE" not in resumo and not resumo.startswith("ERRO DE EXECUÇÃO DO LLM"):
+                    decisao = resumo
+            else:
+                estatisticas["chamadas_evitadas"] += 1
+        else:
+            decisao = yield from self._chamar_agente(iteracao, "gerente", self.agente_gerente, gerente_input,
+                                                     metricas_gerente)
+            decisao = self.decisao_do_gerente(decisao, iteracao, metricas_gerente)
+            estatisticas["chamadas_llm"] += 1
+            yield from self.registrar_roteamento(
+                AGENTE_GERENTE.name,
+                decisao.startswith("ERRO DE EXECUÇÃO DO LLM") or bool(metricas_gerente.get("falha_json")),
+                "resposta inválida", iteracao)
+        self.bytes_prompt_iteracao += metricas_gerente.get("bytes_prompt", 0)
+        return decisao, metricas_gerente
+
+    def etapa_passe_final(self, iteracao, codigo_gerado, chave_memo, simbolos_atuais, relatorios,
+                          aprovacoes_herdadas, complementos_verificadores, decisao):
+        """
+        Gerador: confirma ao vivo as aprovações herdadas antes do TERMINATE;
+        retorna a decisão (refeita por regras se alguma não se confirmar).
+        """
+        opcoes = self.opcoes
+        self.estatisticas_memo["passes_finais"] += 1
+        yield {"status": "passe_final", "iteracao": iteracao,
+               "mensagem": f"🔁 Passe final: confirmando {len(aprovacoes_herdadas)} aprovação(ões) herdada(s)..."}
+        entrada_passe_final = f"Pedido do Cliente: {self.pedido_do_cliente}\n\nAnalise o seguinte código:\n{codigo_gerado}"
+        for item in _verificar_com_checkpoints(
+                self.checkpoints, iteracao, "passe_final", entrada_passe_final, aprovacoes_herdadas, self.pausas_quota,
+                concorrente=opcoes.verificacao_concorrente, complementos=complementos_verificadores,
+                contexto=self.contexto, estruturada=opcoes.saida_estruturada, modelos=self.modelos_verificadores):
+            if isinstance(item, dict):  # evento "pausado"
+                yield item
+                continue
+            indice, agente, relatorio, metricas_verificador = item
+            if metricas_verificador is not None:
+                self.estatisticas_memo["chamadas_ao_vivo"] += 1
+            metricas_verificador = metricas_verificador or {}
+            relatorios[indice] = relatorio
+            self.memo_veredictos.registrar(agente.name, chave_memo, relatorio, simbolos_atuais)
+            self.bytes_prompt_iteracao += metricas_verificador.get("bytes_prompt", 0)
+            yield {"status": "analise", "agente": agente.name, "origem": "passe_final",
+                   "mensagem": f"   -> {agente.name}: {relatorio.split(':')[0]}...",
+                   "metricas": metricas_verificador}
+            if metricas_verificador:
+                yield from self.registrar_roteamento(agente.name, _relatorio_invalido(relatorio, metricas_verificador),
+                                                     "resposta inválida", iteracao)
+        if not all('STATUS: APROVADO' in relatorio for relatorio in relatorios):
+            decisao = decidir_lancamento(relatorios, "" if opcoes.modo_incremental else self.contexto_original_dev)
+        return decisao
+
+    def concluir(self, iteracao, metricas_gerente):
+        """Gerador: execução aprovada (índice de pedidos, checkpoint final e evento "terminado")."""
+        yield from self.registrar_roteamento(dev.name, False, "", iteracao)
+        duracao_execucao = time.perf_counter() - self.inicio
+        if self.similar:
+            self.estatisticas_similar["iteracoes"] = iteracao
+            self.estatisticas_similar["tempo_economizado"] = max(0.0, self.similar["duracao"] - duracao_execucao)
+        indice_pedidos = obter_indice_pedidos()
+        if indice_pedidos is not None and (iteracao, "terminado") not in self.checkpoints.salvas:
+            indice_pedidos.registrar(self.pedido_do_cliente, self.codigo_base, self.especificacao_e_contexto,
+                                     self.ultimo_codigo_valido, iteracao, duracao_execucao,
+                                     self.checkpoints.execucao_id)
+        self.checkpoints.gravar(iteracao, "terminado", "sucesso")
+        self.encerrada = True
+        yield {"status": "terminado", "sucesso": True, "codigo": self.ultimo_codigo_valido, "linguagem": self.linguagem,
+               "metricas": metricas_gerente, "bytes_prompt_iteracao": self.bytes_prompt_iteracao,
+               **self.estatisticas()}
+
+    def etapa_feedback(self, iteracao, decisao, relatorios, codigo_gerado, metricas_gerente):
+        """Gerador: versão reprovada; a decisão vira a entrada do Dev e o feedback segue para o detector."""
+        self.entrada_atual = decisao
+        decisao_limpa = decisao.strip()
+        if self.projeto is not None:
+            # O Dev regenera só os arquivos citados no feedback e nos relatórios de reprovação
+            reprovacoes = "\n".join(r for r in relatorios if 'STATUS: APROVADO' not in r)
+            tarefas = decisao_limpa.split('--- CONTEXTO ORIGINAL DO CLIENTE ---', 1)[0]
+            self.arquivos_alvo = self.projeto.mapear_feedback(f"{tarefas}\n{reprovacoes}")
+
+        # --- BLOCO DE SEGURANÇA CRÍTICO ---
+        try:
+            # Tenta extrair apenas o feedback antes do marcador de contexto
+            feedback_mensagem = decisao_limpa.split('--- CONTEXTO ORIGINAL DO CLIENTE ---', 1)[0].strip()
+        except Exception as e:
+            # Se falhar no split ou parsing, usa a decisão completa.
+            # Isso impede o crash do gerador.
+            feedback_mensagem = f"ERRO DE PARSING DE FEEDBACK: {e}\n\nDECISÃO COMPLETA:\n{decisao_limpa}"
+        # -----------------------------------
+
+        # 3. YIELD DE FEEDBACK (Agora seguro contra crashes de string)
+        yield {"status": "feedback", "iteracao": iteracao,
+               "mensagem": f"❌ Reprovado. Feedback enviado ao Dev:\n{feedback_mensagem}",
+               "metricas": metricas_gerente, "bytes_prompt_iteracao": self.bytes_prompt_iteracao}
+        yield from self.registrar_roteamento(dev.name, True, "reprovado pelos verificadores", iteracao)
+
+        if self.detector is not None:
+            aprovados_finais = sum(1 for relatorio in relatorios if 'STATUS: APROVADO' in relatorio)
+            deteccao = self.detector.registrar_resultado(iteracao, codigo_gerado, aprovados_finais, feedback_mensagem)
+            if deteccao:
+                yield from self.reagir_a_convergencia(deteccao, iteracao)
+
+    # -----------------------------------------------------
+    # CONVERGÊNCIA
+    # -----------------------------------------------------
+
+    def reagir_a_convergencia(self, deteccao, iteracao):
+        """
+        Gerador: evento "convergencia" e a ação configurada ('escalar' e
+        'reformular' só uma vez; depois, 'parar'). Ao parar, emite o
+        "terminado" com a melhor versão e retorna True.
+        """
+        estatisticas = self.estatisticas_convergencia
+        acao = "parar" if estatisticas["acoes_aplicadas"] else self.opcoes.acao_convergencia
+        estatisticas["acoes_aplicadas"].append({"iteracao": iteracao, "tipo": deteccao["tipo"], "acao": acao})
+        if self.roteador is not None:
+            # Com roteamento, 'escalar' sobe o Dev um nível (ou o mantém, se já estiver no mais forte)
+            modelo_escalado = self.roteador.politica.proximo_nivel(self.agente_dev.model) or self.agente_dev.model
+        else:
+            modelo_escalado = MODELO_DEV_ESCALADO
+        descricao = {"parar": "encerrando com a melhor versão até aqui",
+                     "escalar": f"o Dev passa a usar {modelo_escalado}",
+                     "reformular": "a entrada do Dev foi reformulada para sair do ciclo"}[acao]
+        yield {"status": "convergencia", **deteccao, "acao": acao,
+               "mensagem": f"🔁 Convergência detectada ({deteccao['detalhe']}): {descricao}."}
+        if acao != "parar":
+            if acao == "escalar":
+                if self.roteador is not None:
+                    self.roteador.escalar(dev.name, f"convergência: {deteccao['tipo']}", iteracao)
+                self.agente_dev = replace(self.agente_dev, model=modelo_escalado)
+            else:
+                self.instrucao_anticiclo = INSTRUCAO_ANTICICLO.format(detalhe=deteccao["detalhe"])
+            self.detector.reiniciar_janelas()
+            return False
+        melhor = self.detector.melhor or {"iteracao": iteracao, "aprovados": 0, "codigo": self.ultimo_codigo_valido}
+        estatisticas["iteracoes_economizadas"] = self.max_iteracoes - iteracao
+        estatisticas["melhor_iteracao"] = melhor["iteracao"]
+        self.checkpoints.gravar(iteracao, "terminado", "convergencia")
+        self.encerrada = True
+        yield {"status": "terminado", "sucesso": False, "codigo": melhor["codigo"], "linguagem": self.linguagem,
+               "mensagem": f"🛑 Execução encerrada por convergência na iteração {iteracao} ({deteccao['detalhe']}); "
+                           f"{self.max_iteracoes - iteracao} iteração(ões) economizada(s).\n\nMelhor versão (iteração "
+                           f"{melhor['iteracao']}, {melhor['aprovados']}/{len(AGENTES_VERIFICADORES)} aprovações):\n"
+                           f"{melhor['codigo']}",
+               **self.estatisticas()}
+        return True
@@ -0,0 +1,288 @@
+"""
+Backends de LLM plugáveis atrás do REGISTRO_CLIENTES.
+
+- "gemini": o SDK real (google.generativeai), comportamento padrão.
+- "gravar": chama o Gemini e grava cada par prompt→resposta, com a latência
+  observada, em um arquivo JSONL.
+- "replay": serve as respostas gravadas de forma determinística, sem rede,
+  opcionalmente simulando a latência gravada e injetando erros de quota.
+
+Todos os clientes expõem a mesma interface usada pelo workflow
+(generate_content(contents, stream=...) e generate_content_async), então o
+workflow e o app Streamlit rodam sem alteração em qualquer backend.
+
+Seleção pelo ambiente (aplicada no primeiro uso, por obter_armazem_gravacoes):
+    BACKEND_LLM=gemini|gravar|replay
+    GRAVACOES_LLM=caminho do JSONL (padrão: .gravacoes_llm.jsonl ao lado deste módulo)
+    REPLAY_ESCALA_LATENCIA=1.0   (0 = sem espera; 0.5 = metade da latência gravada)
+    REPLAY_TAXA_QUOTA=0.0        (probabilidade de erro de quota, QuotaSimulada, por chamada)
+    REPLAY_SEMENTE=0
+
+Ao gravar, use um cache de respostas vazio (ex: CACHE_RESPOSTAS_CAMINHO=:memory:):
+respostas servidas pelo cache não chegam ao backend e não são gravadas.
+"""
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from clientes_llm import REGISTRO_CLIENTES, _fabrica_contexto_gemini, _fabrica_gemini
+from limitador_taxa import QuotaSimulada
+
+CAMINHO_GRAVACOES_PADRAO = os.getenv(
+    "GRAVACOES_LLM",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".gravacoes_llm.jsonl"),
+)
+TAMANHO_TRECHO_REPLAY = 40  # caracteres por trecho quando a gravação não guardou os trechos do stream
+
+
+class GravacaoAusente(LookupError):
+    """O replay recebeu um prompt que não existe no arquivo de gravações."""
+
+# ---------------------------------------------------------
+# ARMAZENAMENTO DAS GRAVAÇÕES (JSONL, SÓ ACRESCENTA)
+# ---------------------------------------------------------
+
+def chave_gravacao(modelo, prompt):
+    return hashlib.sha256(f"{modelo}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class ArmazemGravacoes:
+    """
+    Pares prompt→resposta por (modelo, prompt). O mesmo prompt pode ter várias
+    respostas gravadas: o replay as serve na ordem em que foram gravadas e
+    repete a última quando elas acabam.
+    """
+
+    def __init__(self, caminho=CAMINHO_GRAVACOES_PADRAO):
+        self.caminho = caminho
+        self._gravacoes = {}
+        self._proxima = {}
+        self._trava = threading.Lock()
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    if linha.strip():
+                        registro = json.loads(linha)
+                        self._gravacoes.setdefault(registro["chave"], []).append(registro)
+
+    def guardar(self, modelo, prompt, texto, latencia, ttft, trechos=None):
+        registro = {
+            "chave": chave_gravacao(modelo, prompt),
+            "modelo": modelo,
+            "texto": texto,
+            "latencia": latencia,
+            "ttft": ttft,
+            "trechos": trechos,
+            "tokens_prompt": max(1, len(prompt) // 4),
+        }
+        with self._trava:
+            self._gravacoes.setdefault(registro["chave"], []).append(registro)
+            with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def obter(self, modelo, prompt):
+        chave = chave_gravacao(modelo, prompt)
+        with self._trava:
+            registros = self._gravacoes.get(chave)
+            if not registros:
+                raise GravacaoAusente(f"Nenhuma resposta gravada para este prompt do modelo {modelo}.")
+            indice = self._proxima.get(chave, 0)
+            self._proxima[chave] = indice + 1
+            return registros[min(indice, len(registros) - 1)]
+
+    def reiniciar(self):
+        """Volta a servir cada prompt a partir da primeira resposta gravada."""
+        with self._trava:
+            self._proxima.clear()
+
+    def __len__(self):
+        return sum(len(registros) for registros in self._gravacoes.values())
+
+# ---------------------------------------------------------
+# RESPOSTAS NO FORMATO DO SDK
+# ---------------------------------------------------------
+
+def _resposta(texto, tokens_prompt=0):
+    """Objeto com .text e .usage_metadata, como as respostas do google.generativeai."""
+    tokens_saida = max(1, len(texto) // 4) if texto else 0
+    uso = SimpleNamespace(prompt_token_count=tokens_prompt, candidates_token_count=tokens_saida,
+                          total_token_count=tokens_prompt + tokens_saida, cached_content_token_count=0)
+    return SimpleNamespace(text=texto, usage_metadata=uso)
+
+# ---------------------------------------------------------
+# BACKEND GRAVADOR
+# ---------------------------------------------------------
+
+class ClienteGravador:
+    """Encaminha as chamadas ao cliente real e grava prompt, resposta e latência observada."""
+
+    def __init__(self, cliente, modelo, armazem):
+        self._cliente = cliente
+        self._modelo = modelo
+        self._armazem = armazem
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        inicio = time.perf_counter()
+        if stream:
+            return self._gravar_stream(contents, self._cliente.generate_content(contents=contents, stream=True, **kwargs), inicio)
+        resposta = self._cliente.generate_content(contents=contents, **kwargs)
+        latencia = time.perf_counter() - inicio
+        self._armazem.guardar(self._modelo, contents, resposta.text, latencia, latencia)
+        return resposta
+
+    def _gravar_stream(self, contents, iterador, inicio):
+        """
+        Grava ao fim do stream ou quando o consumidor o fecha antes (ex: veredito
+        antecipado do JSON estruturado): nesse caso ficam os trechos lidos até ali,
+        que são os mesmos que o replay precisa servir. Um stream que falha não é gravado.
+        """
+        trechos = []
+        ttft = None
+
+        def guardar():
+            latencia = time.perf_counter() - inicio
+            self._armazem.guardar(self._modelo, contents, "".join(trechos), latencia,
+                                  ttft if ttft is not None else latencia, trechos)
+
+        try:
+            for chunk in iterador:
+                if ttft is None:
+                    ttft = time.perf_counter() - inicio
+                trechos.append(getattr(chunk, "text", "") or "")
+                yield chunk
+        except GeneratorExit:
+            guardar()
+            raise
+        guardar()
+
+    async def generate_content_async(self, contents, **kwargs):
+        inicio = time.perf_counter()
+        resposta = await self._cliente.generate_content_async(contents=contents, **kwargs)
+        latencia = time.perf_counter() - inicio
+        self._armazem.guardar(self._modelo, contents, resposta.text, latencia, latencia)
+        return resposta
+
+# ---------------------------------------------------------
+# BACKEND DE REPLAY (OFFLINE)
+# ---------------------------------------------------------
+
+class ClienteReplay:
+    """
+    Serve as respostas gravadas. 'escala_latencia' multiplica a latência
+    gravada (0 desliga a espera) e 'taxa_erros_quota' injeta QuotaSimulada
+    (sem precisar do SDK) com um gerador aleatório de semente fixa (sequência
+    reprodutível).
+    """
+
+    def __init__(self, modelo, armazem, escala_latencia=1.0, taxa_erros_quota=0.0, semente=0):
+        self._modelo = modelo
+        self._armazem = armazem
+        self.escala_latencia = escala_latencia
+        self.taxa_erros_quota = taxa_erros_quota
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+
+    def _talvez_falhar(self):
+        with self._trava:
+            sorteio = self._aleatorio.random()
+        if sorteio < self.taxa_erros_quota:
+            raise QuotaSimulada(f"Quota excedida (injetada pelo replay de {self._modelo}).")
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        self._talvez_falhar()
+        gravacao = self._armazem.obter(self._modelo, contents)
+        if stream:
+            return self._replay_stream(gravacao)
+        time.sleep(gravacao["latencia"] * self.escala_latencia)
+        return _resposta(gravacao["texto"], gravacao["tokens_prompt"])
+
+    def _replay_stream(self, gravacao):
+        texto = gravacao["texto"]
+        trechos = gravacao.get("trechos") or [
+            texto[i:i + TAMANHO_TRECHO_REPLAY] for i in range(0, len(texto), TAMANHO_TRECHO_REPLAY)
+        ] or [""]
+        time.sleep(gravacao["ttft"] * self.escala_latencia)
+        # O restante da latência é distribuído igualmente entre os trechos seguintes
+        intervalo = max(0.0, gravacao["latencia"] - gravacao["ttft"]) * self.escala_latencia / max(1, len(trechos) - 1)
+        for indice, trecho in enumerate(trechos):
+            if indice:
+                time.sleep(intervalo)
+            yield _resposta(trecho, gravacao["tokens_prompt"] if indice == len(trechos) - 1 else 0)
+
+    async def generate_content_async(self, contents, **kwargs):
+        self._talvez_falhar()
+        gravacao = self._armazem.obter(self._modelo, contents)
+        import asyncio  # import tardio, como no LimitadorTaxa
+        await asyncio.sleep(gravacao["latencia"] * self.escala_latencia)
+        return _resposta(gravacao["texto"], gravacao["tokens_prompt"])
+
+# ---------------------------------------------------------
+# SELEÇÃO DO BACKEND
+# ---------------------------------------------------------
+
+BACKENDS = ("gemini", "gravar", "replay")
+BACKEND_ATIVO = "gemini"
+ARMAZEM_ATIVO = None  # ArmazemGravacoes dos backends "gravar" e "replay"
+
+
+def configurar_backend(nome, caminho=CAMINHO_GRAVACOES_PADRAO, escala_latencia=1.0, taxa_erros_quota=0.0, semente=0):
+    """
+    Troca a fábrica do REGISTRO_CLIENTES (descartando os clientes já criados)
+    e retorna o ArmazemGravacoes em uso (None no backend "gemini").
+    """
+    global BACKEND_ATIVO, ARMAZEM_ATIVO
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de LLM desconhecido: {nome!r} (use um de {', '.join(BACKENDS)}).")
+
+    armazem = None
+    # Só o backend real usa o cache de contexto do provedor: gravações são chaveadas pelo prompt completo
+    fabrica_contexto = None
+    if nome == "gemini":
+        fabrica, fabrica_contexto = _fabrica_gemini, _fabrica_contexto_gemini
+    elif nome == "gravar":
+        armazem = ArmazemGravacoes(caminho)
+
+        def fabrica(model_name, generation_config):
+            return ClienteGravador(_fabrica_gemini(model_name, generation_config), model_name, armazem)
+    else:
+        armazem = ArmazemGravacoes(caminho)
+
+        def fabrica(model_name, generation_config):
+            return ClienteReplay(model_name, armazem, escala_latencia, taxa_erros_quota, semente)
+
+    REGISTRO_CLIENTES.trocar_fabrica(fabrica, fabrica_contexto)
+    BACKEND_ATIVO = nome
+    ARMAZEM_ATIVO = armazem
+    return armazem
+
+
+def configurar_backend_do_ambiente():
+    """Aplica BACKEND_LLM e as opções de replay das variáveis de ambiente."""
+    return configurar_backend(
+        os.getenv("BACKEND_LLM", "gemini"),
+        caminho=os.getenv("GRAVACOES_LLM", CAMINHO_GRAVACOES_PADRAO),
+        escala_latencia=float(os.getenv("REPLAY_ESCALA_LATENCIA", 1.0)),
+        taxa_erros_quota=float(os.getenv("REPLAY_TAXA_QUOTA", 0.0)),
+        semente=int(os.getenv("REPLAY_SEMENTE", 0)),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _aplicar_backend_do_ambiente():
+    if REGISTRO_CLIENTES.fabrica_padrao:
+        configurar_backend_do_ambiente()
+
+
+def obter_armazem_gravacoes():
+    """
+    Aplica o backend do ambiente no primeiro uso (e não no import de quem usa o
+    REGISTRO_CLIENTES) e retorna o ArmazemGravacoes em uso (None no "gemini").
+    Uma fábrica trocada antes (ex: o stand-in do benchmark) é mantida.
+    """
+    _aplicar_backend_do_ambiente()
+    return ARMAZEM_ATIVO
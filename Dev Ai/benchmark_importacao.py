@@ -0,0 +1,90 @@
+"""
+Benchmark de tempo de importação (partida a frio) do núcleo headless.
+
+Importa o módulo em processos Python novos, mede o tempo de importação
+(mediana de várias execuções), lista os módulos que mais pesam (via
+-X importtime) e verifica que o SDK do Gemini, o google-adk e o Streamlit
+não são carregados na importação. Sai com código 1 se o orçamento for
+estourado ou se algum módulo pesado for importado, para uso em CI.
+
+Uso: python benchmark_importacao.py [--modulo agente_workflow] [--orcamento-ms 300] [--execucoes 5]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Módulos que só devem ser carregados no primeiro uso (cliente real, ADK ou interface)
+MODULOS_PESADOS = ("google.generativeai", "google.adk", "google.api_core", "grpc", "streamlit")
+
+_SCRIPT_MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"ms": duracao * 1000, "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def _executar(argumentos):
+    return subprocess.run([sys.executable, *argumentos], cwd=DIRETORIO, capture_output=True, text=True, check=True)
+
+
+def medir_importacao(modulo, execucoes):
+    """Tempos (ms) de 'import modulo' em processos novos e os módulos pesados carregados."""
+    tempos = []
+    pesados = set()
+    for _ in range(execucoes):
+        saida = _executar(["-c", _SCRIPT_MEDICAO.format(modulo=modulo, pesados=MODULOS_PESADOS)])
+        resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+        tempos.append(resultado["ms"])
+        pesados.update(resultado["pesados"])
+    return tempos, sorted(pesados)
+
+
+def modulos_mais_lentos(modulo, quantidade=10):
+    """Módulos com maior tempo acumulado segundo o -X importtime (em ms)."""
+    saida = _executar(["-X", "importtime", "-c", f"import {modulo}"])
+    tempos = []
+    for linha in saida.stderr.splitlines():
+        partes = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", linha)
+        if partes:
+            tempos.append((int(partes.group(2)) / 1000, partes.group(4)))
+    return sorted(tempos, reverse=True)[:quantidade]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulo", default="agente_workflow")
+    parser.add_argument("--orcamento-ms", type=float, default=300.0, help="Mediana máxima aceitável da importação")
+    parser.add_argument("--execucoes", type=int, default=5)
+    args = parser.parse_args()
+
+    tempos, pesados = medir_importacao(args.modulo, args.execucoes)
+    mediana = statistics.median(tempos)
+    print(f"--- import {args.modulo} ({args.execucoes} processos novos) ---")
+    print(f"Mediana: {mediana:.1f} ms | mín {min(tempos):.1f} ms | máx {max(tempos):.1f} ms "
+          f"(orçamento {args.orcamento_ms:.0f} ms)")
+    print("\nMódulos mais lentos (tempo acumulado):")
+    for ms, nome in modulos_mais_lentos(args.modulo):
+        print(f"  {ms:8.1f} ms  {nome}")
+
+    falhou = False
+    if pesados:
+        print(f"\n🚨 Módulos pesados carregados na importação: {', '.join(pesados)}")
+        falhou = True
+    if mediana > args.orcamento_ms:
+        print(f"\n🚨 Orçamento estourado: {mediana:.1f} ms > {args.orcamento_ms:.0f} ms")
+        falhou = True
+    if not falhou:
+        print("\n✅ Dentro do orçamento e sem módulos pesados.")
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""
+Benchmark ponta a ponta do workflow de desenvolvimento.
+
+Executa executar_workflow_de_desenvolvimento sobre um corpus de pedidos
+representativos (sem código base, código base pequeno e grande) contra um
+stand-in local e determinístico do LLM, com latência configurável. Nenhuma
+chamada de rede é feita e o cache de respostas fica desligado (exceto com
+--com-cache), para que cada execução pague todas as chamadas.
+
+Por pedido, mede: tempo de relógio por etapa (engenheiro, dev, verificadores,
+cada verificador, gerente), iterações até convergir, bytes de prompt/resposta
+e o overhead fora das chamadas ao LLM (tempo total menos o tempo em que havia
+alguma chamada em andamento). O resultado vai para um JSON, e --comparar
+mostra a variação em relação a um resultado anterior (ex: de outro commit).
+
+Os modelos do stand-in têm perfis diferentes (FATOR_LATENCIA_MODELO e
+MODELOS_DEV_FRACOS): --comparar-roteamento roda o corpus com os modelos fixos
+e com o roteamento adaptativo (o histórico começa vazio e aprende entre as
+repetições) e mostra a variação de tempo e custo em relação aos fixos.
+
+Uso: python benchmark_workflow.py --saida bench.json --latencia 0.2 --comparar bench_anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# Checkpoints continuam ativos (o custo de gravação entra na medição), mas em memória
+os.environ.setdefault("CHECKPOINTS_CAMINHO", ":memory:")
+# Índice de pedidos similares também em memória (com --opcoes '{"reaproveitar_similares": true}' as
+# repetições a partir da 2ª reaproveitam a 1ª)
+os.environ.setdefault("INDICE_PEDIDOS_CAMINHO", ":memory:")
+# Histórico do roteamento adaptativo em memória: cada benchmark aprende do zero
+os.environ.setdefault("ROTEAMENTO_CAMINHO", ":memory:")
+
+import agente_workflow
+from clientes_llm import REGISTRO_CLIENTES
+from diff_incremental import MARCADOR_DIFF, gerar_diff
+from lote_pedidos import carregar_pedidos
+from opcoes_workflow import OpcoesWorkflow
+from projeto_arquivos import MARCADOR_ARQUIVO
+
+# ---------------------------------------------------------
+# STAND-IN DETERMINÍSTICO DO LLM
+# ---------------------------------------------------------
+
+class EstadoStandIn:
+    """Estado compartilhado pelos clientes do stand-in durante uma execução do workflow."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.reiniciar(1)
+
+    def reiniciar(self, iteracoes_para_aprovar):
+        with self._trava:
+            self.iteracoes_para_aprovar = iteracoes_para_aprovar
+            self.chamadas_dev = 0
+            self.intervalos = []
+            self.bytes_prompt = 0
+            self.bytes_resposta = 0
+
+    def proxima_revisao(self):
+        with self._trava:
+            self.chamadas_dev += 1
+            return self.chamadas_dev
+
+    def registrar(self, inicio, fim, prompt, resposta):
+        with self._trava:
+            self.intervalos.append((inicio, fim))
+            self.bytes_prompt += len(prompt.encode("utf-8"))
+            self.bytes_resposta += len(resposta.encode("utf-8"))
+
+    def tempo_em_llm(self):
+        """Tempo de relógio com ao menos uma chamada em andamento (união dos intervalos)."""
+        total = 0.0
+        fim_atual = None
+        for inicio, fim in sorted(self.intervalos):
+            if fim_atual is None or inicio > fim_atual:
+                total += fim - inicio
+                fim_atual = fim
+            elif fim > fim_atual:
+                total += fim - fim_atual
+                fim_atual = fim
+        return total
+
+
+ESTADO = EstadoStandIn()
+
+# Perfis dos modelos no stand-in: latência relativa (multiplica a do benchmark) e os modelos cujo Dev
+# não evolui o código (revisão 0, sempre reprovada), como um modelo fraco demais para a tarefa
+FATOR_LATENCIA_MODELO = {"gemini-2.5-flash-lite": 0.5, "gemini-2.5-flash": 1.0, "gemini-2.5-pro": 2.5}
+MODELOS_DEV_FRACOS = {"gemini-2.5-flash-lite"}
+
+
+def _resposta(texto):
+    tokens_saida = max(1, len(texto) // 4)
+    uso = SimpleNamespace(prompt_token_count=0, candidates_token_count=tokens_saida,
+                          total_token_count=tokens_saida, cached_content_token_count=0)
+    return SimpleNamespace(text=texto, usage_metadata=uso)
+
+
+def _codigo_da_revisao(revisao, codigo_base):
+    solucao = (
+        f"# revisao {revisao}\n"
+        f"def solucao(valores):\n"
+        f"    \"\"\"Soma os valores informados.\"\"\"\n"
+        f"    return sum(valores)\n"
+    )
+    return f"{codigo_base.rstrip()}\n\n\n{solucao}" if codigo_base.strip() else solucao
+
+
+def _projeto_da_revisao(revisao):
+    """Projeto de dois arquivos: a lógica (que evolui a cada revisão) e a interface que a usa."""
+    return {
+        "solucao.py": _codigo_da_revisao(revisao, ""),
+        "interface.py": "from solucao import solucao\n\n\ndef main(valores):\n    return solucao(valores)\n",
+    }
+
+
+def _contexto_ecoado(prompt):
+    """Contexto original do cliente que uma resposta textual repete (montado a partir do pedido no prompt)."""
+    pedido = re.search(r"(?:PEDIDO TEXTUAL|PEDIDO DO CLIENTE|Pedido do Cliente): (.*)", prompt)
+    pedido = pedido.group(1).strip() if pedido else "Pedido do benchmark"
+    return (f"--- CONTEXTO ORIGINAL DO CLIENTE ---\nPEDIDO DO CLIENTE: {pedido}\n"
+            f"Código base: APLICÁVEL (está na memória do Dev)")
+
+
+def _em_json(agente, texto):
+    """Resposta textual do stand-in convertida para o esquema JSON do papel (chaves em ordem alfabética)."""
+    if agente == "eng_software":
+        especificacao = texto.split("--- CONTEXTO ORIGINAL DO CLIENTE ---", 1)[0]
+        dados = {"especificacao": especificacao.replace("--- ESPECIFICACAO TECNICA ---", "").strip()}
+    elif agente == "dev" and "--- ARQUIVO:" in texto:
+        dados = {"codigo": texto.split("--- CONTEXTO ORIGINAL DO CLIENTE ---", 1)[0].strip()}
+    elif agente == "dev":
+        codigo = re.search(r"```python\n(.*?)```", texto, re.DOTALL)
+        dados = {"codigo": codigo.group(1) if codigo else texto}
+    elif agente == "gerente_lancamento":
+        tarefas = re.findall(r"^\d+\. (.*)$", texto, re.MULTILINE)
+        dados = {"decisao": "TERMINATE" if texto == "TERMINATE" else "CORRIGIR", "tarefas": tarefas}
+    else:
+        aprovado = texto.startswith("STATUS: APROVADO")
+        dados = {"status": "APROVADO" if aprovado else "REPROVADO",
+                 "tarefas": [] if aprovado else re.findall(r"^- (.*)$", texto, re.MULTILINE), "testes": []}
+    return json.dumps(dados, ensure_ascii=False, sort_keys=True)
+
+
+class ModeloDeterministico:
+    """
+    Stand-in do GenerativeModel: responde pelo papel do agente (lido do
+    prompt) com textos fixos; como o LLM real, ecoa o contexto original do
+    cliente nas respostas textuais. O Dev produz a revisão N do código a cada
+    chamada; os verificadores aprovam a partir da revisão
+    ESTADO.iteracoes_para_aprovar (o Dev de MODELOS_DEV_FRACOS fica na
+    revisão 0). Com response_mime_type JSON no generation_config (saída
+    estruturada), responde no esquema do papel. Latência = (base + por_kb *
+    KB do prompt + por_kb_saida * KB da resposta) * FATOR_LATENCIA_MODELO
+    (+ jitter com semente fixa), distribuída entre os trechos no streaming.
+    """
+
+    def __init__(self, model_name, generation_config=None, latencia=0.05, latencia_por_kb=0.0,
+                 jitter=0.0, semente=0, latencia_por_kb_saida=0.0):
+        self.model_name = model_name
+        self.latencia = latencia
+        self.latencia_por_kb = latencia_por_kb
+        self.latencia_por_kb_saida = latencia_por_kb_saida
+        self.jitter = jitter
+        self.json = (generation_config or {}).get("response_mime_type") == "application/json"
+        self._aleatorio = random.Random(f"{semente}:{model_name}")
+        self._trava = threading.Lock()
+
+    def _latencia(self, prompt, resposta=""):
+        with self._trava:
+            variacao = self._aleatorio.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        fator = FATOR_LATENCIA_MODELO.get(self.model_name, 1.0)
+        return max(0.0, fator * (self.latencia + self.latencia_por_kb * len(prompt.encode("utf-8")) / 1024
+                                 + self.latencia_por_kb_saida * len(resposta.encode("utf-8")) / 1024) + variacao)
+
+    def _responder(self, prompt):
+        agente = re.search(r"Instrução do Agente '([^']+)'", prompt)
+        agente = agente.group(1) if agente else ""
+        texto = self._responder_texto(agente, prompt)
+        return _em_json(agente, texto) if self.json else texto
+
+    def _responder_texto(self, agente, prompt):
+        if agente == "eng_software":
+            return ("--- ESPECIFICACAO TECNICA ---\nImplementar 'solucao(valores)' somando os valores.\n"
+                    f"{_contexto_ecoado(prompt)}")
+        if agente == "dev":
+            revisao = 0 if self.model_name in MODELOS_DEV_FRACOS else ESTADO.proxima_revisao()
+            atual = prompt.split("--- VERSÃO ATUAL DO CÓDIGO ---", 1)
+            if len(atual) == 2:
+                # Modo incremental: responde com um diff contra a versão atual
+                anterior = atual[1].strip("\n") + "\n"
+                novo = re.sub(r"# revisao \d+", f"# revisao {revisao}", anterior)
+                return f"{MARCADOR_DIFF}\n{gerar_diff(anterior, novo)}"
+            if "📁 PROJETO COM VÁRIOS ARQUIVOS" in prompt:
+                # Projeto multiarquivo: envia só os arquivos pedidos (todos na 1ª iteração)
+                alvos = re.search(r"ARQUIVOS A REGENERAR \(reenvie só estes, completos\): (.*)", prompt)
+                arquivos = _projeto_da_revisao(revisao)
+                alvos = alvos.group(1).split(", ") if alvos else list(arquivos)
+                return "\n".join(f"{MARCADOR_ARQUIVO.format(c)}\n```python\n{arquivos[c]}```"
+                                 for c in alvos if c in arquivos) + f"\n{_contexto_ecoado(prompt)}"
+            base = re.search(r"CÓDIGO BASE NA MEMÓRIA \(INÍCIO DO TRABALHO\) 🚨\n(.*?)\n🚨 CÓDIGO BASE NA MEMÓRIA \(FIM",
+                             prompt, re.DOTALL)
+            base = base.group(1) if base else ""
+            return (f"--- CODIGO PYTHON ---\n```python\n{_codigo_da_revisao(revisao, base.strip())}```\n"
+                    f"{_contexto_ecoado(prompt)}")
+        if agente == "gerente_lancamento":
+            relatorios = prompt.split("RELATÓRIOS DOS REVISORES:", 1)[-1]
+            if "STATUS: REPROVADO" not in relatorios:
+                return "TERMINATE"
+            return ("LISTA DE TAREFAS PARA O DEV:\n1. Aplique as correções apontadas pelos revisores.\n"
+                    f"{_contexto_ecoado(prompt)}")
+        # Verificadores: aprovam a partir da revisão alvo
+        revisoes = [int(n) for n in re.findall(r"# revisao (\d+)", prompt)]
+        if revisoes and max(revisoes) >= ESTADO.iteracoes_para_aprovar:
+            return "STATUS: APROVADO\nNenhum problema encontrado."
+        return "STATUS: REPROVADO\n- A função 'solucao' não trata entradas vazias."
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        inicio = time.perf_counter()
+        texto = self._responder(contents)
+        latencia = self._latencia(contents, texto)
+        if stream:
+            return self._stream(contents, texto, latencia, inicio)
+        time.sleep(latencia)
+        ESTADO.registrar(inicio, time.perf_counter(), contents, texto)
+        return _resposta(texto)
+
+    def _stream(self, contents, texto, latencia, inicio):
+        trechos = [texto[i:i + 40] for i in range(0, len(texto), 40)] or [""]
+        enviados = []
+        try:
+            for trecho in trechos:
+                time.sleep(latencia / len(trechos))
+                enviados.append(trecho)
+                yield _resposta(trecho)
+        finally:
+            # Um stream encerrado antes do fim (ex: veredito antecipado) conta só o que foi gerado
+            ESTADO.registrar(inicio, time.perf_counter(), contents, "".join(enviados))
+
+# ---------------------------------------------------------
+# CORPUS DE PEDIDOS
+# ---------------------------------------------------------
+
+def _codigo_base_sintetico(funcoes):
+    return "\n\n".join(
+        f"def utilitario_{i}(valor):\n    \"\"\"Utilitário {i}.\"\"\"\n    resultado = valor * {i} + {i % 7}\n"
+        f"    if resultado > {i * 10}:\n        return resultado - {i}\n    return resultado\n"
+        for i in range(funcoes)
+    )
+
+
+def corpus_padrao():
+    """Pedidos representativos: sem código base, base pequena e base grande; 1 a 3 iterações."""
+    return [
+        {"id": "sem_base_1it", "pedido": "Crie uma função Python que some uma lista de números.",
+         "codigo_base": "", "iteracoes_para_aprovar": 1},
+        {"id": "sem_base_3it", "pedido": "Crie uma função Python que some uma lista de números, validando a entrada.",
+         "codigo_base": "", "iteracoes_para_aprovar": 3},
+        {"id": "base_pequena_2it", "pedido": "Adicione ao módulo uma função que some os valores.",
+         "codigo_base": _codigo_base_sintetico(5), "iteracoes_para_aprovar": 2},
+        {"id": "base_grande_2it", "pedido": "Adicione ao módulo uma função que some os valores.",
+         "codigo_base": _codigo_base_sintetico(300), "iteracoes_para_aprovar": 2},
+    ]
+
+# ---------------------------------------------------------
+# EXECUÇÃO E MEDIÇÃO
+# ---------------------------------------------------------
+
+# Evento que encerra cada etapa -> nome da etapa (contada desde o evento anterior)
+ETAPA_POR_EVENTO = {
+    "engenheiro_completo": "engenheiro",
+    "dev_completo": "dev",
+    "verificadores_completos": "verificadores",
+    "feedback": "gerente",
+    "terminado": "gerente",
+}
+
+
+def executar_pedido(job, max_iteracoes, opcoes):
+    """Roda o workflow para um pedido e devolve as medições."""
+    ESTADO.reiniciar(job.get("iteracoes_para_aprovar", 1))
+    etapas = {}
+    verificadores = {}
+    iteracoes = 0
+    final = {}
+    inicio = ultimo_evento = time.perf_counter()
+    for evento in agente_workflow.executar_workflow_de_desenvolvimento(
+        pedido_do_cliente=job["pedido"], codigo_base=job["codigo_base"], max_iteracoes=max_iteracoes,
+        opcoes=OpcoesWorkflow(**opcoes), deve_abortar=lambda: False,
+    ):
+        agora = time.perf_counter()
+        status = evento.get("status")
+        iteracoes = evento.get("iteracao", iteracoes)
+        if status in ETAPA_POR_EVENTO:
+            etapa = "precheck" if evento.get("precheck") else ETAPA_POR_EVENTO[status]
+            etapas[etapa] = etapas.get(etapa, 0.0) + agora - ultimo_evento
+        if status == "analise" and evento.get("metricas"):
+            verificadores[evento["agente"]] = verificadores.get(evento["agente"], 0.0) + evento["metricas"]["duracao"]
+        if status == "terminado":
+            final = evento
+        if status in ETAPA_POR_EVENTO or status in ("iniciado", "iteracao_inicio"):
+            ultimo_evento = agora
+    total = time.perf_counter() - inicio
+    tempo_llm = ESTADO.tempo_em_llm()
+    tokens = final["telemetria"].total() if final.get("telemetria") else {}
+    return {
+        "id": job["id"],
+        "sucesso": bool(final.get("sucesso")),
+        "iteracoes": iteracoes,
+        "tempo_total": total,
+        "tempo_por_etapa": etapas,
+        "tempo_por_verificador": verificadores,
+        "tempo_em_llm": tempo_llm,
+        "overhead_fora_do_llm": total - tempo_llm,
+        "chamadas_llm": len(ESTADO.intervalos),
+        "bytes_prompt": ESTADO.bytes_prompt,
+        "bytes_resposta": ESTADO.bytes_resposta,
+        "bytes_codigo_base": len(job["codigo_base"].encode("utf-8")),
+        "tokens_prompt": tokens.get("tokens_prompt", 0),
+        "tokens_prompt_cache": tokens.get("tokens_prompt_cache", 0),
+        "tokens_saida": tokens.get("tokens_saida", 0),
+        "bytes_regenerados": (final.get("projeto") or {}).get("bytes_regenerados", 0),
+        "custo": tokens.get("custo", 0.0),
+        "escalonamentos": len((final.get("roteamento") or {}).get("escalonamentos", [])),
+    }
+
+
+def _mediana_por_pedido(execucoes):
+    """Agrega as repetições de cada pedido pela mediana das métricas numéricas."""
+    agregado = {}
+    for identificador in dict.fromkeys(e["id"] for e in execucoes):
+        do_pedido = [e for e in execucoes if e["id"] == identificador]
+        resumo = {"id": identificador, "sucesso": all(e["sucesso"] for e in do_pedido)}
+        for chave, valor in do_pedido[0].items():
+            if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                resumo[chave] = statistics.median(e[chave] for e in do_pedido)
+            elif isinstance(valor, dict):
+                nomes = dict.fromkeys(nome for e in do_pedido for nome in e[chave])
+                resumo[chave] = {nome: statistics.median(e[chave].get(nome, 0.0) for e in do_pedido) for nome in nomes}
+        agregado[identificador] = resumo
+    return agregado
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def executar_benchmark(jobs, repeticoes=3, max_iteracoes=10, opcoes=None, latencia=0.05, latencia_por_kb=0.0,
+                       jitter=0.0, semente=0, com_cache=False, latencia_por_kb_saida=0.0):
+    """Roda o corpus 'repeticoes' vezes contra o stand-in e devolve o resultado completo (serializável em JSON)."""
+    opcoes = opcoes or {}
+    REGISTRO_CLIENTES.trocar_fabrica(
+        lambda model_name, generation_config: ModeloDeterministico(
+            model_name, generation_config, latencia, latencia_por_kb, jitter, semente, latencia_por_kb_saida)
+    )
+    if not com_cache:
+        agente_workflow.USAR_CACHE_RESPOSTAS = False
+
+    execucoes = []
+    for repeticao in range(1, repeticoes + 1):
+        for job in jobs:
+            resultado = executar_pedido(job, max_iteracoes, opcoes)
+            resultado["repeticao"] = repeticao
+            execucoes.append(resultado)
+            print(f"[{repeticao}/{repeticoes}] {job['id']:<20} {resultado['tempo_total']:7.3f}s "
+                  f"{resultado['iteracoes']} it. overhead {resultado['overhead_fora_do_llm'] * 1000:7.1f} ms")
+
+    return {
+        "commit": _commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "configuracao": {"repeticoes": repeticoes, "max_iteracoes": max_iteracoes, "opcoes": opcoes,
+                         "latencia": latencia, "latencia_por_kb": latencia_por_kb,
+                         "latencia_por_kb_saida": latencia_por_kb_saida, "jitter": jitter,
+                         "semente": semente, "com_cache": com_cache},
+        "por_pedido": _mediana_por_pedido(execucoes),
+        "execucoes": execucoes,
+    }
+
+# ---------------------------------------------------------
+# COMPARAÇÃO ENTRE RESULTADOS
+# ---------------------------------------------------------
+
+METRICAS_COMPARADAS = ("tempo_total", "overhead_fora_do_llm", "iteracoes", "chamadas_llm", "bytes_prompt",
+                       "bytes_resposta", "custo")
+
+
+def comparar(anterior, atual, titulo=None):
+    """Imprime a variação das medianas por pedido entre dois resultados."""
+    titulo = titulo or f"{anterior.get('commit')} -> {atual.get('commit')}"
+    print(f"\n--- Comparação: {titulo} ---")
+    for identificador, resumo in atual["por_pedido"].items():
+        base = anterior["por_pedido"].get(identificador)
+        if base is None:
+            print(f"{identificador}: (sem referência)")
+            continue
+        partes = []
+        for metrica in METRICAS_COMPARADAS:
+            antes, depois = base.get(metrica), resumo.get(metrica)
+            if antes is None or depois is None:
+                continue
+            variacao = f"{(depois - antes) / antes * 100:+.1f}%" if antes else "n/a"
+            partes.append(f"{metrica} {variacao}")
+        print(f"{identificador:<20} " + " | ".join(partes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSONL/diretório de pedidos (formato do lote_pedidos; "
+                                         "aprovados na 1ª iteração). Padrão: corpus embutido.")
+    parser.add_argument("--saida", default="resultados_benchmark.json")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--max-iteracoes", type=int, default=10)
+    parser.add_argument("--latencia", type=float, default=0.05, help="Latência base por chamada (s)")
+    parser.add_argument("--latencia-por-kb", type=float, default=0.0, help="Latência extra por KB de prompt (s)")
+    parser.add_argument("--latencia-por-kb-saida", type=float, default=0.0,
+                        help="Latência extra por KB de resposta (s), o custo de gerar tokens de saída")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variação aleatória (±s, semente fixa)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--com-cache", action="store_true", help="Mantém o cache de respostas ligado")
+    parser.add_argument("--opcoes", default="{}", help="Parâmetros extras do workflow em JSON")
+    parser.add_argument("--comparar", help="Resultado anterior (JSON) para comparação")
+    parser.add_argument("--comparar-roteamento", action="store_true",
+                        help="Roda também com roteamento_adaptativo e compara com os modelos fixos")
+    args = parser.parse_args()
+
+    jobs = carregar_pedidos(args.corpus) if args.corpus else corpus_padrao()
+    opcoes = json.loads(args.opcoes)
+    parametros = dict(
+        repeticoes=args.repeticoes, max_iteracoes=args.max_iteracoes, latencia=args.latencia,
+        latencia_por_kb=args.latencia_por_kb, jitter=args.jitter, semente=args.semente, com_cache=args.com_cache,
+        latencia_por_kb_saida=args.latencia_por_kb_saida,
+    )
+    resultado = executar_benchmark(jobs, opcoes=opcoes, **parametros)
+    if args.comparar_roteamento:
+        print("\n--- Com roteamento adaptativo ---")
+        fixos = resultado
+        resultado = executar_benchmark(jobs, opcoes={**opcoes, "roteamento_adaptativo": True}, **parametros)
+        resultado["modelos_fixos"] = fixos
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados em: {args.saida}")
+
+    if args.comparar_roteamento:
+        comparar(resultado["modelos_fixos"], resultado, "modelos fixos -> roteamento adaptativo")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(json.load(arquivo), resultado)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import threading
+
+from clientes_llm import REGISTRO_CLIENTES
+
+# ---------------------------------------------------------
+# CACHE DE CONTEXTO (PREFIXO ESTÁVEL DO PROMPT) POR EXECUÇÃO
+# ---------------------------------------------------------
+
+# O provedor só aceita cache de contexto a partir de um tamanho mínimo de prefixo
+MIN_TOKENS_CONTEXTO = int(os.getenv("MIN_TOKENS_CONTEXTO", 1024))
+TTL_CONTEXTO_SEGUNDOS = int(os.getenv("TTL_CONTEXTO_SEGUNDOS", 3600))
+
+
+def _estimar_tokens(texto):
+    return max(1, len(texto) // 4)
+
+
+class CacheContexto:
+    """
+    Handle de cache de contexto de uma execução do workflow. O prompt de cada
+    agente é dividido em um prefixo estável (instrução + código base) e um
+    sufixo variável (entrada de trabalho); 'preparar' decide o que enviar.
+
+    - Backend com cache de contexto no provedor (REGISTRO_CLIENTES devolve um
+      cliente para o prefixo): a partir do 2º uso do mesmo prefixo, ele vira um
+      conteúdo cacheado no provedor e só o sufixo é enviado.
+    - Demais backends (replay, stand-ins locais): o prompt completo é enviado e
+      o cache é simulado, contando os tokens do prefixo como cacheados a partir
+      do 2º uso, como faria o cache de prefixo do provedor.
+
+    Prefixos menores que MIN_TOKENS_CONTEXTO nunca são cacheados. 'liberar'
+    apaga os conteúdos criados no provedor ao fim da execução.
+    """
+
+    def __init__(self, registro=REGISTRO_CLIENTES, min_tokens=MIN_TOKENS_CONTEXTO, ttl_segundos=TTL_CONTEXTO_SEGUNDOS):
+        self._registro = registro
+        self.min_tokens = min_tokens
+        self.ttl_segundos = ttl_segundos
+        self._entradas = {}
+        self._trava = threading.Lock()
+        self.criados = 0
+        self.falhas_criacao = 0
+        self.acertos = 0
+
+    def preparar(self, modelo, generation_config, prefixo, sufixo, cliente):
+        """
+        (cliente, conteudo, tokens_cacheados_previstos) para a chamada:
+        'conteudo' é só o sufixo quando o prefixo está cacheado no provedor.
+        """
+        tokens_prefixo = _estimar_tokens(prefixo)
+        if tokens_prefixo < self.min_tokens:
+            return cliente, prefixo + sufixo, 0
+        chave = (modelo, hashlib.sha256(prefixo.encode("utf-8")).hexdigest())
+        with self._trava:
+            entrada = self._entradas.setdefault(chave, {"usos": 0, "cliente": None, "liberar": None, "falhou": False})
+            entrada["usos"] += 1
+            if entrada["usos"] >= 2 and entrada["cliente"] is None and not entrada["falhou"]:
+                try:
+                    criado = self._registro.obter_com_contexto(modelo, generation_config, prefixo, self.ttl_segundos)
+                except Exception as e:
+                    print(f"Erro ao criar o cache de contexto (seguindo com o prompt completo): {e}")
+                    criado = None
+                    entrada["falhou"] = True
+                    self.falhas_criacao += 1
+                if criado is not None:
+                    entrada["cliente"], entrada["liberar"] = criado
+                    self.criados += 1
+            if entrada["usos"] < 2:
+                return cliente, prefixo + sufixo, 0
+            self.acertos += 1
+            if entrada["cliente"] is not None:
+                return entrada["cliente"], sufixo, tokens_prefixo
+        if self._registro.suporta_contexto or entrada["falhou"]:
+            # Provedor com cache explícito, mas sem conteúdo cacheado para este prefixo
+            return cliente, prefixo + sufixo, 0
+        return cliente, prefixo + sufixo, tokens_prefixo
+
+    def liberar(self):
+        with self._trava:
+            entradas = list(self._entradas.values())
+            self._entradas.clear()
+        for entrada in entradas:
+            if entrada["liberar"] is not None:
+                try:
+                    entrada["liberar"]()
+                except Exception as e:
+                    print(f"Erro ao apagar o cache de contexto: {e}")
+
+    def estatisticas(self):
+        return {"prefixos": len(self._entradas), "acertos": self.acertos, "criados_no_provedor": self.criados,
+                "falhas_criacao": self.falhas_criacao, "simulado": not self._registro.suporta_contexto}
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ---------------------------------------------------------
+# CACHE PERSISTENTE DE RESPOSTAS DOS AGENTES
+# ---------------------------------------------------------
+
+# Prefixo das mensagens de erro devolvidas pelas funções de execução (nunca são cacheadas)
+PREFIXO_ERRO_LLM = "ERRO DE EXECUÇÃO DO LLM"
+
+CAMINHO_PADRAO = os.getenv(
+    "CACHE_RESPOSTAS_CAMINHO",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_respostas.sqlite3"),
+)
+
+
+class CacheRespostas:
+    """
+    Cache endereçado por conteúdo das respostas do LLM, guardado em SQLite para
+    sobreviver a reinícios do processo (ex: refresh da página do Streamlit).
+
+    - A chave é o hash do modelo + generation_config + prompt completo (instrução
+      do agente, código base injetado e entrada de trabalho).
+    - Entradas expiram após 'ttl_segundos'.
+    - Quando o total armazenado passa de 'max_bytes', as entradas acessadas há
+      mais tempo são removidas (LRU).
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO, max_bytes=50 * 1024 * 1024, ttl_segundos=7 * 24 * 3600):
+        self.caminho = caminho
+        self.max_bytes = max_bytes
+        self.ttl_segundos = ttl_segundos
+        self.acertos = 0
+        self.falhas = 0
+        self.bytes_economizados = 0
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS respostas ("
+            " chave TEXT PRIMARY KEY,"
+            " resposta TEXT NOT NULL,"
+            " tamanho INTEGER NOT NULL,"
+            " criado_em REAL NOT NULL,"
+            " acessado_em REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_acessado_em ON respostas (acessado_em)")
+        self._conexao.commit()
+
+    @staticmethod
+    def gerar_chave(modelo, prompt, generation_config=None):
+        conteudo = json.dumps([modelo, generation_config or {}, prompt], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def obter(self, chave):
+        """Retorna a resposta cacheada (ou None), atualizando contadores e o instante de acesso."""
+        agora = time.time()
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT resposta, tamanho, criado_em FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None or agora - linha[2] > self.ttl_segundos:
+                if linha is not None:
+                    self._conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                    self._conexao.commit()
+                self.falhas += 1
+                return None
+            self._conexao.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+            self._conexao.commit()
+            self.acertos += 1
+            self.bytes_economizados += linha[1]
+            return linha[0]
+
+    def guardar(self, chave, resposta):
+        """Armazena a resposta, exceto mensagens de erro, e aplica a política LRU de tamanho."""
+        if not resposta or resposta.startswith(PREFIXO_ERRO_LLM):
+            return
+        agora = time.time()
+        tamanho = len(resposta.encode("utf-8"))
+        with self._trava:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO respostas (chave, resposta, tamanho, criado_em, acessado_em) VALUES (?, ?, ?, ?, ?)",
+                (chave, resposta, tamanho, agora, agora),
+            )
+            self._despejar(agora)
+            self._conexao.commit()
+
+    def _despejar(self, agora):
+        self._conexao.execute("DELETE FROM respostas WHERE criado_em < ?", (agora - self.ttl_segundos,))
+        total = self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for chave, tamanho in self._conexao.execute(
+            "SELECT chave, tamanho FROM respostas ORDER BY acessado_em ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            total -= tamanho
+
+    def limpar(self):
+        with self._trava:
+            self._conexao.execute("DELETE FROM respostas")
+            self._conexao.commit()
+
+    def estatisticas(self):
+        with self._trava:
+            entradas, total = self._conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas"
+            ).fetchone()
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "bytes_economizados": self.bytes_economizados,
+            "entradas": entradas,
+            "bytes_armazenados": total,
+        }
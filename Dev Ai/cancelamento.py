@@ -0,0 +1,121 @@
+import contextlib
+import contextvars
+import threading
+import time
+
+# ---------------------------------------------------------
+# TOKEN DE CANCELAMENTO COOPERATIVO
+# ---------------------------------------------------------
+
+INTERVALO_CHECAGEM = 0.05  # segundos entre checagens do token durante uma chamada bloqueante
+
+
+class OperacaoCancelada(BaseException):
+    """
+    O token de cancelamento do job foi acionado. Herda de BaseException (como
+    asyncio.CancelledError) para atravessar os 'except Exception' que
+    transformam falhas de chamada em texto de erro.
+    """
+
+
+class TokenCancelamento:
+    """Sinal de cancelamento de um job; chamável, pode ser passado como 'deve_abortar' do workflow."""
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    def __call__(self):
+        return self.cancelado
+
+    def verificar(self):
+        if self._evento.is_set():
+            raise OperacaoCancelada()
+
+    def aguardar(self, segundos):
+        """Dorme até 'segundos', acordando (com OperacaoCancelada) assim que o token for acionado."""
+        if self._evento.wait(segundos):
+            raise OperacaoCancelada()
+
+
+# Token do job em execução, visível às chamadas de agentes feitas no mesmo contexto
+_TOKEN_ATUAL = contextvars.ContextVar("token_cancelamento", default=None)
+
+
+def token_atual():
+    return _TOKEN_ATUAL.get()
+
+
+@contextlib.contextmanager
+def usar_token(token):
+    """Torna 'token' o token atual durante o bloco (as chamadas de LLM feitas nele ficam canceláveis)."""
+    marcador = _TOKEN_ATUAL.set(token)
+    try:
+        yield token
+    finally:
+        _TOKEN_ATUAL.reset(marcador)
+
+
+def verificar_cancelamento():
+    token = _TOKEN_ATUAL.get()
+    if token is not None:
+        token.verificar()
+
+
+def dormir(segundos):
+    """time.sleep interrompível pelo token atual."""
+    token = _TOKEN_ATUAL.get()
+    if token is None:
+        time.sleep(segundos)
+    else:
+        token.aguardar(segundos)
+
+
+def executar_cancelavel(chamada, descartar=None):
+    """
+    Executa 'chamada()' (ex: uma requisição bloqueante ao LLM) e retorna o
+    resultado. Com um token atual, a chamada roda em uma thread auxiliar e a
+    espera é abandonada com OperacaoCancelada assim que o token é acionado.
+    A requisição já enviada não é interrompida: ela termina em segundo plano
+    (e é cobrada pelo provedor), e o resultado que chegar depois é passado a
+    'descartar' (ex: para fechar o stream aberto) em vez de ser usado.
+    """
+    token = _TOKEN_ATUAL.get()
+    if token is None:
+        return chamada()
+    token.verificar()
+
+    resultado = {}
+    concluido = threading.Event()
+    trava = threading.Lock()
+
+    def alvo():
+        try:
+            valor, erro = chamada(), None
+        except BaseException as e:  # repassada à thread do job
+            valor, erro = None, e
+        with trava:
+            abandonada = resultado.get("abandonada", False)
+            resultado.update(valor=valor, erro=erro)
+            concluido.set()
+        if abandonada and erro is None and descartar is not None:
+            try:
+                descartar(valor)
+            except Exception:
+                pass  # ninguém mais espera por esta chamada
+
+    threading.Thread(target=alvo, daemon=True, name="chamada-llm").start()
+    while not concluido.wait(INTERVALO_CHECAGEM):
+        with trava:
+            if token.cancelado and not concluido.is_set():
+                resultado["abandonada"] = True
+                raise OperacaoCancelada()
+    if resultado["erro"] is not None:
+        raise resultado["erro"]
+    return resultado["valor"]
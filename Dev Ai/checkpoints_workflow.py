@@ -0,0 +1,179 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# ---------------------------------------------------------
+# CHECKPOINTS DAS EXECUÇÕES DO WORKFLOW (APPEND-ONLY)
+# ---------------------------------------------------------
+
+CAMINHO_PADRAO = os.getenv(
+    "CHECKPOINTS_CAMINHO",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints_workflow.sqlite3"),
+)
+
+# Prefixo das mensagens de erro devolvidas pelas funções de execução (nunca viram checkpoint)
+PREFIXO_ERRO_LLM = "ERRO DE EXECUÇÃO DO LLM"
+
+
+class ArmazemCheckpoints:
+    """
+    Saídas de cada etapa das execuções do workflow (especificação, código do
+    Dev, relatório de cada verificador, decisão do gerente), guardadas em
+    SQLite por (execução, iteração, etapa). A tabela só recebe INSERTs.
+
+    As gravações vão para uma fila consumida por uma thread de fundo, que as
+    agrupa em uma transação por lote: o workflow nunca espera o disco. Se o
+    processo morrer, perdem-se no máximo as gravações ainda na fila.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self.falhas_gravacao = 0
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        if caminho != ":memory:":
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS execucoes ("
+            " execucao_id TEXT PRIMARY KEY,"
+            " parametros TEXT NOT NULL,"
+            " criado_em REAL NOT NULL)"
+        )
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " execucao_id TEXT NOT NULL,"
+            " iteracao INTEGER NOT NULL,"
+            " etapa TEXT NOT NULL,"
+            " saida TEXT NOT NULL,"
+            " criado_em REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_execucao ON checkpoints (execucao_id)")
+        self._conexao.commit()
+        self._fila = queue.Queue()
+        threading.Thread(target=self._gravar_em_segundo_plano, daemon=True, name="checkpoints").start()
+        atexit.register(self.descarregar)
+
+    # -----------------------------------------------------
+    # GRAVAÇÃO ASSÍNCRONA
+    # -----------------------------------------------------
+
+    def registrar_execucao(self, execucao_id, parametros):
+        """Guarda os parâmetros da execução (a primeira gravação vale; retomar não os altera)."""
+        self._fila.put(("INSERT OR IGNORE INTO execucoes (execucao_id, parametros, criado_em) VALUES (?, ?, ?)",
+                        (execucao_id, json.dumps(parametros, ensure_ascii=False), time.time())))
+
+    def gravar(self, execucao_id, iteracao, etapa, saida):
+        self._fila.put(("INSERT INTO checkpoints (execucao_id, iteracao, etapa, saida, criado_em) VALUES (?, ?, ?, ?, ?)",
+                        (execucao_id, iteracao, etapa, saida, time.time())))
+
+    def descarregar(self):
+        """Bloqueia até todas as gravações enfileiradas chegarem ao banco."""
+        self._fila.join()
+
+    def _gravar_em_segundo_plano(self):
+        while True:
+            lote = [self._fila.get()]
+            while True:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._trava:
+                    for comando, valores in lote:
+                        self._conexao.execute(comando, valores)
+                    self._conexao.commit()
+            except sqlite3.Error as e:
+                self.falhas_gravacao += len(lote)
+                print(f"Erro ao gravar checkpoints (execução segue sem eles): {e}")
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+    # -----------------------------------------------------
+    # LEITURA
+    # -----------------------------------------------------
+
+    def carregar(self, execucao_id):
+        """(parametros, {(iteracao, etapa): saida}) da execução; parametros é None se ela não existir."""
+        self.descarregar()
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT parametros FROM execucoes WHERE execucao_id = ?", (execucao_id,)
+            ).fetchone()
+            etapas = self._conexao.execute(
+                "SELECT iteracao, etapa, saida FROM checkpoints WHERE execucao_id = ? ORDER BY id", (execucao_id,)
+            ).fetchall()
+        parametros = json.loads(linha[0]) if linha else None
+        return parametros, {(iteracao, etapa): saida for iteracao, etapa, saida in etapas}
+
+    def listar_execucoes(self, limite=20):
+        """Execuções mais recentes com o número de etapas salvas, a última iteração e se terminaram."""
+        self.descarregar()
+        with self._trava:
+            linhas = self._conexao.execute(
+                "SELECT e.execucao_id, e.criado_em, e.parametros, COUNT(c.id), COALESCE(MAX(c.iteracao), 0),"
+                " MAX(CASE WHEN c.etapa = 'terminado' THEN c.saida END)"
+                " FROM execucoes e LEFT JOIN checkpoints c ON c.execucao_id = e.execucao_id"
+                " GROUP BY e.execucao_id ORDER BY e.criado_em DESC LIMIT ?", (limite,)
+            ).fetchall()
+        return [{"execucao_id": execucao_id, "criado_em": criado_em, "parametros": json.loads(parametros),
+                 "etapas": etapas, "ultima_iteracao": ultima_iteracao, "terminado": terminado}
+                for execucao_id, criado_em, parametros, etapas, ultima_iteracao, terminado in linhas]
+
+
+class CheckpointsExecucao:
+    """
+    Checkpoints de uma execução: as etapas já salvas são devolvidas sem chamar
+    o LLM e as novas são gravadas. Como o restante do workflow é local e
+    determinístico, reexecutá-lo sobre as saídas salvas reconstrói o estado
+    exato (memo, casos de teste, versão anterior) até o ponto da interrupção.
+    """
+
+    def __init__(self, armazem, execucao_id=None, parametros=None):
+        self.armazem = armazem
+        self.execucao_id = execucao_id or uuid.uuid4().hex[:12]
+        self.salvas = {}
+        if armazem is not None:
+            parametros_salvos, self.salvas = armazem.carregar(self.execucao_id)
+            if parametros_salvos is None:
+                armazem.registrar_execucao(self.execucao_id, parametros or {})
+        self.reaproveitadas = 0
+        self.gravadas = 0
+
+    @property
+    def retomada(self):
+        return bool(self.salvas)
+
+    def obter(self, iteracao, etapa):
+        saida = self.salvas.get((iteracao, etapa))
+        if saida is not None:
+            self.reaproveitadas += 1
+        return saida
+
+    def gravar(self, iteracao, etapa, saida):
+        """Grava a saída da etapa (exceto erros do LLM e etapas já salvas) sem bloquear."""
+        if self.armazem is None or not saida or saida.startswith(PREFIXO_ERRO_LLM) or (iteracao, etapa) in self.salvas:
+            return
+        self.salvas[(iteracao, etapa)] = saida
+        self.armazem.gravar(self.execucao_id, iteracao, etapa, saida)
+        self.gravadas += 1
+
+    def etapa(self, iteracao, etapa, chamada):
+        """Gerador: devolve a saída salva da etapa ou roda 'chamada()' (um gerador) e grava o que ela retornar."""
+        saida = self.obter(iteracao, etapa)
+        if saida is None:
+            saida = yield from chamada()
+            self.gravar(iteracao, etapa, saida)
+        return saida
+
+    def estatisticas(self):
+        return {"execucao_id": self.execucao_id, "etapas_reaproveitadas": self.reaproveitadas,
+                "etapas_gravadas": self.gravadas}
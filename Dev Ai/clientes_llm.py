@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import weakref
+
+# ---------------------------------------------------------
+# REGISTRO DE CLIENTES REUTILIZÁVEIS
+# ---------------------------------------------------------
+
+def _chave_config(generation_config):
+    """Transforma o generation_config (dict, ex: com o response_schema aninhado) em uma chave imutável e ordenada."""
+    return json.dumps(generation_config or {}, sort_keys=True, ensure_ascii=False)
+
+
+_gemini_configurado = False
+
+
+def _importar_gemini():
+    # Import tardio: o SDK só é importado (e configurado com a chave) quando um cliente real é criado.
+    global _gemini_configurado
+    import google.generativeai as genai
+    if not _gemini_configurado:
+        try:
+            genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
+        except Exception as e:
+            print(f"Erro ao configurar o cliente Gemini: {e}")
+        _gemini_configurado = True
+    return genai
+
+
+def _fabrica_gemini(model_name, generation_config):
+    genai = _importar_gemini()
+    return genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+
+
+def _fabrica_contexto_gemini(model_name, generation_config, prefixo, ttl_segundos):
+    """
+    Cria no provedor um conteúdo cacheado com o prefixo do prompt e devolve
+    (cliente que só recebe o sufixo, função que apaga o cache).
+    """
+    import datetime
+    genai = _importar_gemini()
+    from google.generativeai import caching
+    modelo = model_name if model_name.startswith("models/") else f"models/{model_name}"
+    conteudo = caching.CachedContent.create(model=modelo, contents=[prefixo],
+                                            ttl=datetime.timedelta(seconds=ttl_segundos))
+    cliente = genai.GenerativeModel.from_cached_content(cached_content=conteudo, generation_config=generation_config)
+    return cliente, conteudo.delete
+
+
+class RegistroClientes:
+    """
+    Mantém um único objeto de modelo por (nome do modelo, generation_config),
+    reaproveitando o cliente e as conexões subjacentes entre chamadas.
+
+    Os clientes usados pelo caminho assíncrono ficam separados por event loop,
+    pois os canais gRPC assíncronos ficam presos ao loop em que foram criados.
+
+    'fabrica_contexto' (opcional) cria clientes ligados a um prefixo de prompt
+    cacheado no provedor; backends sem ela não têm cache de contexto explícito.
+    """
+
+    def __init__(self, fabrica=None, fabrica_contexto=None):
+        # Ainda na fábrica padrão (SDK real): backends_llm só aplica BACKEND_LLM sobre ela
+        self.fabrica_padrao = fabrica is None
+        if fabrica is None:
+            fabrica, fabrica_contexto = _fabrica_gemini, _fabrica_contexto_gemini
+        self._fabrica = fabrica
+        self._fabrica_contexto = fabrica_contexto
+        self._clientes = {}
+        self._clientes_por_loop = weakref.WeakKeyDictionary()
+        self._trava = threading.Lock()
+
+    def _obter_ou_criar(self, cache, modelo, generation_config):
+        chave = (modelo, _chave_config(generation_config))
+        cliente = cache.get(chave)
+        if cliente is None:
+            with self._trava:
+                cliente = cache.get(chave)
+                if cliente is None:
+                    cliente = self._fabrica(model_name=modelo, generation_config=dict(generation_config or {}))
+                    cache[chave] = cliente
+        return cliente
+
+    def obter(self, modelo, generation_config=None):
+        """Retorna o cliente (síncrono) do modelo, criando-o apenas na primeira vez."""
+        return self._obter_ou_criar(self._clientes, modelo, generation_config)
+
+    def obter_assincrono(self, modelo, generation_config=None):
+        """Retorna o cliente do modelo associado ao event loop em execução."""
+        import asyncio  # import tardio: só o caminho assíncrono precisa do asyncio
+        loop = asyncio.get_running_loop()
+        with self._trava:
+            cache = self._clientes_por_loop.setdefault(loop, {})
+        return self._obter_ou_criar(cache, modelo, generation_config)
+
+    @property
+    def suporta_contexto(self):
+        return self._fabrica_contexto is not None
+
+    def obter_com_contexto(self, modelo, generation_config, prefixo, ttl_segundos):
+        """
+        (cliente, liberar) para chamadas que enviam só o sufixo do prompt, ou
+        None se o backend não tem cache de contexto. Não é reaproveitado entre
+        execuções: quem cria (CacheContexto) apaga ao final.
+        """
+        if self._fabrica_contexto is None:
+            return None
+        return self._fabrica_contexto(model_name=modelo, generation_config=dict(generation_config or {}),
+                                      prefixo=prefixo, ttl_segundos=ttl_segundos)
+
+    def trocar_fabrica(self, fabrica, fabrica_contexto=None):
+        """Passa a criar clientes com outra fábrica (ex: backend de gravação/replay), descartando os atuais."""
+        with self._trava:
+            self._fabrica = fabrica
+            self._fabrica_contexto = fabrica_contexto
+            self.fabrica_padrao = False
+        self.limpar()
+
+    def limpar(self):
+        """Descarta todos os clientes (ex: após trocar a chave de API)."""
+        with self._trava:
+            self._clientes.clear()
+            self._clientes_por_loop.clear()
+
+    def __len__(self):
+        return len(self._clientes)
+
+
+# Registro global compartilhado por agentes.py e agente_workflow.py
+REGISTRO_CLIENTES = RegistroClientes()
+
+
+def obter_cliente(modelo, generation_config=None):
+    return REGISTRO_CLIENTES.obter(modelo, generation_config)
+
+
+def obter_cliente_assincrono(modelo, generation_config=None):
+    return REGISTRO_CLIENTES.obter_assincrono(modelo, generation_config)
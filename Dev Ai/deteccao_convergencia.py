@@ -0,0 +1,107 @@
+import re
+
+# ---------------------------------------------------------
+# DETECÇÃO DE CICLOS E ESTAGNAÇÃO ENTRE ITERAÇÕES
+# ---------------------------------------------------------
+
+# Ações possíveis ao detectar um ciclo: encerrar com a melhor versão, trocar o Dev por um modelo
+# mais forte ou reformular a entrada do Dev. 'escalar' e 'reformular' valem uma vez: uma nova
+# detecção depois delas encerra a execução.
+ACOES_CONVERGENCIA = ("parar", "escalar", "reformular")
+
+# Feedbacks com similaridade (Jaccard das trincas de palavras) a partir disso contam como repetidos
+LIMIAR_FEEDBACK_REPETIDO = 0.9
+# Iterações seguidas com o mesmo feedback, ou sem superar o número de aprovações anterior, que
+# caracterizam estagnação
+JANELA_ESTAGNACAO = 3
+
+
+def normalizar_feedback(texto):
+    """Minúsculas, sem números (linhas, numeração das tarefas) e sem pontuação."""
+    return " ".join(re.findall(r"[^\W\d_]+", texto.lower()))
+
+
+def _trincas(texto):
+    palavras = normalizar_feedback(texto).split()
+    if len(palavras) < 3:
+        return {" ".join(palavras)}
+    return {" ".join(palavras[i:i + 3]) for i in range(len(palavras) - 2)}
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class DetectorConvergencia:
+    """
+    Acompanha as iterações de uma execução: a impressão digital (hash do
+    texto, ver memo_veredictos.impressao_texto) de cada código gerado, o
+    feedback devolvido ao Dev e o número de aprovações dos verificadores.
+    Mudanças só de formatação ou de comentários contam como versão nova.
+    Cada registro devolve uma detecção (dict com "tipo", "iteracao" e "detalhe") ou None:
+
+    - "reescrita_nula": o Dev devolveu o mesmo código da iteração anterior;
+    - "ciclo": o Dev reintroduziu uma versão já reprovada antes;
+    - "feedback_repetido": JANELA_ESTAGNACAO feedbacks seguidos quase idênticos;
+    - "estagnacao": JANELA_ESTAGNACAO iterações sem superar as aprovações de antes.
+
+    Também guarda a melhor versão até agora (compila, mais aprovações, mais recente).
+    """
+
+    def __init__(self, limiar_feedback=LIMIAR_FEEDBACK_REPETIDO, janela=JANELA_ESTAGNACAO):
+        self.limiar_feedback = limiar_feedback
+        self.janela = janela
+        self._versoes = {}
+        self._ultima_versao = None
+        self._ultimo_feedback = None
+        self._repeticoes_feedback = 1
+        self._aprovacoes = []
+        self.melhor = None
+        self.deteccoes = []
+
+    def _detectar(self, tipo, iteracao, detalhe):
+        deteccao = {"tipo": tipo, "iteracao": iteracao, "detalhe": detalhe}
+        self.deteccoes.append(deteccao)
+        return deteccao
+
+    def reiniciar_janelas(self):
+        """Após escalar/reformular: o feedback e as aprovações voltam a contar do zero (os ciclos de código, não)."""
+        self._ultimo_feedback = None
+        self._repeticoes_feedback = 1
+        self._aprovacoes = []
+
+    def registrar_codigo(self, iteracao, impressao):
+        """Registra a impressão digital do código gerado na iteração."""
+        anterior = self._ultima_versao
+        primeira = self._versoes.setdefault(impressao, iteracao)
+        self._ultima_versao = (impressao, iteracao)
+        if anterior is not None and anterior[0] == impressao:
+            return self._detectar("reescrita_nula", iteracao, f"código idêntico ao da iteração {anterior[1]}")
+        if primeira != iteracao:
+            return self._detectar("ciclo", iteracao, f"o Dev reintroduziu a versão da iteração {primeira}")
+        return None
+
+    def registrar_resultado(self, iteracao, codigo, aprovados, feedback, compila=True):
+        """Registra uma iteração reprovada: aprovações, feedback devolvido ao Dev e candidata a melhor versão."""
+        chave = (compila, aprovados, iteracao)
+        if self.melhor is None or chave > self.melhor["chave"]:
+            self.melhor = {"chave": chave, "iteracao": iteracao, "aprovados": aprovados, "codigo": codigo}
+
+        trincas = _trincas(feedback)
+        anterior = self._ultimo_feedback
+        self._aprovacoes.append(aprovados)
+        if anterior is not None and _jaccard(trincas, anterior[0]) >= self.limiar_feedback:
+            self._repeticoes_feedback += 1
+            if self._repeticoes_feedback >= self.janela:
+                self._repeticoes_feedback = 1
+                return self._detectar("feedback_repetido", iteracao,
+                                      f"o mesmo feedback desde a iteração {anterior[1]}")
+        else:
+            self._repeticoes_feedback = 1
+            self._ultimo_feedback = (trincas, iteracao)
+        if len(self._aprovacoes) > self.janela:
+            referencia = self._aprovacoes[-self.janela - 1]
+            if max(self._aprovacoes[-self.janela:]) <= referencia:
+                return self._detectar("estagnacao", iteracao,
+                                      f"{self.janela} iterações sem superar {referencia} aprovação(ões)")
+        return None
@@ -0,0 +1,156 @@
+import ast
+import difflib
+import re
+
+# ---------------------------------------------------------
+# UTILITÁRIOS PARA O MODO INCREMENTAL (DIFF ENTRE ITERAÇÕES)
+# ---------------------------------------------------------
+
+MARCADOR_DIFF = "--- DIFF ---"
+
+_CABECALHO_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class ErroAplicacaoDiff(ValueError):
+    """O diff devolvido pelo Dev não se aplica à versão anterior do código."""
+
+
+def remover_cercas_markdown(texto):
+    """Remove as cercas ```linguagem ... ``` que o LLM costuma colocar em volta do código."""
+    return re.sub(r"^\s*```[\w+-]*\s*$\n?", "", texto, flags=re.MULTILINE).strip("\n")
+
+
+def gerar_diff(anterior, novo, nome="codigo_gerado"):
+    """Diff unificado (3 linhas de contexto) entre duas versões do código."""
+    return "".join(difflib.unified_diff(
+        anterior.splitlines(keepends=True),
+        novo.splitlines(keepends=True),
+        fromfile=f"a/{nome}",
+        tofile=f"b/{nome}",
+    ))
+
+
+def _ler_hunks(diff):
+    """
+    Hunks do diff ({"inicio", "antigas", "novas"}). As contagens do cabeçalho
+    '@@ -a,b +c,d @@' dizem onde o corpo do hunk termina: só depois dele um
+    par '--- '/'+++ ' é cabeçalho de arquivo (dentro, '--- x' remove a linha
+    '-- x'). Linhas de corpo além da contagem continuam no hunk, porque LLMs
+    erram a contagem.
+    """
+    hunks = []
+    atual = None
+    antigas_restantes = novas_restantes = 0
+    linhas = diff.splitlines()
+    for indice, linha in enumerate(linhas):
+        cabecalho = _CABECALHO_HUNK.match(linha)
+        if cabecalho:
+            atual = {"inicio": int(cabecalho.group(1)), "antigas": [], "novas": []}
+            antigas_restantes = int(cabecalho.group(2) or 1)
+            novas_restantes = int(cabecalho.group(4) or 1)
+            hunks.append(atual)
+            continue
+        if atual is None:
+            continue
+        if (antigas_restantes <= 0 and novas_restantes <= 0 and linha.startswith("--- ")
+                and indice + 1 < len(linhas) and linhas[indice + 1].startswith("+++ ")):
+            atual = None  # cabeçalho do próximo arquivo
+        elif linha.startswith("-"):
+            atual["antigas"].append(linha[1:])
+            antigas_restantes -= 1
+        elif linha.startswith("+"):
+            atual["novas"].append(linha[1:])
+            novas_restantes -= 1
+        elif linha.startswith(" ") or linha == "":
+            contexto = linha[1:]
+            atual["antigas"].append(contexto)
+            atual["novas"].append(contexto)
+            antigas_restantes -= 1
+            novas_restantes -= 1
+        # Linhas como '\ No newline at end of file' são ignoradas
+    return hunks
+
+
+def _localizar(linhas, bloco, sugestao, minimo):
+    """Procura 'bloco' em 'linhas' a partir de 'minimo', começando pela posição sugerida pelo cabeçalho."""
+    if not bloco:
+        return max(minimo, min(sugestao, len(linhas)))
+    candidatos = sorted(range(minimo, len(linhas) - len(bloco) + 1), key=lambda i: abs(i - sugestao))
+    comparar = [l.rstrip() for l in bloco]
+    for i in candidatos:
+        if [l.rstrip() for l in linhas[i:i + len(bloco)]] == comparar:
+            return i
+    return None
+
+
+def aplicar_diff(original, diff):
+    """
+    Reconstrói localmente a nova versão aplicando um diff unificado sobre o
+    'original'. Os números de linha dos cabeçalhos são usados apenas como dica
+    (LLMs erram a contagem); cada hunk é localizado pelo seu conteúdo.
+    """
+    hunks = _ler_hunks(diff)
+    if not hunks:
+        raise ErroAplicacaoDiff("Nenhum hunk '@@ ... @@' encontrado no diff.")
+
+    linhas = original.splitlines()
+    resultado = []
+    posicao = 0
+    for numero, hunk in enumerate(hunks, start=1):
+        inicio = _localizar(linhas, hunk["antigas"], hunk["inicio"] - 1, posicao)
+        if inicio is None:
+            raise ErroAplicacaoDiff(f"O hunk {numero} não corresponde à versão anterior do código.")
+        resultado.extend(linhas[posicao:inicio])
+        resultado.extend(hunk["novas"])
+        posicao = inicio + len(hunk["antigas"])
+    resultado.extend(linhas[posicao:])
+    return "\n".join(resultado) + ("\n" if original.endswith("\n") else "")
+
+
+def _simbolos_de_topo(codigo):
+    """Mapeia nome -> (linha inicial, linha final) dos defs/classes de topo; vazio se não for Python válido."""
+    try:
+        arvore = ast.parse(codigo)
+    except (SyntaxError, ValueError):
+        return {}
+    return {
+        no.name: (no.lineno, no.end_lineno)
+        for no in arvore.body
+        if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    }
+
+
+def resumir_regioes_inalteradas(anterior, novo):
+    """
+    Resumo compacto do que NÃO mudou entre as versões: faixas de linhas iguais
+    e, para Python, os defs/classes de topo cujo código é idêntico.
+    """
+    linhas_anteriores = anterior.splitlines()
+    linhas_novas = novo.splitlines()
+    matcher = difflib.SequenceMatcher(a=linhas_anteriores, b=linhas_novas, autojunk=False)
+    faixas = [
+        f"{j1 + 1}-{j2}" for tag, _, _, j1, j2 in matcher.get_opcodes()
+        if tag == "equal" and j2 - j1 >= 3
+    ]
+
+    simbolos_anteriores = _simbolos_de_topo(anterior)
+    simbolos_novos = _simbolos_de_topo(novo)
+    inalterados = [
+        nome for nome, (ini, fim) in simbolos_novos.items()
+        if nome in simbolos_anteriores
+        and linhas_novas[ini - 1:fim] == linhas_anteriores[simbolos_anteriores[nome][0] - 1:simbolos_anteriores[nome][1]]
+    ]
+
+    partes = [f"Linhas inalteradas (na nova versão): {', '.join(faixas) if faixas else 'nenhuma'}."]
+    if inalterados:
+        partes.append(f"Definições inalteradas (já analisadas): {', '.join(inalterados)}.")
+    return "\n".join(partes)
+
+
+def extrair_diff(resposta):
+    """Separa o diff da resposta do Dev (após MARCADOR_DIFF, com ou sem cercas ```diff)."""
+    if MARCADOR_DIFF in resposta:
+        resposta = resposta.split(MARCADOR_DIFF, 1)[1]
+    # O Dev pode ecoar o contexto mesmo quando instruído a não fazê-lo
+    resposta = resposta.split("--- CONTEXTO ORIGINAL DO CLIENTE ---", 1)[0]
+    return remover_cercas_markdown(resposta)
@@ -0,0 +1,28 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+# ---------------------------------------------------------
+# ESPECIFICAÇÃO COMPACTA DE AGENTES
+# ---------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class EspecAgente:
+    """
+    Especificação imutável de um agente: apenas o que o workflow usa (nome,
+    modelo, descrição e instrução). Os campos têm os mesmos nomes do LlmAgent
+    do google-adk, que deixa de ser importado para definir os agentes.
+
+    'esquema' (opcional) restringe a resposta a um JSON com esse esquema
+    (saída estruturada); fica fora da igualdade e do hash do agente.
+    """
+    name: str
+    model: str
+    description: str
+    instruction: str
+    esquema: Optional[dict] = field(default=None, compare=False, hash=False)
+
+    def para_llm_agent(self):
+        """Converte para um LlmAgent do google-adk (importado só aqui), ex: para os runners do ADK."""
+        from google.adk.agents import LlmAgent
+        return LlmAgent(name=self.name, model=self.model, description=self.description,
+                        instruction=self.instruction)
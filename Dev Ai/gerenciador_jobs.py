@@ -0,0 +1,181 @@
+"""
+Execução do workflow em segundo plano, desacoplada dos reruns do Streamlit.
+
+Cada job roda executar_workflow_de_desenvolvimento em uma thread de um pool
+e publica os eventos em uma fila; a interface drena a fila a cada rerun (ou
+atualização de fragmento) e renderiza o histórico completo do job. O
+gerenciador é global ao processo, então um job continua rodando e pode ser
+reaberto pelo id após recarregar a página. O cancelamento usa um
+TokenCancelamento, que também interrompe a espera pela chamada ao LLM em
+andamento. Cada job recebe um execucao_id (o dos checkpoints) no envio, e no
+máximo um job ativo pode ser dono de um mesmo execucao_id.
+"""
+import itertools
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from agente_workflow import executar_workflow_de_desenvolvimento
+from cancelamento import OperacaoCancelada, TokenCancelamento, usar_token
+
+# Estados de um job
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+CANCELADO = "cancelado"
+FALHOU = "falhou"
+ESTADOS_FINAIS = (CONCLUIDO, CANCELADO, FALHOU)
+
+MAX_JOBS_CONCORRENTES = 2
+MAX_JOBS_GUARDADOS = 50  # jobs terminados mais antigos são descartados além deste limite
+
+
+class Job:
+    """Um workflow submetido: parâmetros, token de cancelamento, fila de eventos e histórico."""
+
+    def __init__(self, parametros):
+        self.id = uuid.uuid4().hex[:12]
+        self.parametros = parametros
+        self.token = TokenCancelamento()
+        self.estado = NA_FILA
+        self.criado_em = time.time()
+        self.iniciado_em = None
+        self.terminado_em = None
+        self.resultado = None  # evento "terminado"
+        self._fila = queue.Queue()
+        self._eventos = []
+        self._trava = threading.Lock()
+
+    @property
+    def terminado(self):
+        return self.estado in ESTADOS_FINAIS
+
+    @property
+    def execucao_id(self):
+        return self.parametros.get("execucao_id")
+
+    def iniciar(self):
+        """Passa de NA_FILA a EXECUTANDO; False se o job foi cancelado antes de começar."""
+        with self._trava:
+            if self.estado != NA_FILA:
+                return False
+            self.estado = EXECUTANDO
+            self.iniciado_em = time.time()
+            return True
+
+    def cancelar(self):
+        """
+        Aciona o token. Um job ainda na fila é encerrado aqui (e não roda mais);
+        um job executando termina sozinho ao notar o token.
+        """
+        with self._trava:
+            if self.terminado:
+                return
+            self.token.cancelar()
+            if self.estado == NA_FILA:
+                self._finalizar(CANCELADO, {"status": "terminado", "sucesso": False, "codigo": "",
+                                            "linguagem": "python",
+                                            "mensagem": "🚫 Operação abortada pelo usuário antes de iniciar."})
+
+    def finalizar(self, estado, evento_final=None):
+        """Registra o estado final de um job em execução (publicando 'evento_final', se houver)."""
+        with self._trava:
+            if self.estado == EXECUTANDO:
+                self._finalizar(estado, evento_final)
+
+    def _finalizar(self, estado, evento_final):
+        self.estado = estado
+        self.terminado_em = time.time()
+        if evento_final is not None:
+            self.resultado = evento_final
+            self._fila.put(evento_final)
+
+    def publicar(self, evento):
+        self._fila.put(evento)
+
+    def drenar(self):
+        """Move os eventos pendentes da fila para o histórico e retorna o histórico completo."""
+        with self._trava:
+            while True:
+                try:
+                    self._eventos.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            return list(self._eventos)
+
+    def duracao(self):
+        if self.iniciado_em is None:
+            return 0.0
+        return (self.terminado_em or time.time()) - self.iniciado_em
+
+
+class GerenciadorJobs:
+    """Pool de threads que executa os jobs, com no máximo 'max_concorrentes' workflows simultâneos."""
+
+    def __init__(self, max_concorrentes=MAX_JOBS_CONCORRENTES):
+        self._pool = ThreadPoolExecutor(max_workers=max_concorrentes, thread_name_prefix="job-workflow")
+        self._jobs = {}
+        self._trava = threading.Lock()
+
+    def submeter(self, **parametros):
+        """
+        Enfileira um workflow (parâmetros de executar_workflow_de_desenvolvimento) e
+        retorna o id do job. Se um job ativo já for dono do mesmo 'execucao_id'
+        (ex: retomada de uma execução que ainda roda), retorna o id desse job em
+        vez de iniciar um segundo.
+        """
+        parametros["execucao_id"] = parametros.get("execucao_id") or uuid.uuid4().hex[:12]
+        with self._trava:
+            for existente in self._jobs.values():
+                if not existente.terminado and existente.execucao_id == parametros["execucao_id"]:
+                    return existente.id
+            job = Job(parametros)
+            self._jobs[job.id] = job
+            self._descartar_antigos()
+        self._pool.submit(self._executar, job)
+        return job.id
+
+    def obter(self, job_id):
+        with self._trava:
+            return self._jobs.get(job_id)
+
+    def listar(self):
+        with self._trava:
+            return sorted(self._jobs.values(), key=lambda job: job.criado_em, reverse=True)
+
+    def execucoes_ativas(self):
+        """execucao_id dos jobs na fila ou executando."""
+        with self._trava:
+            return {job.execucao_id for job in self._jobs.values() if not job.terminado}
+
+    def cancelar(self, job_id):
+        job = self.obter(job_id)
+        if job is not None:
+            job.cancelar()
+
+    def _descartar_antigos(self):
+        terminados = sorted((j for j in self._jobs.values() if j.terminado), key=lambda job: job.criado_em)
+        for job in itertools.islice(terminados, max(0, len(self._jobs) - MAX_JOBS_GUARDADOS)):
+            del self._jobs[job.id]
+
+    def _executar(self, job):
+        if not job.iniciar():
+            return  # cancelado na fila: o evento final já foi publicado
+        try:
+            with usar_token(job.token):
+                for evento in executar_workflow_de_desenvolvimento(**job.parametros, deve_abortar=job.token):
+                    job.publicar(evento)
+                    if evento.get("status") == "terminado":
+                        job.resultado = evento
+            job.finalizar(CANCELADO if job.token.cancelado else CONCLUIDO)
+        except Exception as e:
+            job.finalizar(FALHOU, {"status": "terminado", "sucesso": False, "codigo": "", "linguagem": "python",
+                                   "mensagem": f"❌ Erro Crítico durante o Workflow: {e}"})
+        except OperacaoCancelada:
+            job.finalizar(CANCELADO)
+
+
+# Gerenciador global do processo: sobrevive aos reruns e às recargas da página
+GERENCIADOR_JOBS = GerenciadorJobs()
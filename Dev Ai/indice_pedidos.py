@@ -0,0 +1,207 @@
+import ast
+import functools
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# ---------------------------------------------------------
+# ASSINATURAS MINHASH DO PEDIDO E DO CÓDIGO BASE
+# ---------------------------------------------------------
+
+NUM_PERMUTACOES = 64
+LINHAS_POR_BANDA = 4  # LSH: 16 bandas de 4 linhas (~0.5 de similaridade para 50% de chance de virar candidato)
+_PRIMO = (1 << 61) - 1
+_gerador = random.Random(20240601)  # semente fixa: as assinaturas precisam ser estáveis entre processos
+_PERMUTACOES = [(_gerador.randrange(1, _PRIMO), _gerador.randrange(0, _PRIMO)) for _ in range(NUM_PERMUTACOES)]
+
+CAMINHO_PADRAO = os.getenv(
+    "INDICE_PEDIDOS_CAMINHO",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".indice_pedidos.sqlite3"),
+)
+
+
+def _hash64(texto):
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def normalizar_pedido(texto):
+    """Minúsculas, sem acentos nem pontuação e com espaços colapsados."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", texto))
+
+
+def shingles_pedido(texto, tamanho=3):
+    """Trincas de palavras do pedido normalizado (o texto inteiro se for mais curto)."""
+    palavras = normalizar_pedido(texto).split()
+    if len(palavras) <= tamanho:
+        return {" ".join(palavras)} if palavras else set()
+    return {" ".join(palavras[i:i + tamanho]) for i in range(len(palavras) - tamanho + 1)}
+
+
+def shingles_codigo(codigo):
+    """
+    Impressão da AST: o dump (sem posições) de cada comando, em qualquer
+    profundidade, de modo que mudar uma função altera só parte do conjunto.
+    Para código que não é Python válido, trincas de tokens do texto.
+    """
+    if not codigo.strip():
+        return set()
+    try:
+        arvore = ast.parse(codigo)
+    except (SyntaxError, ValueError):
+        tokens = re.findall(r"\w+|[^\w\s]", codigo)
+        return {" ".join(tokens[i:i + 3]) for i in range(max(1, len(tokens) - 2))}
+    return {ast.dump(no, include_attributes=False) for no in ast.walk(arvore) if isinstance(no, ast.stmt)}
+
+
+def assinatura_minhash(shingles):
+    """Mínimo de cada permutação (a*h + b mod p) sobre os hashes dos shingles; None para conjunto vazio."""
+    if not shingles:
+        return None
+    hashes = [_hash64(shingle) for shingle in shingles]
+    return [min((a * h + b) % _PRIMO for h in hashes) for a, b in _PERMUTACOES]
+
+
+@functools.lru_cache(maxsize=128)
+def _assinatura_do_codigo(codigo):
+    """Assinatura da AST do código, memorizada: o parse de um código base grande custa dezenas de ms."""
+    return assinatura_minhash(shingles_codigo(codigo))
+
+
+def similaridade_estimada(assinatura_a, assinatura_b):
+    """Fração de posições iguais: estimativa da similaridade de Jaccard entre os conjuntos."""
+    if assinatura_a is None or assinatura_b is None:
+        return 1.0 if assinatura_a is assinatura_b else 0.0
+    return sum(1 for x, y in zip(assinatura_a, assinatura_b) if x == y) / NUM_PERMUTACOES
+
+
+def _bandas(assinatura):
+    return [
+        hashlib.blake2b(repr(assinatura[i:i + LINHAS_POR_BANDA]).encode(), digest_size=8).hexdigest()
+        for i in range(0, NUM_PERMUTACOES, LINHAS_POR_BANDA)
+    ]
+
+
+def _hash_texto(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _serializar(assinatura):
+    return "" if assinatura is None else ",".join(map(str, assinatura))
+
+
+def _desserializar(texto):
+    return [int(x) for x in texto.split(",")] if texto else None
+
+# ---------------------------------------------------------
+# ÍNDICE DE EXECUÇÕES APROVADAS
+# ---------------------------------------------------------
+
+class IndicePedidos:
+    """
+    Execuções aprovadas (especificação e código final), indexadas por MinHash
+    do pedido e da AST do código base, em SQLite. A busca usa LSH por bandas
+    do pedido para achar candidatos sem varrer o índice e confirma pela
+    similaridade combinada (pedido e código base com o mesmo peso).
+
+    O registro só calcula a assinatura do pedido (barata) e guarda o código
+    base com seu hash; a assinatura da AST é calculada na busca, apenas para
+    candidatos que ainda podem passar do limiar e cujo código não é idêntico.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS execucoes ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " execucao_id TEXT,"
+            " pedido TEXT NOT NULL,"
+            " assinatura_pedido TEXT NOT NULL,"
+            " codigo_base TEXT NOT NULL,"
+            " hash_codigo TEXT NOT NULL,"
+            " especificacao TEXT NOT NULL,"
+            " codigo_aprovado TEXT NOT NULL,"
+            " iteracoes INTEGER NOT NULL,"
+            " duracao REAL NOT NULL,"
+            " criado_em REAL NOT NULL)"
+        )
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS bandas (banda INTEGER NOT NULL, valor TEXT NOT NULL, execucao INTEGER NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_bandas ON bandas (banda, valor)")
+        self._conexao.commit()
+
+    def registrar(self, pedido, codigo_base, especificacao, codigo_aprovado, iteracoes, duracao, execucao_id=None):
+        assinatura_pedido = assinatura_minhash(shingles_pedido(pedido))
+        if assinatura_pedido is None:
+            return
+        with self._trava:
+            cursor = self._conexao.execute(
+                "INSERT INTO execucoes (execucao_id, pedido, assinatura_pedido, codigo_base, hash_codigo, especificacao,"
+                " codigo_aprovado, iteracoes, duracao, criado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (execucao_id, pedido, _serializar(assinatura_pedido), codigo_base, _hash_texto(codigo_base),
+                 especificacao, codigo_aprovado, iteracoes, duracao, time.time()),
+            )
+            self._conexao.executemany(
+                "INSERT INTO bandas (banda, valor, execucao) VALUES (?, ?, ?)",
+                [(banda, valor, cursor.lastrowid) for banda, valor in enumerate(_bandas(assinatura_pedido))],
+            )
+            self._conexao.commit()
+
+    def buscar(self, pedido, codigo_base, limiar):
+        """
+        Execução indexada mais parecida com similaridade >= 'limiar' (dict com
+        "similaridade" e "tempo_busca" em segundos) ou None.
+        """
+        inicio = time.perf_counter()
+        assinatura_pedido = assinatura_minhash(shingles_pedido(pedido))
+        if assinatura_pedido is None:
+            return None
+        hash_codigo = _hash_texto(codigo_base)
+        condicoes = " OR ".join(["(banda = ? AND valor = ?)"] * (NUM_PERMUTACOES // LINHAS_POR_BANDA))
+        valores = [item for par in enumerate(_bandas(assinatura_pedido)) for item in par]
+        with self._trava:
+            linhas = self._conexao.execute(
+                "SELECT id, execucao_id, pedido, assinatura_pedido, codigo_base, hash_codigo, especificacao, codigo_aprovado,"
+                f" iteracoes, duracao FROM execucoes WHERE id IN (SELECT execucao FROM bandas WHERE {condicoes})",
+                valores,
+            ).fetchall()
+
+        melhor = None
+        for (id_, execucao_id, pedido_salvo, assin_pedido, codigo_salvo, hash_salvo, especificacao, codigo,
+             iteracoes, duracao) in linhas:
+            similaridade_pedido = similaridade_estimada(assinatura_pedido, _desserializar(assin_pedido))
+            if (similaridade_pedido + 1) / 2 < limiar:
+                continue  # nem um código base idêntico levaria ao limiar
+            if hash_salvo == hash_codigo:
+                similaridade_codigo = 1.0
+            else:
+                similaridade_codigo = similaridade_estimada(_assinatura_do_codigo(codigo_base),
+                                                            _assinatura_do_codigo(codigo_salvo))
+            similaridade = (similaridade_pedido + similaridade_codigo) / 2
+            if similaridade >= limiar and (melhor is None or similaridade > melhor["similaridade"]):
+                melhor = {"id": id_, "execucao_id": execucao_id, "pedido": pedido_salvo, "similaridade": similaridade,
+                          "especificacao": especificacao, "codigo_aprovado": codigo, "iteracoes": iteracoes,
+                          "duracao": duracao}
+        if melhor is not None:
+            melhor["tempo_busca"] = time.perf_counter() - inicio
+        return melhor
+
+    def estatisticas(self):
+        with self._trava:
+            entradas = self._conexao.execute("SELECT COUNT(*) FROM execucoes").fetchone()[0]
+        return {"entradas": entradas}
+
+    def limpar(self):
+        with self._trava:
+            self._conexao.execute("DELETE FROM bandas")
+            self._conexao.execute("DELETE FROM execucoes")
+            self._conexao.commit()
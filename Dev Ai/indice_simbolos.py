@@ -0,0 +1,223 @@
+import ast
+import functools
+import os
+import re
+
+# ---------------------------------------------------------
+# ÍNDICE DE SÍMBOLOS DO CÓDIGO BASE (RECORTE PARA O DEV)
+# ---------------------------------------------------------
+
+# Bases menores que isso vão inteiras: o recorte não compensa
+MIN_BYTES_RECORTE = int(os.getenv("MIN_BYTES_RECORTE", 8000))
+# Quantos níveis do grafo de chamadas seguir a partir dos símbolos citados
+PROFUNDIDADE_DEPENDENCIAS = int(os.getenv("PROFUNDIDADE_DEPENDENCIAS", 2))
+# Recortes que mantêm mais que esta fração da base são descartados (vai a base inteira)
+FRACAO_MAXIMA_RECORTE = 0.8
+
+_MARCADOR_OMITIDO = re.compile(r"⟪omitido: ([\w.]+)⟫")
+AVISO_RECORTE = ("# ⟪Corpos marcados com '⟪omitido: ...⟫' foram omitidos: mantenha essas linhas como estão; "
+                 "eles são restaurados localmente.⟫")
+
+
+class ErroRecorte(ValueError):
+    """A resposta do Dev não permite restaurar os trechos omitidos do código base."""
+
+
+class Simbolo:
+    """Função de topo ou método: faixa de linhas, cabeçalho e nomes que o corpo referencia."""
+
+    def __init__(self, no, classe=None):
+        self.nome = no.name
+        self.classe = classe
+        self.id = f"{classe}.{no.name}" if classe else no.name
+        self.inicio = min([d.lineno for d in no.decorator_list] + [no.lineno])
+        self.fim = no.end_lineno
+        self.coluna = no.col_offset
+        self.inicio_corpo = no.body[0].lineno
+        self.indentacao_corpo = no.body[0].col_offset
+        # Corpo na mesma linha do 'def' ou de uma linha só: o stub não economizaria nada
+        self.elidivel = self.inicio_corpo > no.lineno and self.fim > self.inicio_corpo
+        self._no = no
+
+    @functools.cached_property
+    def referencias(self):
+        """Nomes e atributos usados no corpo (calculados só para os símbolos alcançados na seleção)."""
+        nomes = set()
+        for sub in ast.walk(self._no):
+            if isinstance(sub, ast.Name):
+                nomes.add(sub.id)
+            elif isinstance(sub, ast.Attribute):
+                nomes.add(sub.attr)
+        return nomes
+
+
+def _funcoes_e_metodos(corpo):
+    """Defs do módulo e das classes (em qualquer nível de classe), sem descer em corpos de função."""
+    for no in corpo:
+        if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield no
+        elif isinstance(no, ast.ClassDef):
+            yield from _funcoes_e_metodos(no.body)
+
+
+class IndiceSimbolos:
+    """
+    Funções, classes (com seus métodos) e imports de topo de um código base
+    Python, com o grafo de chamadas aproximado por nome (chamar 'f' ou
+    'obj.f' depende de toda função/método chamado 'f'; instanciar uma classe
+    depende do seu __init__).
+
+    'recortar' monta a visão enviada ao Dev: os símbolos citados no texto
+    (spec/feedback) e suas dependências vão inteiros; as demais funções e
+    métodos viram stubs (cabeçalho + '...  # ⟪omitido: id⟫'). Imports,
+    constantes e os cabeçalhos de classe são sempre mantidos.
+    """
+
+    def __init__(self, codigo, arvore):
+        self.codigo = codigo
+        self.linhas = codigo.splitlines()
+        self.simbolos = {}
+        self.classes = {}
+        self.imports = []
+        for no in arvore.body:
+            if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.simbolos[no.name] = Simbolo(no)
+            elif isinstance(no, ast.ClassDef):
+                metodos = [Simbolo(m, no.name) for m in no.body if isinstance(m, (ast.FunctionDef, ast.AsyncFunctionDef))]
+                self.classes[no.name] = [m.id for m in metodos]
+                self.simbolos.update((m.id, m) for m in metodos)
+            elif isinstance(no, (ast.Import, ast.ImportFrom)):
+                self.imports.extend(alias.asname or alias.name for alias in no.names)
+        self._por_nome = {}
+        for simbolo in self.simbolos.values():
+            self._por_nome.setdefault(simbolo.nome, []).append(simbolo.id)
+        for classe, metodos in self.classes.items():
+            if f"{classe}.__init__" in metodos:
+                self._por_nome.setdefault(classe, []).append(f"{classe}.__init__")
+
+    def dependencias(self, id_simbolo):
+        """Símbolos que o corpo de 'id_simbolo' chama ou instancia."""
+        simbolo = self.simbolos[id_simbolo]
+        return {dep for nome in simbolo.referencias for dep in self._por_nome.get(nome, ()) if dep != id_simbolo}
+
+    def selecionar(self, texto, profundidade=PROFUNDIDADE_DEPENDENCIAS):
+        """Ids citados no texto (por nome, 'Classe' inteira ou 'Classe.metodo') mais as dependências."""
+        palavras = set(re.findall(r"[A-Za-z_]\w{2,}", texto))
+        selecionados = set()
+        for palavra in palavras:
+            if palavra in self.classes:
+                selecionados.update(self.classes[palavra])
+            selecionados.update(i for i in self._por_nome.get(palavra, ()) if self.simbolos[i].nome == palavra)
+        fronteira = set(selecionados)
+        for _ in range(profundidade):
+            fronteira = {dep for i in fronteira for dep in self.dependencias(i)} - selecionados
+            selecionados |= fronteira
+        return selecionados
+
+    def recortar(self, texto):
+        """
+        Visão recortada do código base para o texto da chamada (dict com
+        "codigo", "omitidos", "selecionados", "bytes_enviados" e "bytes_base")
+        ou None quando o recorte não reduz o suficiente.
+        """
+        selecionados = self.selecionar(texto)
+        omitidos = sorted(
+            (s for i, s in self.simbolos.items() if i not in selecionados and s.elidivel), key=lambda s: s.inicio
+        )
+        if not omitidos:
+            return None
+        partes = []
+        posicao = 0
+        for simbolo in omitidos:
+            partes.extend(self.linhas[posicao:simbolo.inicio_corpo - 1])
+            partes.append(f"{' ' * simbolo.indentacao_corpo}...  # ⟪omitido: {simbolo.id}⟫")
+            posicao = simbolo.fim
+        partes.extend(self.linhas[posicao:])
+        codigo = AVISO_RECORTE + "\n" + "\n".join(partes) + "\n"
+        bytes_base = len(self.codigo.encode("utf-8"))
+        bytes_enviados = len(codigo.encode("utf-8"))
+        if bytes_enviados > bytes_base * FRACAO_MAXIMA_RECORTE:
+            return None
+        return {"codigo": codigo, "omitidos": [s.id for s in omitidos], "selecionados": sorted(selecionados),
+                "bytes_enviados": bytes_enviados, "bytes_base": bytes_base}
+
+    def trecho_original(self, id_simbolo, coluna):
+        """Linhas originais do símbolo (com decoradores), reindentadas para 'coluna'."""
+        simbolo = self.simbolos[id_simbolo]
+        linhas = self.linhas[simbolo.inicio - 1:simbolo.fim]
+        if coluna == simbolo.coluna:
+            return linhas
+        recuo = " " * coluna
+        return [recuo + l[simbolo.coluna:] if l[:simbolo.coluna].isspace() else l for l in linhas]
+
+
+@functools.lru_cache(maxsize=16)
+def indexar_codigo(codigo, min_bytes=MIN_BYTES_RECORTE):
+    """Índice do código base (montado uma vez por código); None se for pequeno ou não for Python válido."""
+    if len(codigo.encode("utf-8")) < min_bytes:
+        return None
+    try:
+        arvore = ast.parse(codigo)
+    except (SyntaxError, ValueError):
+        return None
+    return IndiceSimbolos(codigo, arvore)
+
+# ---------------------------------------------------------
+# RESTAURAÇÃO LOCAL DOS TRECHOS OMITIDOS
+# ---------------------------------------------------------
+
+def _localizar_codigo(resposta):
+    """(início, fim) do código na resposta do Dev: o 1º bloco ```...``` ou o texto antes do contexto."""
+    cerca = re.search(r"```[\w+-]*\n(.*?)```", resposta, re.DOTALL)
+    if cerca:
+        return cerca.span(1)
+    fim = resposta.find("--- CONTEXTO ORIGINAL DO CLIENTE ---")
+    fim = len(resposta) if fim == -1 else fim
+    inicio = resposta.find("--- CODIGO PYTHON ---")
+    inicio = 0 if inicio == -1 or inicio > fim else inicio + len("--- CODIGO PYTHON ---")
+    return inicio, fim
+
+
+def _restaurar_codigo(codigo, indice, omitidos):
+    linhas = [l for l in codigo.splitlines() if l.strip() != AVISO_RECORTE]
+    codigo = "\n".join(linhas)
+    try:
+        arvore = ast.parse(codigo)
+    except (SyntaxError, ValueError) as e:
+        if _MARCADOR_OMITIDO.search(codigo):
+            raise ErroRecorte(f"Código com trechos omitidos não é Python válido ({e}).")
+        arvore = None
+
+    substituicoes = []
+    restaurados = set()
+    for no in _funcoes_e_metodos(arvore.body) if arvore is not None else ():
+        corpo = no.body
+        if len(corpo) != 1 or not isinstance(corpo[0], ast.Expr) or not isinstance(corpo[0].value, ast.Constant):
+            continue
+        marcador = _MARCADOR_OMITIDO.search(linhas[corpo[0].lineno - 1])
+        if marcador and marcador.group(1) in indice.simbolos:
+            inicio = min([d.lineno for d in no.decorator_list] + [no.lineno])
+            substituicoes.append((inicio, no.end_lineno, indice.trecho_original(marcador.group(1), no.col_offset)))
+            restaurados.add(marcador.group(1))
+    for inicio, fim, trecho in sorted(substituicoes, reverse=True):
+        linhas[inicio - 1:fim] = trecho
+
+    restantes = [m.group(1) for l in linhas for m in _MARCADOR_OMITIDO.finditer(l)]
+    if restantes:
+        raise ErroRecorte(f"Marcadores de trechos omitidos fora de um stub: {', '.join(restantes[:5])}.")
+    # Um omitido sem marcador só é aceito se o Dev o reescreveu (o nome continua definido)
+    definidos = set(re.findall(r"^\s*(?:async\s+)?def\s+(\w+)", codigo, re.MULTILINE))
+    removidos = [i for i in omitidos if i not in restaurados and i.rsplit(".", 1)[-1] not in definidos]
+    if removidos:
+        raise ErroRecorte(f"O Dev removeu trechos omitidos que não pôde ver: {', '.join(removidos[:5])}.")
+    return "\n".join(linhas) + "\n"
+
+
+def restaurar_trechos(resposta, indice, omitidos):
+    """
+    Reconstrói localmente o arquivo completo na resposta do Dev: cada stub
+    '...  # ⟪omitido: id⟫' volta a ser o código original do símbolo. Levanta
+    ErroRecorte se sobrar marcador ou se um trecho omitido sumir da resposta.
+    """
+    inicio, fim = _localizar_codigo(resposta)
+    return resposta[:inicio] + _restaurar_codigo(resposta[inicio:fim], indice, omitidos) + resposta[fim:]
@@ -0,0 +1,226 @@
+import os
+import random
+import threading
+import time
+
+from cancelamento import dormir
+
+# ---------------------------------------------------------
+# ERROS TIPADOS DE LIMITE / INDISPONIBILIDADE DO LLM
+# ---------------------------------------------------------
+
+class ErroLimiteLLM(Exception):
+    """O LLM não pôde ser chamado mesmo após as retentativas (o workflow deve pausar, não seguir)."""
+
+    def __init__(self, mensagem, modelo=None, espera_sugerida=30.0):
+        super().__init__(mensagem)
+        self.modelo = modelo
+        self.espera_sugerida = espera_sugerida
+
+
+class QuotaExcedida(ErroLimiteLLM):
+    """Quota (ResourceExhausted) continua excedida após o backoff."""
+
+
+class ErroTransitorioLLM(ErroLimiteLLM):
+    """Erro transitório (indisponibilidade, timeout) persistiu após o backoff."""
+
+
+class QuotaSimulada(Exception):
+    """
+    Erro de quota injetado por um backend offline (replay), sem depender do
+    SDK: o LimitadorTaxa o trata como os erros de quota do provedor.
+    """
+
+# ---------------------------------------------------------
+# BALDE DE TOKENS (REQUISIÇÕES/MIN E TOKENS/MIN)
+# ---------------------------------------------------------
+
+class BaldeDeTokens:
+    """
+    Balde de tokens com reserva: reservar() desconta a quantidade na hora (o saldo
+    pode ficar negativo) e devolve quanto tempo o chamador deve esperar até que
+    a reserva esteja coberta. Assim chamadas concorrentes formam uma fila justa.
+    """
+
+    def __init__(self, capacidade, por_minuto):
+        self.capacidade = float(capacidade)
+        self.taxa = por_minuto / 60.0
+        self._saldo = float(capacidade)
+        self._atualizado_em = time.monotonic()
+        self._trava = threading.Lock()
+
+    def _reabastecer(self, agora):
+        self._saldo = min(self.capacidade, self._saldo + (agora - self._atualizado_em) * self.taxa)
+        self._atualizado_em = agora
+
+    def reservar(self, quantidade):
+        with self._trava:
+            self._reabastecer(time.monotonic())
+            # Pedidos maiores que a capacidade nunca caberiam: limita à capacidade
+            self._saldo -= min(quantidade, self.capacidade)
+            return max(0.0, -self._saldo / self.taxa)
+
+    def ajustar(self, diferenca):
+        """Corrige a reserva quando o consumo real difere do estimado (positivo = consumiu mais)."""
+        with self._trava:
+            self._saldo -= diferenca
+
+
+class OrcamentoRetentativas:
+    """
+    Orçamento global de retentativas: cada sucesso deposita uma fração de ficha e
+    cada retentativa gasta uma ficha inteira. Sob falha generalizada o orçamento
+    seca e as chamadas falham rápido, evitando tempestades de retentativas.
+    """
+
+    def __init__(self, maximo=10.0, deposito_por_sucesso=0.2):
+        self.maximo = maximo
+        self.deposito_por_sucesso = deposito_por_sucesso
+        self._fichas = maximo
+        self._trava = threading.Lock()
+
+    def registrar_sucesso(self):
+        with self._trava:
+            self._fichas = min(self.maximo, self._fichas + self.deposito_por_sucesso)
+
+    def gastar(self):
+        with self._trava:
+            if self._fichas < 1.0:
+                return False
+            self._fichas -= 1.0
+            return True
+
+# ---------------------------------------------------------
+# LIMITADOR COMPARTILHADO POR MODELO
+# ---------------------------------------------------------
+
+# A limitação proativa (baldes) é opcional: só vale para os limites configurados, pois as quotas
+# dependem do plano da conta. Sem nenhum, as chamadas não esperam e só os erros de quota/transitórios
+# têm backoff. Formato: LIMITES_MODELOS="gemini-2.5-flash=10/250000,gemini-2.5-pro=5/250000"
+# (requisições/min e tokens/min por modelo) e LIMITE_RPM/LIMITE_TPM para os demais modelos.
+def _limites_do_ambiente():
+    limites = {}
+    for item in os.getenv("LIMITES_MODELOS", "").split(","):
+        if item.strip():
+            modelo, valores = item.split("=", 1)
+            rpm, tpm = valores.split("/", 1)
+            limites[modelo.strip()] = (int(rpm) if rpm.strip() else None, int(tpm) if tpm.strip() else None)
+    return limites
+
+
+LIMITES_PADRAO = _limites_do_ambiente()
+LIMITE_GENERICO = (int(os.environ["LIMITE_RPM"]) if os.getenv("LIMITE_RPM") else None,
+                   int(os.environ["LIMITE_TPM"]) if os.getenv("LIMITE_TPM") else None)
+
+
+class LimitadorTaxa:
+    """
+    Limitador compartilhado por todas as chamadas de agentes: um balde de
+    requisições/min e outro de tokens/min por modelo (só para os limites
+    configurados; None = sem limite), backoff exponencial com jitter e
+    orçamento global de retentativas.
+    """
+
+    def __init__(self, limites=None, limite_generico=None, max_tentativas=5, backoff_base=2.0, backoff_maximo=60.0):
+        self.limites = dict(LIMITES_PADRAO if limites is None else limites)
+        self.limite_generico = LIMITE_GENERICO if limite_generico is None else limite_generico
+        self.max_tentativas = max_tentativas
+        self.backoff_base = backoff_base
+        self.backoff_maximo = backoff_maximo
+        self.orcamento = OrcamentoRetentativas()
+        self._baldes = {}
+        self._trava = threading.Lock()
+
+    def _baldes_do_modelo(self, modelo):
+        """(balde de requisições, balde de tokens) do modelo; None no lugar de um limite não configurado."""
+        with self._trava:
+            if modelo not in self._baldes:
+                rpm, tpm = self.limites.get(modelo, self.limite_generico)
+                self._baldes[modelo] = (BaldeDeTokens(rpm, rpm) if rpm else None,
+                                        BaldeDeTokens(tpm, tpm) if tpm else None)
+            return self._baldes[modelo]
+
+    def reservar(self, modelo, tokens_estimados):
+        """Reserva 1 requisição + tokens estimados; retorna o tempo de espera necessário."""
+        balde_requisicoes, balde_tokens = self._baldes_do_modelo(modelo)
+        return max(balde_requisicoes.reservar(1) if balde_requisicoes is not None else 0.0,
+                   balde_tokens.reservar(tokens_estimados) if balde_tokens is not None else 0.0)
+
+    def ajustar_tokens(self, modelo, diferenca):
+        balde_tokens = self._baldes_do_modelo(modelo)[1]
+        if balde_tokens is not None:
+            balde_tokens.ajustar(diferenca)
+
+    def _backoff(self, tentativa):
+        # "Full jitter": espera aleatória entre 0 e o teto exponencial
+        return random.uniform(0, min(self.backoff_maximo, self.backoff_base * (2 ** tentativa)))
+
+    def _proxima_espera(self, erro, tentativa, modelo, erros_quota):
+        """Decide se há nova tentativa; se não houver, levanta o erro tipado correspondente."""
+        tipo_erro = QuotaExcedida if isinstance(erro, erros_quota) else ErroTransitorioLLM
+        if tentativa + 1 >= self.max_tentativas or not self.orcamento.gastar():
+            raise tipo_erro(f"{type(erro).__name__} persistiu após {tentativa + 1} tentativa(s): {erro}",
+                            modelo=modelo, espera_sugerida=self.backoff_maximo) from erro
+        return self._backoff(tentativa)
+
+    def executar(self, modelo, tokens_estimados, chamada, erros_quota=(), erros_transitorios=(), metricas=None):
+        """
+        Executa 'chamada()' respeitando os limites do modelo, com retentativas em
+        erros de quota (incluindo QuotaSimulada)/transitórios. Preenche em 'metricas' o tempo de espera no
+        limitador, o tempo de backoff e o número de retentativas. As esperas são
+        interrompidas (OperacaoCancelada) pelo token de cancelamento atual.
+        """
+        erros_quota = (*erros_quota, QuotaSimulada)
+        espera_limitador = espera_backoff = 0.0
+        tentativa = 0
+        try:
+            while True:
+                espera = self.reservar(modelo, tokens_estimados)
+                if espera:
+                    dormir(espera)
+                    espera_limitador += espera
+                try:
+                    resultado = chamada()
+                    self.orcamento.registrar_sucesso()
+                    return resultado
+                except erros_quota + erros_transitorios as e:
+                    espera = self._proxima_espera(e, tentativa, modelo, erros_quota)
+                    dormir(espera)
+                    espera_backoff += espera
+                    tentativa += 1
+        finally:
+            if metricas is not None:
+                metricas.update({"espera_limitador": espera_limitador, "espera_backoff": espera_backoff,
+                                 "retentativas": tentativa})
+
+    async def executar_async(self, modelo, tokens_estimados, chamada, erros_quota=(), erros_transitorios=(),
+                             metricas=None):
+        """Versão assíncrona de executar(): 'chamada()' retorna um awaitable e as esperas usam asyncio.sleep."""
+        import asyncio  # import tardio: o caminho síncrono não paga o custo do asyncio
+        erros_quota = (*erros_quota, QuotaSimulada)
+        espera_limitador = espera_backoff = 0.0
+        tentativa = 0
+        try:
+            while True:
+                espera = self.reservar(modelo, tokens_estimados)
+                if espera:
+                    await asyncio.sleep(espera)
+                    espera_limitador += espera
+                try:
+                    resultado = await chamada()
+                    self.orcamento.registrar_sucesso()
+                    return resultado
+                except erros_quota + erros_transitorios as e:
+                    espera = self._proxima_espera(e, tentativa, modelo, erros_quota)
+                    await asyncio.sleep(espera)
+                    espera_backoff += espera
+                    tentativa += 1
+        finally:
+            if metricas is not None:
+                metricas.update({"espera_limitador": espera_limitador, "espera_backoff": espera_backoff,
+                                 "retentativas": tentativa})
+
+
+# Limitador global compartilhado por todas as chamadas do processo
+LIMITADOR = LimitadorTaxa()
@@ -0,0 +1,182 @@
+"""
+Execução headless em lote: passa muitos pedidos pelo workflow de
+desenvolvimento com um limite global de concorrência.
+
+Entrada: um arquivo JSONL (um objeto por linha com "pedido" e, opcionalmente,
+"id" e "codigo_base") ou um diretório de arquivos .txt/.md (um pedido por
+arquivo, como o Pedido.txt). Quando "codigo_base" não é informado, ele é
+extraído do texto pelos marcadores 'CÓDIGO BASE:'/'CÓDIGO DADO:'.
+
+Saída: um JSONL com um resultado por pedido, gravado assim que cada job termina.
+
+Uso: python lote_pedidos.py pedidos.jsonl --saida resultados.jsonl --concorrencia 8
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from agente_workflow import executar_workflow_de_desenvolvimento, extrair_codigo_base, total_chamadas_llm
+from cancelamento import TokenCancelamento, usar_token
+from opcoes_workflow import OpcoesWorkflow
+
+# ---------------------------------------------------------
+# LEITURA DOS PEDIDOS
+# ---------------------------------------------------------
+
+def _montar_job(identificador, texto, codigo_base=None):
+    if codigo_base is None:
+        pedido_textual, codigo_base = extrair_codigo_base(texto)
+    else:
+        pedido_textual = texto
+    return {"id": str(identificador), "pedido": pedido_textual, "codigo_base": codigo_base}
+
+
+def carregar_pedidos(caminho):
+    """Lê os pedidos de um arquivo JSONL ou de um diretório de arquivos de texto."""
+    if os.path.isdir(caminho):
+        nomes = sorted(n for n in os.listdir(caminho) if n.lower().endswith((".txt", ".md")))
+        jobs = []
+        for nome in nomes:
+            with open(os.path.join(caminho, nome), encoding="utf-8") as arquivo:
+                jobs.append(_montar_job(os.path.splitext(nome)[0], arquivo.read()))
+        return jobs
+
+    jobs = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for numero, linha in enumerate(arquivo, start=1):
+            if not linha.strip():
+                continue
+            registro = json.loads(linha)
+            jobs.append(_montar_job(registro.get("id", numero), registro["pedido"], registro.get("codigo_base")))
+    return jobs
+
+# ---------------------------------------------------------
+# EXECUÇÃO DE UM JOB
+# ---------------------------------------------------------
+
+def executar_job(job, max_iteracoes, opcoes, cancelado):
+    """Consome o gerador do workflow até o evento 'terminado' e resume o resultado do job."""
+    inicio = time.perf_counter()
+    iteracoes = 0
+    chamadas_llm = 0
+    final = None
+    try:
+        # O token também interrompe as chamadas ao LLM em andamento ao cancelar o lote
+        with usar_token(cancelado):
+            for evento in executar_workflow_de_desenvolvimento(
+                pedido_do_cliente=job["pedido"],
+                codigo_base=job["codigo_base"],
+                max_iteracoes=max_iteracoes,
+                opcoes=OpcoesWorkflow(**{"stream_dev": False, **opcoes}),
+                deve_abortar=cancelado,
+            ):
+                iteracoes = evento.get("iteracao", iteracoes)
+                metricas = evento.get("metricas")
+                if metricas and not metricas.get("cache"):
+                    chamadas_llm += 1
+                if evento.get("status") == "terminado":
+                    final = evento
+    except Exception as e:
+        final = {"sucesso": False, "mensagem": f"Erro Crítico durante o Workflow: {e}"}
+
+    final = final or {"sucesso": False, "mensagem": "Workflow encerrado sem evento final."}
+    telemetria = final.get("telemetria")
+    if telemetria is not None:
+        telemetria.execucao_id = job["id"]
+    return {
+        "id": job["id"],
+        "sucesso": bool(final.get("sucesso")),
+        "codigo": final.get("codigo"),
+        "linguagem": final.get("linguagem"),
+        "mensagem": final.get("mensagem"),
+        "iteracoes": iteracoes,
+        "chamadas_llm": chamadas_llm,
+        "duracao": round(time.perf_counter() - inicio, 3),
+        "custo": round(telemetria.total()["custo"], 6) if telemetria is not None else 0.0,
+        "telemetria": telemetria,
+    }
+
+# ---------------------------------------------------------
+# EXECUÇÃO DO LOTE
+# ---------------------------------------------------------
+
+def executar_lote_de_pedidos(jobs, caminho_saida, concorrencia=4, max_iteracoes=10, opcoes=None,
+                             caminho_telemetria=None):
+    """
+    Executa os jobs com no máximo 'concorrencia' workflows simultâneos, gravando
+    cada resultado no JSONL de saída assim que o job termina. Retorna o resumo
+    de vazão do lote. Com 'caminho_telemetria', acrescenta a esse arquivo uma
+    linha JSON por chamada de agente (com o id do job em "execucao").
+    """
+    opcoes = opcoes or {}
+    cancelado = TokenCancelamento()
+    chamadas_antes = total_chamadas_llm()
+    inicio = time.perf_counter()
+    sucessos = 0
+    custo = 0.0
+
+    with open(caminho_saida, "a", encoding="utf-8") as saida, ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        futuros = {pool.submit(executar_job, job, max_iteracoes, opcoes, cancelado): job for job in jobs}
+        try:
+            for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+                resultado = futuro.result()
+                telemetria = resultado.pop("telemetria")
+                if caminho_telemetria and telemetria is not None:
+                    with open(caminho_telemetria, "a", encoding="utf-8") as arquivo_telemetria:
+                        arquivo_telemetria.write(telemetria.exportar_jsonl())
+                sucessos += resultado["sucesso"]
+                custo += resultado["custo"]
+                saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+                saida.flush()
+                print(f"[{concluidos}/{len(jobs)}] {resultado['id']}: "
+                      f"{'✅' if resultado['sucesso'] else '❌'} {resultado['iteracoes']} iteração(ões) em {resultado['duracao']:.1f}s")
+        except KeyboardInterrupt:
+            # Jobs em andamento são interrompidos (inclusive a chamada ao LLM em curso); os pendentes são cancelados
+            print("\n🚫 Interrompido: aguardando os jobs em andamento encerrarem...")
+            cancelado.cancelar()
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+
+    duracao = time.perf_counter() - inicio
+    chamadas = total_chamadas_llm() - chamadas_antes
+    minutos = max(duracao / 60, 1e-9)
+    return {
+        "jobs": len(jobs),
+        "sucessos": sucessos,
+        "duracao": duracao,
+        "jobs_por_minuto": len(jobs) / minutos,
+        "chamadas_llm": chamadas,
+        "chamadas_llm_por_minuto": chamadas / minutos,
+        "custo": custo,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entrada", help="Arquivo JSONL ou diretório com pedidos .txt/.md")
+    parser.add_argument("--saida", default="resultados_lote.jsonl", help="JSONL de saída (acrescenta ao final)")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Máximo de workflows simultâneos")
+    parser.add_argument("--max-iteracoes", type=int, default=10)
+    parser.add_argument("--telemetria", help="JSONL de telemetria por chamada de agente (acrescenta ao final)")
+    parser.add_argument("--opcoes", default="{}",
+                        help='Parâmetros extras do workflow em JSON, ex: \'{"modo_incremental": true}\'')
+    args = parser.parse_args()
+
+    jobs = carregar_pedidos(args.entrada)
+    print(f"--- Lote iniciado: {len(jobs)} pedido(s), concorrência {args.concorrencia} ---")
+    resumo = executar_lote_de_pedidos(
+        jobs, args.saida, concorrencia=args.concorrencia, max_iteracoes=args.max_iteracoes,
+        opcoes=json.loads(args.opcoes), caminho_telemetria=args.telemetria,
+    )
+    print(f"\n==============================================")
+    print(f"{resumo['sucessos']}/{resumo['jobs']} aprovados em {resumo['duracao']:.1f}s")
+    print(f"Vazão: {resumo['jobs_por_minuto']:.2f} jobs/min | {resumo['chamadas_llm_por_minuto']:.1f} chamadas LLM/min "
+          f"({resumo['chamadas_llm']} chamadas) | custo estimado US$ {resumo['custo']:.4f}")
+    print(f"Resultados em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
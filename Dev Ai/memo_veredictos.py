@@ -0,0 +1,95 @@
+import ast
+import hashlib
+import threading
+
+# ---------------------------------------------------------
+# IMPRESSÃO DIGITAL DO CÓDIGO E MEMO DE VEREDITOS
+# ---------------------------------------------------------
+
+# Pseudo-símbolo do código de topo que não está em nenhum def/classe
+SIMBOLO_MODULO = "<modulo>"
+
+
+def _hash(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def impressao_texto(codigo):
+    """
+    Hash do texto do código normalizado só nas quebras de linha e nas linhas
+    em branco das pontas. Mudanças de formatação e de comentários contam: o
+    Revisor avalia o estilo, e uma versão que só corrige a formatação precisa
+    de um veredito novo (e não é uma reescrita nula nem um ciclo).
+    """
+    return _hash(codigo.replace("\r\n", "\n").replace("\r", "\n").strip("\n"))
+
+
+def simbolos_do_codigo(codigo):
+    """Símbolos do código (ver impressoes_por_simbolo); None se não for Python válido (símbolos desconhecidos)."""
+    try:
+        ast.parse(codigo)
+    except (SyntaxError, ValueError):
+        return None
+    return set(impressoes_por_simbolo(codigo))
+
+
+def impressoes_por_simbolo(codigo):
+    """
+    Hash da AST de cada def/classe de topo e, sob SIMBOLO_MODULO, das demais
+    instruções de topo (imports, constantes, script). Vazio se o código não
+    for Python válido.
+    """
+    try:
+        arvore = ast.parse(codigo)
+    except (SyntaxError, ValueError):
+        return {}
+    definicoes = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    impressoes = {no.name: _hash(ast.dump(no, include_attributes=False))
+                  for no in arvore.body if isinstance(no, definicoes)}
+    resto = [ast.dump(no, include_attributes=False) for no in arvore.body if not isinstance(no, definicoes)]
+    if resto:
+        impressoes[SIMBOLO_MODULO] = _hash("\n".join(resto))
+    return impressoes
+
+
+def simbolos_alterados(anterior, novo):
+    """Símbolos (defs/classes de topo e SIMBOLO_MODULO) criados, removidos ou com AST diferente entre as versões."""
+    antes = impressoes_por_simbolo(anterior)
+    depois = impressoes_por_simbolo(novo)
+    return sorted(nome for nome in set(antes) | set(depois) if antes.get(nome) != depois.get(nome))
+
+
+class MemoVeredictos:
+    """
+    Guarda, por verificador, o relatório dado a cada impressão de código
+    (impressao_texto) e o último veredito emitido, com os símbolos que ele
+    revisou (para saber se a aprovação da versão anterior pode ser herdada).
+    """
+
+    def __init__(self):
+        self._relatorios = {}
+        self._ultimo = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, agente_nome, impressao, relatorio, simbolos_revisados=None):
+        """'simbolos_revisados': defs/classes que o verificador analisou (None se desconhecidos)."""
+        with self._trava:
+            self._relatorios[(agente_nome, impressao)] = relatorio
+            self._ultimo[agente_nome] = (impressao, relatorio,
+                                         None if simbolos_revisados is None else frozenset(simbolos_revisados))
+
+    def obter(self, agente_nome, impressao):
+        """Relatório já emitido por este verificador para o mesmo código (ou None)."""
+        return self._relatorios.get((agente_nome, impressao))
+
+    def aprovou_ultima_versao(self, agente_nome, alterados):
+        """
+        Se a aprovação da versão anterior vale para a atual: o verificador
+        aprovou a última versão que viu e nenhum dos símbolos 'alterados'
+        desde então está entre os que ele revisou. Com símbolos desconhecidos
+        (código não Python ou inválido), nunca herda.
+        """
+        ultimo = self._ultimo.get(agente_nome)
+        if ultimo is None or 'STATUS: APROVADO' not in ultimo[1] or ultimo[2] is None or alterados is None:
+            return False
+        return not ultimo[2] & set(alterados)
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from deteccao_convergencia import ACOES_CONVERGENCIA
+
+# ---------------------------------------------------------
+# OPÇÕES DO WORKFLOW DE DESENVOLVIMENTO
+# ---------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class OpcoesWorkflow:
+    """
+    Funcionalidades opcionais de executar_workflow_de_desenvolvimento. Os
+    campos têm os nomes dos argumentos que o workflow também aceita
+    diretamente e dos parâmetros gravados nos checkpoints.
+
+    verificacao_concorrente: os três verificadores rodam ao mesmo tempo; os
+    eventos "analise" chegam na ordem em que cada um termina, mas os relatórios
+    repassados ao gerente mantêm a ordem de AGENTES_VERIFICADORES.
+
+    stream_dev: o código do Dev é gerado em streaming e cada trecho chega como
+    um evento "dev_parcial". Os eventos de cada chamada de agente trazem
+    "metricas" (duração, tempo até o primeiro token e tokens/s).
+
+    modo_incremental: a partir da 2ª iteração o Dev devolve apenas um diff
+    unificado contra a versão anterior (reconstruída e validada localmente), os
+    verificadores recebem esse diff mais um resumo das regiões inalteradas e o
+    gerente deixa de receber o contexto original (mantido pelo workflow). Os
+    eventos de fim de iteração trazem "bytes_prompt_iteracao" para comparação.
+
+    precheck_local: em código Python, a sintaxe e o PEP8 são verificados
+    localmente antes dos verificadores: erros de sintaxe voltam direto ao Dev,
+    sem chamar verificadores nem gerente, e o relatório PEP8 é anexado à
+    entrada do Revisor. Os eventos "terminado" trazem as estatísticas em "precheck".
+
+    execucao_sandbox: em código Python, o código é de fato executado em
+    subprocessos isolados, junto com os casos de teste propostos pelo Beta Tester
+    na iteração anterior, e os resultados alimentam a entrada do Beta Tester.
+
+    gerente_por_regras: a decisão do gerente é tomada localmente
+    (decidir_lancamento): aprovação unânime termina sem chamar o LLM e, na
+    reprovação, a lista de tarefas é montada a partir dos relatórios. Com
+    'resumo_gerente_llm' o gerente LLM ainda é chamado nas reprovações, apenas
+    para resumir o feedback. Os eventos "terminado" trazem "gerente" com as
+    chamadas evitadas.
+
+    reverificacao_seletiva: os vereditos ficam memorizados pelo hash do texto
+    normalizado do código (impressao_texto): um verificador não é chamado de
+    novo para o mesmo código, e quem aprovou a versão anterior tem a aprovação
+    herdada se nenhum símbolo alterado desde então estiver entre os que ele
+    revisou. Antes do TERMINATE, um passe final chama ao vivo os verificadores
+    com aprovação herdada. Os eventos "analise" trazem "origem" ("ao_vivo",
+    "memo" ou "passe_final") e os eventos "terminado" trazem "memo".
+
+    reaproveitar_similares: um pedido com similaridade >= LIMIAR_SIMILARIDADE
+    a uma execução aprovada do índice de pedidos reaproveita a especificação
+    dela (sem chamar o engenheiro) e o Dev parte do código aprovado. O evento
+    "similar_encontrado" traz a similaridade e o tempo de busca, e os eventos
+    "terminado" trazem "similar" com o tempo economizado em relação àquela
+    execução.
+
+    cache_contexto: a execução tem um CacheContexto. No backend real o prefixo
+    estável dos prompts (instrução + código base) vira um conteúdo cacheado no
+    provedor e só o sufixo é enviado; nos demais o cache é simulado. As
+    métricas de cada chamada separam "tokens_prompt_cache" de
+    "tokens_prompt_sem_cache" (o cache implícito do provedor também é contado)
+    e os eventos "terminado" trazem "cache_contexto".
+
+    recorte_codigo_base: com um código base Python grande, a base é indexada uma
+    vez por símbolos (indice_simbolos) e cada chamada do Dev recebe só as
+    funções/métodos citados na spec/feedback e suas dependências; os demais
+    vão como stubs, restaurados localmente na resposta para reconstruir o
+    arquivo completo. Se a restauração falhar, o Dev é chamado de novo com a
+    base inteira. O evento "dev_completo" traz "recorte" (bytes enviados x
+    base inteira) e os eventos "terminado" trazem o acumulado em "recorte".
+
+    candidatos_dev: com mais de 1 (modo especulativo), o Dev gera esse número de
+    candidatos em paralelo, cada um com uma variante de VARIANTES_CANDIDATOS
+    (temperatura e ênfase), sem streaming. Uma triagem local
+    (triagem_candidatos: compila, tamanho, avisos PEP8, cobertura dos termos
+    da spec) ordena os candidatos e só o melhor segue para os verificadores.
+    Cada candidato gera um evento "candidato_dev" (com suas métricas), ou
+    "candidato_limitado" se ficou sem resposta pelo limite do LLM; o
+    "dev_completo" traz "candidatos" (ranking e escolhido) e os eventos
+    "terminado" trazem as estatísticas em "candidatos". No modo incremental,
+    as iterações com diff continuam com um único candidato.
+
+    acao_convergencia: com "parar", "escalar" ou "reformular", um
+    DetectorConvergencia acompanha as iterações: código idêntico ao da
+    iteração anterior (reescrita nula) ou a uma versão já reprovada (ciclo),
+    feedback repetido e aprovações estagnadas. Cada detecção gera um evento
+    "convergencia" e dispara a ação: "parar" encerra com a melhor versão até
+    ali (mais aprovações); "escalar" troca o Dev por MODELO_DEV_ESCALADO;
+    "reformular" acrescenta INSTRUCAO_ANTICICLO à entrada do Dev. As duas
+    últimas valem uma vez: uma nova detecção encerra a execução. Os eventos
+    "terminado" trazem "convergencia" (detecções, ações aplicadas e
+    iterações economizadas em relação a max_iteracoes).
+
+    saida_estruturada: os agentes de AGENTES_JSON respondem em JSON restrito a
+    um esquema (código, veredito em enum, lista de tarefas) e o contexto
+    original do cliente fica com o workflow, que o repassa ao Dev em vez de
+    pedir que cada agente o ecoe. Os verificadores são lidos em streaming: o
+    veredito é conhecido assim que o campo chega e uma aprovação encerra a
+    leitura. Os eventos "terminado" trazem "saida_estruturada" (tokens de
+    saída economizados por iteração, estimados pelo tamanho do contexto que
+    seria ecoado; vereditos antecipados; respostas fora do esquema).
+
+    projeto_multiarquivo: o resultado é um Projeto de vários arquivos (cada um
+    após um MARCADOR_ARQUIVO, com o hash do conteúdo), iniciado com os
+    arquivos do código base. O feedback é mapeado para os arquivos que cita e
+    o Dev recebe só esses (mais as interfaces dos demais) para regenerar; os
+    verificadores analisam os arquivos alterados e as interfaces dos outros. O
+    "codigo" dos eventos é o texto do projeto inteiro; "dev_completo" e os
+    eventos "terminado" trazem "projeto" (hashes e bytes regenerados por iteração).
+
+    roteamento_adaptativo: cada papel (agente) começa no seu modelo e só passa
+    a um nível mais barato de NIVEIS_MODELO quando o histórico da política de
+    roteamento (taxa de sucesso e latência registradas por papel e modelo)
+    mostra que o nível atual funcionou para ele. Durante a execução o papel
+    sobe um nível após LIMITE_FALHAS_ROTEAMENTO falhas seguidas: reprovações
+    ou código que não compila para o Dev, respostas de erro ou fora do formato
+    para os demais. Cada subida gera um evento "roteamento"; com
+    acao_convergencia "escalar", o Dev sobe um nível em vez de ir para
+    MODELO_DEV_ESCALADO. Ao encerrar, o desempenho da execução entra no
+    histórico e os eventos "terminado" trazem "roteamento" (modelos iniciais
+    e finais, subidas e latência/custo por papel e modelo).
+    """
+    verificacao_concorrente: bool = True
+    stream_dev: bool = True
+    modo_incremental: bool = False
+    precheck_local: bool = True
+    execucao_sandbox: bool = False
+    gerente_por_regras: bool = True
+    resumo_gerente_llm: bool = False
+    reverificacao_seletiva: bool = False
+    reaproveitar_similares: bool = False
+    cache_contexto: bool = False
+    recorte_codigo_base: bool = False
+    candidatos_dev: int = 1
+    acao_convergencia: Optional[str] = None
+    saida_estruturada: bool = False
+    projeto_multiarquivo: bool = False
+    roteamento_adaptativo: bool = False
+
+    def __post_init__(self):
+        if self.acao_convergencia is not None and self.acao_convergencia not in ACOES_CONVERGENCIA:
+            raise ValueError(f"acao_convergencia deve ser uma de {ACOES_CONVERGENCIA} ou None: "
+                             f"{self.acao_convergencia!r}")
@@ -0,0 +1,116 @@
+import re
+
+# pycodestyle é opcional: sem ele, usamos um subconjunto mínimo das regras PEP8
+try:
+    import pycodestyle
+except ImportError:
+    pycodestyle = None
+
+# ---------------------------------------------------------
+# PRÉ-VERIFICAÇÃO ESTÁTICA LOCAL (SINTAXE + PEP8)
+# ---------------------------------------------------------
+
+MAX_COMPRIMENTO_LINHA = 79
+MAX_AVISOS_ESTILO = 30
+
+
+def verificar_sintaxe(codigo):
+    """
+    Compila o código (sem executar) e retorna a lista de erros de sintaxe. O
+    compile() também acusa erros que o ast.parse aceita (ex: 'return' fora de função).
+    """
+    try:
+        compile(codigo, "<codigo_gerado>", "exec")
+        return []
+    except SyntaxError as e:
+        return [{
+            "linha": e.lineno,
+            "coluna": e.offset,
+            "mensagem": e.msg,
+            "trecho": (e.text or "").rstrip(),
+        }]
+    except ValueError as e:  # ex: caracteres nulos no código
+        return [{"linha": None, "coluna": None, "mensagem": str(e), "trecho": ""}]
+
+
+def _estilo_pycodestyle(codigo):
+    linhas = codigo.splitlines(keepends=True)
+    avisos = []
+
+    class _Coletor(pycodestyle.BaseReport):
+        def error(self, line_number, offset, text, check):
+            codigo_regra = super().error(line_number, offset, text, check)
+            if codigo_regra:
+                avisos.append({"linha": line_number, "codigo": text[:4], "mensagem": text[5:]})
+            return codigo_regra
+
+    estilo = pycodestyle.StyleGuide(quiet=True, max_line_length=MAX_COMPRIMENTO_LINHA)
+    verificador = pycodestyle.Checker(lines=linhas, options=estilo.options, report=_Coletor(estilo.options))
+    verificador.check_all()
+    return avisos
+
+
+def _estilo_minimo(codigo):
+    avisos = []
+    linhas = codigo.split("\n")
+    for numero, linha in enumerate(linhas, start=1):
+        if len(linha) > MAX_COMPRIMENTO_LINHA:
+            avisos.append({"linha": numero, "codigo": "E501",
+                           "mensagem": f"line too long ({len(linha)} > {MAX_COMPRIMENTO_LINHA} characters)"})
+        if linha != linha.rstrip():
+            avisos.append({"linha": numero, "codigo": "W291" if linha.strip() else "W293",
+                           "mensagem": "trailing whitespace"})
+        if re.match(r"^ *\t", linha):
+            avisos.append({"linha": numero, "codigo": "W191", "mensagem": "indentation contains tabs"})
+    if codigo.endswith("\n\n"):
+        avisos.append({"linha": len(linhas) - 1, "codigo": "W391", "mensagem": "blank line at end of file"})
+    return avisos
+
+
+def verificar_estilo(codigo):
+    """Avisos PEP8 (pycodestyle quando instalado, senão um subconjunto mínimo)."""
+    avisos = _estilo_pycodestyle(codigo) if pycodestyle is not None else _estilo_minimo(codigo)
+    return avisos[:MAX_AVISOS_ESTILO]
+
+
+def executar_precheck(codigo):
+    """Roda as verificações locais; o estilo só é avaliado se a sintaxe estiver correta."""
+    erros = verificar_sintaxe(codigo)
+    return {
+        "erros_sintaxe": erros,
+        "avisos_estilo": [] if erros else verificar_estilo(codigo),
+    }
+
+
+def executar_precheck_projeto(arquivos):
+    """executar_precheck em cada arquivo .py do projeto; cada erro/aviso traz o seu "arquivo"."""
+    resultado = {"erros_sintaxe": [], "avisos_estilo": []}
+    for caminho, conteudo in arquivos.items():
+        if not caminho.endswith(".py"):
+            continue
+        do_arquivo = executar_precheck(conteudo)
+        for chave in resultado:
+            resultado[chave].extend({"arquivo": caminho, **item} for item in do_arquivo[chave])
+    resultado["avisos_estilo"] = resultado["avisos_estilo"][:MAX_AVISOS_ESTILO]
+    return resultado
+
+
+def _local(item):
+    return f"{item['arquivo']}, linha" if item.get("arquivo") else "Linha"
+
+
+def formatar_erros_sintaxe(erros):
+    linhas = ["ERROS DE SINTAXE ENCONTRADOS NA VERIFICAÇÃO LOCAL (corrija TODOS):"]
+    for erro in erros:
+        linhas.append(f"- {_local(erro)} {erro['linha']}, coluna {erro['coluna']}: {erro['mensagem']}")
+        if erro["trecho"]:
+            linhas.append(f"    {erro['trecho']}")
+    return "\n".join(linhas)
+
+
+def formatar_relatorio_estilo(avisos):
+    if not avisos:
+        return "Sintaxe validada localmente (compile OK). Nenhum aviso PEP8."
+    linhas = [f"Sintaxe validada localmente (compile OK). Avisos PEP8 ({len(avisos)}):"]
+    linhas.extend(f"- {_local(a)} {a['linha']}: {a['codigo']} {a['mensagem']}" for a in avisos)
+    return "\n".join(linhas)
@@ -0,0 +1,193 @@
+import ast
+import hashlib
+import io
+import posixpath
+import re
+import zipfile
+
+from diff_incremental import remover_cercas_markdown
+
+# ---------------------------------------------------------
+# PROJETO COM VÁRIOS ARQUIVOS (SAÍDA MULTIARQUIVO DO DEV)
+# ---------------------------------------------------------
+
+# Cabeçalho de cada arquivo no texto do projeto. É um comentário Python: o projeto concatenado
+# continua compilável, e a triagem, o memo e o recorte funcionam sobre ele sem mudanças.
+MARCADOR_ARQUIVO = "# --- ARQUIVO: {} ---"
+_LINHA_ARQUIVO = re.compile(r"^[ \t]*(?:#|//)?[ \t]*-{3}[ \t]*ARQUIVO:[ \t]*(.+?)[ \t]*-{3}[ \t]*$", re.MULTILINE)
+# Convenção dos pedidos: um código base colado com '#arquivo nome.py' na primeira linha
+_COMENTARIO_ARQUIVO = re.compile(r"^\s*#\s*arquivo:?\s+([\w./-]+\.\w+)", re.IGNORECASE)
+# Nome usado quando o código não diz a que arquivo pertence
+ARQUIVO_PADRAO = "main.py"
+
+
+def normalizar_caminho(caminho):
+    """Caminho relativo, com '/', sem '..' (não escapa do projeto no zip); None se inválido."""
+    caminho = posixpath.normpath(caminho.strip().strip("`'\"").replace("\\", "/")).lstrip("/")
+    if not caminho or caminho == "." or caminho.split("/")[0] == "..":
+        return None
+    return caminho
+
+
+def hash_conteudo(conteudo):
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:16]
+
+
+def separar_arquivos(texto):
+    """
+    {caminho: conteúdo} do texto de um projeto (arquivos após cada
+    MARCADOR_ARQUIVO, com ou sem cercas markdown). Sem marcadores, devolve {}.
+    """
+    marcadores = list(_LINHA_ARQUIVO.finditer(texto))
+    arquivos = {}
+    for atual, seguinte in zip(marcadores, marcadores[1:] + [None]):
+        caminho = normalizar_caminho(atual.group(1))
+        if caminho is None:
+            continue
+        conteudo = texto[atual.end():seguinte.start() if seguinte else len(texto)]
+        conteudo = remover_cercas_markdown(conteudo).strip("\n")
+        arquivos[caminho] = conteudo + "\n" if conteudo else ""
+    return arquivos
+
+
+def resumo_interface(caminho, conteudo):
+    """
+    Interface de um arquivo para quem não precisa do conteúdo: para Python,
+    imports, nomes de topo e assinaturas de funções/classes/métodos (com a 1ª
+    linha da docstring); para os demais, o tamanho e as primeiras linhas.
+    """
+    try:
+        arvore = ast.parse(conteudo)
+    except (SyntaxError, ValueError):
+        arvore = None
+    if arvore is None or not caminho.endswith(".py"):
+        linhas = [l for l in conteudo.splitlines() if l.strip()]
+        return "\n".join([f"# {caminho} ({len(conteudo.splitlines())} linhas)"] + linhas[:5])
+
+    def assinatura(no, recuo=""):
+        prefixo = "async def" if isinstance(no, ast.AsyncFunctionDef) else "def"
+        retorno = f" -> {ast.unparse(no.returns)}" if no.returns else ""
+        doc = ast.get_docstring(no)
+        doc = f"  # {doc.splitlines()[0]}" if doc else ""
+        return f"{recuo}{prefixo} {no.name}({ast.unparse(no.args)}){retorno}: ...{doc}"
+
+    partes = [f"# {caminho}"]
+    for no in arvore.body:
+        if isinstance(no, (ast.Import, ast.ImportFrom)):
+            partes.append(ast.unparse(no))
+        elif isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            partes.append(assinatura(no))
+        elif isinstance(no, ast.ClassDef):
+            bases = f"({', '.join(ast.unparse(b) for b in no.bases)})" if no.bases else ""
+            partes.append(f"class {no.name}{bases}:")
+            metodos = [m for m in no.body if isinstance(m, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            partes.extend(assinatura(m, "    ") for m in metodos if not m.name.startswith("_") or m.name == "__init__")
+        elif isinstance(no, (ast.Assign, ast.AnnAssign)):
+            alvos = no.targets if isinstance(no, ast.Assign) else [no.target]
+            nomes = [a.id for a in alvos if isinstance(a, ast.Name) and not a.id.startswith("_")]
+            partes.extend(f"{nome} = ..." for nome in nomes)
+    return "\n".join(partes)
+
+
+def _nomes_definidos(conteudo):
+    """Funções, classes e métodos definidos no arquivo (vazio se não for Python válido)."""
+    try:
+        arvore = ast.parse(conteudo)
+    except (SyntaxError, ValueError):
+        return set()
+    return {no.name for no in ast.walk(arvore) if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+            and not no.name.startswith("__")}
+
+
+class Projeto:
+    """
+    Arquivos do projeto em geração ({caminho: conteúdo}), com o hash do
+    conteúdo de cada um. 'aplicar' incorpora a resposta do Dev: só os
+    arquivos enviados e com hash diferente mudam; os omitidos são mantidos.
+    """
+
+    def __init__(self, arquivos=None):
+        self.arquivos = {}
+        self.hashes = {}
+        # Resumos e impressões por hash do conteúdo: arquivos que não mudam não são reanalisados
+        self._por_hash = {}
+        for caminho, conteudo in (arquivos or {}).items():
+            self._gravar(caminho, conteudo)
+
+    @classmethod
+    def de_texto(cls, texto):
+        """Projeto a partir de um código base: com marcadores, '#arquivo nome.py' no topo ou um arquivo só."""
+        if not texto.strip():
+            return cls()
+        arquivos = separar_arquivos(texto)
+        if arquivos:
+            return cls(arquivos)
+        comentario = _COMENTARIO_ARQUIVO.match(texto)
+        caminho = normalizar_caminho(comentario.group(1)) if comentario else None
+        return cls({caminho or ARQUIVO_PADRAO: texto.strip("\n") + "\n"})
+
+    def _gravar(self, caminho, conteudo):
+        self.arquivos[caminho] = conteudo
+        self.hashes[caminho] = hash_conteudo(conteudo)
+
+    def aplicar(self, resposta, alvos=()):
+        """
+        Incorpora os arquivos da resposta do Dev e devolve {"alterados",
+        "enviados", "bytes_regenerados"} (bytes dos arquivos que mudaram). Uma
+        resposta sem marcadores vale pelo único arquivo alvo (ou por ARQUIVO_PADRAO).
+        """
+        recebidos = separar_arquivos(resposta)
+        if not recebidos and resposta.strip():
+            caminho = alvos[0] if len(alvos) == 1 else ARQUIVO_PADRAO
+            recebidos = {caminho: remover_cercas_markdown(resposta).strip("\n") + "\n"}
+        alterados = []
+        for caminho, conteudo in recebidos.items():
+            if self.hashes.get(caminho) != hash_conteudo(conteudo):
+                self._gravar(caminho, conteudo)
+                alterados.append(caminho)
+        return {"alterados": alterados, "enviados": list(recebidos),
+                "bytes_regenerados": sum(len(self.arquivos[c].encode("utf-8")) for c in alterados)}
+
+    def texto(self, caminhos=None):
+        """Texto do projeto (ou dos 'caminhos'), cada arquivo após o seu MARCADOR_ARQUIVO."""
+        caminhos = self.arquivos if caminhos is None else [c for c in self.arquivos if c in caminhos]
+        return "\n".join(f"{MARCADOR_ARQUIVO.format(c)}\n{self.arquivos[c]}" for c in caminhos)
+
+    def resumos(self, excluir=()):
+        """Interfaces dos arquivos fora de 'excluir'."""
+        return "\n\n".join(self._analise(c, "resumo", resumo_interface) for c in self.arquivos if c not in excluir)
+
+    def _analise(self, caminho, tipo, funcao):
+        chave = (caminho, self.hashes[caminho], tipo)
+        if chave not in self._por_hash:
+            self._por_hash[chave] = funcao(caminho, self.arquivos[caminho])
+        return self._por_hash[chave]
+
+    def bytes_total(self):
+        return sum(len(c.encode("utf-8")) for c in self.arquivos.values())
+
+    def mapear_feedback(self, feedback):
+        """
+        Arquivos que o feedback cita: pelo caminho, pelo nome do arquivo ou por
+        uma função/classe definida nele. Feedback que não cita nenhum vale
+        para todos os arquivos.
+        """
+        texto = feedback.lower()
+        palavras = set(re.findall(r"[A-Za-z_]\w{2,}", feedback))
+        citados = [
+            caminho for caminho, conteudo in self.arquivos.items()
+            if caminho.lower() in texto or posixpath.basename(caminho).lower() in texto
+            or palavras & self._analise(caminho, "nomes", lambda _, texto: _nomes_definidos(texto))
+        ]
+        return citados or list(self.arquivos)
+
+
+def exportar_zip(arquivos):
+    """Bytes de um .zip com os arquivos {caminho: conteúdo} do projeto."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for caminho, conteudo in arquivos.items():
+            caminho = normalizar_caminho(caminho)
+            if caminho is not None:
+                arquivo_zip.writestr(caminho, conteudo)
+    return buffer.getvalue()
@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+import time
+
+# ---------------------------------------------------------
+# ROTEAMENTO ADAPTATIVO DE MODELOS POR PAPEL
+# ---------------------------------------------------------
+
+# Níveis de modelo, do mais barato e rápido ao mais forte: durante a execução o roteamento só sobe nesta ordem
+NIVEIS_MODELO = tuple(m.strip() for m in os.getenv(
+    "NIVEIS_MODELO", "gemini-2.5-flash-lite,gemini-2.5-flash,gemini-2.5-pro").split(",") if m.strip())
+# Um nível "funcionou" para o papel com pelo menos esta taxa de sucesso em MIN_AMOSTRAS_ROTEAMENTO períodos:
+# só então o papel passa a experimentar o nível abaixo
+TAXA_SUCESSO_MINIMA = float(os.getenv("TAXA_SUCESSO_MINIMA", 0.6))
+MIN_AMOSTRAS_ROTEAMENTO = int(os.getenv("MIN_AMOSTRAS_ROTEAMENTO", 3))
+# Falhas seguidas de um papel (reprovações, respostas inválidas) antes de escalar para o próximo nível
+LIMITE_FALHAS_ROTEAMENTO = int(os.getenv("LIMITE_FALHAS_ROTEAMENTO", 2))
+# Papéis que produzem o trabalho: o período conta como sucesso se a execução foi aprovada nele. Os
+# demais (verificadores, gerente) só precisam de respostas válidas.
+PAPEIS_GERADORES = ("eng_software", "dev")
+
+CAMINHO_PADRAO = os.getenv(
+    "ROTEAMENTO_CAMINHO",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".roteamento_modelos.sqlite3"),
+)
+
+
+class HistoricoRoteamento:
+    """
+    Desempenho registrado de cada (papel, modelo), em SQLite: períodos
+    (trechos de uma execução em que o papel ficou no modelo), sucessos,
+    chamadas, latência e custo somados.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS desempenho ("
+            " papel TEXT NOT NULL,"
+            " modelo TEXT NOT NULL,"
+            " periodos INTEGER NOT NULL,"
+            " sucessos INTEGER NOT NULL,"
+            " chamadas INTEGER NOT NULL,"
+            " soma_latencia REAL NOT NULL,"
+            " soma_custo REAL NOT NULL,"
+            " atualizado_em REAL NOT NULL,"
+            " PRIMARY KEY (papel, modelo))"
+        )
+        self._conexao.commit()
+
+    def registrar(self, papel, modelo, sucesso, chamadas, latencia, custo):
+        with self._trava:
+            self._conexao.execute(
+                "INSERT INTO desempenho VALUES (?, ?, 1, ?, ?, ?, ?, ?) ON CONFLICT (papel, modelo) DO UPDATE SET"
+                " periodos = periodos + 1, sucessos = sucessos + excluded.sucessos,"
+                " chamadas = chamadas + excluded.chamadas, soma_latencia = soma_latencia + excluded.soma_latencia,"
+                " soma_custo = soma_custo + excluded.soma_custo, atualizado_em = excluded.atualizado_em",
+                (papel, modelo, int(sucesso), chamadas, latencia, custo, time.time()),
+            )
+            self._conexao.commit()
+
+    def do_papel(self, papel):
+        """{modelo: {"periodos", "sucessos", "taxa", "latencia_media", "custo_medio"}} (médias por chamada)."""
+        with self._trava:
+            linhas = self._conexao.execute(
+                "SELECT modelo, periodos, sucessos, chamadas, soma_latencia, soma_custo FROM desempenho WHERE papel = ?",
+                (papel,),
+            ).fetchall()
+        return {
+            modelo: {"periodos": periodos, "sucessos": sucessos, "taxa": sucessos / periodos,
+                     "latencia_media": soma_latencia / chamadas if chamadas else 0.0,
+                     "custo_medio": soma_custo / chamadas if chamadas else 0.0}
+            for modelo, periodos, sucessos, chamadas, soma_latencia, soma_custo in linhas
+        }
+
+    def limpar(self):
+        with self._trava:
+            self._conexao.execute("DELETE FROM desempenho")
+            self._conexao.commit()
+
+
+class PoliticaRoteamento:
+    """
+    Escolhe o modelo inicial de cada papel a partir do histórico. Sem
+    histórico, o papel começa no seu modelo de referência (o da especificação
+    do agente). Ele só desce um nível de 'niveis' depois que o nível atual
+    funcionou (TAXA_SUCESSO_MINIMA em MIN_AMOSTRAS_ROTEAMENTO períodos). O
+    nível abaixo é então experimentado até ter amostras suficientes. Se fica
+    abaixo da taxa mínima, o papel volta a começar no nível de cima. Nunca
+    começa acima da referência.
+    """
+
+    def __init__(self, historico, niveis=NIVEIS_MODELO, taxa_minima=TAXA_SUCESSO_MINIMA,
+                 min_amostras=MIN_AMOSTRAS_ROTEAMENTO, limite_falhas=LIMITE_FALHAS_ROTEAMENTO):
+        self.historico = historico
+        self.niveis = tuple(niveis)
+        self.taxa_minima = taxa_minima
+        self.min_amostras = min_amostras
+        self.limite_falhas = limite_falhas
+
+    def _comprovado(self, dados):
+        return dados is not None and dados["periodos"] >= self.min_amostras and dados["taxa"] >= self.taxa_minima
+
+    def _reprovado(self, dados):
+        return dados is not None and dados["periodos"] >= self.min_amostras and dados["taxa"] < self.taxa_minima
+
+    def modelo_inicial(self, papel, referencia):
+        """Modelo em que 'papel' começa, a partir do seu modelo de 'referencia' (fora de 'niveis', fica nele)."""
+        if referencia not in self.niveis:
+            return referencia
+        desempenho = self.historico.do_papel(papel)
+        indice = self.niveis.index(referencia)
+        while (indice > 0 and self._comprovado(desempenho.get(self.niveis[indice]))
+               and not self._reprovado(desempenho.get(self.niveis[indice - 1]))):
+            indice -= 1
+        return self.niveis[indice]
+
+    def proximo_nivel(self, modelo):
+        """Modelo do nível acima de 'modelo' (None se já for o mais forte)."""
+        if modelo not in self.niveis:
+            return self.niveis[-1] if modelo != self.niveis[-1] else None
+        indice = self.niveis.index(modelo)
+        return self.niveis[indice + 1] if indice + 1 < len(self.niveis) else None
+
+
+class RoteadorExecucao:
+    """
+    Modelos em uso por papel durante uma execução do workflow. 'papeis' mapeia
+    cada papel ao seu modelo de referência, e o papel começa no modelo_inicial
+    da política. LIMITE_FALHAS_ROTEAMENTO falhas
+    seguidas (ou um pedido explícito de 'escalar') sobem o papel um nível.
+    Ao escalar e ao encerrar, o período no modelo é registrado no histórico.
+    """
+
+    def __init__(self, politica, papeis):
+        self.politica = politica
+        self.modelos = {papel: politica.modelo_inicial(papel, referencia) for papel, referencia in papeis.items()}
+        self.iniciais = dict(self.modelos)
+        self.escalonamentos = []
+        self._falhas = dict.fromkeys(papeis, 0)
+        self._falhou_no_periodo = dict.fromkeys(papeis, False)
+        self._periodos = {papel: self._novo_periodo() for papel in papeis}
+        self._totais = {}
+
+    @staticmethod
+    def _novo_periodo():
+        return {"chamadas": 0, "latencia": 0.0, "custo": 0.0}
+
+    def modelo(self, papel):
+        return self.modelos[papel]
+
+    def registrar_chamada(self, papel, metricas):
+        """Soma latência e custo de uma chamada ao vivo (no modelo atual do papel) ao período em curso."""
+        if not metricas or metricas.get("cache") or papel not in self._periodos:
+            return
+        if metricas.get("modelo", self.modelos[papel]) != self.modelos[papel]:
+            return
+        for periodo in (self._periodos[papel], self._totais.setdefault((papel, self.modelos[papel]),
+                                                                       self._novo_periodo())):
+            periodo["chamadas"] += 1
+            periodo["latencia"] += metricas.get("duracao", 0.0)
+            periodo["custo"] += metricas.get("custo", 0.0)
+
+    def registrar_sucesso(self, papel):
+        self._falhas[papel] = 0
+
+    def registrar_falha(self, papel, motivo, iteracao=None):
+        """Conta uma falha do papel; devolve o escalonamento (dict) se o limite de falhas seguidas foi atingido."""
+        self._falhas[papel] += 1
+        self._falhou_no_periodo[papel] = True
+        if self._falhas[papel] < self.politica.limite_falhas:
+            return None
+        return self.escalar(papel, motivo, iteracao)
+
+    def escalar(self, papel, motivo, iteracao=None):
+        """Sobe o papel para o próximo nível (o período atual conta como falha); None se já está no mais forte."""
+        atual = self.modelos[papel]
+        proximo = self.politica.proximo_nivel(atual)
+        if proximo is None:
+            return None
+        self._encerrar_periodo(papel, sucesso=False)
+        self.modelos[papel] = proximo
+        escalonamento = {"papel": papel, "de": atual, "para": proximo, "motivo": motivo, "iteracao": iteracao}
+        self.escalonamentos.append(escalonamento)
+        return escalonamento
+
+    def _encerrar_periodo(self, papel, sucesso):
+        periodo = self._periodos[papel]
+        if periodo["chamadas"] and sucesso is not None:
+            self.politica.historico.registrar(papel, self.modelos[papel], sucesso, periodo["chamadas"],
+                                              periodo["latencia"], periodo["custo"])
+        self._periodos[papel] = self._novo_periodo()
+        self._falhas[papel] = 0
+        self._falhou_no_periodo[papel] = False
+
+    def encerrar(self, sucesso_execucao):
+        """
+        Registra os períodos em aberto: geradores pelo resultado da execução
+        (nada se for None, ex: execução abortada), os demais pelas respostas válidas.
+        """
+        for papel in list(self._periodos):
+            if papel in PAPEIS_GERADORES:
+                sucesso = sucesso_execucao
+            else:
+                sucesso = not self._falhou_no_periodo[papel]
+            self._encerrar_periodo(papel, sucesso)
+
+    def resumo(self):
+        """Dict serializável anexado aos eventos "terminado"."""
+        por_modelo = {f"{papel}:{modelo}": dict(totais) for (papel, modelo), totais in self._totais.items()}
+        return {"iniciais": dict(self.iniciais), "finais": dict(self.modelos),
+                "escalonamentos": list(self.escalonamentos), "por_papel_modelo": por_modelo}
@@ -0,0 +1,233 @@
+import json
+import re
+
+from sandbox_execucao import MARCADOR_CASOS_DE_TESTE
+
+# ---------------------------------------------------------
+# ESQUEMAS DE RESPOSTA (SAÍDA ESTRUTURADA EM JSON)
+# ---------------------------------------------------------
+
+# O provedor emite as propriedades em ordem alfabética: os nomes garantem que o veredito
+# ('status'/'decisao') chegue antes das listas, e possa ser lido ainda durante o stream.
+ESQUEMA_ENGENHEIRO = {
+    "type": "OBJECT",
+    "properties": {"especificacao": {"type": "STRING"}},
+    "required": ["especificacao"],
+}
+
+ESQUEMA_DEV = {
+    "type": "OBJECT",
+    "properties": {"codigo": {"type": "STRING"}},
+    "required": ["codigo"],
+}
+
+ESQUEMA_VERIFICADOR = {
+    "type": "OBJECT",
+    "properties": {
+        "status": {"type": "STRING", "enum": ["APROVADO", "REPROVADO"]},
+        "tarefas": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "testes": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": ["status", "tarefas"],
+}
+
+ESQUEMA_GERENTE = {
+    "type": "OBJECT",
+    "properties": {
+        "decisao": {"type": "STRING", "enum": ["TERMINATE", "CORRIGIR"]},
+        "tarefas": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": ["decisao", "tarefas"],
+}
+
+
+def config_json(generation_config, esquema):
+    """generation_config com a resposta restrita ao esquema (JSON)."""
+    return {**generation_config, "response_mime_type": "application/json", "response_schema": esquema}
+
+# ---------------------------------------------------------
+# LEITOR INCREMENTAL (STREAMING)
+# ---------------------------------------------------------
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def _corrigir_surrogates(texto):
+    """Junta pares \\uD8xx\\uDCxx decodificados separadamente em um único caractere."""
+    return texto.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+class LeitorJsonIncremental:
+    """
+    Lê um objeto JSON de topo à medida que os trechos do stream chegam, sem
+    esperar o fim da resposta. 'alimentar' devolve os eventos do trecho:
+
+    - ("trecho", chave, texto): parte já decodificada de um campo string em
+      andamento (ex: o código do Dev, para exibição ao vivo);
+    - ("campo", chave, valor): um campo de topo completo (ex: o 'status' de
+      um verificador, antes de as tarefas chegarem).
+
+    Texto antes do objeto (ex: uma cerca ```json) é ignorado. Os campos
+    completos ficam em 'campos'; 'completo' indica que o objeto foi fechado.
+    """
+
+    def __init__(self):
+        self.campos = {}
+        self.completo = False
+        self._estado = "antes_objeto"
+        self._chave = None
+        self._texto = []
+        self._escape = None
+        self._bruto = []
+        self._profundidade = 0
+        self._em_string = False
+        self._escape_bruto = False
+        self._surrogate_alto = []
+
+    def alimentar(self, trecho):
+        eventos = []
+        pendente, self._surrogate_alto = self._surrogate_alto, []
+        for caractere in trecho:
+            estado = self._estado
+            if estado == "valor_string":
+                if self._escape is not None:
+                    self._escape += caractere
+                    if self._escape[0] != "u":
+                        pendente.append(_ESCAPES.get(self._escape, self._escape))
+                        self._escape = None
+                    elif len(self._escape) == 5:
+                        pendente.append(chr(int(self._escape[1:], 16)))
+                        self._escape = None
+                elif caractere == "\\":
+                    self._escape = ""
+                elif caractere == '"':
+                    if pendente:
+                        self._texto.extend(pendente)
+                        eventos.append(("trecho", self._chave, _corrigir_surrogates("".join(pendente))))
+                        pendente = []
+                    self._concluir(_corrigir_surrogates("".join(self._texto)), eventos)
+                else:
+                    pendente.append(caractere)
+            elif estado == "antes_objeto":
+                if caractere == "{":
+                    self._estado = "antes_chave"
+            elif estado == "antes_chave":
+                if caractere == '"':
+                    self._estado = "chave"
+                    self._texto = []
+                elif caractere == "}":
+                    self._estado = "fim"
+                    self.completo = True
+            elif estado == "chave":
+                if self._escape_bruto:
+                    self._escape_bruto = False
+                elif caractere == "\\":
+                    self._escape_bruto = True
+                elif caractere == '"':
+                    self._chave = self._decodificar('"' + "".join(self._texto) + '"')
+                    self._estado = "dois_pontos"
+                    continue
+                self._texto.append(caractere)
+            elif estado == "dois_pontos":
+                if caractere == ":":
+                    self._estado = "antes_valor"
+            elif estado == "antes_valor":
+                if caractere.isspace():
+                    continue
+                if caractere == '"':
+                    self._estado = "valor_string"
+                    self._texto = []
+                else:
+                    self._estado = "valor_composto" if caractere in "[{" else "valor_literal"
+                    self._bruto = [caractere]
+                    self._profundidade = 1 if caractere in "[{" else 0
+                    self._em_string = False
+            elif estado == "valor_composto":
+                self._bruto.append(caractere)
+                if self._em_string:
+                    if self._escape_bruto:
+                        self._escape_bruto = False
+                    elif caractere == "\\":
+                        self._escape_bruto = True
+                    elif caractere == '"':
+                        self._em_string = False
+                elif caractere == '"':
+                    self._em_string = True
+                elif caractere in "[{":
+                    self._profundidade += 1
+                elif caractere in "]}":
+                    self._profundidade -= 1
+                    if self._profundidade == 0:
+                        self._concluir(self._decodificar("".join(self._bruto)), eventos)
+            elif estado == "valor_literal":
+                if caractere in ",}" or caractere.isspace():
+                    self._concluir(self._decodificar("".join(self._bruto)), eventos)
+                    if caractere == ",":
+                        self._estado = "antes_chave"
+                    elif caractere == "}":
+                        self._estado = "fim"
+                        self.completo = True
+                else:
+                    self._bruto.append(caractere)
+            elif estado == "depois_valor":
+                if caractere == ",":
+                    self._estado = "antes_chave"
+                elif caractere == "}":
+                    self._estado = "fim"
+                    self.completo = True
+        if pendente and "\ud800" <= pendente[-1] <= "\udbff":
+            # Metade de um par surrogate: espera a outra metade no próximo trecho
+            self._surrogate_alto = [pendente.pop()]
+        if pendente:
+            self._texto.extend(pendente)
+            eventos.append(("trecho", self._chave, _corrigir_surrogates("".join(pendente))))
+        return eventos
+
+    @staticmethod
+    def _decodificar(bruto):
+        try:
+            return json.loads(bruto)
+        except ValueError:
+            return bruto
+
+    def _concluir(self, valor, eventos):
+        self.campos[self._chave] = valor
+        eventos.append(("campo", self._chave, valor))
+        self._estado = "depois_valor"
+        self._bruto = []
+
+
+def interpretar_json(texto):
+    """
+    Objeto JSON da resposta (com ou sem cerca markdown). Se o JSON estiver
+    truncado, devolve os campos que chegaram completos; None se não houver nenhum.
+    """
+    texto = texto.strip()
+    cerca = re.match(r"^```(?:json)?\s*\n(.*?)\n?```$", texto, re.DOTALL)
+    if cerca:
+        texto = cerca.group(1)
+    try:
+        dados = json.loads(texto)
+        return dados if isinstance(dados, dict) else None
+    except ValueError:
+        leitor = LeitorJsonIncremental()
+        leitor.alimentar(texto)
+        return leitor.campos or None
+
+# ---------------------------------------------------------
+# CONVERSÃO PARA O FORMATO TEXTUAL DO WORKFLOW
+# ---------------------------------------------------------
+
+def relatorio_do_verificador(dados):
+    """
+    Relatório no formato que o workflow já consome ('STATUS: APROVADO' ou
+    'STATUS: REPROVADO' + itens '- tarefa' + casos de teste após o marcador),
+    montado a partir do veredito do enum, não de busca por substring.
+    """
+    if dados.get("status") == "APROVADO":
+        return "STATUS: APROVADO"
+    linhas = ["STATUS: REPROVADO"] + [f"- {tarefa}" for tarefa in dados.get("tarefas") or []]
+    testes = [teste for teste in dados.get("testes") or [] if teste.strip()]
+    if testes:
+        linhas += ["", MARCADOR_CASOS_DE_TESTE] + [f"```python\n{teste.strip()}\n```" for teste in testes]
+    return "\n".join(linhas)
@@ -0,0 +1,248 @@
+import functools
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------------------------------------------
+# EXECUÇÃO ISOLADA DO CÓDIGO GERADO
+# ---------------------------------------------------------
+
+MARCADOR_CASOS_DE_TESTE = "--- CASOS DE TESTE ---"
+
+TEMPO_LIMITE_PADRAO = 10       # segundos de relógio por execução
+CPU_LIMITE_PADRAO = 10         # segundos de CPU
+MEMORIA_LIMITE_MB_PADRAO = 512
+PROCESSOS_LIMITE_PADRAO = 256  # RLIMIT_NPROC (processos e threads do usuário; não vale para root)
+MAX_SAIDA = 4000               # caracteres guardados de stdout/stderr
+MAX_CASOS_DE_TESTE = 8
+# Sem namespace de rede (unshare -rn), o código só roda com SANDBOX_SEM_ISOLAMENTO=1: a rede fica
+# bloqueada apenas pelo audit hook e os resultados vêm marcados como não isolados
+PERMITIR_SEM_ISOLAMENTO = os.getenv("SANDBOX_SEM_ISOLAMENTO") == "1"
+
+
+class SandboxIndisponivel(RuntimeError):
+    """O sistema não permite isolar a rede do subprocesso e a execução sem isolamento não foi permitida."""
+
+
+# Script executado no subprocesso: aplica os limites de recursos (recebidos em SANDBOX_LIMITES),
+# bloqueia rede, criação de processos e chamadas nativas (ctypes e afins, que contornariam os
+# eventos de auditoria) via audit hook (não pode ser removido pelo código executado), importa o
+# código gerado e roda o caso de teste no mesmo namespace. Os limites
+# são aplicados aqui, e não num preexec_fn, que não é seguro com o pool de threads de executar_lote.
+_EXECUTOR = r'''
+import os
+import runpy
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+if resource is not None and os.environ.get("SANDBOX_LIMITES"):
+    _cpu, _memoria_mb, _processos = (int(valor) for valor in os.environ["SANDBOX_LIMITES"].split(","))
+    _limites = [(resource.RLIMIT_CPU, _cpu), (resource.RLIMIT_AS, _memoria_mb * 1024 * 1024),
+                (resource.RLIMIT_FSIZE, 10 * 1024 * 1024), (resource.RLIMIT_CORE, 0),
+                (resource.RLIMIT_NPROC, _processos)]
+    for _recurso, _valor in _limites:
+        _atual = resource.getrlimit(_recurso)[1]
+        _valor = _valor if _atual == resource.RLIM_INFINITY else min(_valor, _atual)
+        resource.setrlimit(_recurso, (_valor, _valor))
+
+_EVENTOS_DE_REDE = {"socket.connect", "socket.bind", "socket.getaddrinfo", "socket.gethostbyname",
+                    "socket.sendto", "socket.sendmsg", "urllib.Request"}
+_EVENTOS_DE_PROCESSO = {"subprocess.Popen", "os.system", "os.exec", "os.fork", "os.forkpty", "os.posix_spawn",
+                        "os.spawn", "os.startfile"}
+_EVENTOS_NATIVOS = {"ctypes.dlopen", "ctypes.dlsym", "ctypes.dlsym/handle", "ctypes.call_function",
+                    "ctypes.cdata", "ctypes.cdata/buffer"}
+# Sem evento de auditoria para o que fazem: _posixsubprocess.fork_exec cria processos e os demais
+# chamam funções nativas (ex: libc.system) ou escrevem na memória do processo. Não podem ser importados.
+_MODULOS_BLOQUEADOS = {"_posixsubprocess", "ctypes", "_ctypes", "_cffi_backend", "cffi", "_testcapi",
+                       "_testinternalcapi"}
+
+def _bloquear(evento, argumentos):
+    if evento in _EVENTOS_DE_REDE:
+        raise PermissionError(f"Acesso à rede bloqueado no sandbox ({evento})")
+    if evento in _EVENTOS_DE_PROCESSO:
+        raise PermissionError(f"Criação de processos bloqueada no sandbox ({evento})")
+    if evento in _EVENTOS_NATIVOS:
+        raise PermissionError(f"Chamadas nativas bloqueadas no sandbox ({evento})")
+    if evento == "import" and argumentos[0].partition(".")[0] in _MODULOS_BLOQUEADOS:
+        raise PermissionError(f"Módulo bloqueado no sandbox (import {argumentos[0]})")
+    if (evento == "open" and isinstance(argumentos[0], str)
+            and os.path.basename(argumentos[0]) == "mem" and argumentos[0].startswith("/proc/")):
+        raise PermissionError(f"Acesso à memória de processos bloqueado no sandbox ({argumentos[0]})")
+
+sys.addaudithook(_bloquear)
+# -I tira o diretório do código do sys.path: recolocado para os imports entre arquivos de um projeto
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[1])))
+
+try:
+    namespace = runpy.run_path(sys.argv[1], run_name="codigo_gerado")
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], encoding="utf-8") as arquivo:
+            exec(compile(arquivo.read(), "<caso_de_teste>", "exec"), namespace)
+except SystemExit:
+    raise
+except BaseException:
+    traceback.print_exc()
+    sys.exit(1)
+'''
+
+
+@functools.lru_cache(maxsize=None)
+def _prefixo_sem_rede():
+    """
+    ['unshare', '-rn'] se o sistema permite criar um namespace de rede sem
+    privilégios (o subprocesso fica sem nenhuma interface além de um loopback
+    desligado); [] caso contrário (ver isolamento_disponivel).
+    """
+    if os.name != "posix" or shutil.which("unshare") is None:
+        return []
+    try:
+        teste = subprocess.run(["unshare", "-rn", "true"], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return ["unshare", "-rn"] if teste.returncode == 0 else []
+
+
+def isolamento_disponivel():
+    """Se o código gerado pode rodar num namespace de rede próprio (sem isso, só com PERMITIR_SEM_ISOLAMENTO)."""
+    return bool(_prefixo_sem_rede())
+
+
+def _exigir_isolamento(permitir_sem_isolamento):
+    if not isolamento_disponivel() and not permitir_sem_isolamento:
+        raise SandboxIndisponivel("Este sistema não permite isolar a rede do código gerado (unshare -rn); "
+                                  "defina SANDBOX_SEM_ISOLAMENTO=1 para executar só com o audit hook.")
+
+
+def _truncar(texto):
+    return texto if len(texto) <= MAX_SAIDA else texto[:MAX_SAIDA] + "\n... [saída truncada]"
+
+
+def executar_em_sandbox(codigo, caso_de_teste="", nome="execucao", tempo_limite=TEMPO_LIMITE_PADRAO,
+                        cpu_segundos=CPU_LIMITE_PADRAO, memoria_mb=MEMORIA_LIMITE_MB_PADRAO, arquivos=None,
+                        processos=PROCESSOS_LIMITE_PADRAO, permitir_sem_isolamento=PERMITIR_SEM_ISOLAMENTO):
+    """
+    Executa o código (e, opcionalmente, um caso de teste no mesmo namespace) em um
+    subprocesso Python isolado (-I), em diretório temporário, sem stdin, sem rede
+    (namespace de rede próprio e audit hook), sem criar processos nem chamar
+    código nativo e com limites de CPU, memória, processos (POSIX) e tempo.
+    Retorna um dict com saída, traceback, tempo e "isolado".
+    Sem namespace de rede disponível, levanta SandboxIndisponivel, a menos que
+    'permitir_sem_isolamento' (aí "isolado" é False: a rede fica bloqueada só
+    pelo audit hook).
+    'arquivos' ({caminho relativo: conteúdo}) são gravados ao lado do código, para
+    que ele importe os demais módulos de um projeto com vários arquivos.
+    """
+    _exigir_isolamento(permitir_sem_isolamento)
+    prefixo = _prefixo_sem_rede()
+    with tempfile.TemporaryDirectory(prefix="sandbox_dev_") as diretorio:
+        for caminho, conteudo in (arquivos or {}).items():
+            destino = os.path.join(diretorio, *caminho.split("/"))
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            with open(destino, "w", encoding="utf-8") as arquivo:
+                arquivo.write(conteudo)
+        caminho_codigo = os.path.join(diretorio, "codigo_gerado.py")
+        caminho_executor = os.path.join(diretorio, "_executor.py")
+        with open(caminho_codigo, "w", encoding="utf-8") as arquivo:
+            arquivo.write(codigo)
+        with open(caminho_executor, "w", encoding="utf-8") as arquivo:
+            arquivo.write(_EXECUTOR)
+        comando = prefixo + [sys.executable, "-I", caminho_executor, caminho_codigo]
+        if caso_de_teste:
+            caminho_caso = os.path.join(diretorio, "caso_de_teste.py")
+            with open(caminho_caso, "w", encoding="utf-8") as arquivo:
+                arquivo.write(caso_de_teste)
+            comando.append(caminho_caso)
+
+        ambiente = {"PATH": os.environ.get("PATH", ""), "PYTHONIOENCODING": "utf-8", "HOME": diretorio,
+                    "SANDBOX_LIMITES": f"{cpu_segundos},{memoria_mb},{processos}"}
+        inicio = time.perf_counter()
+        processo = subprocess.Popen(
+            comando,
+            cwd=diretorio,
+            env=ambiente,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=os.name == "posix",  # grupo de processos próprio, para matar filhos no timeout
+        )
+        tempo_esgotado = False
+        try:
+            stdout, stderr = processo.communicate(timeout=tempo_limite)
+        except subprocess.TimeoutExpired:
+            tempo_esgotado = True
+            if os.name == "posix":
+                os.killpg(processo.pid, signal.SIGKILL)
+            else:
+                processo.kill()
+            stdout, stderr = processo.communicate()
+        duracao = time.perf_counter() - inicio
+
+    stderr = stderr.decode("utf-8", errors="replace")
+    codigo_saida = processo.returncode
+    return {
+        "nome": nome,
+        "ok": codigo_saida == 0 and not tempo_esgotado,
+        "codigo_saida": codigo_saida,
+        "tempo_esgotado": tempo_esgotado,
+        "duracao": duracao,
+        "isolado": bool(prefixo),
+        "stdout": _truncar(stdout.decode("utf-8", errors="replace")),
+        "stderr": _truncar(stderr),
+        "traceback": _truncar(stderr[stderr.rfind("Traceback (most recent call last)"):]) if "Traceback" in stderr else "",
+    }
+
+
+def executar_lote(codigo, casos_de_teste=(), max_processos=None, arquivos=None, **limites):
+    """
+    Executa, em paralelo e com no máximo 'max_processos' subprocessos simultâneos,
+    a importação do código e cada um dos casos de teste. Retorna os resultados na
+    mesma ordem (importação primeiro). 'arquivos' vai para cada execução.
+    Levanta SandboxIndisponivel antes de executar qualquer item (ver executar_em_sandbox).
+    """
+    _exigir_isolamento(limites.get("permitir_sem_isolamento", PERMITIR_SEM_ISOLAMENTO))
+    itens = [("importacao", "")] + [(f"caso_{i}", caso) for i, caso in enumerate(casos_de_teste, start=1)]
+    max_processos = max_processos or min(len(itens), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_processos) as pool:
+        futuros = [
+            pool.submit(executar_em_sandbox, codigo, caso, nome, arquivos=arquivos, **limites)
+            for nome, caso in itens
+        ]
+        return [futuro.result() for futuro in futuros]
+
+
+def extrair_casos_de_teste(relatorio):
+    """Extrai os blocos ```python``` propostos pelo Beta Tester após MARCADOR_CASOS_DE_TESTE."""
+    if MARCADOR_CASOS_DE_TESTE not in relatorio:
+        return []
+    trecho = relatorio.split(MARCADOR_CASOS_DE_TESTE, 1)[1]
+    casos = re.findall(r"```(?:python|py)?\s*\n(.*?)```", trecho, re.DOTALL)
+    return [caso.strip() for caso in casos if caso.strip()][:MAX_CASOS_DE_TESTE]
+
+
+def formatar_resultados(resultados):
+    """Resumo textual das execuções, para a entrada do Beta Tester."""
+    linhas = ["RESULTADOS DA EXECUÇÃO REAL DO CÓDIGO (sandbox, sem rede):"]
+    if any(not resultado.get("isolado", True) for resultado in resultados):
+        linhas.append("(sem namespace de rede: rede bloqueada só pelo audit hook, resultados não isolados)")
+    for resultado in resultados:
+        situacao = "TEMPO ESGOTADO" if resultado["tempo_esgotado"] else ("OK" if resultado["ok"] else f"FALHOU (saída {resultado['codigo_saida']})")
+        linhas.append(f"- {resultado['nome']}: {situacao} em {resultado['duracao']:.2f}s")
+        if resultado["stdout"].strip():
+            linhas.append(f"  stdout:\n{resultado['stdout'].strip()}")
+        if resultado["traceback"]:
+            linhas.append(f"  traceback:\n{resultado['traceback'].strip()}")
+        elif not resultado["ok"] and resultado["stderr"].strip():
+            linhas.append(f"  stderr:\n{resultado['stderr'].strip()}")
+    return "\n".join(linhas)
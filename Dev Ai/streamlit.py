@@ -1,221 +1,679 @@
-import streamlit as st
-import time
-import re 
-from typing import Tuple
-
-try:
-    from agente_workflow import executar_workflow_de_desenvolvimento, CHAVE_API
-except ImportError:
-    st.error("🚨 Erro de Importação: Certifique-se de que o arquivo 'agente_workflow.py' está no mesmo diretório e não tem erros de sintaxe.")
-    st.stop()
-except Exception as e:
-    st.error(f"Erro ao carregar o módulo: {e}")
-    st.stop()
-
-
-# ---------------------------------------------------------
-# INICIALIZAÇÃO DE ESTADO E CALLBACKS
-# ---------------------------------------------------------
-if 'workflow_em_execucao' not in st.session_state:
-    st.session_state.workflow_em_execucao = False
-if 'abort_workflow' not in st.session_state:
-    st.session_state.abort_workflow = False
-
-def set_start_flag():
-    """Callback para iniciar o workflow."""
-    st.session_state.workflow_em_execucao = True
-    st.session_state.abort_workflow = False 
-
-def set_abort_flag():
-    """Callback para definir o flag de interrupção."""
-    st.session_state.abort_workflow = True
-
-def extrair_codigo_base(texto_cliente: str) -> Tuple[str, str]:
-    """
-    Extrai o código base do pedido do cliente usando um marcador.
-    """
-    match = re.search(r"(?:CÓDIGO DADO:|CÓDIGO BASE:)\s*(.*)", texto_cliente, re.DOTALL | re.IGNORECASE)
-    
-    if match:
-        codigo = match.group(1).strip()
-        codigo = re.sub(r"```python\s*|```", "", codigo).strip()
-        pedido_textual = texto_cliente.replace(match.group(0), "").strip()
-        return pedido_textual, codigo
-    
-    return texto_cliente, "" 
-
-# ---------------------------------------------------------
-# INTERFACE STREAMLIT
-# ---------------------------------------------------------
-
-st.set_page_config(page_title="Agente Desenvolvedor Gemini", layout="wide")
-
-st.title("🤖 Agente Desenvolvedor com Ciclo de QA (Gemini)")
-st.caption(f"Status da API: {'🔑 Configurada' if CHAVE_API else '🚨 Chave Ausente'}")
-
-if not CHAVE_API:
-    st.warning("A variável de ambiente `GOOGLE_API_KEY` não está configurada ou está inválida.")
-
-# Texto padrão genérico
-texto_padrao_generico = (
-    "Descreva a funcionalidade que você deseja criar (e a linguagem de preferência, ex: Java, JavaScript, Python).\n"
-    "Se houver um código existente para modificar, cole-o no final.\n\n"
-    "CÓDIGO DADO:\n"
-    "// Cole seu código aqui, se aplicável"
-)
-
-pedido_completo = st.text_area(
-    "📝 Pedido do Cliente:",
-    height=300,
-    placeholder=texto_padrao_generico,
-    disabled=st.session_state.workflow_em_execucao 
-)
-
-# Configurações adicionais
-st.sidebar.header("⚙️ Configurações do Workflow")
-max_iter = st.sidebar.slider(
-    "Número Máximo de Iterações", 
-    min_value=5, 
-    max_value=30, 
-    value=10, 
-    disabled=st.session_state.workflow_em_execucao
-)
-
-# CONTROLES DE INÍCIO E PARADA
-col1, col2 = st.columns([1, 1])
-
-col1.button(
-    "🚀 Iniciar Workflow de Desenvolvimento", 
-    disabled=st.session_state.workflow_em_execucao,
-    on_click=set_start_flag 
-)
-
-col2.button(
-    "🚫 Abortar Operação", 
-    disabled=not st.session_state.workflow_em_execucao, 
-    on_click=set_abort_flag
-)
-
-# ---------------------------------------------------------
-# LÓGICA DE EXECUÇÃO DO WORKFLOW
-# ---------------------------------------------------------
-
-if st.session_state.workflow_em_execucao:
-    # --- Validação de Início ---
-    if not pedido_completo:
-        st.warning("Por favor, insira um pedido válido para iniciar.")
-        st.session_state.workflow_em_execucao = False
-        st.stop()
-        
-    # 1. Extrai o código base
-    pedido_textual, codigo_base_extraido = extrair_codigo_base(pedido_completo)
-
-    # 2. Inicia o feedback em tempo real
-    st.divider()
-    
-    # Placeholders para o display dinâmico
-    status_box = st.empty()
-    progresso_bar = st.progress(0, text="Aguardando...")
-    
-    # Container para o histórico detalhado
-    st.subheader("📜 Histórico de Iterações e Reprovações")
-    historico = st.container()
-
-    start_time = time.time()
-    iter_total = 0
-    
-    # Variável para controlar o expander atual fora do loop
-    expander_atual = None
-
-    try:
-        # Itera sobre o gerador do workflow para obter atualizações
-        for update in executar_workflow_de_desenvolvimento(
-            pedido_do_cliente=pedido_textual,
-            codigo_base=codigo_base_extraido,
-            max_iteracoes=max_iter
-        ):
-            # 3. Atualiza o status e o histórico
-            status_type = update.get("status")
-            iter_total = update.get("iteracao", iter_total)
-            mensagem = update.get("mensagem")
-
-            # Atualiza a barra de progresso
-            if status_type in ["iteracao_inicio", "dev_completo", "feedback"]:
-                 progresso_value = iter_total / max_iter
-                 progresso_bar.progress(progresso_value, text=f"Iteração {iter_total}/{max_iter}")
-            
-            # --- LÓGICA DE VISUALIZAÇÃO DETALHADA ---
-            
-            if status_type == "iniciado":
-                status_box.info(f"➡️ **{mensagem}**")
-                
-            elif status_type == "engenheiro_completo":
-                status_box.success(f"➡️ **{mensagem}**")
-                
-            elif status_type == "iteracao_inicio":
-                status_box.info(f"**Trabalhando na Iteração {iter_total}...**")
-                # Cria um novo expander para esta iteração dentro do histórico
-                # 'expanded=True' mantém aberto para ver o progresso atual
-                with historico:
-                    expander_atual = st.expander(f"🔄 Detalhes da Iteração {iter_total}", expanded=True)
-                    expander_atual.markdown("---")
-            
-            elif status_type == "dev_completo":
-                if expander_atual:
-                    expander_atual.info("🛠️ **Dev:** Código gerado e enviado para verificação.")
-
-            elif status_type == "analise":
-                status_box.caption(f"Analisando: {mensagem}")
-                # Mostra o relatório do verificador dentro do expander
-                if expander_atual:
-                    agente_nome = update.get("agente")
-                    # Formatação visual para cada agente
-                    icon = "🕵️" if "Revisor" in agente_nome else "🧪" if "Beta" in agente_nome else "🛡️"
-                    expander_atual.markdown(f"**{icon} {agente_nome}:** {mensagem.split(':', 1)[1]}")
-
-            elif status_type == "verificadores_completos":
-                status_box.info(mensagem)
-
-            elif status_type == "feedback":
-                # AQUI ESTÁ O MOTIVO DA REPROVAÇÃO
-                status_box.warning(f"⚠️ Iteração {iter_total}: Código Reprovado.")
-                if expander_atual:
-                    expander_atual.error("❌ **GERENTE REPROVOU**")
-                    expander_atual.markdown("**Motivo / Feedback enviado ao Dev:**")
-                    # Exibe o feedback completo como código para facilitar leitura
-                    # A mensagem aqui contém o texto extraído do 'else' no agente_workflow.py
-                    expander_atual.code(mensagem, language='text')
-
-            time.sleep(0.1) 
-            
-            # 4. Lógica de Término
-            if status_type == "terminado":
-                sucesso = update.get("sucesso")
-                resultado = update.get("codigo") if sucesso else update.get("mensagem")
-                linguagem = update.get("linguagem", "python")
-
-                progresso_bar.empty()
-                status_box.empty()
-                
-                st.markdown(f"---")
-                st.markdown(f"**Tempo Total:** `{time.time() - start_time:.2f} segundos`")
-                
-                if sucesso:
-                    st.success("🎉 Projeto Concluído e Aprovado!")
-                    st.subheader("Código Final:")
-                    st.code(resultado, language=linguagem)
-                else:
-                    st.error("🚨 Workflow Interrompido ou Falhou.")
-                    st.subheader("Último Estado / Erro:")
-                    st.text_area("Detalhes", resultado, height=300)
-
-                # Limpeza final do estado sem rerun imediato para manter o resultado na tela
-                st.session_state.workflow_em_execucao = False
-                st.session_state.abort_workflow = False
-                break
-                
-    except Exception as e:
-        status_box.error(f"❌ Erro Crítico durante o Workflow: {e}")
-        progresso_bar.empty()
-        st.session_state.workflow_em_execucao = False
-        st.session_state.abort_workflow = False
\ No newline at end of file
+import streamlit as st
+
+try:
+    from agente_workflow import extrair_codigo_base, CHAVE_API, obter_cache_respostas, obter_checkpoints
+    from gerenciador_jobs import GERENCIADOR_JOBS, NA_FILA
+    from opcoes_workflow import OpcoesWorkflow
+    from projeto_arquivos import exportar_zip, separar_arquivos
+    import backends_llm
+except ImportError:
+    st.error("🚨 Erro de Importação: Certifique-se de que o arquivo 'agente_workflow.py' está no mesmo diretório e não tem erros de sintaxe.")
+    st.stop()
+except Exception as e:
+    st.error(f"Erro ao carregar o módulo: {e}")
+    st.stop()
+
+
+# ---------------------------------------------------------
+# INICIALIZAÇÃO DE ESTADO E CALLBACKS
+# ---------------------------------------------------------
+# O workflow roda no GERENCIADOR_JOBS (global ao processo); a sessão guarda só o id do
+# job, que também fica na URL (?job=...) para sobreviver a uma recarga da página.
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = st.query_params.get("job")
+
+job_atual = GERENCIADOR_JOBS.obter(st.session_state.job_id) if st.session_state.job_id else None
+st.session_state.workflow_em_execucao = job_atual is not None and not job_atual.terminado
+
+def abrir_job(job_id):
+    """Callback para reabrir um job do gerenciador (em andamento ou já terminado)."""
+    st.session_state.job_id = job_id
+    st.query_params["job"] = job_id
+
+def retomar_execucao(execucao_id, parametros):
+    """Callback para retomar uma execução interrompida a partir dos checkpoints, em um novo job."""
+    abrir_job(GERENCIADOR_JOBS.submeter(**parametros, execucao_id=execucao_id))
+
+def set_abort_flag():
+    """Callback para cancelar o job (interrompe também a chamada ao LLM em andamento)."""
+    if st.session_state.job_id:
+        GERENCIADOR_JOBS.cancelar(st.session_state.job_id)
+
+def formatar_metricas(metricas: dict) -> str:
+    """
+    Resume as métricas de latência de uma chamada de agente (percebida e real).
+    """
+    if not metricas:
+        return ""
+    if metricas.get("cache"):
+        return f"⏱️ {metricas['duracao']:.2f}s (cache)"
+    texto = (
+        f"⏱️ {metricas['duracao']:.2f}s · 1º token em {metricas['ttft']:.2f}s · "
+        f"{metricas['tokens_por_segundo']:.0f} tokens/s · "
+        f"{metricas.get('tokens_prompt', 0)}→{metricas.get('tokens_saida', 0)} tokens · US$ {metricas.get('custo', 0):.4f}"
+    )
+    if metricas.get("tokens_prompt_cache"):
+        texto += f" · {metricas['tokens_prompt_cache']} tokens de entrada em cache"
+    # Espera no limitador de taxa / backoff: componente separado da latência do modelo
+    espera = metricas.get("espera_limitador", 0) + metricas.get("espera_backoff", 0)
+    if espera:
+        texto += f" · ⏳ {espera:.2f}s no limitador ({metricas.get('retentativas', 0)} retentativa(s))"
+    return texto
+
+def exibir_telemetria(telemetria):
+    """Painel com a divisão por agente (latência, tokens, retentativas e custo) e a exportação."""
+    total = telemetria.total()
+    st.subheader("📊 Telemetria por Agente")
+    col_tempo, col_tokens, col_custo = st.columns(3)
+    col_tempo.metric("Tempo em LLM (soma)", f"{total['duracao']:.1f}s")
+    col_tokens.metric("Tokens (entrada/saída)", f"{total['tokens_prompt']}/{total['tokens_saida']}")
+    col_custo.metric("Custo estimado", f"US$ {total['custo']:.4f}")
+
+    linhas = [
+        {
+            "Agente": agente,
+            "Modelo": resumo["modelo"],
+            "Chamadas": resumo["chamadas"],
+            "Cache": resumo["chamadas_cache"],
+            "Falhas": resumo["chamadas_falhas"],
+            "Tempo (s)": round(resumo["duracao"], 2),
+            "% do tempo": round(100 * resumo["duracao"] / total["duracao"], 1) if total["duracao"] else 0.0,
+            "Tokens entrada": resumo["tokens_prompt"],
+            "Tokens saída": resumo["tokens_saida"],
+            "Retentativas": resumo["retentativas"],
+            "Custo (US$)": round(resumo["custo"], 5),
+            "% do custo": round(100 * resumo["custo"] / total["custo"], 1) if total["custo"] else 0.0,
+        }
+        for agente, resumo in sorted(telemetria.por_agente().items(), key=lambda item: -item[1]["duracao"])
+    ]
+    st.dataframe(linhas, use_container_width=True, hide_index=True)
+
+    with st.expander("Por iteração"):
+        st.dataframe(
+            [{"Iteração": iteracao, "Chamadas": resumo["chamadas"], "Tempo (s)": round(resumo["duracao"], 2),
+              "Tokens entrada": resumo["tokens_prompt"], "Tokens saída": resumo["tokens_saida"],
+              "Custo (US$)": round(resumo["custo"], 5)}
+             for iteracao, resumo in telemetria.por_iteracao().items()],
+            use_container_width=True, hide_index=True,
+        )
+
+    col_jsonl, col_prometheus = st.columns(2)
+    col_jsonl.download_button("⬇️ Exportar JSON lines", telemetria.exportar_jsonl(),
+                              file_name="telemetria.jsonl", mime="application/jsonl")
+    col_prometheus.download_button("⬇️ Exportar Prometheus", telemetria.exportar_prometheus(),
+                                   file_name="telemetria.prom", mime="text/plain")
+
+# ---------------------------------------------------------
+# INTERFACE STREAMLIT
+# ---------------------------------------------------------
+
+st.set_page_config(page_title="Agente Desenvolvedor Gemini", layout="wide")
+
+st.title("🤖 Agente Desenvolvedor com Ciclo de QA (Gemini)")
+st.caption(f"Status da API: {'🔑 Configurada' if CHAVE_API else '🚨 Chave Ausente'}")
+
+# Armazéns abertos no primeiro uso (o import do agente_workflow não faz I/O)
+ARMAZEM_GRAVACOES = backends_llm.obter_armazem_gravacoes()
+CACHE_RESPOSTAS = obter_cache_respostas()
+CHECKPOINTS = obter_checkpoints()
+
+if backends_llm.BACKEND_ATIVO != "gemini":
+    st.caption(f"🎞️ Backend LLM: **{backends_llm.BACKEND_ATIVO}** ({len(ARMAZEM_GRAVACOES)} gravação(ões) em "
+               f"`{ARMAZEM_GRAVACOES.caminho}`)")
+
+if not CHAVE_API and backends_llm.BACKEND_ATIVO != "replay":
+    st.warning("A variável de ambiente `GOOGLE_API_KEY` não está configurada ou está inválida.")
+
+# Texto padrão genérico
+texto_padrao_generico = (
+    "Descreva a funcionalidade que você deseja criar (e a linguagem de preferência, ex: Java, JavaScript, Python).\n"
+    "Se houver um código existente para modificar, cole-o no final.\n\n"
+    "CÓDIGO DADO:\n"
+    "// Cole seu código aqui, se aplicável"
+)
+
+pedido_completo = st.text_area(
+    "📝 Pedido do Cliente:",
+    height=300,
+    placeholder=texto_padrao_generico,
+    disabled=st.session_state.workflow_em_execucao 
+)
+
+# Configurações adicionais
+st.sidebar.header("⚙️ Configurações do Workflow")
+max_iter = st.sidebar.slider(
+    "Número Máximo de Iterações", 
+    min_value=5, 
+    max_value=30, 
+    value=10, 
+    disabled=st.session_state.workflow_em_execucao
+)
+verificacao_concorrente = st.sidebar.checkbox(
+    "Rodar verificadores em paralelo",
+    value=True,
+    help="Revisor, Beta Tester e QA analisam o código ao mesmo tempo (a iteração paga só a latência do mais lento).",
+    disabled=st.session_state.workflow_em_execucao
+)
+stream_dev = st.sidebar.checkbox(
+    "Mostrar código do Dev em tempo real",
+    value=True,
+    help="Gera o código em streaming e exibe cada trecho assim que chega.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+modo_incremental = st.sidebar.checkbox(
+    "Modo incremental (diffs entre iterações)",
+    value=False,
+    help="A partir da 2ª iteração o Dev devolve só um diff e os verificadores analisam apenas as alterações.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+precheck_local = st.sidebar.checkbox(
+    "Pré-verificação local (sintaxe/PEP8)",
+    value=True,
+    help="Erros de sintaxe voltam direto ao Dev sem chamar os verificadores nem o gerente.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+execucao_sandbox = st.sidebar.checkbox(
+    "Executar código em sandbox",
+    value=False,
+    help="Roda o código gerado (e os casos de teste do Beta Tester) em subprocessos isolados, sem rede, sem criar processos nem chamar código nativo e com limites de CPU/memória/tempo. Exige namespace de rede (unshare -rn); sem ele o código não é executado, a menos que SANDBOX_SEM_ISOLAMENTO=1.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+gerente_por_regras = st.sidebar.checkbox(
+    "Decisão do gerente por regras locais",
+    value=True,
+    help="Aprovação unânime encerra sem chamar o LLM; reprovações viram uma lista de tarefas montada localmente.",
+    disabled=st.session_state.workflow_em_execucao
+)
+resumo_gerente_llm = st.sidebar.checkbox(
+    "Gerente LLM resume o feedback",
+    value=False,
+    help="Nas reprovações, usa o gerente LLM apenas para resumir a lista de tarefas.",
+    disabled=st.session_state.workflow_em_execucao or not gerente_por_regras
+)
+
+reverificacao_seletiva = st.sidebar.checkbox(
+    "Reverificar só quem reprovou",
+    value=False,
+    help="Vereditos ficam memorizados por impressão digital do código; aprovações herdadas são confirmadas num passe final antes de encerrar.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+reaproveitar_similares = st.sidebar.checkbox(
+    "Reaproveitar pedidos similares",
+    value=False,
+    help="Se um pedido quase idêntico já foi aprovado, reaproveita a especificação dele e o Dev parte do código aprovado.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+candidatos_dev = st.sidebar.slider(
+    "Candidatos do Dev por iteração",
+    min_value=1,
+    max_value=4,
+    value=1,
+    help="Modo especulativo: o Dev gera vários candidatos em paralelo (variando temperatura e ênfase); "
+         "uma triagem local escolhe o melhor para os verificadores.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+acao_convergencia = st.sidebar.selectbox(
+    "Ao detectar ciclo/estagnação",
+    options=[None, "parar", "escalar", "reformular"],
+    format_func=lambda acao: {None: "Não detectar", "parar": "Parar com a melhor versão",
+                              "escalar": "Escalar o Dev para um modelo mais forte",
+                              "reformular": "Reformular a entrada do Dev"}[acao],
+    help="Detecta código repetido entre iterações, feedback repetido e aprovações estagnadas.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+saida_estruturada = st.sidebar.checkbox(
+    "Saída estruturada (JSON)",
+    value=False,
+    help="Os agentes respondem em JSON com esquema: o veredito dos verificadores é lido assim que chega "
+         "e o contexto original não é mais ecoado em cada resposta.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+projeto_multiarquivo = st.sidebar.checkbox(
+    "Projeto com vários arquivos",
+    value=False,
+    help="O resultado é um conjunto de arquivos: nas correções o Dev regenera só os arquivos citados no feedback "
+         "e o projeto pode ser baixado como .zip.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+roteamento_adaptativo = st.sidebar.checkbox(
+    "Roteamento adaptativo de modelos",
+    value=False,
+    help="Cada agente começa no seu modelo e passa a um mais barato só depois que o histórico mostra que o "
+         "modelo atual funciona para ele; sobe para um mais forte após falhas seguidas (reprovações, respostas "
+         "inválidas). O histórico é atualizado a cada execução.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+recorte_codigo_base = st.sidebar.checkbox(
+    "Recortar código base grande",
+    value=False,
+    help="O Dev recebe só as funções citadas na spec/feedback e suas dependências; o resto vai como stub e é restaurado localmente.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+cache_contexto = st.sidebar.checkbox(
+    "Cache de contexto",
+    value=False,
+    help="Instrução + código base viram um prefixo cacheado no provedor; as chamadas seguintes só enviam a parte variável.",
+    disabled=st.session_state.workflow_em_execucao
+)
+
+# Estatísticas do cache de respostas (temperatura 0)
+st.sidebar.header("🗃️ Cache de Respostas")
+if CACHE_RESPOSTAS is None:
+    st.sidebar.caption("Cache desativado.")
+else:
+    estatisticas_cache = CACHE_RESPOSTAS.estatisticas()
+    cache_col1, cache_col2 = st.sidebar.columns(2)
+    cache_col1.metric("Acertos", estatisticas_cache["acertos"])
+    cache_col2.metric("Falhas", estatisticas_cache["falhas"])
+    st.sidebar.metric("Economizado", f"{estatisticas_cache['bytes_economizados'] / 1024:.1f} KB")
+    st.sidebar.caption(
+        f"{estatisticas_cache['entradas']} respostas armazenadas "
+        f"({estatisticas_cache['bytes_armazenados'] / 1024:.1f} KB)"
+    )
+    st.sidebar.button(
+        "Limpar Cache",
+        on_click=CACHE_RESPOSTAS.limpar,
+        disabled=st.session_state.workflow_em_execucao
+    )
+
+# Jobs do processo (continuam rodando mesmo sem nenhuma página aberta)
+st.sidebar.header("🧵 Jobs")
+jobs_recentes = GERENCIADOR_JOBS.listar()[:5]
+if not jobs_recentes:
+    st.sidebar.caption("Nenhum job executado.")
+for job in jobs_recentes:
+    icone = {"na_fila": "⏳", "executando": "🔄", "concluido": "✅", "cancelado": "🚫", "falhou": "❌"}[job.estado]
+    st.sidebar.button(
+        f"{icone} {job.id} · {job.duracao():.0f}s",
+        key=f"abrir_job_{job.id}",
+        on_click=abrir_job,
+        args=(job.id,),
+        disabled=job.id == st.session_state.job_id
+    )
+
+# Execuções interrompidas (crash, quota, aba fechada) podem ser retomadas do último checkpoint
+st.sidebar.header("♻️ Execuções Salvas")
+# Execuções de jobs ainda na fila ou executando não estão interrompidas: ficam de fora da lista
+execucoes_ativas = GERENCIADOR_JOBS.execucoes_ativas()
+execucoes_interrompidas = [
+    execucao for execucao in (CHECKPOINTS.listar_execucoes(10) if CHECKPOINTS is not None else [])
+    if not execucao["terminado"] and execucao["execucao_id"] not in execucoes_ativas
+][:5]
+if not execucoes_interrompidas:
+    st.sidebar.caption("Nenhuma execução interrompida.")
+for execucao in execucoes_interrompidas:
+    st.sidebar.button(
+        f"▶️ {execucao['execucao_id']} · iteração {execucao['ultima_iteracao']} · {execucao['etapas']} etapa(s)",
+        key=f"retomar_{execucao['execucao_id']}",
+        help=execucao["parametros"]["pedido_do_cliente"][:200],
+        on_click=retomar_execucao,
+        args=(execucao["execucao_id"], execucao["parametros"]),
+        disabled=st.session_state.workflow_em_execucao
+    )
+
+# CONTROLES DE INÍCIO E PARADA
+col1, col2 = st.columns([1, 1])
+
+iniciar = col1.button(
+    "🚀 Iniciar Workflow de Desenvolvimento", 
+    disabled=st.session_state.workflow_em_execucao
+)
+
+col2.button(
+    "🚫 Abortar Operação", 
+    disabled=not st.session_state.workflow_em_execucao, 
+    on_click=set_abort_flag
+)
+
+# ---------------------------------------------------------
+# EXIBIÇÃO DO JOB (HISTÓRICO RECONSTRUÍDO A CADA ATUALIZAÇÃO)
+# ---------------------------------------------------------
+
+def exibir_job(job_id):
+    """
+    Drena a fila de eventos do job e renderiza o histórico completo. Enquanto o
+    job executa, roda como fragmento atualizado a cada segundo (o resto da
+    página continua responsivo); ao terminar, provoca um rerun da página para
+    reabilitar os controles.
+    """
+    job = GERENCIADOR_JOBS.obter(job_id)
+    if job is None:
+        st.info("O job não está mais disponível (o servidor pode ter sido reiniciado).")
+        return
+    eventos = job.drenar()
+    max_iter = job.parametros["max_iteracoes"]
+
+    # Placeholders para o display dinâmico
+    status_box = st.empty()
+    progresso_bar = st.progress(0, text="Na fila..." if job.estado == NA_FILA else "Aguardando...")
+    
+    # Container para o histórico detalhado
+    st.subheader("📜 Histórico de Iterações e Reprovações")
+    historico = st.container()
+
+    iter_total = 0
+    
+    # Variável para controlar o expander atual fora do loop
+    expander_atual = None
+    # Placeholder e texto acumulado do código em streaming do Dev
+    dev_placeholder = None
+    codigo_parcial = ""
+
+    for update in eventos:
+        # 3. Atualiza o status e o histórico
+        status_type = update.get("status")
+        iter_total = update.get("iteracao", iter_total)
+        mensagem = update.get("mensagem")
+
+        # Atualiza a barra de progresso
+        if status_type in ["iteracao_inicio", "dev_completo", "feedback", "erro_dev"]:
+             progresso_value = iter_total / max_iter
+             progresso_bar.progress(progresso_value, text=f"Iteração {iter_total}/{max_iter}")
+        
+        # --- LÓGICA DE VISUALIZAÇÃO DETALHADA ---
+        
+        if status_type in ("retomado", "similar_encontrado"):
+            st.info(mensagem)
+
+        elif status_type == "iniciado":
+            status_box.info(f"➡️ **{mensagem}**")
+            st.caption(f"💾 Execução `{update.get('execucao_id')}` (checkpoints para retomada)")
+            
+        elif status_type == "engenheiro_completo":
+            status_box.success(f"➡️ **{mensagem}** {formatar_metricas(update.get('metricas'))}")
+            
+        elif status_type == "iteracao_inicio":
+            status_box.info(f"**Trabalhando na Iteração {iter_total}...**")
+            # Cria um novo expander para esta iteração dentro do histórico
+            # 'expanded=True' mantém aberto para ver o progresso atual
+            with historico:
+                expander_atual = st.expander(f"🔄 Detalhes da Iteração {iter_total}", expanded=True)
+                expander_atual.markdown("---")
+                dev_placeholder = expander_atual.empty()
+            codigo_parcial = ""
+
+        elif status_type == "dev_parcial":
+            # Renderiza o código incrementalmente à medida que os trechos chegam
+            codigo_parcial += update.get("trecho", "")
+            if dev_placeholder:
+                dev_placeholder.code(codigo_parcial, language='text')
+            continue
+        
+        elif status_type == "dev_completo":
+            if expander_atual:
+                if update.get("incremental"):
+                    expander_atual.info("🛠️ **Dev:** Diff aplicado localmente e enviado para verificação.")
+                else:
+                    expander_atual.info("🛠️ **Dev:** Código gerado e enviado para verificação.")
+                resumo_candidatos = update.get("candidatos")
+                if resumo_candidatos:
+                    escolhido = resumo_candidatos["ranking"][0]
+                    expander_atual.caption(
+                        f"🎯 Candidato {resumo_candidatos['escolhido'] + 1} escolhido (rank {resumo_candidatos['rank']} "
+                        f"de {resumo_candidatos['total']}; compila: {'sim' if escolhido['compila'] else 'não'}, "
+                        f"cobertura da spec {escolhido['cobertura_spec']:.0%})"
+                    )
+                projeto = update.get("projeto")
+                if projeto:
+                    expander_atual.caption(
+                        f"📁 Arquivos regenerados: {', '.join(projeto['alterados']) or 'nenhum'} "
+                        f"({projeto['bytes_regenerados'] / 1024:.1f} KB de {projeto['bytes_projeto'] / 1024:.1f} KB do projeto)"
+                    )
+                recorte = update.get("recorte")
+                if recorte:
+                    expander_atual.caption(
+                        f"✂️ Código base recortado: {recorte['bytes_enviados'] / 1024:.1f} KB enviados de "
+                        f"{recorte['bytes_base'] / 1024:.1f} KB ({recorte['selecionados']} símbolo(s) inteiros, "
+                        f"{recorte['omitidos']} como stub)"
+                    )
+                expander_atual.caption(formatar_metricas(update.get("metricas")))
+
+        elif status_type == "candidato_dev":
+            if expander_atual:
+                expander_atual.caption(f"{mensagem.strip()} {formatar_metricas(update.get('metricas'))}")
+
+        elif status_type == "candidato_limitado":
+            if expander_atual:
+                expander_atual.warning(mensagem)
+
+        elif status_type == "analise":
+            status_box.caption(f"Analisando: {mensagem}")
+            # Mostra o relatório do verificador dentro do expander
+            if expander_atual:
+                agente_nome = update.get("agente")
+                # Formatação visual para cada agente
+                icon = "🕵️" if "Revisor" in agente_nome else "🧪" if "Beta" in agente_nome else "🛡️"
+                origem = {"memo": " _(memo)_", "passe_final": " _(passe final)_",
+                          "checkpoint": " _(checkpoint)_"}.get(update.get("origem"), "")
+                expander_atual.markdown(f"**{icon} {agente_nome}{origem}:** {mensagem.split(':', 1)[1]}")
+                expander_atual.caption(formatar_metricas(update.get("metricas")))
+
+        elif status_type == "passe_final":
+            status_box.info(mensagem)
+            if expander_atual:
+                expander_atual.markdown(f"**{mensagem}**")
+
+        elif status_type == "verificadores_completos":
+            status_box.info(mensagem)
+
+        elif status_type == "erro_dev":
+            status_box.warning(f"⚠️ Iteração {iter_total}: o Dev não respondeu (erro do LLM).")
+            if expander_atual:
+                expander_atual.error("⚠️ **ERRO DO LLM NA CHAMADA DO DEV** (verificadores e gerente não foram chamados)")
+                expander_atual.code(mensagem, language='text')
+
+        elif status_type == "feedback":
+            # AQUI ESTÁ O MOTIVO DA REPROVAÇÃO
+            status_box.warning(f"⚠️ Iteração {iter_total}: Código Reprovado.")
+            if expander_atual:
+                if update.get("precheck"):
+                    expander_atual.error("❌ **REPROVADO NA VERIFICAÇÃO LOCAL** (verificadores e gerente não foram chamados)")
+                else:
+                    expander_atual.error("❌ **GERENTE REPROVOU**")
+                expander_atual.markdown("**Motivo / Feedback enviado ao Dev:**")
+                # Exibe o feedback completo como código para facilitar leitura
+                # A mensagem aqui contém o texto extraído do 'else' no agente_workflow.py
+                expander_atual.code(mensagem, language='text')
+                telemetria_iteracao = update.get("telemetria_iteracao") or {}
+                expander_atual.caption(
+                    f"📦 Prompts da iteração: {update.get('bytes_prompt_iteracao', 0) / 1024:.1f} KB · "
+                    f"{telemetria_iteracao.get('chamadas', 0)} chamada(s), "
+                    f"US$ {telemetria_iteracao.get('custo', 0):.4f}"
+                )
+
+        elif status_type == "sandbox":
+            if expander_atual and update.get("indisponivel"):
+                expander_atual.warning(mensagem)
+            elif expander_atual:
+                expander_atual.markdown(f"**{mensagem}**")
+                for resultado in update.get("resultados", []):
+                    if not resultado["ok"]:
+                        detalhe = "tempo esgotado" if resultado["tempo_esgotado"] else (resultado["traceback"] or resultado["stderr"])
+                        expander_atual.code(f"{resultado['nome']}: {detalhe}", language='text')
+
+        elif status_type in ("diff_invalido", "recorte_invalido", "convergencia", "roteamento"):
+            if expander_atual:
+                expander_atual.warning(mensagem)
+
+        elif status_type == "pausado":
+            status_box.warning(mensagem)
+            if expander_atual:
+                expander_atual.warning(mensagem)
+
+        # 4. Lógica de Término
+        if status_type == "terminado":
+            sucesso = update.get("sucesso")
+            resultado = update.get("codigo") if sucesso else update.get("mensagem")
+            linguagem = update.get("linguagem", "python")
+
+            progresso_bar.empty()
+            status_box.empty()
+            
+            st.markdown(f"---")
+            st.markdown(f"**Tempo Total:** `{job.duracao():.2f} segundos`")
+            estatisticas_precheck = update.get("precheck")
+            if estatisticas_precheck and estatisticas_precheck["execucoes"]:
+                st.caption(
+                    f"🔍 Pré-verificação local: {estatisticas_precheck['reprovacoes_locais']} reprovação(ões), "
+                    f"{estatisticas_precheck['chamadas_llm_economizadas']} chamadas ao LLM economizadas."
+                )
+            estatisticas_memo = update.get("memo")
+            if estatisticas_memo and estatisticas_memo["vereditos_memo"]:
+                st.caption(
+                    f"🧠 Memo de vereditos: {estatisticas_memo['vereditos_memo']} veredito(s) reaproveitado(s), "
+                    f"{estatisticas_memo['chamadas_ao_vivo']} chamadas ao vivo."
+                )
+            estatisticas_gerente = update.get("gerente")
+            if estatisticas_gerente and estatisticas_gerente["decisoes"]:
+                st.caption(
+                    f"👔 Gerente: {estatisticas_gerente['decisoes']} decisão(ões), "
+                    f"{estatisticas_gerente['chamadas_evitadas']} chamadas ao LLM evitadas."
+                )
+            estatisticas_checkpoints = update.get("checkpoints")
+            if estatisticas_checkpoints and estatisticas_checkpoints["etapas_reaproveitadas"]:
+                st.caption(
+                    f"♻️ Retomada: {estatisticas_checkpoints['etapas_reaproveitadas']} etapa(s) reaproveitada(s) "
+                    f"dos checkpoints sem chamar o LLM."
+                )
+            estatisticas_similar = update.get("similar")
+            if estatisticas_similar and "tempo_economizado" in estatisticas_similar:
+                st.caption(
+                    f"🔁 Pedido {estatisticas_similar['similaridade']:.0%} similar: {estatisticas_similar['iteracoes']} "
+                    f"iteração(ões) contra {estatisticas_similar['iteracoes_referencia']} da execução de referência, "
+                    f"~{estatisticas_similar['tempo_economizado']:.0f}s economizados."
+                )
+            estatisticas_contexto = update.get("cache_contexto")
+            if estatisticas_contexto and estatisticas_contexto["acertos"]:
+                tokens_cache = update["telemetria"].total()["tokens_prompt_cache"] if update.get("telemetria") else 0
+                st.caption(
+                    f"📌 Cache de contexto{' (simulado)' if estatisticas_contexto['simulado'] else ''}: "
+                    f"{estatisticas_contexto['acertos']} chamada(s) com prefixo em cache, "
+                    f"{tokens_cache} tokens de entrada em cache."
+                )
+            estatisticas_recorte = update.get("recorte")
+            if estatisticas_recorte and estatisticas_recorte["chamadas"]:
+                st.caption(
+                    f"✂️ Recorte do código base: {estatisticas_recorte['bytes_enviados'] / 1024:.1f} KB enviados ao Dev "
+                    f"contra {estatisticas_recorte['bytes_base'] / 1024:.1f} KB da base inteira em "
+                    f"{estatisticas_recorte['chamadas']} chamada(s)."
+                )
+            estatisticas_candidatos = update.get("candidatos")
+            if estatisticas_candidatos and estatisticas_candidatos["iteracoes"]:
+                st.caption(
+                    f"🎯 Modo especulativo: {estatisticas_candidatos['gerados']} candidato(s) em "
+                    f"{estatisticas_candidatos['iteracoes']} iteração(ões), "
+                    f"{estatisticas_candidatos['descartados']} descartado(s) na triagem local, "
+                    f"{estatisticas_candidatos['limitados']} sem resposta pelo limite do LLM e "
+                    f"{estatisticas_candidatos['com_erro']} com erro do LLM."
+                )
+            estatisticas_convergencia = update.get("convergencia")
+            if estatisticas_convergencia and estatisticas_convergencia["deteccoes"]:
+                st.caption(
+                    f"🔁 Convergência: {len(estatisticas_convergencia['deteccoes'])} detecção(ões), "
+                    f"{estatisticas_convergencia['iteracoes_economizadas']} iteração(ões) economizada(s)."
+                )
+            estatisticas_estruturada = update.get("saida_estruturada")
+            if estatisticas_estruturada:
+                st.caption(
+                    f"🧾 Saída estruturada: ~{estatisticas_estruturada['tokens_saida_economizados']} token(s) de saída "
+                    f"economizado(s), {estatisticas_estruturada['vereditos_antecipados']} veredito(s) antecipado(s), "
+                    f"{estatisticas_estruturada['falhas_json']} resposta(s) fora do esquema."
+                )
+            estatisticas_projeto = update.get("projeto")
+            if estatisticas_projeto:
+                st.caption(
+                    f"📁 Projeto: {len(estatisticas_projeto['arquivos'])} arquivo(s), "
+                    f"{estatisticas_projeto['bytes_regenerados'] / 1024:.1f} KB regenerados em "
+                    f"{len(estatisticas_projeto['por_iteracao'])} iteração(ões)."
+                )
+            estatisticas_roteamento = update.get("roteamento")
+            if estatisticas_roteamento:
+                modelos = ", ".join(f"{papel}: {modelo}" for papel, modelo in estatisticas_roteamento["finais"].items())
+                st.caption(
+                    f"🧭 Roteamento: {len(estatisticas_roteamento['escalonamentos'])} subida(s) de modelo. "
+                    f"Modelos finais — {modelos}."
+                )
+            estatisticas_quota = update.get("quota")
+            if estatisticas_quota and estatisticas_quota["pausas"]:
+                st.caption(
+                    f"⏸️ Limite do LLM: {estatisticas_quota['pausas']} pausa(s), "
+                    f"{estatisticas_quota['espera_total']:.0f}s de espera."
+                )
+            
+            if update.get("telemetria"):
+                exibir_telemetria(update["telemetria"])
+
+            if sucesso:
+                st.success("🎉 Projeto Concluído e Aprovado!")
+                st.subheader("Código Final:")
+                st.code(resultado, language=linguagem)
+            else:
+                st.error("🚨 Workflow Interrompido ou Falhou.")
+                st.subheader("Último Estado / Erro:")
+                st.text_area("Detalhes", resultado, height=300)
+            arquivos_projeto = separar_arquivos(update.get("codigo") or "") if estatisticas_projeto else {}
+            if arquivos_projeto:
+                st.download_button(f"⬇️ Baixar projeto ({len(arquivos_projeto)} arquivo(s), .zip)",
+                                   exportar_zip(arquivos_projeto), file_name="projeto.zip", mime="application/zip")
+
+    if job.terminado and st.session_state.workflow_em_execucao:
+        st.session_state.workflow_em_execucao = False
+        st.rerun()
+
+# ---------------------------------------------------------
+# LÓGICA DE EXECUÇÃO DO WORKFLOW
+# ---------------------------------------------------------
+
+if iniciar:
+    # --- Validação de Início ---
+    if not pedido_completo:
+        st.warning("Por favor, insira um pedido válido para iniciar.")
+        st.stop()
+        
+    # 1. Extrai o código base
+    pedido_textual, codigo_base_extraido = extrair_codigo_base(pedido_completo)
+
+    # 2. Submete o workflow ao gerenciador de jobs (roda em segundo plano)
+    st.session_state.job_id = GERENCIADOR_JOBS.submeter(
+        pedido_do_cliente=pedido_textual,
+        codigo_base=codigo_base_extraido,
+        max_iteracoes=max_iter,
+        opcoes=OpcoesWorkflow(
+            verificacao_concorrente=verificacao_concorrente,
+            stream_dev=stream_dev,
+            modo_incremental=modo_incremental,
+            precheck_local=precheck_local,
+            execucao_sandbox=execucao_sandbox,
+            gerente_por_regras=gerente_por_regras,
+            resumo_gerente_llm=resumo_gerente_llm,
+            reverificacao_seletiva=reverificacao_seletiva,
+            reaproveitar_similares=reaproveitar_similares,
+            cache_contexto=cache_contexto,
+            recorte_codigo_base=recorte_codigo_base,
+            candidatos_dev=candidatos_dev,
+            acao_convergencia=acao_convergencia,
+            saida_estruturada=saida_estruturada,
+            projeto_multiarquivo=projeto_multiarquivo,
+            roteamento_adaptativo=roteamento_adaptativo,
+        ),
+    )
+    # O id na URL permite reabrir o job após recarregar a página
+    st.query_params["job"] = st.session_state.job_id
+    st.rerun()
+
+if st.session_state.job_id:
+    st.divider()
+    st.caption(f"🧵 Job `{st.session_state.job_id}`")
+    st.fragment(run_every=1.0 if st.session_state.workflow_em_execucao else None)(exibir_job)(st.session_state.job_id)
@@ -0,0 +1,120 @@
+import json
+import threading
+
+# ---------------------------------------------------------
+# CUSTO ESTIMADO POR MODELO
+# ---------------------------------------------------------
+
+# Preço em USD por 1 milhão de tokens (entrada, saída). Modelos ausentes usam PRECO_GENERICO.
+PRECOS_POR_MILHAO = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+PRECO_GENERICO = (0.30, 2.50)
+# Tokens de entrada servidos pelo cache de contexto custam esta fração do preço de entrada
+FATOR_PRECO_CACHE = 0.25
+
+
+def estimar_custo(modelo, tokens_prompt, tokens_saida, tokens_cacheados=0):
+    entrada, saida = PRECOS_POR_MILHAO.get(modelo, PRECO_GENERICO)
+    tokens_entrada = tokens_prompt - tokens_cacheados + tokens_cacheados * FATOR_PRECO_CACHE
+    return (tokens_entrada * entrada + tokens_saida * saida) / 1_000_000
+
+# ---------------------------------------------------------
+# AGREGAÇÃO POR AGENTE, ITERAÇÃO E EXECUÇÃO
+# ---------------------------------------------------------
+
+# Campos numéricos somados nos agregados
+CAMPOS_SOMADOS = ("duracao", "tokens_prompt", "tokens_prompt_cache", "tokens_saida", "retentativas",
+                  "espera_limitador", "espera_backoff", "custo")
+
+
+def _somar(registros):
+    resumo = {"chamadas": len(registros), "chamadas_cache": sum(1 for r in registros if r.get("cache")),
+              "chamadas_falhas": sum(1 for r in registros if r.get("falha"))}
+    for campo in CAMPOS_SOMADOS:
+        resumo[campo] = sum(r.get(campo, 0) or 0 for r in registros)
+    return resumo
+
+
+class TelemetriaExecucao:
+    """
+    Registros de todas as chamadas de agentes de uma execução do workflow (um
+    por dict 'metricas'), com agregados por agente, por iteração e totais e
+    exportação em JSON lines ou no formato texto do Prometheus.
+    """
+
+    def __init__(self, execucao_id=None):
+        self.execucao_id = execucao_id
+        self._registros = []
+        self._trava = threading.Lock()
+
+    def registrar(self, iteracao, metricas):
+        registro = {"iteracao": iteracao, **{k: v for k, v in metricas.items() if not isinstance(v, (dict, list))}}
+        with self._trava:
+            self._registros.append(registro)
+        return registro
+
+    @property
+    def registros(self):
+        with self._trava:
+            return list(self._registros)
+
+    def por_agente(self):
+        agrupados = {}
+        for registro in self.registros:
+            agrupados.setdefault(registro.get("agente", "?"), []).append(registro)
+        return {agente: {"modelo": registros[-1].get("modelo"), **_somar(registros)}
+                for agente, registros in agrupados.items()}
+
+    def por_iteracao(self):
+        agrupados = {}
+        for registro in self.registros:
+            agrupados.setdefault(registro["iteracao"], []).append(registro)
+        return {iteracao: _somar(registros) for iteracao, registros in agrupados.items()}
+
+    def da_iteracao(self, iteracao):
+        return _somar([r for r in self.registros if r["iteracao"] == iteracao])
+
+    def total(self):
+        return _somar(self.registros)
+
+    def resumo(self):
+        """Dict serializável anexado ao evento "terminado"."""
+        return {"total": self.total(), "por_agente": self.por_agente(), "por_iteracao": self.por_iteracao()}
+
+    # -----------------------------------------------------
+    # EXPORTAÇÃO
+    # -----------------------------------------------------
+
+    def exportar_jsonl(self):
+        """Uma linha JSON por chamada de agente."""
+        extra = {"execucao": self.execucao_id} if self.execucao_id is not None else {}
+        return "".join(json.dumps({**extra, **registro}, ensure_ascii=False) + "\n" for registro in self.registros)
+
+    def exportar_prometheus(self, prefixo="devai"):
+        """Contadores por agente/modelo no formato de exposição em texto do Prometheus."""
+        metricas = [
+            ("agente_chamadas_total", "Chamadas de agentes (inclui as servidas pelo cache)", "chamadas"),
+            ("agente_chamadas_cache_total", "Chamadas servidas pelo cache de respostas", "chamadas_cache"),
+            ("agente_chamadas_falhas_total", "Chamadas sem resposta (erro ou limite do LLM)", "chamadas_falhas"),
+            ("agente_duracao_segundos_total", "Tempo de relógio das chamadas", "duracao"),
+            ("agente_tokens_prompt_total", "Tokens de entrada", "tokens_prompt"),
+            ("agente_tokens_prompt_cache_total", "Tokens de entrada servidos pelo cache de contexto", "tokens_prompt_cache"),
+            ("agente_tokens_saida_total", "Tokens de saída", "tokens_saida"),
+            ("agente_retentativas_total", "Retentativas por quota/erros transitórios", "retentativas"),
+            ("agente_espera_limitador_segundos_total", "Espera no limitador de taxa", "espera_limitador"),
+            ("agente_custo_usd_total", "Custo estimado em USD", "custo"),
+        ]
+        por_agente = self.por_agente()
+        linhas = []
+        for nome, ajuda, campo in metricas:
+            linhas.append(f"# HELP {prefixo}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {prefixo}_{nome} counter")
+            for agente, resumo in por_agente.items():
+                rotulos = f'agente="{agente}",modelo="{resumo["modelo"]}"'
+                if self.execucao_id is not None:
+                    rotulos += f',execucao="{self.execucao_id}"'
+                linhas.append(f"{prefixo}_{nome}{{{rotulos}}} {resumo[campo]}")
+        return "\n".join(linhas) + "\n"
@@ -0,0 +1,80 @@
+from agente_workflow import AGENTES_VERIFICADORES, ExecucaoWorkflow, decidir_lancamento, revisor
+from checkpoints_workflow import CheckpointsExecucao
+from opcoes_workflow import OpcoesWorkflow
+from sandbox_execucao import MARCADOR_CASOS_DE_TESTE
+
+CONTEXTO = "--- CONTEXTO ORIGINAL DO CLIENTE ---\nsoma"
+
+
+def rodar(etapa):
+    """Eventos emitidos pela etapa e o valor que ela retorna."""
+    eventos = []
+    while True:
+        try:
+            eventos.append(next(etapa))
+        except StopIteration as fim:
+            return eventos, fim.value
+
+
+def nova_execucao(**opcoes):
+    return ExecucaoWorkflow(OpcoesWorkflow(**opcoes), CheckpointsExecucao(None), None, None, "crie soma", "", 5)
+
+
+def test_aprovacao_unanime_termina():
+    assert decidir_lancamento(["STATUS: APROVADO"] * len(AGENTES_VERIFICADORES), CONTEXTO) == "TERMINATE"
+
+
+def test_reprovacoes_viram_tarefas_numeradas_seguidas_do_contexto():
+    relatorios = ["STATUS: REPROVADO\n- trate lista vazia\n- documente a função",
+                  f"STATUS: REPROVADO: falha com None\n{MARCADOR_CASOS_DE_TESTE}\nsoma(None, 1)",
+                  "STATUS: APROVADO"]
+    decisao = decidir_lancamento(relatorios, CONTEXTO)
+    assert "TERMINATE" not in decisao
+    tarefas, contexto = decisao.split("\n\n--- CONTEXTO", 1)
+    assert f"[{AGENTES_VERIFICADORES[0].name}]\n1. trate lista vazia\n2. documente a função" in tarefas
+    assert f"[{AGENTES_VERIFICADORES[1].name}]\n3. STATUS: REPROVADO: falha com None" in tarefas
+    assert "soma(None, 1)" not in tarefas and AGENTES_VERIFICADORES[2].name not in tarefas
+    assert decidir_lancamento(relatorios).endswith("falha com None")
+
+
+def test_precheck_devolve_erro_de_sintaxe_ao_dev_sem_chamar_verificadores():
+    execucao = nova_execucao()
+    execucao.contexto_original_dev = CONTEXTO
+    complementos = {}
+    eventos, reprovado = rodar(execucao.etapa_precheck(1, "def soma(a, b)\n    return a + b", complementos))
+    assert reprovado and [e["status"] for e in eventos] == ["feedback"]
+    assert execucao.entrada_atual.endswith(CONTEXTO)
+    assert execucao.estatisticas_precheck == {"execucoes": 1, "reprovacoes_locais": 1,
+                                              "chamadas_llm_economizadas": len(AGENTES_VERIFICADORES)}
+    assert complementos == {}
+
+
+def test_precheck_aprovado_passa_os_avisos_ao_revisor():
+    execucao = nova_execucao()
+    complementos = {}
+    eventos, reprovado = rodar(execucao.etapa_precheck(1, "def soma(a, b):\n    return a + b\n", complementos))
+    assert not reprovado and eventos == [] and revisor.name in complementos
+
+
+def test_precheck_desligado_ou_outra_linguagem_nao_roda():
+    assert rodar(nova_execucao(precheck_local=False).etapa_precheck(1, "def (", {})) == ([], False)
+    execucao = ExecucaoWorkflow(OpcoesWorkflow(), CheckpointsExecucao(None), None, None, "crie em javascript", "", 5)
+    assert execucao.linguagem == "javascript"
+    assert rodar(execucao.etapa_precheck(1, "function (", {})) == ([], False)
+
+
+def test_gerente_por_regras_nao_chama_o_llm():
+    execucao = nova_execucao()
+    execucao.contexto_original_dev = CONTEXTO
+    eventos, (decisao, metricas) = rodar(execucao.etapa_gerente(1, ["STATUS: REPROVADO: x", "STATUS: APROVADO",
+                                                                    "STATUS: APROVADO"]))
+    assert eventos == [] and metricas == {} and decisao.endswith(CONTEXTO)
+    assert execucao.estatisticas_gerente == {"decisoes": 1, "chamadas_llm": 0, "chamadas_evitadas": 1}
+
+
+def test_feedback_vira_a_entrada_do_dev():
+    execucao = nova_execucao()
+    decisao = f"LISTA DE TAREFAS PARA O DEV (corrija TODOS os pontos):\n1. x\n\n{CONTEXTO}"
+    eventos, _ = rodar(execucao.etapa_feedback(2, decisao, ["STATUS: REPROVADO: x"], "codigo", {}))
+    assert execucao.entrada_atual == decisao
+    assert [e["status"] for e in eventos] == ["feedback"] and "CONTEXTO" not in eventos[0]["mensagem"]
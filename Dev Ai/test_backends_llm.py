@@ -0,0 +1,93 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import backends_llm
+from backends_llm import (ArmazemGravacoes, ClienteGravador, ClienteReplay, GravacaoAusente, chave_gravacao,
+                          configurar_backend)
+from limitador_taxa import LimitadorTaxa, QuotaExcedida, QuotaSimulada
+
+
+class ClienteFalso:
+    """Cliente no formato do SDK com respostas fixas."""
+
+    def __init__(self, trechos, falhar_apos=None):
+        self.trechos = trechos
+        self.falhar_apos = falhar_apos
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        if not stream:
+            return SimpleNamespace(text="".join(self.trechos))
+        return self._stream()
+
+    def _stream(self):
+        for indice, trecho in enumerate(self.trechos):
+            if indice == self.falhar_apos:
+                raise ConnectionError("stream caiu")
+            yield SimpleNamespace(text=trecho)
+
+
+def test_caminho_padrao_ao_lado_do_modulo():
+    if "GRAVACOES_LLM" not in os.environ:
+        assert os.path.dirname(backends_llm.CAMINHO_GRAVACOES_PADRAO) == os.path.dirname(
+            os.path.abspath(backends_llm.__file__))
+
+
+def test_armazem_serve_em_ordem_repete_a_ultima_e_persiste(tmp_path):
+    caminho = str(tmp_path / "gravacoes.jsonl")
+    armazem = ArmazemGravacoes(caminho)
+    armazem.guardar("m", "prompt", "primeira", 0.1, 0.05)
+    armazem.guardar("m", "prompt", "segunda", 0.1, 0.05)
+    assert [armazem.obter("m", "prompt")["texto"] for _ in range(3)] == ["primeira", "segunda", "segunda"]
+    armazem.reiniciar()
+    assert armazem.obter("m", "prompt")["texto"] == "primeira"
+    with pytest.raises(GravacaoAusente):
+        armazem.obter("outro", "prompt")
+    recarregado = ArmazemGravacoes(caminho)
+    assert len(recarregado) == 2 and recarregado.obter("m", "prompt")["chave"] == chave_gravacao("m", "prompt")
+
+
+def test_gravador_grava_stream_completo_e_fechado_antes_mas_nao_o_que_falha(tmp_path):
+    armazem = ArmazemGravacoes(str(tmp_path / "g.jsonl"))
+    completo = ClienteGravador(ClienteFalso(["a", "b"]), "m", armazem)
+    assert [c.text for c in completo.generate_content("p1", stream=True)] == ["a", "b"]
+    assert armazem.obter("m", "p1")["trechos"] == ["a", "b"]
+
+    fechado = ClienteGravador(ClienteFalso(["a", "b", "c"]), "m", armazem).generate_content("p2", stream=True)
+    next(fechado)
+    fechado.close()
+    assert armazem.obter("m", "p2")["texto"] == "a"
+
+    com_falha = ClienteGravador(ClienteFalso(["a", "b"], falhar_apos=1), "m", armazem)
+    with pytest.raises(ConnectionError):
+        list(com_falha.generate_content("p3", stream=True))
+    with pytest.raises(GravacaoAusente):
+        armazem.obter("m", "p3")
+
+
+def test_replay_serve_texto_e_trechos_gravados(tmp_path):
+    armazem = ArmazemGravacoes(str(tmp_path / "g.jsonl"))
+    armazem.guardar("m", "p", "abc", 0.0, 0.0, trechos=["a", "bc"])
+    armazem.guardar("m", "longo", "x" * 100, 0.0, 0.0)
+    cliente = ClienteReplay("m", armazem, escala_latencia=0)
+    assert cliente.generate_content("p").text == "abc"
+    assert [c.text for c in cliente.generate_content("p", stream=True)] == ["a", "bc"]
+    trechos = [c.text for c in cliente.generate_content("longo", stream=True)]
+    assert "".join(trechos) == "x" * 100 and len(trechos) == 3
+
+
+def test_quota_injetada_sem_sdk_e_reconhecida_pelo_limitador(tmp_path):
+    armazem = ArmazemGravacoes(str(tmp_path / "g.jsonl"))
+    armazem.guardar("m", "p", "ok", 0.0, 0.0)
+    cliente = ClienteReplay("m", armazem, escala_latencia=0, taxa_erros_quota=1.0)
+    with pytest.raises(QuotaSimulada):
+        cliente.generate_content("p")
+    limitador = LimitadorTaxa(limites={}, limite_generico=(None, None), max_tentativas=2, backoff_base=0.0)
+    with pytest.raises(QuotaExcedida):
+        limitador.executar("m", 1, lambda: cliente.generate_content("p"))
+
+
+def test_backend_desconhecido():
+    with pytest.raises(ValueError):
+        configurar_backend("outro")
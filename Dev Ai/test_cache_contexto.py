@@ -0,0 +1,59 @@
+from cache_contexto import CacheContexto
+
+PREFIXO = "instrução e código base " * 200
+CLIENTE = object()
+
+
+class RegistroFalso:
+    """Registro de clientes com (ou sem) cache de contexto no provedor."""
+
+    def __init__(self, suporta_contexto=True, falhar=False):
+        self.suporta_contexto = suporta_contexto
+        self.falhar = falhar
+        self.criados = []
+        self.liberados = []
+
+    def obter_com_contexto(self, modelo, generation_config, prefixo, ttl_segundos):
+        if not self.suporta_contexto:
+            return None
+        if self.falhar:
+            raise RuntimeError("provedor recusou")
+        cliente = f"cliente-{len(self.criados)}"
+        self.criados.append(cliente)
+        return cliente, lambda: self.liberados.append(cliente)
+
+
+def test_prefixo_curto_nunca_e_cacheado():
+    cache = CacheContexto(RegistroFalso(), min_tokens=1024)
+    for _ in range(3):
+        assert cache.preparar("m", {}, "curto", "sufixo", CLIENTE) == (CLIENTE, "curtosufixo", 0)
+    assert cache.estatisticas()["prefixos"] == 0
+
+
+def test_provedor_recebe_so_o_sufixo_a_partir_do_segundo_uso_e_libera_no_fim():
+    registro = RegistroFalso()
+    cache = CacheContexto(registro, min_tokens=10)
+    assert cache.preparar("m", {}, PREFIXO, "s1", CLIENTE) == (CLIENTE, PREFIXO + "s1", 0)
+    cliente, conteudo, tokens = cache.preparar("m", {}, PREFIXO, "s2", CLIENTE)
+    assert (cliente, conteudo) == ("cliente-0", "s2") and tokens > 0
+    assert cache.preparar("m", {}, PREFIXO, "s3", CLIENTE)[0] == "cliente-0"
+    assert cache.estatisticas() == {"prefixos": 1, "acertos": 2, "criados_no_provedor": 1, "falhas_criacao": 0,
+                                    "simulado": False}
+    cache.liberar()
+    assert registro.liberados == ["cliente-0"]
+
+
+def test_falha_na_criacao_segue_com_o_prompt_completo():
+    cache = CacheContexto(RegistroFalso(falhar=True), min_tokens=10)
+    cache.preparar("m", {}, PREFIXO, "s1", CLIENTE)
+    assert cache.preparar("m", {}, PREFIXO, "s2", CLIENTE) == (CLIENTE, PREFIXO + "s2", 0)
+    assert cache.preparar("m", {}, PREFIXO, "s3", CLIENTE) == (CLIENTE, PREFIXO + "s3", 0)
+    assert cache.estatisticas()["falhas_criacao"] == 1
+
+
+def test_backend_sem_cache_simula_os_tokens_do_prefixo():
+    cache = CacheContexto(RegistroFalso(suporta_contexto=False), min_tokens=10)
+    assert cache.preparar("m", {}, PREFIXO, "s1", CLIENTE)[2] == 0
+    cliente, conteudo, tokens = cache.preparar("m", {}, PREFIXO, "s2", CLIENTE)
+    assert (cliente, conteudo) == (CLIENTE, PREFIXO + "s2") and tokens == len(PREFIXO) // 4
+    assert cache.estatisticas()["simulado"]
@@ -0,0 +1,42 @@
+from cache_respostas import PREFIXO_ERRO_LLM, CacheRespostas
+
+
+def test_chave_depende_de_modelo_config_e_prompt():
+    chave = CacheRespostas.gerar_chave("m", "prompt", {"temperature": 0.0})
+    assert chave == CacheRespostas.gerar_chave("m", "prompt", {"temperature": 0.0})
+    assert chave != CacheRespostas.gerar_chave("outro", "prompt", {"temperature": 0.0})
+    assert chave != CacheRespostas.gerar_chave("m", "prompt!", {"temperature": 0.0})
+    assert chave != CacheRespostas.gerar_chave("m", "prompt", {"temperature": 0.5})
+
+
+def test_acerto_falha_e_estatisticas():
+    cache = CacheRespostas(":memory:")
+    assert cache.obter("k") is None
+    cache.guardar("k", "resposta")
+    assert cache.obter("k") == "resposta"
+    assert cache.estatisticas() == {"acertos": 1, "falhas": 1, "bytes_economizados": 8, "entradas": 1,
+                                    "bytes_armazenados": 8}
+
+
+def test_erros_e_respostas_vazias_nao_sao_guardados():
+    cache = CacheRespostas(":memory:")
+    cache.guardar("erro", f"{PREFIXO_ERRO_LLM} PARA dev: quota")
+    cache.guardar("vazia", "")
+    assert cache.estatisticas()["entradas"] == 0
+
+
+def test_entrada_expirada_e_removida():
+    cache = CacheRespostas(":memory:", ttl_segundos=-1)
+    cache._conexao.execute("INSERT INTO respostas VALUES ('k', 'velha', 5, 0, 0)")
+    assert cache.obter("k") is None
+    assert cache.estatisticas()["entradas"] == 0
+
+
+def test_lru_despeja_o_acessado_ha_mais_tempo():
+    cache = CacheRespostas(":memory:", max_bytes=10)
+    cache.guardar("a", "aaaa")
+    cache.guardar("b", "bbbb")
+    cache._conexao.execute("UPDATE respostas SET acessado_em = 0 WHERE chave = 'a'")
+    cache.guardar("c", "cccc")
+    assert cache.obter("a") is None
+    assert (cache.obter("b"), cache.obter("c")) == ("bbbb", "cccc")
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from cancelamento import OperacaoCancelada, TokenCancelamento, dormir, executar_cancelavel, usar_token
+
+
+def test_sem_token_a_chamada_roda_direto():
+    assert executar_cancelavel(lambda: threading.current_thread().name) == threading.current_thread().name
+
+
+def test_resultado_e_erro_da_chamada_chegam_ao_job():
+    with usar_token(TokenCancelamento()):
+        assert executar_cancelavel(lambda: 42) == 42
+        with pytest.raises(ValueError):
+            executar_cancelavel(lambda: (_ for _ in ()).throw(ValueError("falhou")))
+
+
+def test_cancelar_abandona_a_espera_e_descarta_o_resultado_tardio():
+    token = TokenCancelamento()
+    liberar = threading.Event()
+    descartados = []
+
+    def chamada_lenta():
+        liberar.wait(5)
+        return "stream aberto"
+
+    threading.Timer(0.1, token.cancelar).start()
+    inicio = time.perf_counter()
+    with usar_token(token), pytest.raises(OperacaoCancelada):
+        executar_cancelavel(chamada_lenta, descartar=descartados.append)
+    assert time.perf_counter() - inicio < 1
+    assert descartados == []
+    liberar.set()
+    for _ in range(100):
+        if descartados:
+            break
+        time.sleep(0.01)
+    assert descartados == ["stream aberto"]
+
+
+def test_token_ja_acionado_nao_inicia_a_chamada():
+    token = TokenCancelamento()
+    token.cancelar()
+    chamadas = []
+    with usar_token(token), pytest.raises(OperacaoCancelada):
+        executar_cancelavel(lambda: chamadas.append(1))
+    assert chamadas == []
+
+
+def test_dormir_acorda_no_cancelamento():
+    token = TokenCancelamento()
+    threading.Timer(0.05, token.cancelar).start()
+    inicio = time.perf_counter()
+    with usar_token(token), pytest.raises(OperacaoCancelada):
+        dormir(5)
+    assert time.perf_counter() - inicio < 1
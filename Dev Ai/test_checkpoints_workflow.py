@@ -0,0 +1,68 @@
+from checkpoints_workflow import PREFIXO_ERRO_LLM, ArmazemCheckpoints, CheckpointsExecucao
+
+
+def _executar(gerador):
+    try:
+        while True:
+            next(gerador)
+    except StopIteration as fim:
+        return fim.value
+
+
+def _chamada(saida, chamadas):
+    def chamada():
+        chamadas.append(saida)
+        yield {"status": "chamando"}
+        return saida
+    return chamada
+
+
+def test_parametros_e_etapas_voltam_do_armazem():
+    armazem = ArmazemCheckpoints(":memory:")
+    checkpoints = CheckpointsExecucao(armazem, "exec1", {"max_iteracoes": 3})
+    checkpoints.gravar(0, "engenheiro", "spec")
+    checkpoints.gravar(1, "dev", "codigo")
+    assert armazem.carregar("exec1") == ({"max_iteracoes": 3}, {(0, "engenheiro"): "spec", (1, "dev"): "codigo"})
+    assert armazem.carregar("outra") == (None, {})
+
+
+def test_erros_do_llm_e_saidas_vazias_nao_viram_checkpoint():
+    armazem = ArmazemCheckpoints(":memory:")
+    checkpoints = CheckpointsExecucao(armazem, "exec1")
+    checkpoints.gravar(1, "dev", f"{PREFIXO_ERRO_LLM} PARA dev: caiu")
+    checkpoints.gravar(1, "revisor", "")
+    assert armazem.carregar("exec1")[1] == {}
+    assert checkpoints.estatisticas()["etapas_gravadas"] == 0
+
+
+def test_retomada_reaproveita_etapas_sem_chamar_de_novo():
+    armazem = ArmazemCheckpoints(":memory:")
+    chamadas = []
+    primeira = CheckpointsExecucao(armazem, "exec1", {"pedido_do_cliente": "p"})
+    assert not primeira.retomada
+    assert _executar(primeira.etapa(0, "engenheiro", _chamada("spec", chamadas))) == "spec"
+
+    retomada = CheckpointsExecucao(armazem, "exec1", {"pedido_do_cliente": "ignorado"})
+    assert retomada.retomada
+    assert _executar(retomada.etapa(0, "engenheiro", _chamada("outra spec", chamadas))) == "spec"
+    assert _executar(retomada.etapa(1, "dev", _chamada("codigo", chamadas))) == "codigo"
+    assert chamadas == ["spec", "codigo"]
+    assert retomada.estatisticas() == {"execucao_id": "exec1", "etapas_reaproveitadas": 1, "etapas_gravadas": 1}
+    assert armazem.carregar("exec1")[0] == {"pedido_do_cliente": "p"}
+
+
+def test_listar_execucoes():
+    armazem = ArmazemCheckpoints(":memory:")
+    checkpoints = CheckpointsExecucao(armazem, "exec1", {"max_iteracoes": 2})
+    checkpoints.gravar(1, "dev", "codigo")
+    checkpoints.gravar(2, "terminado", "aprovado")
+    [execucao] = armazem.listar_execucoes()
+    assert execucao["execucao_id"] == "exec1" and execucao["parametros"] == {"max_iteracoes": 2}
+    assert execucao["etapas"] == 2 and execucao["ultima_iteracao"] == 2 and execucao["terminado"] == "aprovado"
+
+
+def test_sem_armazem_gera_id_e_nao_grava():
+    checkpoints = CheckpointsExecucao(None)
+    checkpoints.gravar(1, "dev", "codigo")
+    assert len(checkpoints.execucao_id) == 12
+    assert not checkpoints.retomada and checkpoints.estatisticas()["etapas_gravadas"] == 0
@@ -0,0 +1,62 @@
+from deteccao_convergencia import DetectorConvergencia, normalizar_feedback
+from memo_veredictos import impressao_texto
+
+FEEDBACK = "1. Corrija a divisão por zero na linha 3.\n2. Adicione docstrings às funções públicas."
+
+
+def test_normalizar_feedback_remove_numeros_e_pontuacao():
+    assert normalizar_feedback("1. Corrija a LINHA 12!") == "corrija a linha"
+
+
+def test_reescrita_nula_e_ciclo():
+    detector = DetectorConvergencia()
+    assert detector.registrar_codigo(1, "v1") is None
+    assert detector.registrar_codigo(2, "v1")["tipo"] == "reescrita_nula"
+    assert detector.registrar_codigo(3, "v2") is None
+    ciclo = detector.registrar_codigo(4, "v1")
+    assert ciclo["tipo"] == "ciclo" and "iteração 1" in ciclo["detalhe"]
+    assert [d["tipo"] for d in detector.deteccoes] == ["reescrita_nula", "ciclo"]
+
+
+def test_mudanca_so_de_formatacao_e_versao_nova():
+    detector = DetectorConvergencia()
+    codigo = "def f(a, b):\n    return a + b\n"
+    detector.registrar_codigo(1, impressao_texto(codigo))
+    assert detector.registrar_codigo(2, impressao_texto(codigo.replace("a + b", "a+b"))) is None
+
+
+def test_feedback_repetido_na_janela():
+    detector = DetectorConvergencia(janela=3)
+    assert detector.registrar_resultado(1, "c1", 1, FEEDBACK) is None
+    assert detector.registrar_resultado(2, "c2", 1, FEEDBACK.replace("linha 3", "linha 7")) is None
+    deteccao = detector.registrar_resultado(3, "c3", 2, FEEDBACK)
+    assert deteccao["tipo"] == "feedback_repetido" and "iteração 1" in deteccao["detalhe"]
+
+
+def test_feedback_diferente_nao_conta_como_repeticao():
+    detector = DetectorConvergencia(janela=2)
+    detector.registrar_resultado(1, "c1", 1, FEEDBACK)
+    assert detector.registrar_resultado(2, "c2", 1, "Use type hints e trate entradas vazias no parser") is None
+
+
+def test_estagnacao_sem_superar_as_aprovacoes_anteriores():
+    detector = DetectorConvergencia(janela=2)
+    feedbacks = ["alfa beta gama delta", "epsilon zeta eta teta", "iota kapa lambda mi"]
+    assert detector.registrar_resultado(1, "c1", 2, feedbacks[0]) is None
+    assert detector.registrar_resultado(2, "c2", 1, feedbacks[1]) is None
+    assert detector.registrar_resultado(3, "c3", 2, feedbacks[2])["tipo"] == "estagnacao"
+
+
+def test_reiniciar_janelas_zera_feedback_e_aprovacoes():
+    detector = DetectorConvergencia(janela=2)
+    detector.registrar_resultado(1, "c1", 1, FEEDBACK)
+    detector.reiniciar_janelas()
+    assert detector.registrar_resultado(2, "c2", 1, FEEDBACK) is None
+
+
+def test_melhor_versao_prefere_compilar_e_mais_aprovacoes():
+    detector = DetectorConvergencia()
+    detector.registrar_resultado(1, "c1", 2, "a b c", compila=True)
+    detector.registrar_resultado(2, "c2", 3, "d e f", compila=False)
+    detector.registrar_resultado(3, "c3", 2, "g h i", compila=True)
+    assert detector.melhor["codigo"] == "c3" and detector.melhor["aprovados"] == 2
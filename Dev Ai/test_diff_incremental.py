@@ -0,0 +1,60 @@
+import pytest
+
+from diff_incremental import (MARCADOR_DIFF, ErroAplicacaoDiff, aplicar_diff, extrair_diff, gerar_diff,
+                              remover_cercas_markdown, resumir_regioes_inalteradas)
+
+ANTERIOR = "def soma(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n"
+
+
+def test_aplicar_diff_gerado_reconstroi_a_nova_versao():
+    novo = ANTERIOR.replace("return a - b", "return b - a") + "\n\ndef mul(a, b):\n    return a * b\n"
+    assert aplicar_diff(ANTERIOR, gerar_diff(ANTERIOR, novo)) == novo
+
+
+def test_aplicar_diff_usa_o_conteudo_quando_os_numeros_de_linha_estao_errados():
+    diff = "@@ -40,2 +40,2 @@\n def sub(a, b):\n-    return a - b\n+    return b - a\n"
+    assert aplicar_diff(ANTERIOR, diff) == ANTERIOR.replace("return a - b", "return b - a")
+
+
+def test_aplicar_diff_aceita_linhas_alem_da_contagem_do_cabecalho():
+    diff = "@@ -5,1 +5,1 @@\n def sub(a, b):\n-    return a - b\n+    return b - a\n"
+    assert aplicar_diff(ANTERIOR, diff) == ANTERIOR.replace("return a - b", "return b - a")
+
+
+def test_linhas_com_prefixo_de_cabecalho_dentro_do_hunk_sao_corpo():
+    # '-- y' removida e '++ y' acrescentada viram o par '--- y'/'+++ y' no meio do hunk
+    anterior = "x = 1\n-- y\nw = 2\n"
+    novo = "x = 1\n++ y\nw = 2\n"
+    diff = gerar_diff(anterior, novo)
+    assert "\n--- y\n+++ y\n" in diff
+    assert aplicar_diff(anterior, diff) == novo
+
+
+def test_aplicar_diff_com_varios_arquivos_so_corta_no_cabecalho_apos_o_hunk():
+    diff = ("--- a/x\n+++ b/x\n@@ -1,2 +1,2 @@\n x = 1\n-y = 2\n+y = 3\n"
+            "--- a/z\n+++ b/z\n@@ -4,1 +4,1 @@\n-w = 2\n+w = 5\n")
+    assert aplicar_diff("x = 1\ny = 2\nk = 0\nw = 2\n", diff) == "x = 1\ny = 3\nk = 0\nw = 5\n"
+
+
+def test_aplicar_diff_sem_hunks_ou_que_nao_corresponde_levanta_erro():
+    with pytest.raises(ErroAplicacaoDiff):
+        aplicar_diff(ANTERIOR, "nada de diff aqui")
+    with pytest.raises(ErroAplicacaoDiff):
+        aplicar_diff(ANTERIOR, "@@ -1,1 +1,1 @@\n-linha inexistente\n+outra\n")
+
+
+def test_extrair_diff_remove_marcador_cercas_e_contexto_ecoado():
+    resposta = (f"Segue.\n{MARCADOR_DIFF}\n```diff\n@@ -1 +1 @@\n-a\n+b\n```\n"
+                "--- CONTEXTO ORIGINAL DO CLIENTE ---\npedido")
+    assert extrair_diff(resposta) == "@@ -1 +1 @@\n-a\n+b"
+
+
+def test_remover_cercas_markdown():
+    assert remover_cercas_markdown("```python\nx = 1\n```\n") == "x = 1"
+
+
+def test_resumir_regioes_inalteradas_lista_faixas_e_definicoes():
+    novo = ANTERIOR.replace("return a - b", "return b - a")
+    resumo = resumir_regioes_inalteradas(ANTERIOR, novo)
+    assert "Linhas inalteradas (na nova versão): 1-5." in resumo
+    assert "Definições inalteradas (já analisadas): soma." in resumo
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+import gerenciador_jobs
+from gerenciador_jobs import CANCELADO, CONCLUIDO, EXECUTANDO, NA_FILA, GerenciadorJobs
+
+
+@pytest.fixture
+def workflow_falso(monkeypatch):
+    """Substitui o workflow por um gerador que espera 'liberar' e registra quem rodou."""
+    estado = {"liberar": threading.Event(), "iniciados": [], "rodando": threading.Event()}
+
+    def executar(pedido_do_cliente, execucao_id=None, deve_abortar=None):
+        estado["iniciados"].append(pedido_do_cliente)
+        estado["rodando"].set()
+        yield {"status": "iniciado", "execucao_id": execucao_id}
+        while not estado["liberar"].wait(0.01):
+            if deve_abortar():
+                break
+        yield {"status": "terminado", "sucesso": not deve_abortar(), "codigo": "", "linguagem": "python"}
+
+    monkeypatch.setattr(gerenciador_jobs, "executar_workflow_de_desenvolvimento", executar)
+    return estado
+
+
+def esperar(job, timeout=5):
+    for _ in range(timeout * 100):
+        if job.terminado:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"job {job.id} não terminou ({job.estado})")
+
+
+def test_job_cancelado_na_fila_nunca_roda_e_tem_um_so_evento_final(workflow_falso):
+    gerenciador = GerenciadorJobs(max_concorrentes=1)
+    primeiro = gerenciador.obter(gerenciador.submeter(pedido_do_cliente="a"))
+    segundo = gerenciador.obter(gerenciador.submeter(pedido_do_cliente="b"))
+    assert workflow_falso["rodando"].wait(5)
+    assert (primeiro.estado, segundo.estado) == (EXECUTANDO, NA_FILA)
+
+    gerenciador.cancelar(segundo.id)
+    assert segundo.estado == CANCELADO
+    workflow_falso["liberar"].set()
+    esperar(primeiro)
+    gerenciador._pool.shutdown(wait=True)
+
+    assert primeiro.estado == CONCLUIDO
+    assert workflow_falso["iniciados"] == ["a"]
+    assert [e["status"] for e in segundo.drenar()] == ["terminado"]
+    assert segundo.iniciado_em is None
+
+
+def test_cancelar_job_em_execucao(workflow_falso):
+    gerenciador = GerenciadorJobs(max_concorrentes=1)
+    job = gerenciador.obter(gerenciador.submeter(pedido_do_cliente="a"))
+    assert workflow_falso["rodando"].wait(5)
+    gerenciador.cancelar(job.id)
+    esperar(job)
+    assert job.estado == CANCELADO
+    assert [e["status"] for e in job.drenar()] == ["iniciado", "terminado"]
+
+
+def test_execucao_ativa_nao_ganha_segundo_job(workflow_falso):
+    gerenciador = GerenciadorJobs(max_concorrentes=2)
+    job_id = gerenciador.submeter(pedido_do_cliente="a", execucao_id="exec1")
+    outro_id = gerenciador.submeter(pedido_do_cliente="b")
+    assert gerenciador.submeter(pedido_do_cliente="a", execucao_id="exec1") == job_id
+    assert gerenciador.execucoes_ativas() == {"exec1", gerenciador.obter(outro_id).execucao_id}
+
+    workflow_falso["liberar"].set()
+    esperar(gerenciador.obter(job_id))
+    esperar(gerenciador.obter(outro_id))
+    assert gerenciador.execucoes_ativas() == set()
+    assert gerenciador.submeter(pedido_do_cliente="a", execucao_id="exec1") != job_id
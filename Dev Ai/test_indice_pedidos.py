@@ -0,0 +1,60 @@
+from indice_pedidos import (IndicePedidos, assinatura_minhash, normalizar_pedido, shingles_codigo, shingles_pedido,
+                            similaridade_estimada)
+
+PEDIDO = "Crie uma função em Python que calcule o fatorial de um número inteiro não negativo, com validação."
+CODIGO = "def fatorial(n):\n    return 1 if n <= 1 else n * fatorial(n - 1)\n"
+
+
+def _indice_com_uma_execucao():
+    indice = IndicePedidos(":memory:")
+    indice.registrar(PEDIDO, CODIGO, "spec do fatorial", "codigo aprovado", iteracoes=2, duracao=12.5,
+                     execucao_id="exec1")
+    return indice
+
+
+def test_normalizar_pedido_remove_acentos_pontuacao_e_caixa():
+    assert normalizar_pedido("  Função NÃO-negativa!\n") == "funcao nao negativa"
+
+
+def test_shingles_pedido_curto_e_vazio():
+    assert shingles_pedido("Olá mundo") == {"ola mundo"}
+    assert shingles_pedido("!!!") == set()
+    assert assinatura_minhash(set()) is None
+
+
+def test_shingles_codigo_ignora_formatacao_e_aceita_codigo_invalido():
+    assert shingles_codigo(CODIGO) == shingles_codigo(CODIGO.replace("n * fatorial", "n*fatorial"))
+    assert shingles_codigo("def f(:") and shingles_codigo("  ") == set()
+
+
+def test_similaridade_estimada():
+    assinatura = assinatura_minhash(shingles_pedido(PEDIDO))
+    assert similaridade_estimada(assinatura, assinatura) == 1.0
+    assert similaridade_estimada(assinatura, assinatura_minhash(shingles_pedido("ordene uma lista de strings"))) < 0.2
+    assert similaridade_estimada(None, None) == 1.0
+    assert similaridade_estimada(assinatura, None) == 0.0
+
+
+def test_buscar_pedido_identico_e_parecido():
+    indice = _indice_com_uma_execucao()
+    identico = indice.buscar(PEDIDO, CODIGO, limiar=0.9)
+    assert identico["similaridade"] == 1.0 and identico["execucao_id"] == "exec1"
+    assert identico["especificacao"] == "spec do fatorial" and identico["tempo_busca"] >= 0
+    parecido = indice.buscar(PEDIDO.replace("com validação", "com validação da entrada"), CODIGO, limiar=0.6)
+    assert parecido is not None and 0.6 <= parecido["similaridade"] < 1.0
+
+
+def test_buscar_respeita_o_limiar_e_o_codigo_base():
+    indice = _indice_com_uma_execucao()
+    assert indice.buscar("Implemente um servidor HTTP assíncrono com cache de respostas", CODIGO, 0.6) is None
+    outro_codigo = "class Pilha:\n    def __init__(self):\n        self.itens = []\n"
+    assert indice.buscar(PEDIDO, outro_codigo, limiar=0.9) is None
+
+
+def test_estatisticas_e_limpar():
+    indice = _indice_com_uma_execucao()
+    indice.registrar("", CODIGO, "spec", "codigo", 1, 1.0)
+    assert indice.estatisticas() == {"entradas": 1}
+    indice.limpar()
+    assert indice.estatisticas() == {"entradas": 0}
+    assert indice.buscar(PEDIDO, CODIGO, limiar=0.5) is None
@@ -0,0 +1,85 @@
+import pytest
+
+from indice_simbolos import AVISO_RECORTE, ErroRecorte, indexar_codigo, restaurar_trechos
+
+CODIGO = '''import os
+
+
+def ler(caminho):
+    with open(caminho) as arquivo:
+        return arquivo.read()
+
+
+def contar_linhas(caminho):
+    texto = ler(caminho)
+    return len(texto.splitlines())
+
+
+class Relatorio:
+    def __init__(self, titulo):
+        self.titulo = titulo
+        self.linhas = []
+
+    def adicionar(self, linha):
+        self.linhas.append(linha)
+        return self
+
+    def gerar(self):
+        return "\\n".join([self.titulo] + self.linhas)
+
+
+def nao_relacionada(valor):
+    resultado = valor * 2
+    resultado += 1
+    return resultado
+''' + "".join(f"""
+
+def auxiliar_{i}(x):
+    y = x + {i}
+    if y > 10:
+        y -= 10
+    for _ in range(3):
+        y *= 2
+    return y
+""" for i in range(20))
+
+
+@pytest.fixture
+def indice():
+    return indexar_codigo(CODIGO, min_bytes=100)
+
+
+def test_base_pequena_ou_invalida_nao_e_indexada():
+    assert indexar_codigo("def f():\n    return 1\n", min_bytes=100) is None
+    assert indexar_codigo("def f(:\n" * 50, min_bytes=100) is None
+
+
+def test_selecao_segue_dependencias_e_classes(indice):
+    assert indice.selecionar("corrija contar_linhas") == {"contar_linhas", "ler"}
+    assert indice.selecionar("mude o Relatorio") == {"Relatorio.__init__", "Relatorio.adicionar", "Relatorio.gerar"}
+    assert indice.dependencias("contar_linhas") == {"ler"}
+
+
+def test_recorte_omite_os_corpos_nao_citados(indice):
+    recorte = indice.recortar("corrija contar_linhas")
+    assert recorte["codigo"].startswith(AVISO_RECORTE)
+    assert "⟪omitido: nao_relacionada⟫" in recorte["codigo"]
+    assert "⟪omitido: Relatorio.adicionar⟫" in recorte["codigo"]
+    assert "texto = ler(caminho)" in recorte["codigo"]
+    assert recorte["bytes_enviados"] < recorte["bytes_base"]
+
+
+def test_restauracao_devolve_o_arquivo_completo(indice):
+    recorte = indice.recortar("corrija contar_linhas")
+    editado = recorte["codigo"].replace("return len(texto.splitlines())", "return texto.count('\\n')")
+    restaurado = restaurar_trechos(f"```python\n{editado}```", indice, recorte["omitidos"])
+    esperado = CODIGO.replace("return len(texto.splitlines())", "return texto.count('\\n')")
+    assert restaurado == f"```python\n{esperado}```"
+
+
+def test_trecho_omitido_removido_pelo_dev_e_recusado(indice):
+    recorte = indice.recortar("corrija contar_linhas")
+    sem_adicionar = "\n".join(l for l in recorte["codigo"].splitlines() if "def adicionar" not in l
+                          and "omitido: Relatorio.adicionar" not in l)
+    with pytest.raises(ErroRecorte):
+        restaurar_trechos(sem_adicionar, indice, recorte["omitidos"])
@@ -0,0 +1,92 @@
+import pytest
+
+from limitador_taxa import (BaldeDeTokens, ErroTransitorioLLM, LimitadorTaxa, OrcamentoRetentativas, QuotaExcedida,
+                            _limites_do_ambiente)
+
+
+class ErroQuota(Exception):
+    pass
+
+
+class ErroRede(Exception):
+    pass
+
+
+def _sem_limites(**kwargs):
+    return LimitadorTaxa(limites={}, limite_generico=(None, None), backoff_base=0.0, **kwargs)
+
+
+def test_limites_do_ambiente(monkeypatch):
+    monkeypatch.setenv("LIMITES_MODELOS", "gemini-2.5-flash=10/250000, gemini-2.5-pro=/1000")
+    assert _limites_do_ambiente() == {"gemini-2.5-flash": (10, 250000), "gemini-2.5-pro": (None, 1000)}
+    monkeypatch.delenv("LIMITES_MODELOS")
+    assert _limites_do_ambiente() == {}
+
+
+def test_balde_de_tokens_devolve_espera_quando_a_reserva_passa_do_saldo():
+    balde = BaldeDeTokens(capacidade=2, por_minuto=60)
+    assert balde.reservar(1) == 0.0
+    assert balde.reservar(1) == 0.0
+    assert balde.reservar(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_orcamento_de_retentativas_seca_e_recupera_com_sucessos():
+    orcamento = OrcamentoRetentativas(maximo=1.0, deposito_por_sucesso=0.5)
+    assert orcamento.gastar()
+    assert not orcamento.gastar()
+    orcamento.registrar_sucesso()
+    orcamento.registrar_sucesso()
+    assert orcamento.gastar()
+
+
+def test_sem_limites_configurados_nao_espera():
+    limitador = _sem_limites()
+    assert limitador._baldes_do_modelo("qualquer") == (None, None)
+    assert all(limitador.reservar("qualquer", 10 ** 9) == 0.0 for _ in range(100))
+    limitador.ajustar_tokens("qualquer", 500)
+
+
+def test_limite_do_modelo_tem_precedencia_sobre_o_generico():
+    limitador = LimitadorTaxa(limites={"m": (1, None)}, limite_generico=(None, 10))
+    assert limitador.reservar("m", 1000) == 0.0
+    assert limitador.reservar("m", 1000) > 0
+    assert limitador.reservar("outro", 10) == 0.0
+    assert limitador.reservar("outro", 10) > 0
+
+
+def test_executar_repete_erros_transitorios_e_preenche_metricas():
+    tentativas = []
+
+    def chamada():
+        tentativas.append(1)
+        if len(tentativas) < 3:
+            raise ErroRede("caiu")
+        return "ok"
+
+    metricas = {}
+    resultado = _sem_limites().executar("m", 10, chamada, erros_transitorios=(ErroRede,), metricas=metricas)
+    assert resultado == "ok"
+    assert metricas["retentativas"] == 2 and metricas["espera_limitador"] == 0.0
+
+
+def test_executar_levanta_erro_tipado_apos_as_tentativas():
+    def quota():
+        raise ErroQuota("esgotada")
+
+    def rede():
+        raise ErroRede("caiu")
+
+    limitador = _sem_limites(max_tentativas=2)
+    with pytest.raises(QuotaExcedida) as erro:
+        limitador.executar("m", 10, quota, erros_quota=(ErroQuota,), erros_transitorios=(ErroRede,))
+    assert erro.value.modelo == "m"
+    with pytest.raises(ErroTransitorioLLM):
+        limitador.executar("m", 10, rede, erros_quota=(ErroQuota,), erros_transitorios=(ErroRede,))
+
+
+def test_erros_nao_tratados_passam_direto():
+    def chamada():
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        _sem_limites().executar("m", 10, chamada, erros_transitorios=(ErroRede,))
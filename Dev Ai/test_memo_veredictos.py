@@ -0,0 +1,55 @@
+from memo_veredictos import (SIMBOLO_MODULO, MemoVeredictos, impressao_texto, impressoes_por_simbolo,
+                             simbolos_alterados, simbolos_do_codigo)
+
+CODIGO = "import os\n\ndef soma(a, b):\n    return a + b\n\nclass Conta:\n    pass\n"
+
+
+def test_impressao_texto_ignora_quebras_de_linha_e_linhas_em_branco_das_pontas():
+    assert impressao_texto(CODIGO) == impressao_texto("\n\n" + CODIGO.replace("\n", "\r\n") + "\n")
+
+
+def test_impressao_texto_distingue_formatacao_e_comentarios():
+    assert impressao_texto(CODIGO) != impressao_texto(CODIGO.replace("a + b", "a+b"))
+    assert impressao_texto(CODIGO) != impressao_texto(CODIGO + "# comentário\n")
+
+
+def test_impressoes_por_simbolo_separa_definicoes_e_codigo_de_topo():
+    impressoes = impressoes_por_simbolo(CODIGO)
+    assert set(impressoes) == {"soma", "Conta", SIMBOLO_MODULO}
+    assert impressoes_por_simbolo("def f(:\n") == {}
+
+
+def test_simbolos_do_codigo_invalido_sao_desconhecidos():
+    assert simbolos_do_codigo(CODIGO) == {"soma", "Conta", SIMBOLO_MODULO}
+    assert simbolos_do_codigo("def f(:\n") is None
+
+
+def test_simbolos_alterados_ignora_formatacao_e_detecta_mudanca_de_ast():
+    assert simbolos_alterados(CODIGO, CODIGO.replace("a + b", "a+b")) == []
+    assert simbolos_alterados(CODIGO, CODIGO.replace("a + b", "a - b")) == ["soma"]
+    assert simbolos_alterados(CODIGO, CODIGO + "\ndef nova():\n    pass\n") == ["nova"]
+
+
+def test_memo_devolve_relatorio_do_mesmo_codigo():
+    memo = MemoVeredictos()
+    memo.registrar("revisor", "abc", "STATUS: APROVADO")
+    assert memo.obter("revisor", "abc") == "STATUS: APROVADO"
+    assert memo.obter("revisor", "def") is None
+    assert memo.obter("tester", "abc") is None
+
+
+def test_aprovacao_herdada_so_sem_simbolos_revisados_alterados():
+    memo = MemoVeredictos()
+    memo.registrar("revisor", "abc", "STATUS: APROVADO", simbolos_revisados={"soma"})
+    assert memo.aprovou_ultima_versao("revisor", ["Conta"])
+    assert not memo.aprovou_ultima_versao("revisor", ["soma"])
+    assert not memo.aprovou_ultima_versao("revisor", None)
+    assert not memo.aprovou_ultima_versao("tester", [])
+
+
+def test_aprovacao_nao_herdada_se_reprovou_ou_simbolos_desconhecidos():
+    memo = MemoVeredictos()
+    memo.registrar("revisor", "abc", "STATUS: REPROVADO", simbolos_revisados={"soma"})
+    memo.registrar("tester", "abc", "STATUS: APROVADO")
+    assert not memo.aprovou_ultima_versao("revisor", [])
+    assert not memo.aprovou_ultima_versao("tester", [])
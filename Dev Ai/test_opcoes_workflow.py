@@ -0,0 +1,26 @@
+from dataclasses import FrozenInstanceError, asdict, replace
+
+import pytest
+
+from opcoes_workflow import OpcoesWorkflow
+
+
+def test_padroes():
+    opcoes = OpcoesWorkflow()
+    assert opcoes.stream_dev and opcoes.precheck_local and opcoes.gerente_por_regras
+    assert opcoes.candidatos_dev == 1 and opcoes.acao_convergencia is None
+
+
+def test_acao_convergencia_invalida():
+    with pytest.raises(ValueError):
+        OpcoesWorkflow(acao_convergencia="desistir")
+    assert replace(OpcoesWorkflow(), acao_convergencia="parar").acao_convergencia == "parar"
+    with pytest.raises(ValueError):
+        replace(OpcoesWorkflow(), acao_convergencia="desistir")
+
+
+def test_imutavel_e_serializavel_para_os_checkpoints():
+    opcoes = OpcoesWorkflow(candidatos_dev=3)
+    with pytest.raises(FrozenInstanceError):
+        opcoes.candidatos_dev = 1
+    assert OpcoesWorkflow(**asdict(opcoes)) == opcoes
@@ -0,0 +1,39 @@
+import precheck_estatico
+from precheck_estatico import (MAX_AVISOS_ESTILO, executar_precheck, executar_precheck_projeto,
+                               formatar_erros_sintaxe, formatar_relatorio_estilo, verificar_sintaxe)
+
+CODIGO_OK = "def soma(a, b):\n    return a + b\n"
+
+
+def test_verificar_sintaxe_acusa_erros_que_o_parse_aceita():
+    assert verificar_sintaxe(CODIGO_OK) == []
+    [erro] = verificar_sintaxe("return 1\n")
+    assert erro["linha"] == 1 and "outside function" in erro["mensagem"]
+    assert verificar_sintaxe("x = 1\x00\n")[0]["linha"] is None
+
+
+def test_precheck_so_avalia_estilo_com_sintaxe_correta():
+    resultado = executar_precheck("def f(:\n    pass  \n")
+    assert resultado["erros_sintaxe"] and resultado["avisos_estilo"] == []
+    assert executar_precheck(CODIGO_OK) == {"erros_sintaxe": [], "avisos_estilo": []}
+
+
+def test_estilo_minimo_sem_pycodestyle(monkeypatch):
+    monkeypatch.setattr(precheck_estatico, "pycodestyle", None)
+    codigo = "x = 1  \nif x:\n\ty = 2\n" + "z = '" + "a" * 80 + "'\n\n"
+    codigos = [aviso["codigo"] for aviso in executar_precheck(codigo)["avisos_estilo"]]
+    assert codigos == ["W291", "W191", "E501", "W391"]
+    muitos = "x = 1 \n" * (MAX_AVISOS_ESTILO + 10)
+    assert len(executar_precheck(muitos)["avisos_estilo"]) == MAX_AVISOS_ESTILO
+
+
+def test_precheck_projeto_marca_o_arquivo_e_ignora_nao_python():
+    resultado = executar_precheck_projeto({"a.py": CODIGO_OK, "b.py": "def f(:\n", "README.md": "def f(:\n"})
+    assert [erro["arquivo"] for erro in resultado["erros_sintaxe"]] == ["b.py"]
+    assert formatar_erros_sintaxe(resultado["erros_sintaxe"]).splitlines()[1].startswith("- b.py, linha 1")
+
+
+def test_formatar_relatorio_estilo():
+    assert "Nenhum aviso PEP8" in formatar_relatorio_estilo([])
+    relatorio = formatar_relatorio_estilo([{"linha": 3, "codigo": "E501", "mensagem": "line too long"}])
+    assert relatorio.endswith("- Linha 3: E501 line too long")
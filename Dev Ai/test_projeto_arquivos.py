@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+from projeto_arquivos import (ARQUIVO_PADRAO, MARCADOR_ARQUIVO, Projeto, exportar_zip, normalizar_caminho,
+                              resumo_interface, separar_arquivos)
+
+UTIL = "def dobro(x):\n    \"\"\"Dobra x.\"\"\"\n    return 2 * x\n"
+MAIN = "from util import dobro\n\nLIMITE = 10\n\n\nclass App:\n    def rodar(self):\n        return dobro(LIMITE)\n"
+
+
+def _texto(arquivos):
+    return "\n".join(f"{MARCADOR_ARQUIVO.format(c)}\n{conteudo}" for c, conteudo in arquivos.items())
+
+
+def test_normalizar_caminho_nao_escapa_do_projeto():
+    assert normalizar_caminho(" `pacote\\modulo.py` ") == "pacote/modulo.py"
+    assert normalizar_caminho("/abs/x.py") == "abs/x.py"
+    assert normalizar_caminho("../fora.py") is None
+    assert normalizar_caminho(".") is None
+
+
+def test_separar_arquivos_com_marcadores_e_cercas():
+    texto = "Aqui está:\n// --- ARQUIVO: util.py ---\n```python\n" + UTIL + "```\n# --- ARQUIVO: main.py ---\n" + MAIN
+    assert separar_arquivos(texto) == {"util.py": UTIL, "main.py": MAIN}
+    assert separar_arquivos(UTIL) == {}
+
+
+def test_projeto_de_texto():
+    assert Projeto.de_texto(_texto({"util.py": UTIL, "main.py": MAIN})).arquivos == {"util.py": UTIL,
+                                                                                     "main.py": MAIN}
+    assert list(Projeto.de_texto("# arquivo: lib/util.py\n" + UTIL).arquivos) == ["lib/util.py"]
+    assert list(Projeto.de_texto(UTIL).arquivos) == [ARQUIVO_PADRAO]
+    assert Projeto.de_texto("  \n").arquivos == {}
+
+
+def test_aplicar_so_altera_arquivos_com_hash_diferente():
+    projeto = Projeto({"util.py": UTIL, "main.py": MAIN})
+    novo_util = UTIL.replace("2 * x", "x + x")
+    resultado = projeto.aplicar(_texto({"util.py": novo_util, "main.py": MAIN}))
+    assert resultado["alterados"] == ["util.py"]
+    assert resultado["enviados"] == ["util.py", "main.py"]
+    assert resultado["bytes_regenerados"] == len(novo_util.encode("utf-8"))
+    assert projeto.arquivos["util.py"] == novo_util
+
+
+def test_aplicar_resposta_sem_marcadores_vale_pelo_unico_alvo():
+    projeto = Projeto({"util.py": UTIL, "main.py": MAIN})
+    assert projeto.aplicar("```python\nx = 1\n```", alvos=["main.py"])["alterados"] == ["main.py"]
+    assert projeto.arquivos["main.py"] == "x = 1\n"
+
+
+def test_texto_do_projeto_volta_aos_mesmos_arquivos():
+    projeto = Projeto({"util.py": UTIL, "main.py": MAIN})
+    assert separar_arquivos(projeto.texto()) == projeto.arquivos
+    assert list(separar_arquivos(projeto.texto(["main.py"]))) == ["main.py"]
+
+
+def test_resumo_interface_de_python_e_de_outros_arquivos():
+    resumo = resumo_interface("main.py", MAIN)
+    assert "from util import dobro" in resumo and "LIMITE = ..." in resumo
+    assert "class App:" in resumo and "    def rodar(self): ..." in resumo
+    assert "def dobro(x): ...  # Dobra x." in resumo_interface("util.py", UTIL)
+    assert resumo_interface("README.md", "# Título\ntexto\n").startswith("# README.md (2 linhas)")
+
+
+def test_mapear_feedback_por_caminho_ou_simbolo():
+    projeto = Projeto({"util.py": UTIL, "main.py": MAIN})
+    assert projeto.mapear_feedback("Em util.py, trate x negativo") == ["util.py"]
+    assert projeto.mapear_feedback("O método rodar deve validar o LIMITE") == ["main.py"]
+    assert projeto.mapear_feedback("Melhore a documentação") == ["util.py", "main.py"]
+
+
+def test_exportar_zip_descarta_caminhos_invalidos():
+    conteudo = exportar_zip({"util.py": UTIL, "../fora.py": "x"})
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo_zip:
+        assert arquivo_zip.namelist() == ["util.py"]
+        assert arquivo_zip.read("util.py").decode("utf-8") == UTIL
@@ -0,0 +1,99 @@
+from roteamento_modelos import HistoricoRoteamento, PoliticaRoteamento, RoteadorExecucao
+
+NIVEIS = ("lite", "flash", "pro")
+
+
+def _politica():
+    return PoliticaRoteamento(HistoricoRoteamento(":memory:"), niveis=NIVEIS, taxa_minima=0.6, min_amostras=2,
+                              limite_falhas=2)
+
+
+def _registrar(politica, papel, modelo, sucessos, falhas=0):
+    for sucesso in [True] * sucessos + [False] * falhas:
+        politica.historico.registrar(papel, modelo, sucesso, chamadas=2, latencia=1.0, custo=0.01)
+
+
+def test_historico_agrega_por_papel_e_modelo():
+    historico = HistoricoRoteamento(":memory:")
+    historico.registrar("dev", "flash", True, chamadas=2, latencia=3.0, custo=0.02)
+    historico.registrar("dev", "flash", False, chamadas=2, latencia=1.0, custo=0.02)
+    assert historico.do_papel("dev") == {"flash": {"periodos": 2, "sucessos": 1, "taxa": 0.5,
+                                                   "latencia_media": 1.0, "custo_medio": 0.01}}
+    assert historico.do_papel("revisor") == {}
+    historico.limpar()
+    assert historico.do_papel("dev") == {}
+
+
+def test_sem_historico_comeca_no_modelo_de_referencia():
+    politica = _politica()
+    assert politica.modelo_inicial("dev", "flash") == "flash"
+    assert politica.modelo_inicial("dev", "pro") == "pro"
+    assert politica.modelo_inicial("dev", "fora-dos-niveis") == "fora-dos-niveis"
+
+
+def test_desce_so_quando_o_nivel_atual_esta_comprovado():
+    politica = _politica()
+    _registrar(politica, "revisor", "flash", sucessos=1)
+    assert politica.modelo_inicial("revisor", "flash") == "flash"
+    _registrar(politica, "revisor", "flash", sucessos=1)
+    assert politica.modelo_inicial("revisor", "flash") == "lite"
+    assert politica.modelo_inicial("dev", "flash") == "flash"
+
+
+def test_nivel_abaixo_reprovado_mantem_o_papel_no_atual():
+    politica = _politica()
+    _registrar(politica, "dev", "flash", sucessos=2)
+    _registrar(politica, "dev", "lite", sucessos=0, falhas=2)
+    assert politica.modelo_inicial("dev", "flash") == "flash"
+
+
+def test_nunca_comeca_acima_da_referencia():
+    politica = _politica()
+    _registrar(politica, "dev", "pro", sucessos=2)
+    _registrar(politica, "dev", "flash", sucessos=0, falhas=2)
+    assert politica.modelo_inicial("dev", "flash") == "flash"
+    assert politica.modelo_inicial("dev", "pro") == "pro"
+
+
+def test_proximo_nivel():
+    politica = _politica()
+    assert politica.proximo_nivel("lite") == "flash"
+    assert politica.proximo_nivel("pro") is None
+    assert politica.proximo_nivel("fora-dos-niveis") == "pro"
+
+
+def test_roteador_sobe_apos_falhas_seguidas_e_registra_o_periodo():
+    politica = _politica()
+    roteador = RoteadorExecucao(politica, {"dev": "lite", "revisor": "flash"})
+    roteador.registrar_chamada("dev", {"duracao": 2.0, "custo": 0.01, "modelo": "lite"})
+    assert roteador.registrar_falha("dev", "reprovado", iteracao=1) is None
+    roteador.registrar_sucesso("dev")
+    assert roteador.registrar_falha("dev", "reprovado", iteracao=2) is None
+    escalonamento = roteador.registrar_falha("dev", "reprovado", iteracao=3)
+    assert escalonamento == {"papel": "dev", "de": "lite", "para": "flash", "motivo": "reprovado", "iteracao": 3}
+    assert roteador.modelo("dev") == "flash"
+    assert politica.historico.do_papel("dev")["lite"]["sucessos"] == 0
+
+
+def test_roteador_encerrar_registra_geradores_pelo_resultado_e_ignora_cache():
+    politica = _politica()
+    roteador = RoteadorExecucao(politica, {"dev": "flash", "revisor": "flash", "tester": "flash"})
+    roteador.registrar_chamada("dev", {"duracao": 1.0, "custo": 0.01, "modelo": "flash"})
+    roteador.registrar_chamada("revisor", {"duracao": 1.0, "custo": 0.01})
+    roteador.registrar_chamada("tester", {"duracao": 1.0, "custo": 0.01, "cache": True})
+    roteador.registrar_falha("revisor", "formato")
+    roteador.encerrar(sucesso_execucao=True)
+    assert politica.historico.do_papel("dev")["flash"]["sucessos"] == 1
+    assert politica.historico.do_papel("revisor")["flash"]["sucessos"] == 0
+    assert politica.historico.do_papel("tester") == {}
+    resumo = roteador.resumo()
+    assert resumo["iniciais"] == resumo["finais"] == {"dev": "flash", "revisor": "flash", "tester": "flash"}
+    assert set(resumo["por_papel_modelo"]) == {"dev:flash", "revisor:flash"}
+
+
+def test_execucao_abortada_nao_conta_para_os_geradores():
+    politica = _politica()
+    roteador = RoteadorExecucao(politica, {"dev": "flash"})
+    roteador.registrar_chamada("dev", {"duracao": 1.0, "custo": 0.01})
+    roteador.encerrar(sucesso_execucao=None)
+    assert politica.historico.do_papel("dev") == {}
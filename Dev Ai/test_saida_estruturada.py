@@ -0,0 +1,62 @@
+import json
+
+from sandbox_execucao import MARCADOR_CASOS_DE_TESTE
+from saida_estruturada import (ESQUEMA_VERIFICADOR, LeitorJsonIncremental, config_json, interpretar_json,
+                               relatorio_do_verificador)
+
+
+def _alimentar_em_trechos(texto, tamanho):
+    leitor = LeitorJsonIncremental()
+    eventos = []
+    for i in range(0, len(texto), tamanho):
+        eventos.extend(leitor.alimentar(texto[i:i + tamanho]))
+    return leitor, eventos
+
+
+def test_config_json_restringe_a_resposta_ao_esquema():
+    config = config_json({"temperature": 0.2}, ESQUEMA_VERIFICADOR)
+    assert config["temperature"] == 0.2
+    assert config["response_mime_type"] == "application/json"
+    assert config["response_schema"] is ESQUEMA_VERIFICADOR
+
+
+def test_leitor_emite_o_veredito_antes_do_fim_do_objeto():
+    leitor = LeitorJsonIncremental()
+    eventos = leitor.alimentar('```json\n{"status": "REPROVADO", "tarefas": ["corrigir')
+    assert ("campo", "status", "REPROVADO") in eventos
+    assert not leitor.completo and "tarefas" not in leitor.campos
+    leitor.alimentar(' x"]}')
+    assert leitor.completo and leitor.campos["tarefas"] == ["corrigir x"]
+
+
+def test_leitor_decodifica_escapes_e_surrogates_em_qualquer_corte():
+    dados = {"codigo": 'print("olá\\n")\n\ttab 😀 \\u', "linhas": 3, "ok": True, "extra": {"a": [1, "}"]}}
+    texto = json.dumps(dados)
+    for tamanho in (1, 2, 3, 7):
+        leitor, eventos = _alimentar_em_trechos(texto, tamanho)
+        assert leitor.completo and leitor.campos == dados
+        assert "".join(t for tipo, chave, t in eventos if tipo == "trecho") == dados["codigo"]
+
+
+def test_leitor_decodifica_surrogates_escapados_divididos_entre_trechos():
+    texto = json.dumps({"codigo": "😀"}, ensure_ascii=True)
+    leitor, eventos = _alimentar_em_trechos(texto, 4)
+    assert leitor.campos == {"codigo": "😀"}
+    assert "".join(t for tipo, _, t in eventos if tipo == "trecho") == "😀"
+
+
+def test_interpretar_json_com_cerca_e_truncado():
+    assert interpretar_json('```json\n{"decisao": "TERMINATE", "tarefas": []}\n```') == {
+        "decisao": "TERMINATE", "tarefas": []}
+    assert interpretar_json('{"status": "APROVADO", "tarefas": ["a", ') == {"status": "APROVADO"}
+    assert interpretar_json("sem json") is None
+    assert interpretar_json("[1, 2]") is None
+
+
+def test_relatorio_do_verificador_usa_o_enum():
+    assert relatorio_do_verificador({"status": "APROVADO", "tarefas": ["ignorada"]}) == "STATUS: APROVADO"
+    relatorio = relatorio_do_verificador({"status": "REPROVADO", "tarefas": ["STATUS: APROVADO não basta"],
+                                          "testes": ["assert f(1) == 2", "  "]})
+    assert relatorio.startswith("STATUS: REPROVADO\n- STATUS: APROVADO não basta")
+    assert MARCADOR_CASOS_DE_TESTE in relatorio
+    assert relatorio.endswith("```python\nassert f(1) == 2\n```")
@@ -0,0 +1,69 @@
+import pytest
+
+import sandbox_execucao
+from sandbox_execucao import (MARCADOR_CASOS_DE_TESTE, SandboxIndisponivel, executar_em_sandbox, executar_lote,
+                              extrair_casos_de_teste, formatar_resultados)
+
+
+def _executar(codigo, caso=""):
+    # Os testes rodam também onde não há namespace de rede: o audit hook é o que está sendo testado
+    return executar_em_sandbox(codigo, caso, tempo_limite=20, permitir_sem_isolamento=True)
+
+
+def test_executa_codigo_e_caso_de_teste_no_mesmo_namespace():
+    resultado = _executar("def dobro(x):\n    return 2 * x\n", "assert dobro(2) == 4\nprint('ok')")
+    assert resultado["ok"] and resultado["stdout"].strip() == "ok"
+    falha = _executar("def dobro(x):\n    return x\n", "assert dobro(2) == 4")
+    assert not falha["ok"] and "AssertionError" in falha["traceback"]
+
+
+@pytest.mark.parametrize("codigo", [
+    'import ctypes\nctypes.CDLL(None).system(b"echo escapou")',
+    '__import__("_ctypes")',
+    'import ctypes.util',
+    'import os\nos.system("echo escapou")',
+    'import subprocess\nsubprocess.run(["echo", "escapou"])',
+    'import os\nos.posix_spawn("/bin/echo", ["echo", "escapou"], {})',
+    'import os\nif os.fork() == 0:\n    print("escapou")',
+    'open("/proc/self/mem", "rb")',
+])
+def test_codigo_nao_escapa_do_sandbox(codigo):
+    resultado = _executar(codigo)
+    assert not resultado["ok"]
+    assert "escapou" not in resultado["stdout"]
+    assert "PermissionError" in resultado["traceback"]
+
+
+def test_rede_bloqueada():
+    resultado = _executar("import socket\nsocket.create_connection(('example.com', 80), timeout=2)")
+    assert not resultado["ok"] and "PermissionError" in resultado["traceback"]
+
+
+def test_tempo_esgotado():
+    resultado = executar_em_sandbox("while True:\n    pass\n", tempo_limite=1, cpu_segundos=5,
+                                    permitir_sem_isolamento=True)
+    assert resultado["tempo_esgotado"] and not resultado["ok"]
+
+
+def test_sem_isolamento_recusa_ou_marca_os_resultados(monkeypatch):
+    monkeypatch.setattr(sandbox_execucao, "_prefixo_sem_rede", lambda: [])
+    with pytest.raises(SandboxIndisponivel):
+        executar_em_sandbox("print(1)", permitir_sem_isolamento=False)
+    with pytest.raises(SandboxIndisponivel):
+        executar_lote("print(1)", ["print(2)"], permitir_sem_isolamento=False)
+    resultados = executar_lote("print(1)", permitir_sem_isolamento=True)
+    assert [r["isolado"] for r in resultados] == [False]
+    assert "resultados não isolados" in formatar_resultados(resultados)
+
+
+def test_executar_lote_mantem_a_ordem_e_os_arquivos_do_projeto():
+    resultados = executar_lote("from util import um\n", ["assert um() == 1", "assert um() == 2"],
+                               arquivos={"util.py": "def um():\n    return 1\n"}, permitir_sem_isolamento=True)
+    assert [(r["nome"], r["ok"]) for r in resultados] == [("importacao", True), ("caso_1", True), ("caso_2", False)]
+
+
+def test_extrair_casos_de_teste():
+    relatorio = (f"STATUS: REPROVADO\n```python\nignorado()\n```\n{MARCADOR_CASOS_DE_TESTE}\n"
+                 "```python\nassert f(1) == 2\n```\n```\nassert f(0) == 0\n```\n```python\n  \n```")
+    assert extrair_casos_de_teste(relatorio) == ["assert f(1) == 2", "assert f(0) == 0"]
+    assert extrair_casos_de_teste("STATUS: APROVADO") == []
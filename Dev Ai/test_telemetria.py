@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from telemetria import PRECOS_POR_MILHAO, TelemetriaExecucao, estimar_custo
+
+
+def test_custo_com_tokens_do_cache_de_contexto():
+    entrada, saida = PRECOS_POR_MILHAO["gemini-2.5-pro"]
+    assert estimar_custo("gemini-2.5-pro", 1_000_000, 1_000_000) == pytest.approx(entrada + saida)
+    assert estimar_custo("gemini-2.5-pro", 1_000_000, 0, tokens_cacheados=1_000_000) == pytest.approx(entrada / 4)
+    assert estimar_custo("desconhecido", 1_000_000, 0) > 0
+
+
+def telemetria_exemplo():
+    telemetria = TelemetriaExecucao(execucao_id="e1")
+    telemetria.registrar(1, {"agente": "dev", "modelo": "m1", "duracao": 1.0, "tokens_saida": 10, "custo": 0.5})
+    telemetria.registrar(1, {"agente": "Revisor", "modelo": "m2", "duracao": 0.5, "cache": True})
+    telemetria.registrar(2, {"agente": "dev", "modelo": "m1", "duracao": 2.0, "tokens_saida": 5, "falha": "erro_llm",
+                             "detalhes": {"ignorado": True}})
+    return telemetria
+
+
+def test_agregados_por_agente_iteracao_e_total():
+    telemetria = telemetria_exemplo()
+    dev = telemetria.por_agente()["dev"]
+    assert (dev["modelo"], dev["chamadas"], dev["chamadas_falhas"], dev["tokens_saida"]) == ("m1", 2, 1, 15)
+    assert telemetria.por_iteracao()[1]["chamadas_cache"] == 1
+    assert telemetria.da_iteracao(2)["duracao"] == 2.0
+    assert telemetria.total()["duracao"] == 3.5
+    assert "detalhes" not in telemetria.registros[2]
+
+
+def test_exportacoes():
+    telemetria = telemetria_exemplo()
+    linhas = [json.loads(linha) for linha in telemetria.exportar_jsonl().splitlines()]
+    assert len(linhas) == 3 and all(linha["execucao"] == "e1" for linha in linhas)
+    texto = telemetria.exportar_prometheus()
+    assert '# TYPE devai_agente_chamadas_total counter' in texto
+    assert 'devai_agente_chamadas_total{agente="dev",modelo="m1",execucao="e1"} 2' in texto
@@ -0,0 +1,41 @@
+from triagem_candidatos import avaliar_candidato, extrair_codigo, ranquear_candidatos, termos_da_especificacao
+
+SPEC = "Implemente `calcular_media(valores)` que retorna a média e levanta ValueError para lista vazia."
+
+BOM = '''--- CODIGO PYTHON ---
+```python
+def calcular_media(valores):
+    if not valores:
+        raise ValueError("lista vazia")
+    return sum(valores) / len(valores)
+```
+--- CONTEXTO ORIGINAL DO CLIENTE ---
+pedido'''
+SEM_COBERTURA = "```python\ndef media(v):\n    if not v:\n        return 0\n    return sum(v) / len(v)\n```"
+QUEBRADO = "```python\ndef calcular_media(valores:\n    return sum(valores) / len(valores)\n```"
+
+
+def test_extrai_o_codigo_sem_rotulo_cercas_e_contexto():
+    assert extrair_codigo(BOM).startswith("def calcular_media(valores):")
+    assert "CONTEXTO" not in extrair_codigo(BOM)
+
+
+def test_termos_da_especificacao():
+    assert {"calcular_media", "ValueError"} <= termos_da_especificacao(SPEC)
+    assert "ordenar" in termos_da_especificacao("ordenar nomes alfabeticamente")
+
+
+def test_erro_do_llm_e_invalido():
+    avaliacao = avaliar_candidato("ERRO DE EXECUÇÃO DO LLM PARA dev: quota", {"x"})
+    assert not avaliacao["valido"] and avaliacao["motivo"] == "erro do LLM"
+
+
+def test_ranking_prefere_o_que_compila_e_cobre_a_spec():
+    ranking = ranquear_candidatos({0: QUEBRADO, 1: SEM_COBERTURA, 2: BOM, 3: "ERRO DE EXECUÇÃO DO LLM: x"}, SPEC)
+    assert [item["indice"] for item in ranking] == [2, 1, 0, 3]
+    assert ranking[2]["motivo"] == "não compila"
+    assert ranking[3]["pontuacao"] is None
+
+
+def test_empate_favorece_o_menor_indice():
+    assert [item["indice"] for item in ranquear_candidatos({1: BOM, 0: BOM}, SPEC)] == [0, 1]
@@ -0,0 +1,83 @@
+import re
+import statistics
+
+from diff_incremental import remover_cercas_markdown
+from precheck_estatico import verificar_estilo, verificar_sintaxe
+
+# ---------------------------------------------------------
+# TRIAGEM LOCAL DOS CANDIDATOS DO DEV (MODO ESPECULATIVO)
+# ---------------------------------------------------------
+
+# Pesos da pontuação: compilar domina; a cobertura da spec desempata entre os que compilam
+PESO_COMPILA = 100.0
+PESO_COBERTURA = 40.0
+PESO_AVISO_ESTILO = 0.5
+PENALIDADE_TRUNCADO = 30.0
+# Candidatos com menos que esta fração da mediana de tamanho provavelmente foram truncados
+FRACAO_TAMANHO_MINIMO = 0.5
+
+_PALAVRAS_COMUNS = {"para", "como", "deve", "devem", "cada", "quando", "retorna", "retornar", "função", "funcao",
+                    "classe", "código", "codigo", "python", "especificacao", "especificação", "cliente"}
+
+
+def extrair_codigo(resposta):
+    """Código da resposta do Dev: antes do contexto original, sem o rótulo e sem cercas markdown."""
+    codigo = resposta.split("--- CONTEXTO ORIGINAL DO CLIENTE ---", 1)[0].replace("--- CODIGO PYTHON ---", "")
+    return remover_cercas_markdown(codigo).strip("\n")
+
+
+def termos_da_especificacao(texto):
+    """
+    Termos que a spec espera ver no código: identificadores entre aspas ou
+    crases, chamadas 'nome(' e nomes com '_' ou CamelCase; na falta deles,
+    as palavras de 4+ letras do texto.
+    """
+    termos = set(re.findall(r"[`'\"]([A-Za-z_]\w*)", texto))
+    termos |= set(re.findall(r"\b([A-Za-z_]\w*)\(", texto))
+    termos |= set(re.findall(r"\b([a-z]+_\w+|[A-Z][a-z]+[A-Z]\w*)\b", texto))
+    if not termos:
+        termos = {p for p in re.findall(r"\b[^\W\d_]{4,}\b", texto.lower()) if p not in _PALAVRAS_COMUNS}
+    return termos
+
+
+def avaliar_candidato(resposta, termos, linguagem="python"):
+    """Medições locais de um candidato (sem LLM): compila, avisos PEP8, tamanho e cobertura dos termos da spec."""
+    if not resposta or resposta.startswith("ERRO DE EXECUÇÃO DO LLM"):
+        return {"valido": False, "motivo": "erro do LLM", "compila": False, "avisos_estilo": 0, "tamanho": 0,
+                "cobertura_spec": 0.0}
+    codigo = extrair_codigo(resposta)
+    if not codigo.strip():
+        return {"valido": False, "motivo": "sem código", "compila": False, "avisos_estilo": 0, "tamanho": 0,
+                "cobertura_spec": 0.0}
+    compila, avisos = True, 0
+    if linguagem == "python":
+        compila = not verificar_sintaxe(codigo)
+        avisos = len(verificar_estilo(codigo)) if compila else 0
+    palavras_codigo = set(re.findall(r"\w+", codigo.lower()))
+    cobertura = sum(1 for t in termos if t.lower() in palavras_codigo) / len(termos) if termos else 1.0
+    return {"valido": True, "motivo": "" if compila else "não compila", "compila": compila,
+            "avisos_estilo": avisos, "tamanho": len(codigo.encode("utf-8")), "cobertura_spec": cobertura}
+
+
+def ranquear_candidatos(respostas, especificacao, linguagem="python"):
+    """
+    Avalia e ordena os candidatos {indice: resposta} do melhor para o pior.
+    Cada item traz "indice", "rank", "pontuacao" e as medições de
+    avaliar_candidato. Empates favorecem o menor índice (a variante padrão).
+    """
+    termos = termos_da_especificacao(especificacao)
+    avaliacoes = {indice: avaliar_candidato(resposta, termos, linguagem) for indice, resposta in respostas.items()}
+    tamanhos = [a["tamanho"] for a in avaliacoes.values() if a["valido"]]
+    mediana = statistics.median(tamanhos) if tamanhos else 0
+    for avaliacao in avaliacoes.values():
+        if not avaliacao["valido"]:
+            avaliacao["pontuacao"] = None
+            continue
+        truncado = mediana and avaliacao["tamanho"] < mediana * FRACAO_TAMANHO_MINIMO
+        if truncado and not avaliacao["motivo"]:
+            avaliacao["motivo"] = "muito menor que os demais"
+        avaliacao["pontuacao"] = (PESO_COMPILA * avaliacao["compila"] + PESO_COBERTURA * avaliacao["cobertura_spec"]
+                                  - PESO_AVISO_ESTILO * avaliacao["avisos_estilo"] - PENALIDADE_TRUNCADO * bool(truncado))
+    ordem = sorted(avaliacoes, key=lambda indice: (avaliacoes[indice]["pontuacao"] is None,
+                                                   -(avaliacoes[indice]["pontuacao"] or 0), indice))
+    return [{"indice": indice, "rank": rank, **avaliacoes[indice]} for rank, indice in enumerate(ordem, start=1)]